@@ -0,0 +1,167 @@
+# apps/core/alcance.py
+"""
+Visibilidad por rol: reglas declarativas rol → predicado.
+
+Cada modelo con listados filtrados por rol declara ALCANCE_POR_ROL:
+
+    ALCANCE_POR_ROL = {
+        "ADMIN": TODOS,
+        "SUPERVISOR": Condicion("ot__vehiculo__site", SITES),
+        "MECANICO": (Condicion("subido_por"), Condicion("ot__mecanico")),
+        "GUARDIA": Condicion("subido_por"),
+    }
+
+- TODOS / NINGUNO: el rol ve todo / nada (los roles no declarados no ven nada)
+- Condicion(campo, valor): campo (ruta del ORM) igual al usuario o dentro
+  de los sites / vehículos supervisados del AuthContext
+- Una tupla de condiciones se combina con OR
+
+filtrar_por_rol() compila la regla del rol en un solo Q que se aplica con
+filter(): el queryset sigue admitiendo filtros, ordenamiento y paginación,
+y cada predicado tiene un índice compuesto que lo cubre (ver los Meta de
+los modelos). Reemplaza las ramas if/elif escritas a mano en cada
+get_queryset, entre ellas un union() para el mecánico que impedía filtrar
+y ordenar el listado.
+
+puede_ver() evalúa la misma regla sobre un objeto ya cargado, sin
+consultas (para has_object_permission).
+
+Relaciones:
+- Usa: apps/users/auth_context.py (AuthContext del request)
+- Usado por: apps/workorders/models.py (Evidencia), apps/emergencies/models.py
+  (EmergenciaRuta), apps/scheduling/models.py (Agenda)
+- Usado por: apps/workorders/views.py, apps/workorders/permissions.py,
+  apps/emergencies/views.py, apps/scheduling/views.py
+"""
+
+from django.db.models import Q
+
+
+class _Alcance:
+    """Marcador de alcance total o nulo."""
+
+    def __init__(self, nombre):
+        self.nombre = nombre
+
+    def __repr__(self):
+        return self.nombre
+
+
+TODOS = _Alcance("TODOS")
+NINGUNO = _Alcance("NINGUNO")
+
+# Valores del AuthContext usables en una Condicion
+USUARIO = "user_id"
+SITES = "sites"
+VEHICULOS_SUPERVISADOS = "vehiculos_supervisados"
+
+
+class Condicion:
+    """
+    Predicado campo = usuario, o campo IN (sites | vehículos supervisados).
+
+    Parámetros:
+    - campo: Ruta del ORM (ej: "ot__mecanico", "ot__vehiculo__site")
+    - valor: USUARIO (por defecto), SITES o VEHICULOS_SUPERVISADOS
+    - si_vacio: Alcance si el conjunto del contexto está vacío (NINGUNO por
+      defecto; TODOS para "sin site configurado ve todo")
+    """
+
+    def __init__(self, campo, valor=USUARIO, si_vacio=NINGUNO):
+        self.campo = campo
+        self.valor = valor
+        self.si_vacio = si_vacio
+
+    def __repr__(self):
+        return f"Condicion({self.campo!r}, {self.valor!r})"
+
+    def compilar(self, contexto):
+        """Retorna un Q, o TODOS/NINGUNO si el conjunto del contexto está vacío."""
+        valor = getattr(contexto, self.valor)
+        if self.valor == USUARIO:
+            return Q(**{self.campo: valor})
+        if not valor:
+            return self.si_vacio
+        return Q(**{f"{self.campo}__in": sorted(valor)})
+
+    def cumple(self, obj, contexto):
+        """Evalúa la condición sobre un objeto (relaciones vía select_related)."""
+        valor = getattr(contexto, self.valor)
+        if self.valor != USUARIO and not valor:
+            return self.si_vacio is TODOS
+
+        *ruta, ultimo = self.campo.split("__")
+        for nombre in ruta:
+            obj = getattr(obj, nombre)
+            if obj is None:
+                return False
+        # attname: para una FK compara el id sin cargar el objeto relacionado
+        actual = getattr(obj, obj._meta.get_field(ultimo).attname)
+        if self.valor == USUARIO:
+            return actual == valor
+        return actual in valor
+
+
+def _regla(modelo, contexto):
+    if contexto is None:
+        return NINGUNO
+    regla = modelo.ALCANCE_POR_ROL.get(contexto.rol, NINGUNO)
+    if isinstance(regla, Condicion):
+        return (regla,)
+    return regla
+
+
+def compilar_alcance(modelo, contexto):
+    """
+    Compila la regla del rol del contexto para el modelo.
+
+    Retorna:
+    - TODOS, NINGUNO o un Q (OR de las condiciones)
+    """
+    regla = _regla(modelo, contexto)
+    if regla is TODOS or regla is NINGUNO:
+        return regla
+
+    filtro = None
+    for condicion in regla:
+        parcial = condicion.compilar(contexto)
+        if parcial is TODOS:
+            return TODOS
+        if parcial is NINGUNO:
+            continue
+        filtro = parcial if filtro is None else filtro | parcial
+    return NINGUNO if filtro is None else filtro
+
+
+def filtrar_por_rol(queryset, contexto):
+    """
+    Filtra el queryset con la regla del rol (contexto None: anónimo, nada).
+    """
+    filtro = compilar_alcance(queryset.model, contexto)
+    if filtro is TODOS:
+        return queryset
+    if filtro is NINGUNO:
+        return queryset.none()
+    return queryset.filter(filtro)
+
+
+def puede_ver(obj, contexto):
+    """True si la regla del rol incluye al objeto."""
+    regla = _regla(type(obj), contexto)
+    if regla is TODOS or regla is NINGUNO:
+        return regla is TODOS
+    return any(condicion.cumple(obj, contexto) for condicion in regla)
+
+
+class AlcancePorRolMixin:
+    """
+    Mixin de ViewSet: get_queryset filtrado con el ALCANCE_POR_ROL del modelo.
+
+    Uso:
+        class AgendaViewSet(AlcancePorRolMixin, viewsets.ModelViewSet):
+            queryset = Agenda.objects.select_related(...)
+    """
+
+    def get_queryset(self):
+        from apps.users.auth_context import obtener_contexto
+        return filtrar_por_rol(super().get_queryset(), obtener_contexto(self.request))
@@ -0,0 +1,77 @@
+# apps/core/busqueda.py
+"""
+Búsqueda de texto (patentes, catálogo) compatible con los índices de las tablas.
+
+Django traduce icontains/istartswith en PostgreSQL a
+UPPER(col::text) LIKE UPPER(...). Sobre esa expresión existen dos índices
+(apps/vehicles/migrations/0010_busqueda_patente.py, y para el catálogo de
+repuestos apps/inventory/migrations/0005_busqueda_catalogo.py):
+
+- btree text_pattern_ops: sirve LIKE 'ABC%' (prefijo)
+- GIN de trigramas (pg_trgm): sirve LIKE '%ABC%' (contenido)
+
+Los filtros de patente (filtro_patente) buscan siempre por contenido: un
+término de 1-2 caracteres no alcanza para un trigrama y recorre todo el
+índice, pero cambiar a prefijo dejaría de encontrar, por ejemplo, "12" en
+ABCD12. El prefijo se usa solo en los autocompletados (patentes en
+portería, filtro_texto en el catálogo), donde es lo que el usuario espera.
+
+Relaciones:
+- Usado por: apps/workorders/filters.py (OrdenTrabajoFilter.patente)
+- Usado por: apps/vehicles/views.py (ingresos, autocompletado de patentes)
+- Usado por: apps/inventory/catalogo.py (autocompletado de repuestos)
+"""
+
+import re
+
+from django.db.models import Q
+
+# Largo mínimo para que un término use el índice de trigramas
+LARGO_MINIMO_TRIGRAMA = 3
+
+
+def normalizar_patente_busqueda(valor: str) -> str:
+    """
+    Normaliza un término de búsqueda de patente: mayúsculas y sin
+    separadores ("ab-cd 12" → "ABCD12"), igual que se guardan las patentes.
+    """
+    return re.sub(r"[^0-9A-Z]", "", (valor or "").upper())
+
+
+def filtro_patente(valor: str, campo: str = "patente") -> Q:
+    """
+    Retorna el Q de búsqueda por patente para el término indicado.
+
+    Parámetros:
+    - valor: Texto ingresado (se normaliza)
+    - campo: Campo de patente (admite relaciones, ej: "vehiculo__patente")
+
+    Retorna:
+    - Q(campo__icontains=...) con el término normalizado
+    - Q() si el término queda vacío
+    """
+    termino = normalizar_patente_busqueda(valor)
+    if not termino:
+        return Q()
+    return Q(**{f"{campo}__icontains": termino})
+
+
+def filtro_texto(valor: str, *campos: str) -> Q:
+    """
+    Retorna el Q de autocompletado que busca el término en cualquiera de los
+    campos: prefijo si es corto (no alcanza para un trigrama), contenido si no.
+
+    El término solo se recorta; no se normaliza como patente.
+
+    Ejemplo:
+    >>> filtro_texto("fil", "codigo", "nombre")
+    Q(codigo__icontains="fil") | Q(nombre__icontains="fil")
+    """
+    termino = (valor or "").strip()
+    if not termino:
+        return Q()
+    lookup = "istartswith" if len(termino) < LARGO_MINIMO_TRIGRAMA else "icontains"
+    condicion = Q()
+    for campo in campos:
+        condicion |= Q(**{f"{campo}__{lookup}": termino})
+    return condicion
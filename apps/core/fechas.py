@@ -0,0 +1,77 @@
+# apps/core/fechas.py
+"""
+Rangos de días locales para filtrar columnas DateTimeField.
+
+Con USE_TZ, un filtro como apertura__date=hoy se traduce a
+(apertura AT TIME ZONE 'America/Santiago')::date = '2025-01-15', una
+expresión que no puede usar el índice btree sobre apertura. Estos helpers
+convierten días locales en rangos [inicio, fin) de timestamptz, que sí lo
+usan:
+
+    apertura__date=dia              →  apertura >= inicio AND apertura < fin
+    apertura__date__gte=desde       →  apertura >= inicio(desde)
+    apertura__date__lte=hasta       →  apertura < inicio(hasta + 1 día)
+
+Los límites se calculan en la zona horaria activa (TIME_ZONE del proyecto),
+así que los días con cambio de horario quedan con su duración real.
+
+Relaciones:
+- Usado por: apps/core/filters.py (filtros de django-filter)
+- Usado por: views, reportes, agenda y servicios que filtran por día
+"""
+
+from datetime import date, datetime, time, timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+
+
+def inicio_dia_local(dia: date) -> datetime:
+    """
+    Retorna el instante (aware) en que comienza el día local indicado.
+    """
+    return timezone.make_aware(datetime.combine(dia, time.min))
+
+
+def rango_dia_local(dia: date) -> tuple[datetime, datetime]:
+    """
+    Retorna el rango [inicio, fin) del día local indicado.
+
+    >>> inicio, fin = rango_dia_local(timezone.localdate())
+    >>> OrdenTrabajo.objects.filter(cierre__gte=inicio, cierre__lt=fin)
+    """
+    return inicio_dia_local(dia), inicio_dia_local(dia + timedelta(days=1))
+
+
+def rango_dias_locales(desde: date, hasta: date) -> tuple[datetime, datetime]:
+    """
+    Retorna el rango [inicio de desde, fin de hasta) (ambos días incluidos).
+    """
+    return inicio_dia_local(desde), inicio_dia_local(hasta + timedelta(days=1))
+
+
+def filtro_dias_locales(campo: str, desde: date | None = None, hasta: date | None = None) -> Q:
+    """
+    Retorna un Q equivalente a campo__date__gte=desde y campo__date__lte=hasta,
+    expresado como rango sobre la columna.
+
+    Parámetros:
+    - campo: Nombre del DateTimeField (admite relaciones, ej: "ots__cierre")
+    - desde: Primer día incluido (opcional)
+    - hasta: Último día incluido (opcional)
+
+    >>> OrdenTrabajo.objects.filter(filtro_dias_locales("apertura", desde, hasta))
+    """
+    condicion = Q()
+    if desde is not None:
+        condicion &= Q(**{f"{campo}__gte": inicio_dia_local(desde)})
+    if hasta is not None:
+        condicion &= Q(**{f"{campo}__lt": inicio_dia_local(hasta + timedelta(days=1))})
+    return condicion
+
+
+def filtro_dia_local(campo: str, dia: date) -> Q:
+    """
+    Retorna un Q equivalente a campo__date=dia, expresado como rango.
+    """
+    return filtro_dias_locales(campo, dia, dia)
@@ -0,0 +1,43 @@
+# apps/core/filters.py
+"""
+Filtros de django-filter compartidos.
+
+Relaciones:
+- Usa: apps/core/fechas.py (rangos de días locales)
+- Usado por: apps/workorders/filters.py
+"""
+
+import django_filters as filters
+from django_filters.constants import EMPTY_VALUES
+
+from .fechas import filtro_dias_locales
+
+
+class DiaLocalDesdeFilter(filters.DateFilter):
+    """
+    Filtra un DateTimeField desde el inicio del día local indicado (incluido).
+
+    Reemplaza DateFilter(lookup_expr="date__gte"), que no usa el índice:
+    ?apertura_from=2025-01-15 → apertura >= 2025-01-15 00:00 America/Santiago
+    """
+
+    def filter(self, qs, value):
+        if value in EMPTY_VALUES:
+            return qs
+        qs = qs.filter(filtro_dias_locales(self.field_name, desde=value))
+        return qs.distinct() if self.distinct else qs
+
+
+class DiaLocalHastaFilter(filters.DateFilter):
+    """
+    Filtra un DateTimeField hasta el fin del día local indicado (incluido).
+
+    Reemplaza DateFilter(lookup_expr="date__lte"), que no usa el índice:
+    ?apertura_to=2025-01-15 → apertura < 2025-01-16 00:00 America/Santiago
+    """
+
+    def filter(self, qs, value):
+        if value in EMPTY_VALUES:
+            return qs
+        qs = qs.filter(filtro_dias_locales(self.field_name, hasta=value))
+        return qs.distinct() if self.distinct else qs
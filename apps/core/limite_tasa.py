@@ -0,0 +1,123 @@
+# apps/core/limite_tasa.py
+"""
+Limitador de tasa atómico (GCRA, equivalente a un token bucket).
+
+Cada clave guarda un solo número: el TAT ("theoretical arrival time"), el
+instante a partir del cual el balde vuelve a estar lleno. Con un
+presupuesto de `limite` solicitudes cada `periodo` segundos:
+
+- intervalo = periodo / limite (lo que "cuesta" cada solicitud)
+- Se admite si TAT + intervalo - periodo <= ahora; el nuevo TAT es
+  max(TAT, ahora) + intervalo
+- Si no, la espera (Retry-After) es exactamente TAT + intervalo - periodo - ahora
+
+Permite ráfagas de hasta `limite` solicitudes y luego una cada
+`intervalo`, sin ventanas que se reinicien de golpe.
+
+Backends:
+- Redis (caché django-redis): un script Lua hace la lectura, la decisión y
+  la escritura en una sola operación atómica (EVALSHA, un viaje de red) y
+  usa el reloj de Redis, común a todos los procesos
+- En memoria (LocMemCache en desarrollo y tests): el mismo algoritmo con un
+  lock, por proceso
+
+Reemplaza el cache.get + cache.set del RateLimitMiddleware original, que no
+era atómico: bajo carga admitía de más y reiniciaba la ventana en cada
+solicitud.
+
+Relaciones:
+- Usado por: apps/workorders/middleware.py (RateLimitMiddleware)
+- Usado por: apps/workorders/management/commands/benchmark_rate_limit.py
+"""
+
+import threading
+import time
+
+from django.conf import settings
+
+# Prefijo de las claves en Redis
+PREFIJO_CLAVE = "pgf:rl"
+
+# GCRA: KEYS[1] = clave, ARGV[1] = intervalo (ms), ARGV[2] = periodo (ms).
+# Retorna 0 si se admite o los ms de espera si no.
+LUA_GCRA = """
+local reloj = redis.call('TIME')
+local ahora = tonumber(reloj[1]) * 1000 + math.floor(tonumber(reloj[2]) / 1000)
+local intervalo = tonumber(ARGV[1])
+local periodo = tonumber(ARGV[2])
+local tat = tonumber(redis.call('GET', KEYS[1]) or ahora)
+if tat < ahora then
+    tat = ahora
+end
+local espera = tat + intervalo - periodo - ahora
+if espera > 0 then
+    return espera
+end
+redis.call('SET', KEYS[1], tat + intervalo, 'PX', tat + intervalo - ahora)
+return 0
+"""
+
+# Máximo de claves del backend en memoria antes de purgar las vencidas
+MAX_CLAVES_LOCAL = 10_000
+
+
+class LimitadorRedis:
+    """GCRA en Redis con un script Lua (atómico entre procesos)."""
+
+    def __init__(self, alias="default"):
+        from django_redis import get_redis_connection
+
+        self._script = get_redis_connection(alias).register_script(LUA_GCRA)
+
+    def consumir(self, clave, intervalo_ms, periodo_ms):
+        return int(self._script(keys=[f"{PREFIJO_CLAVE}:{clave}"], args=[intervalo_ms, periodo_ms]))
+
+
+class LimitadorLocal:
+    """GCRA en memoria del proceso (desarrollo y tests)."""
+
+    def __init__(self):
+        self._tat = {}
+        self._lock = threading.Lock()
+
+    def consumir(self, clave, intervalo_ms, periodo_ms):
+        ahora = time.monotonic() * 1000
+        with self._lock:
+            tat = max(self._tat.get(clave, ahora), ahora)
+            espera = tat + intervalo_ms - periodo_ms - ahora
+            if espera > 0:
+                return int(espera) + 1
+            self._tat[clave] = tat + intervalo_ms
+            if len(self._tat) > MAX_CLAVES_LOCAL:
+                # Las claves con TAT vencido equivalen a un balde lleno
+                self._tat = {k: v for k, v in self._tat.items() if v > ahora}
+        return 0
+
+
+_limitador = None
+
+
+def obtener_limitador():
+    """
+    Retorna el limitador según el backend de la caché por defecto
+    (Redis si es django-redis; en memoria si no).
+    """
+    global _limitador
+    if _limitador is None:
+        if settings.CACHES["default"]["BACKEND"].startswith("django_redis"):
+            _limitador = LimitadorRedis()
+        else:
+            _limitador = LimitadorLocal()
+    return _limitador
+
+
+def consumir(clave, limite, periodo, limitador=None):
+    """
+    Consume una solicitud del presupuesto `limite` por `periodo` segundos.
+
+    Retorna:
+    - 0 si se admite
+    - Milisegundos a esperar (Retry-After) si se excedió el presupuesto
+    """
+    periodo_ms = periodo * 1000
+    return (limitador or obtener_limitador()).consumir(clave, periodo_ms // limite, periodo_ms)
@@ -0,0 +1,34 @@
+# apps/core/pagination.py
+"""
+Clases de paginación compartidas.
+
+Relaciones:
+- Usado por: apps/vehicles/views.py (secciones del historial del vehículo)
+"""
+
+from rest_framework.pagination import CursorPagination
+
+
+class FechaCursorPagination(CursorPagination):
+    """
+    Paginación por cursor (keyset) ordenada por fecha descendente.
+
+    A diferencia de la paginación por página/offset, el costo de cada página
+    no crece con la profundidad: la consulta usa WHERE fecha < cursor sobre
+    un índice (vehiculo, fecha) en vez de OFFSET.
+
+    El campo de orden se define al instanciar:
+    >>> paginator = FechaCursorPagination(ordering=("-apertura", "-id"))
+
+    Query params:
+    - cursor: Cursor opaco retornado en "next"/"previous"
+    - page_size: Tamaño de página (default 20, máximo 100)
+    """
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = "-id"
+
+    def __init__(self, ordering=None):
+        if ordering is not None:
+            self.ordering = ordering
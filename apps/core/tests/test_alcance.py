@@ -0,0 +1,169 @@
+# apps/core/tests/test_alcance.py
+"""
+Tests para la visibilidad por rol (apps/core/alcance.py).
+"""
+
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from apps.core.alcance import NINGUNO, TODOS, compilar_alcance, filtrar_por_rol, puede_ver
+from apps.emergencies.models import EmergenciaRuta
+from apps.scheduling.models import Agenda
+from apps.users.auth_context import AuthContext, contexto_de_usuario
+from apps.users.models import User
+from apps.vehicles.models import Vehiculo
+from apps.workorders.models import Evidencia, OrdenTrabajo
+
+
+def _resultados(response):
+    return response.data["results"] if isinstance(response.data, dict) else response.data
+
+
+def _cliente(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    contexto_de_usuario(user)  # Contexto en caché: el listado no lo consulta
+    return client
+
+
+@pytest.fixture
+def evidencias(db, orden_trabajo, mecanico_user, guardia_user, jefe_taller_user):
+    """Evidencias subidas por el mecánico, de su OT, de un guardia y de otro site."""
+    orden_trabajo.mecanico = mecanico_user
+    orden_trabajo.save(update_fields=["mecanico"])
+    otro = Vehiculo.objects.create(patente="OTRO01", marca="Ford", modelo="Ranger", anio=2021, site="OTRO")
+    ot_ajena = OrdenTrabajo.objects.create(vehiculo=otro, jefe_taller=jefe_taller_user, motivo="Otra", site="OTRO")
+
+    def crear(nombre, ot, subido_por=None):
+        return Evidencia.objects.create(ot=ot, url=f"https://s3.example.com/{nombre}.jpg", subido_por=subido_por)
+
+    return {
+        "subida": crear("subida", ot_ajena, mecanico_user),
+        "de_su_ot": crear("de_su_ot", orden_trabajo),
+        "guardia": crear("guardia", ot_ajena, guardia_user),
+        "ajena": crear("ajena", ot_ajena),
+    }
+
+
+@pytest.mark.unit
+class TestCompilarAlcance:
+    """Tests del compilador rol → Q"""
+
+    def test_roles_todos_y_no_declarados(self):
+        """Test TODOS para ADMIN y NINGUNO para roles no declarados o anónimos"""
+        assert compilar_alcance(Evidencia, AuthContext(1, "ADMIN")) is TODOS
+        assert compilar_alcance(Evidencia, AuthContext(1, "CHOFER")) is NINGUNO
+        assert compilar_alcance(Evidencia, None) is NINGUNO
+
+    def test_condiciones_or(self):
+        """Test que varias condiciones se combinan en un solo Q con OR"""
+        filtro = compilar_alcance(Evidencia, AuthContext(7, "MECANICO"))
+        assert filtro.connector == "OR"
+        assert sorted(filtro.children) == [("ot__mecanico", 7), ("subido_por", 7)]
+
+    def test_sites_vacios(self):
+        """Test si_vacio: jefe de taller sin sites ve todo, supervisor nada"""
+        assert compilar_alcance(Evidencia, AuthContext(1, "JEFE_TALLER")) is TODOS
+        assert compilar_alcance(Evidencia, AuthContext(1, "SUPERVISOR")) is NINGUNO
+        filtro = compilar_alcance(Evidencia, AuthContext(1, "SUPERVISOR", sites={"B", "A"}))
+        assert filtro.children == [("ot__vehiculo__site__in", ["A", "B"])]
+
+
+@pytest.mark.django_db
+@pytest.mark.service
+class TestFiltrarYPuedeVer:
+    """Tests de filtrar_por_rol y puede_ver con las mismas reglas"""
+
+    @pytest.mark.parametrize("rol, visibles", [
+        ("MECANICO", {"subida", "de_su_ot"}),
+        ("GUARDIA", {"guardia"}),
+        ("SUPERVISOR", {"de_su_ot"}),
+        ("ADMIN", {"subida", "de_su_ot", "guardia", "ajena"}),
+        ("COORDINADOR_ZONA", set()),
+    ])
+    def test_misma_regla_en_queryset_y_objeto(self, evidencias, mecanico_user, guardia_user, supervisor_user,
+                                               admin_user, rol, visibles):
+        """Test que el listado y la verificación por objeto coinciden"""
+        user = {"MECANICO": mecanico_user, "GUARDIA": guardia_user, "SUPERVISOR": supervisor_user}.get(rol, admin_user)
+        contexto = contexto_de_usuario(user)
+        contexto.rol = rol
+        por_id = {e.id: nombre for nombre, e in evidencias.items()}
+
+        en_queryset = {por_id[e.id] for e in filtrar_por_rol(Evidencia.objects.all(), contexto)}
+        cargadas = Evidencia.objects.select_related("ot__vehiculo")
+        por_objeto = {por_id[e.id] for e in cargadas if puede_ver(e, contexto)}
+        assert en_queryset == por_objeto == visibles
+
+    def test_puede_ver_sin_consultas(self, evidencias, mecanico_user):
+        """Test que puede_ver compara ids sin cargar relaciones"""
+        contexto = contexto_de_usuario(mecanico_user)
+        evidencia = Evidencia.objects.select_related("ot").get(pk=evidencias["de_su_ot"].pk)
+        with CaptureQueriesContext(connection) as ctx:
+            assert puede_ver(evidencia, contexto)
+        assert ctx.captured_queries == []
+
+
+@pytest.mark.django_db
+@pytest.mark.api
+class TestListadosPorRol:
+    """Tests de los listados filtrados con AlcancePorRolMixin"""
+
+    def test_evidencias_mecanico_filtra_y_ordena(self, evidencias, mecanico_user, django_assert_num_queries):
+        """Test que el mecánico puede filtrar y ordenar (antes union()) en una consulta"""
+        client = _cliente(mecanico_user)
+        with django_assert_num_queries(1) as ctx:
+            response = client.get("/api/v1/work/evidencias/?tipo=FOTO&ordering=-subido_en")
+        assert response.status_code == status.HTTP_200_OK
+        assert "UNION" not in ctx.captured_queries[0]["sql"]
+        ids = [e["id"] for e in _resultados(response)]
+        assert ids == [str(evidencias["de_su_ot"].id), str(evidencias["subida"].id)]
+
+    def test_evidencia_ajena_404(self, evidencias, mecanico_user):
+        """Test que el detalle usa la misma regla"""
+        client = _cliente(mecanico_user)
+        response = client.get(f"/api/v1/work/evidencias/{evidencias['ajena'].id}/")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_emergencias_por_rol(self, vehiculo, mecanico_user, supervisor_user, admin_user,
+                                 django_assert_num_queries):
+        """Test que cada rol ve sus emergencias con una consulta por listado"""
+        coordinador = User.objects.create_user(
+            username="coord_alcance", email="coord_alcance@test.com", password="x", rol="COORDINADOR_ZONA"
+        )
+        datos = {"vehiculo": vehiculo, "descripcion": "Pana", "ubicacion": "Ruta 5"}
+        propia = EmergenciaRuta.objects.create(solicitante=coordinador, mecanico_asignado=mecanico_user, **datos)
+        EmergenciaRuta.objects.create(solicitante=admin_user, supervisor_asignado=supervisor_user, **datos)
+
+        esperados = {mecanico_user: 1, supervisor_user: 1, coordinador: 1, admin_user: 2}
+        for user, cantidad in esperados.items():
+            client = _cliente(user)
+            with django_assert_num_queries(1):
+                response = client.get("/api/v1/emergencies/?estado=SOLICITADA")
+            assert len(_resultados(response)) == cantidad
+        assert _resultados(_cliente(coordinador).get("/api/v1/emergencies/"))[0]["id"] == str(propia.id)
+
+    def test_agendas_coordinador(self, vehiculo, supervisor_user, mecanico_user, django_assert_num_queries):
+        """Test que el coordinador ve solo sus agendas y otros roles según la regla"""
+        coordinadores = [
+            User.objects.create_user(
+                username=f"coord_agenda{i}", email=f"coord_agenda{i}@test.com", password="x", rol="COORDINADOR_ZONA"
+            )
+            for i in range(2)
+        ]
+        manana = timezone.now() + timedelta(days=1)
+        for i, coordinador in enumerate(coordinadores):
+            Agenda.objects.create(
+                vehiculo=vehiculo, coordinador=coordinador, fecha_programada=manana + timedelta(days=i), motivo="PM"
+            )
+
+        client = _cliente(coordinadores[0])
+        with django_assert_num_queries(1):
+            response = client.get("/api/v1/scheduling/agendas/")
+        assert len(_resultados(response)) == 1
+        assert len(_resultados(_cliente(supervisor_user).get("/api/v1/scheduling/agendas/"))) == 2
+        assert _resultados(_cliente(mecanico_user).get("/api/v1/scheduling/agendas/")) == []
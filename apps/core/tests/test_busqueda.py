@@ -0,0 +1,77 @@
+"""
+Tests para la búsqueda por patente (apps/core/busqueda.py) y sus índices.
+"""
+import pytest
+from django.db import connection
+from apps.core.busqueda import normalizar_patente_busqueda, filtro_patente, filtro_texto
+from apps.vehicles.models import Vehiculo
+
+
+def _plan(queryset):
+    """Plan de la consulta sin seq scan (tablas de prueba pequeñas)."""
+    with connection.cursor() as cursor:
+        cursor.execute("SET LOCAL enable_seqscan = off")
+    return queryset.explain()
+
+
+def _trigramas_instalados():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_indexes WHERE indexname = 'vehiculo_patente_trgm_idx'")
+        return cursor.fetchone() is not None
+
+
+class TestFiltroPatente:
+    """Tests de normalización y tipo de búsqueda"""
+
+    @pytest.mark.unit
+    def test_normalizar(self):
+        """Test que se quitan separadores y se pasa a mayúsculas"""
+        assert normalizar_patente_busqueda(" ab-cd.12 ") == "ABCD12"
+        assert normalizar_patente_busqueda(None) == ""
+
+    @pytest.mark.unit
+    def test_siempre_por_contenido(self):
+        """Test que los términos cortos también se buscan por contenido"""
+        assert filtro_patente("a-b", "vehiculo__patente").children == [("vehiculo__patente__icontains", "AB")]
+        assert filtro_patente("abc").children == [("patente__icontains", "ABC")]
+        assert not filtro_patente(" - ")
+
+    @pytest.mark.unit
+    def test_filtro_texto_varios_campos(self):
+        """Test que filtro_texto combina campos con OR y aplica la misma regla de largo"""
+        assert filtro_texto(" fi ", "codigo", "nombre").children == [
+            ("codigo__istartswith", "fi"), ("nombre__istartswith", "fi")
+        ]
+        assert filtro_texto("Filtro", "nombre").children == [("nombre__icontains", "Filtro")]
+        assert not filtro_texto("  ", "nombre")
+
+
+@pytest.mark.django_db
+@pytest.mark.unit
+class TestFiltroPatenteConsultas:
+    """Tests de resultados sobre la base"""
+
+    def test_prefijo_y_contenido(self):
+        """Test que prefijo y contenido retornan las patentes esperadas"""
+        Vehiculo.objects.bulk_create([Vehiculo(patente=p) for p in ("ABCD12", "XABC34", "ZZ0001")])
+        assert set(Vehiculo.objects.filter(filtro_patente("12")).values_list("patente", flat=True)) == {"ABCD12"}
+        assert set(Vehiculo.objects.filter(patente__istartswith="AB").values_list("patente", flat=True)) == {"ABCD12"}
+        assert set(Vehiculo.objects.filter(filtro_patente("abc")).values_list("patente", flat=True)) == {"ABCD12", "XABC34"}
+
+
+@pytest.mark.django_db
+@pytest.mark.slow
+class TestIndicesBusqueda:
+    """Tests con EXPLAIN sobre los índices de búsqueda"""
+
+    def test_prefijo_usa_indice(self):
+        """Test que istartswith usa el índice text_pattern_ops sobre UPPER(patente)"""
+        plan = _plan(Vehiculo.objects.filter(patente__istartswith="AB").only("id"))
+        assert "vehiculo_patente_prefijo_idx" in plan
+
+    def test_contenido_usa_trigramas(self):
+        """Test que icontains usa el índice GIN de trigramas (si pg_trgm está disponible)"""
+        if not _trigramas_instalados():
+            pytest.skip("pg_trgm no disponible en este servidor")
+        plan = _plan(Vehiculo.objects.filter(filtro_patente("ABC")).only("id"))
+        assert "vehiculo_patente_trgm_idx" in plan
@@ -0,0 +1,111 @@
+"""
+Tests para los rangos de días locales (apps/core/fechas.py) y su uso de índices.
+"""
+import pytest
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from django.db import connection
+from django.utils import timezone
+from apps.core.fechas import rango_dia_local, filtro_dia_local, filtro_dias_locales
+from apps.workorders.filters import OrdenTrabajoFilter
+from apps.workorders.models import OrdenTrabajo
+from apps.vehicles.models import IngresoVehiculo
+from apps.scheduling.models import Agenda
+
+
+def _duracion_utc(inicio, fin):
+    return fin.astimezone(dt_timezone.utc) - inicio.astimezone(dt_timezone.utc)
+
+
+def _plan(queryset):
+    """
+    Retorna el plan de la consulta sin seq scan (las tablas de prueba son
+    pequeñas y el planner preferiría recorrerlas completas).
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SET LOCAL enable_seqscan = off")
+    return queryset.explain()
+
+
+class TestRangosDiaLocal:
+    """Tests de los límites [inicio, fin) en America/Santiago"""
+
+    @pytest.mark.unit
+    def test_dia_normal(self):
+        """Test que un día normal parte y termina a medianoche local"""
+        inicio, fin = rango_dia_local(date(2025, 1, 15))
+        assert inicio.isoformat() == "2025-01-15T00:00:00-03:00"
+        assert _duracion_utc(inicio, fin) == timedelta(hours=24)
+
+    @pytest.mark.unit
+    def test_dias_con_cambio_de_horario(self):
+        """Test que los días con cambio de horario conservan su duración real"""
+        assert _duracion_utc(*rango_dia_local(date(2025, 4, 5))) == timedelta(hours=25)
+        assert _duracion_utc(*rango_dia_local(date(2025, 9, 7))) == timedelta(hours=23)
+
+    @pytest.mark.unit
+    def test_filtro_dias_locales_limites_opcionales(self):
+        """Test que cada límite genera solo su condición"""
+        assert filtro_dias_locales("apertura") == filtro_dias_locales("apertura", None, None)
+        desde = dict(filtro_dias_locales("apertura", desde=date(2025, 1, 1)).children)
+        assert set(desde) == {"apertura__gte"}
+        hasta = dict(filtro_dias_locales("apertura", hasta=date(2025, 1, 31)).children)
+        assert hasta["apertura__lt"] == rango_dia_local(date(2025, 1, 31))[1]
+
+
+@pytest.mark.django_db
+@pytest.mark.unit
+class TestFiltroDiaLocal:
+    """Tests de equivalencia con __date"""
+
+    def test_equivale_a_date(self, orden_trabajo):
+        """Test que el rango selecciona las mismas filas que apertura__date"""
+        hoy = timezone.localdate()
+        # 23:30 local de ayer: en UTC ya es hoy, pero no pertenece al día local
+        ayer_tarde = timezone.make_aware(datetime.combine(hoy - timedelta(days=1), datetime.min.time())) + timedelta(hours=23, minutes=30)
+        OrdenTrabajo.objects.filter(pk=orden_trabajo.pk).update(apertura=ayer_tarde)
+
+        for dia in (hoy, hoy - timedelta(days=1)):
+            por_rango = set(OrdenTrabajo.objects.filter(filtro_dia_local("apertura", dia)).values_list("id", flat=True))
+            por_date = set(OrdenTrabajo.objects.filter(apertura__date=dia).values_list("id", flat=True))
+            assert por_rango == por_date
+
+    def test_filterset_apertura(self, orden_trabajo):
+        """Test que apertura_from/apertura_to incluyen ambos días extremos"""
+        hoy = timezone.localdate().isoformat()
+        qs = OrdenTrabajoFilter({"apertura_from": hoy, "apertura_to": hoy}, queryset=OrdenTrabajo.objects.all()).qs
+        assert list(qs) == [orden_trabajo]
+
+
+@pytest.mark.django_db
+@pytest.mark.slow
+class TestPlanesConIndice:
+    """Tests con EXPLAIN: los rangos usan los índices btree de las columnas"""
+
+    def test_apertura_usa_indice(self):
+        """Test que el filtro de apertura_from/to es condición del índice"""
+        hoy = timezone.localdate()
+        qs = OrdenTrabajoFilter(
+            {"apertura_from": hoy.isoformat(), "apertura_to": hoy.isoformat()},
+            queryset=OrdenTrabajo.objects.all(),
+        ).qs
+        plan = _plan(qs.only("id"))
+        assert "Index Cond" in plan and "apertura >=" in plan
+
+        # Referencia: __date no puede ser condición de índice sobre apertura
+        plan_date = _plan(OrdenTrabajo.objects.filter(apertura__date=hoy).only("id"))
+        assert "apertura >=" not in plan_date
+
+    def test_cierre_usa_indice(self):
+        """Test que las OT cerradas del día usan el índice de cierre"""
+        plan = _plan(OrdenTrabajo.objects.filter(filtro_dia_local("cierre", timezone.localdate())).only("id"))
+        assert "Index Cond" in plan and "cierre >=" in plan
+
+    def test_fecha_ingreso_usa_indice(self):
+        """Test que los ingresos del día usan el índice de fecha_ingreso"""
+        plan = _plan(IngresoVehiculo.objects.filter(filtro_dia_local("fecha_ingreso", timezone.localdate())).only("id"))
+        assert "Index Cond" in plan and "fecha_ingreso >=" in plan
+
+    def test_fecha_programada_usa_indice(self):
+        """Test que las agendas del día usan el índice de fecha_programada"""
+        plan = _plan(Agenda.objects.filter(filtro_dia_local("fecha_programada", timezone.localdate())).only("id"))
+        assert "Index Cond" in plan and "fecha_programada >=" in plan
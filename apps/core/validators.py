@@ -10,6 +10,9 @@ import re
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
 
+# Máximo de un PositiveIntegerField (integer de PostgreSQL)
+MAX_ENTERO_POSITIVO = 2_147_483_647
+
 
 def validar_rut_chileno(rut: str) -> tuple[bool, str]:
     """
@@ -0,0 +1,119 @@
+# apps/drivers/asignaciones.py
+"""
+Asignación de vehículos a choferes y consultas por momento.
+
+El historial (HistorialAsignacionVehiculo) guarda cada asignación como un
+periodo tstzrange [fecha_asignacion, fecha_fin). asignar_vehiculo() cierra
+en el mismo instante la asignación vigente del chofer y la del vehículo y
+abre la nueva, de modo que los periodos quedan contiguos y sin solape.
+Las restricciones de exclusión de la base de datos lo garantizan aun ante
+escrituras concurrentes; además se bloquean las filas del chofer y del
+vehículo para que dos asignaciones simultáneas se serialicen en vez de
+fallar.
+
+chofer_en() y vehiculo_en() responden "quién manejaba el vehículo X en T" y
+"qué vehículo manejaba el chofer Y en T" con periodo @> T, usando los
+índices GiST (vehiculo, periodo) / (chofer, periodo) de las restricciones.
+
+Relaciones:
+- Usado por: apps/drivers/views.py (asignar-vehiculo, historial/en)
+- Escribe: HistorialAsignacionVehiculo, Chofer.vehiculo_asignado
+"""
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.vehicles.models import Vehiculo
+from .models import Chofer, HistorialAsignacionVehiculo
+
+MOTIVO_REASIGNACION = "Reasignación"
+
+
+class AsignacionSolapada(ValueError):
+    """La asignación se solapa con otra del mismo chofer o vehículo."""
+
+
+def _solapada(momento):
+    return AsignacionSolapada(
+        f"La asignación desde {timezone.localtime(momento):%Y-%m-%d %H:%M} se solapa "
+        "con otra del chofer o del vehículo."
+    )
+
+
+def asignar_vehiculo(chofer, vehiculo, motivo_fin=MOTIVO_REASIGNACION, momento=None):
+    """
+    Asigna `vehiculo` a `chofer` desde `momento` (default: ahora).
+
+    Proceso (en una transacción):
+    1. Bloquea las filas del chofer y del vehículo
+    2. Si el chofer ya tiene ese vehículo, retorna la asignación vigente
+    3. Cierra en `momento` las asignaciones abiertas del chofer y del vehículo
+       (el chofer anterior del vehículo queda sin vehículo asignado)
+    4. Abre la nueva asignación desde `momento`
+
+    Retorna:
+    - HistorialAsignacionVehiculo vigente
+
+    Lanza:
+    - AsignacionSolapada si alguna asignación del chofer o del vehículo
+      empieza o termina después de `momento`
+    """
+    momento = momento or timezone.now()
+    try:
+        with transaction.atomic():
+            list(Chofer.objects.select_for_update().filter(pk=chofer.pk).values_list("pk"))
+            list(Vehiculo.objects.select_for_update().filter(pk=vehiculo.pk).values_list("pk"))
+
+            relacionadas = HistorialAsignacionVehiculo.objects.filter(Q(chofer=chofer) | Q(vehiculo=vehiculo))
+            abiertas = relacionadas.filter(fecha_fin__isnull=True)
+            actual = abiertas.filter(chofer=chofer, vehiculo=vehiculo).first()
+            if actual is not None:
+                return actual
+            if relacionadas.filter(Q(fecha_asignacion__gt=momento) | Q(fecha_fin__gt=momento)).exists():
+                raise _solapada(momento)
+
+            abiertas.update(fecha_fin=momento, activa=False, motivo_fin=motivo_fin)
+            Chofer.objects.filter(vehiculo_asignado=vehiculo).exclude(pk=chofer.pk).update(
+                vehiculo_asignado=None, updated_at=timezone.now()
+            )
+            chofer.vehiculo_asignado = vehiculo
+            chofer.save(update_fields=["vehiculo_asignado", "updated_at"])
+            return HistorialAsignacionVehiculo.objects.create(
+                chofer=chofer, vehiculo=vehiculo, fecha_asignacion=momento, activa=True
+            )
+    except IntegrityError as e:
+        # Restricción de exclusión: otra transacción ganó la carrera
+        raise _solapada(momento) from e
+
+
+def chofer_en(vehiculo, momento=None):
+    """
+    Chofer que tenía asignado `vehiculo` en `momento` (default: ahora).
+
+    Retorna:
+    - Chofer o None
+    """
+    asignacion = (
+        HistorialAsignacionVehiculo.objects.vigentes_en(momento or timezone.now())
+        .filter(vehiculo=vehiculo)
+        .select_related("chofer")
+        .first()
+    )
+    return asignacion.chofer if asignacion else None
+
+
+def vehiculo_en(chofer, momento=None):
+    """
+    Vehículo que tenía asignado `chofer` en `momento` (default: ahora).
+
+    Retorna:
+    - Vehiculo o None
+    """
+    asignacion = (
+        HistorialAsignacionVehiculo.objects.vigentes_en(momento or timezone.now())
+        .filter(chofer=chofer)
+        .select_related("vehiculo")
+        .first()
+    )
+    return asignacion.vehiculo if asignacion else None
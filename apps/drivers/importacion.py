@@ -0,0 +1,230 @@
+# apps/drivers/importacion.py
+"""
+Importación masiva de choferes desde CSV o XLSX (planillas de RR.HH.).
+
+Reemplaza el alta chofer por chofer (POST /drivers/choferes/), que busca
+un username libre con una consulta por intento y crea User y Profile con
+get_or_create más tres post_save por usuario:
+
+1. Lee el archivo con apps/vehicles/importacion.leer_filas (columna rut)
+2. Valida por lotes en memoria: RUT con validar_rut_chileno, nombre,
+   email, números y fechas; RUT duplicados dentro del archivo (set)
+3. Hace upsert de Chofer por lote con bulk_create(update_conflicts=True)
+   sobre rut
+4. Provisiona los usuarios CHOFER del lote con provisionar_usuarios
+   (usernames únicos calculados en memoria, bulk_create sin señales)
+
+Las filas inválidas se reportan y se omiten; las válidas se importan en
+una sola transacción. La asignación de vehículos se hace después con
+asignar-vehiculo (historial sin solapes, ver apps/drivers/asignaciones.py).
+
+Relaciones:
+- Usado por: apps/drivers/views.py (ChoferViewSet.importar)
+- Usado por: apps/drivers/management/commands/importar_choferes.py
+- Usa: apps/drivers/usuarios.py, apps/core/validators.py
+"""
+
+from datetime import datetime
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.utils.dateparse import parse_date
+
+from apps.core.validators import MAX_ENTERO_POSITIVO, validar_rut_chileno
+from apps.vehicles.importacion import ArchivoInvalido, leer_filas as _leer_filas
+from .models import Chofer
+from .usuarios import provisionar_usuarios
+
+# Filas por lote de validación/upsert
+TAMANO_LOTE = 1000
+
+# Columnas aceptadas además de rut (encabezados, sin distinguir mayúsculas)
+COLUMNAS_TEXTO = ("nombre_completo", "telefono", "email", "zona", "sucursal", "observaciones")
+COLUMNAS_IMPORTABLES = COLUMNAS_TEXTO + ("km_mensual_promedio", "fecha_ingreso", "activo")
+
+ALIAS_COLUMNAS = {
+    "nombre": "nombre_completo",
+    "celular": "telefono",
+    "correo": "email",
+    "km_mensual": "km_mensual_promedio",
+    "fecha_contratacion": "fecha_ingreso",
+}
+
+VALORES_VERDADEROS = {"1", "si", "sí", "true", "activo", "s", "x"}
+VALORES_FALSOS = {"0", "no", "false", "inactivo", "n"}
+
+
+def leer_filas(archivo, nombre_archivo):
+    """Itera las filas del archivo; lanza ArchivoInvalido si falta la columna rut."""
+    return _leer_filas(archivo, nombre_archivo, columna_requerida="rut", alias=ALIAS_COLUMNAS)
+
+
+def _fecha(valor):
+    """Acepta YYYY-MM-DD y DD-MM-YYYY / DD/MM/YYYY (formato chileno)."""
+    try:
+        fecha = parse_date(valor)
+    except ValueError:
+        fecha = None
+    if fecha is None:
+        for formato in ("%d-%m-%Y", "%d/%m/%Y"):
+            try:
+                return datetime.strptime(valor, formato).date()
+            except ValueError:
+                continue
+    return fecha
+
+
+def _validar_fila(fila, columnas):
+    """
+    Valida una fila y construye la instancia de Chofer (sin guardar).
+
+    Retorna:
+    - (chofer, []) si es válida
+    - (None, [errores]) si no lo es
+    """
+    errores = []
+
+    es_valido, rut = validar_rut_chileno(fila.get("rut", ""))
+    if not es_valido:
+        errores.append(rut)
+    rut = rut.replace("-", "")  # Chofer.rut se guarda sin guión (ver ChoferSerializer)
+
+    datos = {}
+    for columna in columnas:
+        valor = fila.get(columna, "")
+        if columna == "km_mensual_promedio":
+            if valor == "":
+                datos[columna] = None
+                continue
+            try:
+                datos[columna] = int(float(valor))
+            except (ValueError, OverflowError):
+                errores.append("km_mensual_promedio debe ser numérico.")
+                continue
+            if datos[columna] < 0:
+                errores.append("km_mensual_promedio no puede ser negativo.")
+            elif datos[columna] > MAX_ENTERO_POSITIVO:
+                errores.append(f"km_mensual_promedio no puede superar {MAX_ENTERO_POSITIVO}.")
+        elif columna == "fecha_ingreso":
+            datos[columna] = _fecha(valor) if valor else None
+            if valor and datos[columna] is None:
+                errores.append("fecha_ingreso debe ser YYYY-MM-DD o DD-MM-YYYY.")
+        elif columna == "activo":
+            valor = valor.lower()
+            if valor and valor not in VALORES_VERDADEROS | VALORES_FALSOS:
+                errores.append("activo debe ser sí/no.")
+            datos[columna] = valor not in VALORES_FALSOS
+        elif columna == "email":
+            if valor:
+                try:
+                    validate_email(valor)
+                except ValidationError:
+                    errores.append(f"Email '{valor}' inválido.")
+            datos[columna] = valor.lower()
+        else:
+            datos[columna] = valor
+
+        # nombre_completo se valida abajo con su propio mensaje
+        largo_maximo = Chofer._meta.get_field(columna).max_length
+        if columna != "nombre_completo" and largo_maximo and len(valor) > largo_maximo:
+            errores.append(f"{columna} no puede exceder {largo_maximo} caracteres.")
+
+    nombre = datos.get("nombre_completo", "")
+    if len(nombre) < 3:
+        errores.append("nombre_completo es requerido (mínimo 3 caracteres).")
+    elif len(nombre) > 255:
+        errores.append("nombre_completo no puede exceder 255 caracteres.")
+
+    if errores:
+        return None, errores
+    return Chofer(rut=rut, **datos), []
+
+
+def importar_choferes(encabezados, filas, solo_validar=False, tamano_lote=TAMANO_LOTE):
+    """
+    Valida e importa (upsert por RUT) las filas leídas con leer_filas, y
+    crea o actualiza el usuario CHOFER de cada una.
+
+    Parámetros:
+    - encabezados: Columnas normalizadas del archivo
+    - filas: Iterador de dicts (ver leer_filas)
+    - solo_validar: Si es True, valida sin escribir en la base de datos
+    - tamano_lote: Filas por lote de validación/upsert
+
+    Retorna:
+    - dict: {
+        "total_filas": 2000,
+        "creados": 1950,
+        "actualizados": 40,
+        "usuarios_creados": 1950,
+        "con_errores": 10,
+        "errores": [{"fila": 12, "rut": "1-2", "errores": ["..."]}, ...]
+      }
+
+    Notas:
+    - nombre_completo es obligatorio; solo se actualizan las columnas
+      presentes en el archivo
+    - RUT repetidos dentro del archivo: se importa el primero y los
+      siguientes se reportan como error
+    - Consultas: dos por lote para choferes (existentes + upsert) y un
+      número fijo por lote para usuarios (ver provisionar_usuarios)
+    """
+    columnas = [c for c in encabezados if c in COLUMNAS_IMPORTABLES]
+    if "nombre_completo" not in columnas:
+        raise ArchivoInvalido("El archivo debe tener una columna 'nombre_completo'.")
+    campos_actualizables = columnas + ["updated_at"]
+
+    resultado = {
+        "total_filas": 0, "creados": 0, "actualizados": 0, "usuarios_creados": 0,
+        "con_errores": 0, "errores": [],
+    }
+    ruts_vistos = set()
+    numero_fila = 1  # La fila 1 es el encabezado
+
+    with transaction.atomic():
+        while True:
+            lote = list(islice(filas, tamano_lote))
+            if not lote:
+                break
+
+            choferes = []
+            for fila in lote:
+                numero_fila += 1
+                resultado["total_filas"] += 1
+                chofer, errores = _validar_fila(fila, columnas)
+                if chofer is not None and chofer.rut in ruts_vistos:
+                    chofer, errores = None, ["RUT duplicado en el archivo."]
+                if errores:
+                    resultado["con_errores"] += 1
+                    resultado["errores"].append({"fila": numero_fila, "rut": fila.get("rut", ""), "errores": errores})
+                    continue
+                ruts_vistos.add(chofer.rut)
+                choferes.append(chofer)
+
+            if not choferes:
+                continue
+
+            existentes = set(
+                Chofer.objects.filter(rut__in=[c.rut for c in choferes]).values_list("rut", flat=True)
+            )
+            resultado["actualizados"] += len(existentes)
+            resultado["creados"] += len(choferes) - len(existentes)
+
+            if solo_validar:
+                continue
+
+            Chofer.objects.bulk_create(
+                choferes,
+                update_conflicts=True,
+                unique_fields=["rut"],
+                update_fields=campos_actualizables,
+            )
+            # Los actualizados solo traen las columnas del archivo: releer para el usuario
+            if existentes:
+                choferes = list(Chofer.objects.filter(rut__in=[c.rut for c in choferes]))
+            creados, _ = provisionar_usuarios(choferes)
+            resultado["usuarios_creados"] += creados
+
+    return resultado
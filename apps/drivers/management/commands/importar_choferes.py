@@ -0,0 +1,68 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.drivers.importacion import leer_filas, importar_choferes, ArchivoInvalido, TAMANO_LOTE
+
+
+class Command(BaseCommand):
+    help = "Importa (upsert por RUT) choferes desde un archivo CSV o XLSX y crea sus usuarios CHOFER"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'archivo',
+            type=str,
+            help='Ruta del archivo .csv o .xlsx (columnas rut y nombre_completo obligatorias)'
+        )
+        parser.add_argument(
+            '--solo-validar',
+            action='store_true',
+            help='Valida el archivo sin escribir en la base de datos'
+        )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=TAMANO_LOTE,
+            help=f'Filas por lote de validación/upsert (default: {TAMANO_LOTE})'
+        )
+        parser.add_argument(
+            '--reporte',
+            type=str,
+            help='Ruta donde guardar el reporte de errores por fila (JSON)'
+        )
+
+    def handle(self, *args, **options):
+        ruta = options['archivo']
+
+        try:
+            with open(ruta, 'rb') as archivo:
+                encabezados, filas = leer_filas(archivo, ruta)
+                resultado = importar_choferes(
+                    encabezados,
+                    filas,
+                    solo_validar=options['solo_validar'],
+                    tamano_lote=options['lote'],
+                )
+        except FileNotFoundError:
+            raise CommandError(f'No se encontró el archivo "{ruta}".')
+        except ArchivoInvalido as e:
+            raise CommandError(str(e))
+
+        if options['reporte']:
+            with open(options['reporte'], 'w', encoding='utf-8') as salida:
+                json.dump(resultado['errores'], salida, ensure_ascii=False, indent=2)
+
+        accion = 'validadas' if options['solo_validar'] else 'importadas'
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'✅ {resultado["total_filas"]} filas {accion}: '
+                f'{resultado["creados"]} choferes nuevos, {resultado["actualizados"]} actualizados, '
+                f'{resultado["usuarios_creados"]} usuarios creados, {resultado["con_errores"]} con errores.'
+            )
+        )
+        for error in resultado['errores'][:20]:
+            self.stdout.write(
+                self.style.WARNING(f'   Fila {error["fila"]} ({error["rut"]}): {"; ".join(error["errores"])}')
+            )
+        if resultado['con_errores'] > 20:
+            self.stdout.write(self.style.WARNING(f'   ... y {resultado["con_errores"] - 20} filas más con errores.'))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drivers', '0001_initial'),
+        ('vehicles', '0008_linea_tiempo_vehiculo_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='historialasignacionvehiculo',
+            index=models.Index(fields=['vehiculo', 'fecha_asignacion'], name='drivers_his_vehicul_f6c167_idx'),
+        ),
+    ]
@@ -0,0 +1,98 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:38
+
+import django.contrib.postgres.fields.ranges
+import django.utils.timezone
+from django.db import migrations, models
+
+# Restricciones de exclusión: un vehículo no tiene dos choferes, ni un chofer
+# dos vehículos, en periodos que se solapan. Necesitan btree_gist para
+# combinar la igualdad del UUID con el solape del rango en un índice GiST.
+RESTRICCIONES_SOLAPE = {
+    "asignacion_vehiculo_sin_solape": "vehiculo_id",
+    "asignacion_chofer_sin_solape": "chofer_id",
+}
+
+
+def cerrar_solapes(apps, schema_editor):
+    """
+    Deja el historial sin solapes antes de crear la columna periodo.
+
+    Antes, al reasignar solo se marcaba activa=False (sin fecha_fin) y un
+    vehículo podía quedar activo con varios choferes. Por vehículo y luego
+    por chofer, cada asignación termina a más tardar cuando empieza la
+    siguiente; las inactivas sin fecha_fin se cierran igual (o en su propio
+    inicio si no hay siguiente, un periodo vacío).
+    """
+    Historial = apps.get_model("drivers", "HistorialAsignacionVehiculo")
+    filas = {
+        h.pk: h for h in Historial.objects.only("id", "chofer_id", "vehiculo_id", "fecha_asignacion", "fecha_fin", "activa")
+    }
+    originales = {pk: (h.fecha_fin, h.activa) for pk, h in filas.items()}
+
+    for campo in ("vehiculo_id", "chofer_id"):
+        grupos = {}
+        for h in filas.values():
+            grupos.setdefault(getattr(h, campo), []).append(h)
+        for grupo in grupos.values():
+            grupo.sort(key=lambda h: (h.fecha_asignacion, str(h.pk)))
+            for actual, siguiente in zip(grupo, grupo[1:] + [None]):
+                limite = siguiente.fecha_asignacion if siguiente else None
+                if limite is not None and (actual.fecha_fin is None or actual.fecha_fin > limite):
+                    actual.fecha_fin, actual.activa = limite, False
+                elif actual.fecha_fin is None and not actual.activa:
+                    actual.fecha_fin = actual.fecha_asignacion
+                if actual.fecha_fin is not None and actual.fecha_fin < actual.fecha_asignacion:
+                    actual.fecha_fin = actual.fecha_asignacion
+
+    cambiadas = [h for pk, h in filas.items() if (h.fecha_fin, h.activa) != originales[pk]]
+    Historial.objects.bulk_update(cambiadas, ["fecha_fin", "activa"], batch_size=1000)
+
+
+def crear_restricciones(apps, schema_editor):
+    """
+    Crea btree_gist y las restricciones si la extensión está disponible en el
+    servidor. Sin ella, la asignación sigue serializada por los bloqueos de
+    apps/drivers/asignaciones.py y las consultas usan los índices B-tree.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'btree_gist'")
+        if cursor.fetchone() is None:
+            return
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+        for nombre, columna in RESTRICCIONES_SOLAPE.items():
+            cursor.execute(
+                f"ALTER TABLE drivers_historialasignacionvehiculo ADD CONSTRAINT {nombre} "
+                f"EXCLUDE USING gist ({columna} WITH =, periodo WITH &&)"
+            )
+
+
+def eliminar_restricciones(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for nombre in RESTRICCIONES_SOLAPE:
+            cursor.execute(f"ALTER TABLE drivers_historialasignacionvehiculo DROP CONSTRAINT IF EXISTS {nombre}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drivers', '0002_linea_tiempo_vehiculo_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='historialasignacionvehiculo',
+            name='fecha_asignacion',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(cerrar_solapes, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='historialasignacionvehiculo',
+            name='periodo',
+            field=models.GeneratedField(db_persist=True, expression=models.Func(models.F('fecha_asignacion'), models.F('fecha_fin'), models.Value('[)'), function='tstzrange'), output_field=django.contrib.postgres.fields.ranges.DateTimeRangeField()),
+        ),
+        migrations.RunPython(crear_restricciones, eliminar_restricciones),
+    ]
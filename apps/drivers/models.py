@@ -1,5 +1,7 @@
 # apps/drivers/models.py
+from django.contrib.postgres.fields import DateTimeRangeField
 from django.db import models
+from django.utils import timezone
 from apps.vehicles.models import Vehiculo
 import uuid
 
@@ -47,24 +49,57 @@ class Chofer(models.Model):
         return f"{self.nombre_completo} ({self.rut})"
 
 
+class HistorialAsignacionQuerySet(models.QuerySet):
+    def vigentes_en(self, momento):
+        """Asignaciones cuyo periodo contiene `momento` (periodo @> momento)."""
+        return self.filter(periodo__contains=momento)
+
+
 class HistorialAsignacionVehiculo(models.Model):
-    """Historial de asignaciones de vehículos a choferes"""
+    """
+    Historial de asignaciones de vehículos a choferes.
+    
+    `periodo` es una columna generada tstzrange [fecha_asignacion, fecha_fin)
+    (abierta mientras fecha_fin es NULL). Dos restricciones de exclusión
+    GiST impiden que un vehículo tenga dos choferes, o un chofer dos
+    vehículos, en periodos que se solapan; sus índices (vehiculo, periodo) y
+    (chofer, periodo) resuelven "quién manejaba el vehículo X en el momento T"
+    y "qué vehículo manejaba el chofer Y en T" (ver apps/drivers/asignaciones.py).
+    
+    Las restricciones requieren la extensión btree_gist y se crean en la
+    migración 0003 solo si está disponible (como los índices pg_trgm de
+    vehicles), por eso no se declaran en Meta.
+    """
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     chofer = models.ForeignKey(Chofer, on_delete=models.CASCADE, related_name="historial_asignaciones")
     vehiculo = models.ForeignKey(Vehiculo, on_delete=models.PROTECT, related_name="historial_choferes")
-    fecha_asignacion = models.DateTimeField(auto_now_add=True)
+    fecha_asignacion = models.DateTimeField(default=timezone.now)
     fecha_fin = models.DateTimeField(null=True, blank=True)
     motivo_fin = models.TextField(blank=True)
     activa = models.BooleanField(default=True)
     
+    # tstzrange(fecha_asignacion, fecha_fin, '[)'), calculado por la base de datos
+    periodo = models.GeneratedField(
+        expression=models.Func(
+            models.F("fecha_asignacion"),
+            models.F("fecha_fin"),
+            models.Value("[)"),
+            function="tstzrange",
+        ),
+        output_field=DateTimeRangeField(),
+        db_persist=True,
+    )
+    
+    objects = HistorialAsignacionQuerySet.as_manager()
+    
     class Meta:
         indexes = [
             models.Index(fields=["chofer", "activa"]),
             models.Index(fields=["vehiculo", "activa"]),
             models.Index(fields=["fecha_asignacion"]),
+            models.Index(fields=["vehiculo", "fecha_asignacion"]),  # Línea de tiempo del vehículo
         ]
         ordering = ["-fecha_asignacion"]
     
     def __str__(self):
         return f"{self.chofer.nombre_completo} - {self.vehiculo.patente} ({self.fecha_asignacion})"
-
@@ -0,0 +1,148 @@
+# apps/drivers/tests/test_asignaciones.py
+"""
+Tests para la asignación de vehículos sin solapes y las consultas por momento.
+"""
+
+import importlib
+from datetime import datetime, timedelta
+
+import pytest
+from django.apps import apps as django_apps
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+from rest_framework import status
+from apps.drivers.asignaciones import AsignacionSolapada, asignar_vehiculo, chofer_en, vehiculo_en
+from apps.drivers.models import Chofer, HistorialAsignacionVehiculo
+from apps.vehicles.models import Vehiculo
+
+T0 = timezone.make_aware(datetime(2025, 3, 1, 8, 0))
+
+
+def _t(horas):
+    return T0 + timedelta(hours=horas)
+
+
+@pytest.fixture
+def choferes(db):
+    return [Chofer.objects.create(nombre_completo=f"Chofer {i}", rut=f"1000000{i}") for i in range(2)]
+
+
+@pytest.fixture
+def vehiculos(db):
+    return [Vehiculo.objects.create(patente=f"ASIG0{i}") for i in range(2)]
+
+
+@pytest.fixture
+def con_exclusion(db):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_constraint WHERE conname = 'asignacion_vehiculo_sin_solape'")
+        if cursor.fetchone() is None:
+            pytest.skip("btree_gist no disponible: restricciones de exclusión no creadas")
+
+
+@pytest.mark.django_db
+@pytest.mark.service
+class TestAsignarVehiculo:
+    """Tests para asignar_vehiculo, chofer_en y vehiculo_en"""
+
+    def test_reasignacion_contigua(self, choferes, vehiculos):
+        """Test que la asignación anterior termina justo cuando empieza la nueva"""
+        chofer = choferes[0]
+        anterior = asignar_vehiculo(chofer, vehiculos[0], momento=_t(0))
+        nueva = asignar_vehiculo(chofer, vehiculos[1], momento=_t(5))
+
+        anterior.refresh_from_db()
+        assert (anterior.fecha_fin, anterior.activa, anterior.motivo_fin) == (_t(5), False, "Reasignación")
+        assert nueva.fecha_fin is None
+        assert vehiculo_en(chofer, _t(4)) == vehiculos[0]
+        assert vehiculo_en(chofer, _t(5)) == vehiculos[1]
+        assert vehiculo_en(chofer, _t(-1)) is None
+        assert chofer_en(vehiculos[0], _t(6)) is None
+
+    def test_vehiculo_cambia_de_chofer(self, choferes, vehiculos):
+        """Test que el chofer anterior del vehículo queda sin vehículo"""
+        asignar_vehiculo(choferes[0], vehiculos[0], momento=_t(0))
+        asignar_vehiculo(choferes[1], vehiculos[0], momento=_t(2))
+
+        choferes[0].refresh_from_db()
+        assert choferes[0].vehiculo_asignado is None
+        assert chofer_en(vehiculos[0], _t(1)) == choferes[0]
+        assert chofer_en(vehiculos[0], _t(3)) == choferes[1]
+        assert HistorialAsignacionVehiculo.objects.filter(vehiculo=vehiculos[0], fecha_fin__isnull=True).count() == 1
+
+    def test_misma_asignacion_no_duplica(self, choferes, vehiculos):
+        """Test que reasignar el mismo vehículo retorna la asignación vigente"""
+        primera = asignar_vehiculo(choferes[0], vehiculos[0], momento=_t(0))
+        assert asignar_vehiculo(choferes[0], vehiculos[0], momento=_t(1)) == primera
+        assert HistorialAsignacionVehiculo.objects.count() == 1
+
+    def test_momento_dentro_de_periodo_cerrado(self, choferes, vehiculos):
+        """Test que no se puede abrir una asignación que se solapa con una posterior"""
+        asignar_vehiculo(choferes[0], vehiculos[0], momento=_t(0))
+        asignar_vehiculo(choferes[0], vehiculos[1], momento=_t(5))
+        with pytest.raises(AsignacionSolapada):
+            asignar_vehiculo(choferes[1], vehiculos[0], momento=_t(3))
+
+    def test_restriccion_de_exclusion(self, con_exclusion, choferes, vehiculos):
+        """Test que la base de datos rechaza periodos solapados del mismo vehículo"""
+        HistorialAsignacionVehiculo.objects.create(chofer=choferes[0], vehiculo=vehiculos[0], fecha_asignacion=_t(0))
+        with pytest.raises(IntegrityError), transaction.atomic():
+            HistorialAsignacionVehiculo.objects.create(
+                chofer=choferes[1], vehiculo=vehiculos[0], fecha_asignacion=_t(1)
+            )
+
+    def test_migracion_cierra_solapes(self, choferes, vehiculos):
+        """Test que la migración cierra las asignaciones solapadas del historial previo"""
+        migracion = importlib.import_module("apps.drivers.migrations.0003_periodo_asignacion")
+        a = HistorialAsignacionVehiculo.objects.create(chofer=choferes[0], vehiculo=vehiculos[0], fecha_asignacion=_t(0))
+        b = HistorialAsignacionVehiculo.objects.create(
+            chofer=choferes[0], vehiculo=vehiculos[1], fecha_asignacion=_t(1), activa=False
+        )
+        c = HistorialAsignacionVehiculo.objects.create(chofer=choferes[1], vehiculo=vehiculos[1], fecha_asignacion=_t(9))
+
+        migracion.cerrar_solapes(django_apps, None)
+        for h in (a, b, c):
+            h.refresh_from_db()
+        assert (a.fecha_fin, a.activa) == (_t(1), False)
+        assert (b.fecha_fin, b.activa) == (_t(9), False)  # inactiva sin fecha_fin: hasta la siguiente del vehículo
+        assert (c.fecha_fin, c.activa) == (None, True)
+
+
+@pytest.mark.django_db
+@pytest.mark.view
+@pytest.mark.api
+class TestAsignacionViews:
+    """Tests para asignar-vehiculo y GET /drivers/historial/en/"""
+
+    URL = "/api/v1/drivers/historial/en/"
+
+    def test_en_momento_por_vehiculo_y_chofer(self, authenticated_client, choferes, vehiculos):
+        """Test ambas direcciones de la consulta por momento"""
+        asignar_vehiculo(choferes[0], vehiculos[0], momento=_t(0))
+        asignar_vehiculo(choferes[1], vehiculos[0], momento=_t(2))
+
+        response = authenticated_client.get(self.URL, {"vehiculo": vehiculos[0].id, "momento": _t(1).isoformat()})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["chofer"] == choferes[0].id
+
+        response = authenticated_client.get(self.URL, {"chofer": choferes[1].id})
+        assert response.data["vehiculo_patente"] == vehiculos[0].patente
+
+    def test_en_momento_sin_asignacion_o_invalido(self, authenticated_client, vehiculos):
+        """Test 404 sin asignación y 400 con parámetros inválidos"""
+        assert authenticated_client.get(self.URL, {"vehiculo": vehiculos[0].id}).status_code == status.HTTP_404_NOT_FOUND
+        assert authenticated_client.get(self.URL).status_code == status.HTTP_400_BAD_REQUEST
+        response = authenticated_client.get(self.URL, {"vehiculo": vehiculos[0].id, "momento": "ayer"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert authenticated_client.get(self.URL, {"chofer": "no-es-uuid"}).status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_asignar_cierra_asignacion_anterior(self, authenticated_client, choferes, vehiculos):
+        """Test que el endpoint cierra la asignación previa del chofer"""
+        url = f"/api/v1/drivers/choferes/{choferes[0].id}/asignar-vehiculo/"
+        for vehiculo in vehiculos:
+            response = authenticated_client.post(url, {"vehiculo_id": str(vehiculo.id)}, format="json")
+            assert response.status_code == status.HTTP_200_OK
+
+        historial = list(HistorialAsignacionVehiculo.objects.filter(chofer=choferes[0]).order_by("fecha_asignacion"))
+        assert [h.vehiculo_id for h in historial] == [v.id for v in vehiculos]
+        assert historial[0].fecha_fin == historial[1].fecha_asignacion
@@ -0,0 +1,205 @@
+# apps/drivers/tests/test_importacion.py
+"""
+Tests para la importación masiva de choferes y el alta de sus usuarios.
+"""
+
+import io
+import time
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+from apps.drivers.importacion import importar_choferes, leer_filas
+from apps.drivers.models import Chofer
+from apps.drivers.usuarios import provisionar_usuarios
+from apps.users.models import Profile, User
+
+URL = "/api/v1/drivers/choferes/importar/"
+
+
+def _rut(numero):
+    """RUT válido (sin puntos ni guión) para un número dado."""
+    suma = sum(int(d) * m for d, m in zip(str(numero)[::-1], [2, 3, 4, 5, 6, 7] * 2))
+    dv = {11: "0", 10: "K"}.get(11 - suma % 11, str(11 - suma % 11))
+    return f"{numero}{dv}"
+
+
+def _csv(texto, nombre="choferes.csv"):
+    return SimpleUploadedFile(nombre, texto.encode("utf-8"), content_type="text/csv")
+
+
+def _importar(texto):
+    encabezados, filas = leer_filas(io.BytesIO(texto.encode()), "choferes.csv")
+    return importar_choferes(encabezados, filas)
+
+
+@pytest.mark.django_db
+@pytest.mark.service
+class TestImportarChoferes:
+    """Tests del servicio de importación y de provisionar_usuarios"""
+
+    def test_crea_choferes_usuarios_y_perfiles(self):
+        """Test que cada chofer nuevo recibe usuario CHOFER y perfil"""
+        rut = _rut(12345678)
+        resultado = _importar(f"RUT;Nombre;Correo;Activo\n{rut[:-1]}-{rut[-1]};Ana María Soto;ana@pgf.cl;sí\n")
+
+        assert (resultado["creados"], resultado["usuarios_creados"]) == (1, 1)
+        chofer = Chofer.objects.get()
+        user = User.objects.get(rut=rut)
+        assert chofer.rut == rut
+        assert (user.username, user.email, user.rol) == (rut.lower(), "ana@pgf.cl", "CHOFER")
+        assert (user.first_name, user.last_name) == ("Ana", "María Soto")
+        assert not user.has_usable_password()
+        assert Profile.objects.get(user=user).last_name == "María Soto"
+
+    def test_username_ocupado_y_email_en_uso(self, admin_user):
+        """Test que el username toma sufijo si está ocupado y el email en uso se reemplaza"""
+        rut = _rut(11111111)
+        User.objects.create_user(username=rut.lower(), email="otro@test.com", password="x")
+        User.objects.create_user(username=f"{rut.lower()}1", email="otro2@test.com", password="x")
+
+        _importar(f"rut,nombre_completo,email\n{rut},Pedro Pérez,{admin_user.email}\n")
+        user = User.objects.get(rut=rut)
+        assert user.username == f"{rut.lower()}2"
+        assert user.email == f"{rut.lower()}2@chofer.local"
+
+    def test_actualiza_chofer_y_usuario_existentes(self):
+        """Test que un RUT existente actualiza el chofer, su usuario y su perfil"""
+        rut = _rut(22222222)
+        Chofer.objects.create(nombre_completo="Nombre Viejo", rut=rut, zona="Norte")
+        provisionar_usuarios(Chofer.objects.all())
+
+        resultado = _importar(f"rut,nombre_completo,activo\n{rut},Nombre Nuevo,no\n")
+        assert (resultado["creados"], resultado["actualizados"], resultado["usuarios_creados"]) == (0, 1, 0)
+        chofer = Chofer.objects.get()
+        user = User.objects.get(rut=rut)
+        assert (chofer.nombre_completo, chofer.zona, chofer.activo) == ("Nombre Nuevo", "Norte", False)
+        assert (user.last_name, user.is_active) == ("Nuevo", False)
+        assert Profile.objects.get(user=user).last_name == "Nuevo"
+
+    def test_reporta_filas_invalidas(self):
+        """Test RUT inválido, duplicado, nombre faltante y valores inválidos"""
+        rut = _rut(33333333)
+        contenido = (
+            "rut,nombre_completo,email,km_mensual_promedio,fecha_ingreso\n"
+            f"{rut},Chofer Uno,,1500,15-03-2024\n"
+            "12345678-0,Chofer Dos,,,\n"
+            f"{rut},Chofer Repetido,,,\n"
+            f"{_rut(44444444)},,,,\n"
+            f"{_rut(55555555)},Chofer Cinco,no-es-email,-3,ayer\n"
+        )
+        resultado = _importar(contenido)
+
+        assert (resultado["creados"], resultado["con_errores"]) == (1, 4)
+        assert [e["fila"] for e in resultado["errores"]] == [3, 4, 5, 6]
+        assert len(resultado["errores"][3]["errores"]) == 3
+        assert Chofer.objects.get().fecha_ingreso.isoformat() == "2024-03-15"
+
+    def test_valores_fuera_de_rango(self):
+        """Test que textos largos y números desbordados son errores de fila, no de la importación"""
+        contenido = (
+            "rut,nombre_completo,telefono,zona,sucursal,km_mensual_promedio\n"
+            f"{_rut(66666666)},Chofer Uno,{'9' * 21},,,\n"
+            f"{_rut(77777777)},Chofer Dos,,{'Z' * 101},{'S' * 101},\n"
+            f"{_rut(88888888)},Chofer Tres,,,,1e400\n"
+            f"{_rut(99999999)},Chofer Cuatro,,,,3000000000\n"
+            f"{_rut(10101010)},Chofer Cinco,{'9' * 20},{'Z' * 100},,2147483647\n"
+        )
+        resultado = _importar(contenido)
+
+        assert (resultado["creados"], resultado["con_errores"]) == (1, 4)
+        assert [len(e["errores"]) for e in resultado["errores"]] == [1, 2, 1, 1]
+        assert Chofer.objects.get().km_mensual_promedio == 2_147_483_647
+
+    def test_username_ocupado_en_otro_lote(self):
+        """Test que el sufijo considera usernames con el mismo prefijo creados antes"""
+        rut = _rut(12121212)
+        for username in (rut.lower(), f"{rut.lower()}1", "admin"):
+            User.objects.create_user(username=username, email=f"{username}@test.com", password="x")
+
+        with CaptureQueriesContext(connection) as ctx:
+            _importar(f"rut,nombre_completo\n{rut},Chofer Sufijo\n{_rut(13131313)},Chofer Libre\n")
+        assert User.objects.get(rut=rut).username == f"{rut.lower()}2"
+        assert User.objects.get(rut=_rut(13131313)).username == _rut(13131313).lower()
+        assert not any("~" in q["sql"] for q in ctx.captured_queries)  # sin regex sobre toda la tabla
+
+    def test_consultas_constantes(self):
+        """Test que las consultas no dependen de la cantidad de filas del lote"""
+        def archivo(desde, n):
+            return "rut,nombre_completo\n" + "".join(f"{_rut(desde + i)},Chofer {i}\n" for i in range(n))
+
+        with CaptureQueriesContext(connection) as pocos:
+            _importar(archivo(10_000_000, 2))
+        with CaptureQueriesContext(connection) as muchos:
+            resultado = _importar(archivo(20_000_000, 500))
+
+        assert resultado["usuarios_creados"] == 500
+        assert len(muchos.captured_queries) == len(pocos.captured_queries)
+
+    @pytest.mark.slow
+    def test_importa_2000_choferes(self):
+        """Test que 2.000 choferes con sus usuarios se importan en pocos segundos"""
+        contenido = "rut,nombre_completo,email\n" + "".join(
+            f"{_rut(15_000_000 + i)},Chofer Número {i},chofer{i}@pgf.cl\n" for i in range(2_000)
+        )
+        inicio = time.monotonic()
+        resultado = _importar(contenido)
+        duracion = time.monotonic() - inicio
+
+        assert resultado["usuarios_creados"] == 2_000
+        assert Profile.objects.filter(user__rol="CHOFER").count() == 2_000
+        assert duracion < 10
+
+    def test_comando_importar_choferes(self, tmp_path):
+        """Test el management command importar_choferes"""
+        ruta = tmp_path / "choferes.csv"
+        ruta.write_text(f"rut,nombre_completo\n{_rut(16000000)},Luis Díaz\n1-1,Malo\n", encoding="utf-8")
+        salida = io.StringIO()
+
+        call_command("importar_choferes", str(ruta), stdout=salida)
+        assert "1 choferes nuevos" in salida.getvalue()
+        assert "1 con errores" in salida.getvalue()
+
+
+@pytest.mark.django_db
+@pytest.mark.view
+@pytest.mark.api
+class TestImportarChoferesView:
+    """Tests para POST /drivers/choferes/importar/ y el alta individual"""
+
+    def test_importa(self, authenticated_client):
+        """Test que el endpoint importa y reporta"""
+        contenido = f"rut,nombre_completo\n{_rut(17000000)},Carla Rojas\n"
+        response = authenticated_client.post(URL, {"archivo": _csv(contenido)}, format="multipart")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["usuarios_creados"] == 1
+
+    def test_archivo_invalido(self, authenticated_client):
+        """Test que sin columna rut o nombre_completo retorna 400"""
+        sin_rut = authenticated_client.post(URL, {"archivo": _csv("nombre\nAna\n")}, format="multipart")
+        sin_nombre = authenticated_client.post(URL, {"archivo": _csv("rut\n1-9\n")}, format="multipart")
+        assert sin_rut.status_code == status.HTTP_400_BAD_REQUEST
+        assert sin_nombre.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_requiere_rol(self, mecanico_user):
+        """Test que un mecánico no puede importar choferes"""
+        client = APIClient()
+        client.force_authenticate(user=mecanico_user)
+        response = client.post(URL, {"archivo": _csv("rut,nombre_completo\n")}, format="multipart")
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_alta_individual_crea_usuario(self, authenticated_client):
+        """Test que POST /choferes/ provisiona el usuario con username único"""
+        rut = _rut(18000000)
+        User.objects.create_user(username=rut.lower(), email="ocupado@test.com", password="x")
+        response = authenticated_client.post(
+            "/api/v1/drivers/choferes/", {"nombre_completo": "Rosa Vera", "rut": rut}, format="json"
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        user = User.objects.get(rut=rut)
+        assert (user.username, user.rol) == (f"{rut.lower()}1", "CHOFER")
+        assert Profile.objects.get(user=user).first_name == "Rosa"
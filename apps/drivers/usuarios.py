@@ -0,0 +1,152 @@
+# apps/drivers/usuarios.py
+"""
+Usuarios (rol CHOFER) vinculados a los choferes.
+
+Cada chofer tiene un User con su mismo RUT, username derivado del RUT
+(sin puntos ni guión, en minúsculas; con sufijo numérico si ya está
+ocupado) y su Profile. provisionar_usuarios() crea o actualiza esos
+usuarios para cualquier cantidad de choferes con un número fijo de
+consultas:
+
+1. Usuarios existentes por RUT y dueños de los emails (dos consultas)
+2. Usernames ya ocupados entre los del lote: los base exactos y, solo para
+   los base tomados, los que empiezan por ellos (hasta dos consultas); los
+   únicos se calculan en memoria
+3. bulk_update / bulk_create de User y Profile
+
+bulk_create no dispara los post_save de apps/users/models.py, así que los
+Profile se crean aquí con los nombres del chofer. Los usuarios nuevos
+quedan con contraseña inutilizable: la definen con la recuperación de
+contraseña (antes se generaba una temporal aleatoria que nadie conocía y
+cuyo hash PBKDF2 dominaba el costo del alta).
+
+Relaciones:
+- Usado por: apps/drivers/views.py (ChoferViewSet.perform_create/perform_update)
+- Usado por: apps/drivers/importacion.py (importación masiva)
+- Escribe: User, Profile
+- Invalida: apps/notifications/directory.py
+"""
+
+from functools import reduce
+from operator import or_
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q
+
+from apps.users.models import Profile
+
+TAMANO_LOTE = 1000
+
+
+def username_base(rut):
+    return rut.replace("-", "").replace(".", "").lower()
+
+
+def _nombres(nombre_completo):
+    partes = (nombre_completo or "").strip().split(maxsplit=1)
+    return (partes[0] if partes else ""), (partes[1] if len(partes) > 1 else "")
+
+
+def provisionar_usuarios(choferes):
+    """
+    Crea o actualiza el User CHOFER y el Profile de cada chofer.
+
+    Parámetros:
+    - choferes: Choferes ya guardados (se usa rut, nombre_completo, email, activo)
+
+    Retorna:
+    - (usuarios_creados, usuarios_actualizados)
+
+    Notas:
+    - Usuario existente (mismo RUT): se sincronizan nombres, is_active y el
+      email si no lo usa otro usuario
+    - Usuario nuevo: email del chofer, o <username>@chofer.local si no tiene
+      o ya está en uso
+    """
+    User = get_user_model()
+    choferes = list(choferes)
+    if not choferes:
+        return 0, 0
+
+    existentes = {u.rut: u for u in User.objects.filter(rut__in=[c.rut for c in choferes])}
+    duenos_email = dict(
+        User.objects.filter(email__in={c.email for c in choferes if c.email}).values_list("email", "id")
+    )
+    ocupados = set()
+    bases = {username_base(c.rut) for c in choferes if c.rut not in existentes}
+    if bases:
+        # Los sufijos solo hacen falta para los base ya tomados (caso raro)
+        tomadas = set(User.objects.filter(username__in=bases).values_list("username", flat=True))
+        ocupados = set(tomadas)
+        if tomadas:
+            ocupados.update(
+                User.objects.filter(reduce(or_, (Q(username__startswith=b) for b in tomadas)))
+                .values_list("username", flat=True)
+            )
+
+    nuevos, actualizados = [], []
+    for chofer in choferes:
+        first_name, last_name = _nombres(chofer.nombre_completo)
+        user = existentes.get(chofer.rut)
+        if user is not None:
+            if chofer.email and duenos_email.get(chofer.email, user.id) == user.id:
+                user.email = chofer.email
+            user.first_name = first_name or user.first_name
+            user.last_name = last_name or user.last_name
+            user.is_active = chofer.activo
+            actualizados.append(user)
+            continue
+
+        base = username_base(chofer.rut)
+        username, sufijo = base, 1
+        while username in ocupados:
+            username, sufijo = f"{base}{sufijo}", sufijo + 1
+        ocupados.add(username)
+
+        email = chofer.email if chofer.email and chofer.email not in duenos_email else f"{username}@chofer.local"
+        duenos_email[email] = None
+        user = User(
+            username=username,
+            email=email,
+            first_name=first_name,
+            last_name=last_name,
+            rol="CHOFER",
+            is_active=chofer.activo,
+            rut=chofer.rut,
+        )
+        user.set_unusable_password()
+        nuevos.append(user)
+
+    with transaction.atomic():
+        User.objects.bulk_update(
+            actualizados, ["email", "first_name", "last_name", "is_active"], batch_size=TAMANO_LOTE
+        )
+        User.objects.bulk_create(nuevos, batch_size=TAMANO_LOTE)
+
+        # Perfiles: sincronizar nombres de los existentes y crear los que falten
+        por_id = {u.id: u for u in actualizados}
+        perfiles = {p.user_id: p for p in Profile.objects.filter(user__in=actualizados)}
+        for user_id, perfil in perfiles.items():
+            perfil.first_name = por_id[user_id].first_name[:100]
+            perfil.last_name = por_id[user_id].last_name[:100]
+        Profile.objects.bulk_update(list(perfiles.values()), ["first_name", "last_name"], batch_size=TAMANO_LOTE)
+        Profile.objects.bulk_create(
+            [
+                Profile(
+                    user=user,
+                    first_name=user.first_name[:100],
+                    last_name=user.last_name[:100],
+                    notificaciones_email=True,
+                    notificaciones_sonido=True,
+                )
+                for user in nuevos + [u for u in actualizados if u.id not in perfiles]
+            ],
+            batch_size=TAMANO_LOTE,
+        )
+
+        # bulk_create/bulk_update no disparan post_save
+        from apps.notifications.directory import invalidar_directorio
+        transaction.on_commit(invalidar_directorio)
+
+    return len(nuevos), len(actualizados)
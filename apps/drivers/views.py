@@ -9,14 +9,18 @@ Este módulo define todos los endpoints de la API relacionados con:
 Relaciones:
 - Usa: apps/drivers/models.py (Chofer, HistorialAsignacionVehiculo)
 - Usa: apps/drivers/serializers.py (serializers para validación)
+- Usa: apps/drivers/asignaciones.py (asignación sin solapes, consultas por momento)
+- Usa: apps/drivers/usuarios.py, apps/drivers/importacion.py (usuarios CHOFER, importación)
 - Usa: apps/vehicles/models.py (Vehiculo)
 - Conectado a: apps/drivers/urls.py
 
 Endpoints principales:
 - /api/v1/drivers/choferes/ → CRUD de choferes
+- /api/v1/drivers/choferes/importar/ → Importación masiva desde CSV/XLSX
 - /api/v1/drivers/choferes/{id}/asignar-vehiculo/ → Asignar vehículo a chofer
 - /api/v1/drivers/choferes/{id}/historial/ → Historial de asignaciones
 - /api/v1/drivers/historial/ → Listar historial de asignaciones
+- /api/v1/drivers/historial/en/ → Quién manejaba un vehículo (o qué vehículo un chofer) en un momento
 """
 
 from rest_framework import viewsets, permissions, status
@@ -24,6 +28,8 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
+from drf_spectacular.utils import extend_schema
+from django.core.exceptions import ValidationError as DjangoValidationError
 from django.db import transaction
 from .models import Chofer, HistorialAsignacionVehiculo
 from .serializers import (
@@ -44,6 +50,7 @@ class ChoferViewSet(viewsets.ModelViewSet):
     - DELETE /api/v1/drivers/choferes/{id}/ → Eliminar chofer
     
     Acciones personalizadas:
+    - POST /api/v1/drivers/choferes/importar/ → Importación masiva (CSV/XLSX)
     - POST /api/v1/drivers/choferes/{id}/asignar-vehiculo/ → Asignar vehículo
     - GET /api/v1/drivers/choferes/{id}/historial/ → Historial de asignaciones
     
@@ -84,77 +91,83 @@ class ChoferViewSet(viewsets.ModelViewSet):
         
         Proceso:
         1. Guarda el chofer
-        2. Crea un usuario con rol CHOFER usando el RUT y email del chofer
-        3. Genera un username único basado en el RUT
-        4. Crea una contraseña temporal (el admin puede cambiarla después)
+        2. Crea (o actualiza, si ya existe uno con el mismo RUT) el usuario
+           CHOFER y su perfil, con username único basado en el RUT
+        
+        Ver apps/drivers/usuarios.py (provisionar_usuarios). El usuario nuevo
+        queda sin contraseña utilizable: la define con la recuperación de
+        contraseña.
         """
-        from django.contrib.auth import get_user_model
-        from django.db import transaction
-        import secrets
-        import string
+        from .usuarios import provisionar_usuarios
         
-        User = get_user_model()
+        with transaction.atomic():
+            chofer = serializer.save()
+            provisionar_usuarios([chofer])
+    
+    @extend_schema(
+        responses={200: None},
+        description="Importa choferes en bloque desde CSV o XLSX (upsert por RUT) y crea sus usuarios"
+    )
+    @action(detail=False, methods=["post"], url_path="importar")
+    def importar(self, request):
+        """
+        Importa o actualiza choferes desde un archivo CSV/XLSX (ej: planilla de RR.HH.).
         
-        # Guardar el chofer primero
-        chofer = serializer.save()
+        Endpoint: POST /api/v1/drivers/choferes/importar/ (multipart/form-data)
         
-        # Crear usuario asociado si no existe
-        with transaction.atomic():
-            # Generar username único basado en RUT (sin guión)
-            username_base = chofer.rut.replace("-", "").replace(".", "").lower()
-            username = username_base
-            
-            # Si el username ya existe, agregar sufijo
-            counter = 1
-            while User.objects.filter(username=username).exists():
-                username = f"{username_base}{counter}"
-                counter += 1
-            
-            # Generar contraseña temporal aleatoria
-            password_chars = string.ascii_letters + string.digits + "!@#$%^&*"
-            temp_password = ''.join(secrets.choice(password_chars) for _ in range(12))
-            
-            # Extraer nombre y apellido del nombre_completo
-            nombre_parts = chofer.nombre_completo.strip().split(maxsplit=1)
-            first_name = nombre_parts[0] if nombre_parts else ""
-            last_name = nombre_parts[1] if len(nombre_parts) > 1 else ""
-            
-            # Crear o actualizar usuario
-            user, created = User.objects.get_or_create(
-                rut=chofer.rut,
-                defaults={
-                    "username": username,
-                    "email": chofer.email or f"{username}@chofer.local",
-                    "first_name": first_name,
-                    "last_name": last_name,
-                    "rol": "CHOFER",
-                    "is_active": chofer.activo,
-                }
+        Permisos:
+        - ADMIN, COORDINADOR_ZONA
+        
+        Form data:
+        - archivo: Archivo .csv o .xlsx con columnas "rut" y "nombre_completo"
+          y opcionalmente telefono, email, zona, sucursal, km_mensual_promedio,
+          fecha_ingreso, activo, observaciones
+        - solo_validar: "true" para validar sin guardar (opcional)
+        
+        Retorna:
+        - 200: {"total_filas", "creados", "actualizados", "usuarios_creados",
+                "con_errores", "errores": [...]}
+        - 400: Si no se envió archivo o el formato no es soportado
+        - 403: Si el rol no puede importar
+        
+        Ver apps/drivers/importacion.py para el detalle del proceso.
+        """
+        from apps.workorders.models import Auditoria
+        from .importacion import leer_filas, importar_choferes, ArchivoInvalido
+        
+        if request.user.rol not in ("ADMIN", "COORDINADOR_ZONA"):
+            return Response(
+                {"detail": "No tiene permisos para importar choferes."},
+                status=status.HTTP_403_FORBIDDEN
             )
-            
-            # Si el usuario ya existía, actualizar datos
-            if not created:
-                user.email = chofer.email or user.email
-                user.first_name = first_name or user.first_name
-                user.last_name = last_name or user.last_name
-                user.is_active = chofer.activo
-                user.save()
-            else:
-                # Solo establecer contraseña si es un usuario nuevo
-                user.set_password(temp_password)
-                user.save()
-            
-            # Crear perfil si no existe
-            from apps.users.models import Profile
-            Profile.objects.get_or_create(
-                user=user,
-                defaults={
-                    "first_name": first_name,
-                    "last_name": last_name,
-                    "notificaciones_email": True,
-                    "notificaciones_sonido": True,
-                }
+        
+        archivo = request.FILES.get("archivo")
+        if not archivo:
+            return Response(
+                {"detail": "Debe enviar un archivo en el campo 'archivo'."},
+                status=status.HTTP_400_BAD_REQUEST
             )
+        
+        solo_validar = str(request.data.get("solo_validar", "")).lower() in ("1", "true")
+        try:
+            encabezados, filas = leer_filas(archivo, archivo.name)
+            resultado = importar_choferes(encabezados, filas, solo_validar=solo_validar)
+        except ArchivoInvalido as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        Auditoria.objects.create(
+            usuario=request.user,
+            accion="IMPORTAR_CHOFERES",
+            objeto_tipo="Chofer",
+            objeto_id="",
+            payload={
+                "archivo": archivo.name,
+                "solo_validar": solo_validar,
+                **{k: v for k, v in resultado.items() if k != "errores"},
+            }
+        )
+        
+        return Response(resultado, status=status.HTTP_200_OK)
     
     @action(detail=True, methods=["post"], url_path="asignar-vehiculo")
     def asignar_vehiculo(self, request, pk=None):
@@ -170,9 +183,11 @@ class ChoferViewSet(viewsets.ModelViewSet):
         1. Obtiene el chofer
         2. Valida que se proporcione vehiculo_id
         3. Busca el vehículo
-        4. Finaliza asignación anterior (si existe)
-        5. Asigna nuevo vehículo
-        6. Crea registro en historial
+        4. Cierra ahora la asignación vigente del chofer y la del vehículo
+           (el chofer anterior del vehículo queda sin vehículo)
+        5. Asigna nuevo vehículo y abre su periodo en el historial
+        
+        Ver apps/drivers/asignaciones.py (asignar_vehiculo).
         
         Body JSON:
         {
@@ -183,6 +198,7 @@ class ChoferViewSet(viewsets.ModelViewSet):
         - 200: Chofer serializado con vehículo asignado
         - 400: Si falta vehiculo_id
         - 404: Si el vehículo no existe
+        - 409: Si se solapa con una asignación posterior del chofer o vehículo
         """
         try:
             chofer = self.get_object()
@@ -209,24 +225,12 @@ class ChoferViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            # Finalizar asignación anterior si existe
-            if chofer.vehiculo_asignado:
-                HistorialAsignacionVehiculo.objects.filter(
-                    chofer=chofer,
-                    vehiculo=chofer.vehiculo_asignado,
-                    activa=True
-                ).update(activa=False, motivo_fin="Reasignación")
-            
-            # Asignar nuevo vehículo
-            chofer.vehiculo_asignado = vehiculo
-            chofer.save()
-            
-            # Crear registro en historial
-            HistorialAsignacionVehiculo.objects.create(
-                chofer=chofer,
-                vehiculo=vehiculo,
-                activa=True
-            )
+            # Cerrar asignaciones vigentes y abrir la nueva (sin solapes)
+            from .asignaciones import asignar_vehiculo, AsignacionSolapada
+            try:
+                asignar_vehiculo(chofer, vehiculo)
+            except AsignacionSolapada as e:
+                return Response({"detail": str(e)}, status=status.HTTP_409_CONFLICT)
             
             # Serializar y retornar
             serializer = ChoferSerializer(chofer)
@@ -247,63 +251,13 @@ class ChoferViewSet(viewsets.ModelViewSet):
     def perform_update(self, serializer):
         """
         Actualiza un chofer y también actualiza el usuario asociado si existe.
-        Si no existe usuario, crea uno nuevo.
+        Si no existe usuario, crea uno nuevo (ver provisionar_usuarios).
         """
-        from django.contrib.auth import get_user_model
-        import secrets
-        import string
-        
-        User = get_user_model()
-        chofer = serializer.save()
-        
-        # Extraer nombre y apellido del nombre_completo
-        nombre_parts = chofer.nombre_completo.strip().split(maxsplit=1)
-        first_name = nombre_parts[0] if nombre_parts else ""
-        last_name = nombre_parts[1] if len(nombre_parts) > 1 else ""
-        
-        # Buscar o crear usuario asociado
-        user, created = User.objects.get_or_create(
-            rut=chofer.rut,
-            defaults={
-                "username": chofer.rut.replace("-", "").replace(".", "").lower(),
-                "email": chofer.email or f"{chofer.rut.replace('-', '').replace('.', '')}@chofer.local",
-                "first_name": first_name,
-                "last_name": last_name,
-                "rol": "CHOFER",
-                "is_active": chofer.activo,
-            }
-        )
+        from .usuarios import provisionar_usuarios
         
-        # Si el usuario ya existía, actualizar datos
-        if not created:
-            user.email = chofer.email or user.email
-            user.first_name = first_name or user.first_name
-            user.last_name = last_name or user.last_name
-            user.is_active = chofer.activo
-            user.save()
-        else:
-            # Solo establecer contraseña si es un usuario nuevo
-            password_chars = string.ascii_letters + string.digits + "!@#$%^&*"
-            temp_password = ''.join(secrets.choice(password_chars) for _ in range(12))
-            user.set_password(temp_password)
-            user.save()
-        
-        # Crear o actualizar perfil
-        from apps.users.models import Profile
-        profile, _ = Profile.objects.get_or_create(
-            user=user,
-            defaults={
-                "first_name": first_name,
-                "last_name": last_name,
-                "notificaciones_email": True,
-                "notificaciones_sonido": True,
-            }
-        )
-        # Actualizar perfil si ya existía
-        if not _:
-            profile.first_name = first_name or profile.first_name
-            profile.last_name = last_name or profile.last_name
-            profile.save()
+        with transaction.atomic():
+            chofer = serializer.save()
+            provisionar_usuarios([chofer])
     
     @action(detail=True, methods=["get"])
     def historial(self, request, pk=None):
@@ -363,3 +317,64 @@ class HistorialAsignacionVehiculoViewSet(viewsets.ReadOnlyModelViewSet):
     filter_backends = [DjangoFilterBackend, OrderingFilter]
     filterset_fields = ["chofer", "vehiculo", "activa"]
     ordering = ["-fecha_asignacion"]  # Más recientes primero
+    
+    @action(detail=False, methods=["get"], url_path="en")
+    def en_momento(self, request):
+        """
+        Asignación vigente de un vehículo o de un chofer en un momento dado.
+        
+        Endpoint: GET /api/v1/drivers/historial/en/?vehiculo=<id>&momento=<iso>
+                  GET /api/v1/drivers/historial/en/?chofer=<id>&momento=<iso>
+        
+        Permisos:
+        - Requiere autenticación
+        
+        Query params:
+        - vehiculo o chofer: UUID (uno de los dos, requerido)
+        - momento: Fecha/hora ISO 8601 (opcional, default: ahora)
+        
+        Responde "quién manejaba el vehículo X en T" (incidentes, emergencias)
+        y "qué vehículo manejaba el chofer Y en T" con periodo @> T sobre el
+        índice GiST del historial.
+        
+        Retorna:
+        - 200: Asignación serializada (chofer y vehículo)
+        - 400: Si falta vehiculo/chofer o momento es inválido
+        - 404: Si no había asignación en ese momento
+        """
+        from django.utils import timezone
+        from django.utils.dateparse import parse_datetime
+        
+        vehiculo_id = request.query_params.get("vehiculo")
+        chofer_id = request.query_params.get("chofer")
+        if bool(vehiculo_id) == bool(chofer_id):
+            return Response(
+                {"detail": "Indique vehiculo o chofer (solo uno)."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        momento = timezone.now()
+        if request.query_params.get("momento"):
+            try:
+                momento = parse_datetime(request.query_params["momento"])
+            except ValueError:
+                momento = None
+            if momento is None:
+                return Response(
+                    {"detail": "momento debe ser una fecha/hora ISO 8601."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if timezone.is_naive(momento):
+                momento = timezone.make_aware(momento)
+        
+        filtro = {"vehiculo_id": vehiculo_id} if vehiculo_id else {"chofer_id": chofer_id}
+        try:
+            asignacion = self.get_queryset().vigentes_en(momento).filter(**filtro).first()
+        except DjangoValidationError:
+            return Response({"detail": "ID inválido."}, status=status.HTTP_400_BAD_REQUEST)
+        if asignacion is None:
+            return Response(
+                {"detail": "Sin asignación en ese momento."},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return Response(self.get_serializer(asignacion).data)
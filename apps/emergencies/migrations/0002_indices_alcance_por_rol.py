@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('emergencies', '0001_initial'),
+        ('vehicles', '0012_indices_alcance_por_rol'),
+        ('workorders', '0018_indices_alcance_por_rol'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='emergenciaruta',
+            index=models.Index(fields=['supervisor_asignado', 'estado'], name='emergencies_supervi_69d66e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='emergenciaruta',
+            index=models.Index(fields=['solicitante', 'estado'], name='emergencies_solicit_781ba9_idx'),
+        ),
+    ]
@@ -1,6 +1,7 @@
 # apps/emergencies/models.py
 from django.db import models
 from django.conf import settings
+from apps.core.alcance import TODOS, Condicion
 from apps.vehicles.models import Vehiculo
 from apps.workorders.models import OrdenTrabajo
 import uuid
@@ -87,12 +88,26 @@ class EmergenciaRuta(models.Model):
     
     observaciones = models.TextField(blank=True)
     
+    # Visibilidad por rol (apps/core/alcance.py). Los roles no listados no ven emergencias
+    ALCANCE_POR_ROL = {
+        "MECANICO": Condicion("mecanico_asignado"),
+        "SUPERVISOR": Condicion("supervisor_asignado"),
+        "COORDINADOR_ZONA": Condicion("solicitante"),
+        "JEFE_TALLER": TODOS,
+        "ADMIN": TODOS,
+        "EJECUTIVO": TODOS,
+        "SPONSOR": TODOS,
+    }
+    
     class Meta:
         indexes = [
             models.Index(fields=["estado", "fecha_solicitud"]),
             models.Index(fields=["vehiculo", "estado"]),
             models.Index(fields=["zona", "estado"]),
+            # Un índice por predicado de ALCANCE_POR_ROL (+ ?estado=)
             models.Index(fields=["mecanico_asignado", "estado"]),
+            models.Index(fields=["supervisor_asignado", "estado"]),
+            models.Index(fields=["solicitante", "estado"]),
         ]
         ordering = ["-fecha_solicitud"]
     
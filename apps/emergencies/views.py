@@ -36,6 +36,7 @@ from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
 from django.utils import timezone
 from django.db.models import Q
+from apps.core.alcance import AlcancePorRolMixin
 from .models import EmergenciaRuta
 from .serializers import (
     EmergenciaRutaSerializer,
@@ -45,7 +46,7 @@ from .serializers import (
 from apps.workorders.models import OrdenTrabajo
 
 
-class EmergenciaRutaViewSet(viewsets.ModelViewSet):
+class EmergenciaRutaViewSet(AlcancePorRolMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestión de emergencias en ruta.
     
@@ -66,7 +67,7 @@ class EmergenciaRutaViewSet(viewsets.ModelViewSet):
     
     Permisos:
     - Requiere autenticación
-    - Filtrado por rol (cada rol ve solo sus emergencias)
+    - Filtrado por rol (EmergenciaRuta.ALCANCE_POR_ROL, apps/core/alcance.py)
     
     Filtros:
     - Por estado, prioridad, zona
@@ -99,46 +100,6 @@ class EmergenciaRutaViewSet(viewsets.ModelViewSet):
             return EmergenciaRutaListSerializer
         return EmergenciaRutaSerializer
     
-    def get_queryset(self):
-        """
-        Filtrar emergencias según rol del usuario.
-        
-        Lógica:
-        - MECANICO: Ve solo sus emergencias asignadas
-        - SUPERVISOR: Ve emergencias asignadas a él
-        - COORDINADOR_ZONA: Ve emergencias que solicitó
-        - JEFE_TALLER/ADMIN: Ven todas
-        
-        Retorna:
-        - QuerySet filtrado según permisos
-        """
-        user = self.request.user
-        
-        # Verificar que el usuario tenga rol
-        if not hasattr(user, 'rol') or not user.rol:
-            return EmergenciaRuta.objects.none()
-        
-        queryset = super().get_queryset()
-        
-        # Mecánico ve solo sus emergencias asignadas
-        if user.rol == "MECANICO":
-            return queryset.filter(mecanico_asignado=user)
-        
-        # Supervisor ve emergencias asignadas a él
-        if user.rol == "SUPERVISOR":
-            return queryset.filter(supervisor_asignado=user)
-        
-        # Coordinador ve emergencias que solicitó
-        if user.rol == "COORDINADOR_ZONA":
-            return queryset.filter(solicitante=user)
-        
-        # Jefe de Taller, Admin, Ejecutivo, Sponsor ven todas
-        if user.rol in ["JEFE_TALLER", "ADMIN", "EJECUTIVO", "SPONSOR"]:
-            return queryset
-        
-        # Por defecto, no mostrar nada si el rol no está contemplado
-        return queryset.none()
-    
     def perform_create(self, serializer):
         """
         Crea una emergencia y asigna el solicitante automáticamente.
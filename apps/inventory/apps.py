@@ -5,3 +5,6 @@ class InventoryConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.inventory'
 
+    def ready(self):
+        # Registrar señales (invalidación del catálogo de repuestos)
+        from . import signals  # noqa: F401
@@ -0,0 +1,116 @@
+# apps/inventory/catalogo.py
+"""
+Catálogo liviano de repuestos para el selector de los mecánicos.
+
+El catálogo completo (id, codigo, nombre, categoria, stock disponible) se
+arma con una sola consulta y se guarda en la caché de Django junto con su
+ETag (hash del contenido). Las tablets lo piden con If-None-Match y, si no
+cambió, reciben 304 sin cuerpo.
+
+Se invalida:
+- desde apps/inventory/signals.py al guardar o eliminar Repuesto / Stock
+- desde apps/inventory/services.py tras los UPDATE condicionales de stock
+  (QuerySet.update no dispara señales)
+
+Relaciones:
+- Usado por: apps/inventory/views.py (RepuestoViewSet.catalogo, autocompletar)
+- Usa: apps/core/busqueda.py (regla prefijo/contenido de los índices)
+"""
+
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.db.models import Case, F, IntegerField, Value, When
+from django.db.models.functions import Coalesce
+
+from apps.core.busqueda import filtro_texto
+from .models import Repuesto
+
+# Clave y duración del catálogo en caché
+CATALOGO_CACHE_KEY = "inventario:catalogo"
+CATALOGO_CACHE_TIMEOUT = 60 * 60  # 1 hora (se invalida antes por señales)
+
+# Campos donde busca el autocompletado
+CAMPOS_AUTOCOMPLETADO = ("codigo", "nombre", "marca")
+
+
+def _repuestos_activos():
+    """Repuestos activos con su stock disponible (actual - reservado) en un JOIN."""
+    return Repuesto.objects.filter(activo=True).annotate(
+        stock_disponible=Coalesce(F("stock__cantidad_actual"), Value(0))
+        - Coalesce(F("stock__cantidad_reservada"), Value(0)),
+    )
+
+
+def _serializar(filas):
+    return [
+        {
+            "id": str(fila["id"]),
+            "codigo": fila["codigo"],
+            "nombre": fila["nombre"],
+            "categoria": fila["categoria"],
+            "stock": fila["stock_disponible"],
+        }
+        for fila in filas
+    ]
+
+
+def obtener_catalogo():
+    """
+    Retorna (etag, repuestos) del catálogo, construyéndolo si no está en caché.
+    """
+    catalogo = cache.get(CATALOGO_CACHE_KEY)
+    if catalogo is None:
+        repuestos = _serializar(
+            _repuestos_activos().order_by("nombre", "codigo").values(
+                "id", "codigo", "nombre", "categoria", "stock_disponible"
+            )
+        )
+        contenido = json.dumps(repuestos, separators=(",", ":"), ensure_ascii=False)
+        etag = '"%s"' % hashlib.sha1(contenido.encode()).hexdigest()
+        catalogo = {"etag": etag, "repuestos": repuestos}
+        cache.set(CATALOGO_CACHE_KEY, catalogo, CATALOGO_CACHE_TIMEOUT)
+    return catalogo["etag"], catalogo["repuestos"]
+
+
+def invalidar_catalogo():
+    """
+    Elimina el catálogo de la caché.
+
+    La próxima lectura lo reconstruye (y su ETag cambia si cambió el contenido).
+    """
+    cache.delete(CATALOGO_CACHE_KEY)
+
+
+def autocompletar(texto, limite=10):
+    """
+    Sugerencias de repuestos activos por codigo, nombre o marca.
+
+    Usa los índices de apps/inventory/migrations/0005_busqueda_catalogo.py:
+    prefijo para términos de 1-2 caracteres, trigramas para el resto.
+    Primero los códigos que empiezan con el término, luego los nombres.
+
+    Retorna:
+    - Lista con el mismo formato que el catálogo
+    """
+    condicion = filtro_texto(texto, *CAMPOS_AUTOCOMPLETADO)
+    if not condicion:
+        return []
+
+    termino = texto.strip()
+    filas = (
+        _repuestos_activos()
+        .filter(condicion)
+        .annotate(
+            prioridad=Case(
+                When(codigo__istartswith=termino, then=Value(0)),
+                When(nombre__istartswith=termino, then=Value(1)),
+                default=Value(2),
+                output_field=IntegerField(),
+            )
+        )
+        .order_by("prioridad", "nombre", "codigo")
+        .values("id", "codigo", "nombre", "categoria", "stock_disponible")[:limite]
+    )
+    return _serializar(filas)
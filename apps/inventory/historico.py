@@ -0,0 +1,202 @@
+# apps/inventory/historico.py
+"""
+Stock histórico (en un momento dado) y valorización de bodega.
+
+El stock de un repuesto en el momento T se reconstruye como:
+- el último SnapshotStock cerrado antes de T, más
+- los movimientos entre el cierre del snapshot y T (a lo sumo un día)
+
+Si el repuesto aún no tiene snapshots, se parte del stock actual y se
+revierten los movimientos posteriores a T.
+
+La variación de cada movimiento se calcula por tipo (ENTRADA/DEVOLUCION
+suman, SALIDA resta, AJUSTE usa cantidad_nueva - cantidad_anterior) en vez
+de confiar en los saldos registrados, que pueden venir de cargas manuales.
+
+Relaciones:
+- Usado por: apps/inventory/views.py (StockViewSet.historico, valorizacion)
+- Usado por: apps/inventory/tasks.py (capturar_snapshot_stock)
+- Usa: apps/core/fechas.py (límites del día local)
+"""
+
+from decimal import Decimal
+
+from django.db.models import Case, Count, F, IntegerField, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from apps.core.fechas import rango_dia_local
+from .models import Repuesto, Stock, MovimientoStock, SnapshotStock
+
+TIPOS_QUE_SUMAN = (MovimientoStock.TipoMovimiento.ENTRADA, MovimientoStock.TipoMovimiento.DEVOLUCION)
+
+
+def variacion_movimiento():
+    """Expresión con la variación (con signo) que un movimiento produjo en el stock."""
+    return Case(
+        When(tipo__in=TIPOS_QUE_SUMAN, then=F("cantidad")),
+        When(tipo=MovimientoStock.TipoMovimiento.SALIDA, then=-F("cantidad")),
+        default=F("cantidad_nueva") - F("cantidad_anterior"),
+        output_field=IntegerField(),
+    )
+
+
+def _suma_movimientos(campo_repuesto, **filtros):
+    """Subconsulta con la variación total de los movimientos del repuesto (0 si no hay)."""
+    return Coalesce(
+        Subquery(
+            MovimientoStock.objects.filter(repuesto=OuterRef(campo_repuesto), **filtros)
+            .order_by()
+            .values("repuesto")
+            .annotate(total=Sum(variacion_movimiento()))
+            .values("total"),
+            output_field=IntegerField(),
+        ),
+        Value(0),
+    )
+
+
+def stock_en(repuesto_id, momento):
+    """
+    Stock del repuesto en el instante indicado.
+
+    Consultas: 2 (último snapshot por índice + agregado de los movimientos
+    a reproducir).
+
+    Retorna:
+    - {"cantidad": 12, "snapshot": date | None, "movimientos": 3}
+      donde movimientos es la cantidad de movimientos reproducidos
+    """
+    snapshot = (
+        SnapshotStock.objects.filter(repuesto_id=repuesto_id, fecha__lt=timezone.localdate(momento))
+        .order_by("-fecha")
+        .values("fecha", "hasta", "cantidad")
+        .first()
+    )
+    movimientos = MovimientoStock.objects.filter(repuesto_id=repuesto_id)
+
+    if snapshot is not None:
+        replay = movimientos.filter(fecha__gte=snapshot["hasta"], fecha__lt=momento).aggregate(
+            total=Sum(variacion_movimiento()), n=Count("id")
+        )
+        cantidad = snapshot["cantidad"] + (replay["total"] or 0)
+    else:
+        actual = Stock.objects.filter(repuesto_id=repuesto_id).values_list("cantidad_actual", flat=True).first() or 0
+        replay = movimientos.filter(fecha__gte=momento).aggregate(total=Sum(variacion_movimiento()), n=Count("id"))
+        cantidad = actual - (replay["total"] or 0)
+
+    return {
+        "cantidad": max(cantidad, 0),
+        "snapshot": snapshot["fecha"] if snapshot else None,
+        "movimientos": replay["n"],
+    }
+
+
+def valorizar_bodega(dia):
+    """
+    Valoriza la bodega completa al cierre del día local indicado.
+
+    Una sola consulta sobre Repuesto: por cada repuesto toma su último
+    snapshot hasta ese día y suma los movimientos posteriores hasta el cierre
+    (o, sin snapshots, revierte desde el stock actual). El costo unitario es
+    el registrado en el snapshot o, si no hay, el precio_referencia actual.
+
+    Retorna:
+    - {
+        "fecha": "2025-01-31",
+        "total_unidades": 340,
+        "valor_total": Decimal("1234500.00"),
+        "sin_costo": 2,       # repuestos con stock pero sin costo conocido
+        "repuestos": [{"repuesto_id", "codigo", "nombre", "categoria",
+                       "cantidad", "costo_unitario", "valor"}, ...]
+      }
+    """
+    _, cierre = rango_dia_local(dia)
+    ultimo_snapshot = SnapshotStock.objects.filter(repuesto=OuterRef("pk"), fecha__lte=dia).order_by("-fecha")
+
+    filas = (
+        Repuesto.objects.annotate(
+            snapshot_hasta=Subquery(ultimo_snapshot.values("hasta")[:1]),
+            snapshot_cantidad=Subquery(ultimo_snapshot.values("cantidad")[:1]),
+            snapshot_costo=Subquery(ultimo_snapshot.values("costo_unitario")[:1]),
+        )
+        .annotate(
+            cantidad_al_cierre=Case(
+                When(
+                    snapshot_hasta__isnull=False,
+                    then=F("snapshot_cantidad")
+                    + _suma_movimientos("pk", fecha__gte=OuterRef("snapshot_hasta"), fecha__lt=cierre),
+                ),
+                default=Coalesce(F("stock__cantidad_actual"), Value(0))
+                - _suma_movimientos("pk", fecha__gte=cierre),
+                output_field=IntegerField(),
+            ),
+            costo=Coalesce(F("snapshot_costo"), F("precio_referencia")),
+        )
+        .filter(Q(cantidad_al_cierre__gt=0))
+        .order_by("codigo")
+        .values("id", "codigo", "nombre", "categoria", "cantidad_al_cierre", "costo")
+    )
+
+    repuestos = []
+    total_unidades, valor_total, sin_costo = 0, Decimal("0"), 0
+    for fila in filas:
+        valor = fila["costo"] * fila["cantidad_al_cierre"] if fila["costo"] is not None else None
+        repuestos.append({
+            "repuesto_id": str(fila["id"]),
+            "codigo": fila["codigo"],
+            "nombre": fila["nombre"],
+            "categoria": fila["categoria"],
+            "cantidad": fila["cantidad_al_cierre"],
+            "costo_unitario": fila["costo"],
+            "valor": valor,
+        })
+        total_unidades += fila["cantidad_al_cierre"]
+        if valor is None:
+            sin_costo += 1
+        else:
+            valor_total += valor
+
+    return {
+        "fecha": dia.isoformat(),
+        "total_unidades": total_unidades,
+        "valor_total": valor_total,
+        "sin_costo": sin_costo,
+        "repuestos": repuestos,
+    }
+
+
+def capturar_snapshots(dia):
+    """
+    Guarda el stock de cada repuesto al cierre del día local indicado.
+
+    El cierre se calcula desde el stock actual revirtiendo los movimientos
+    posteriores, así que se puede ejecutar después de medianoche o para días
+    pasados. Re-ejecutar sobre el mismo día sobrescribe las filas.
+
+    Retorna:
+    - Cantidad de snapshots guardados
+    """
+    _, cierre = rango_dia_local(dia)
+    filas = Stock.objects.annotate(
+        cantidad_al_cierre=F("cantidad_actual") - _suma_movimientos("repuesto", fecha__gte=cierre),
+    ).values_list("repuesto_id", "cantidad_al_cierre", "repuesto__precio_referencia")
+
+    snapshots = [
+        SnapshotStock(
+            repuesto_id=repuesto_id,
+            fecha=dia,
+            hasta=cierre,
+            cantidad=max(cantidad, 0),
+            costo_unitario=costo,
+        )
+        for repuesto_id, cantidad, costo in filas
+    ]
+    SnapshotStock.objects.bulk_create(
+        snapshots,
+        update_conflicts=True,
+        unique_fields=["repuesto", "fecha"],
+        update_fields=["hasta", "cantidad", "costo_unitario", "creado_en"],
+        batch_size=1000,
+    )
+    return len(snapshots)
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:50
+
+from django.db import migrations, models
+
+
+def reservar_aprobadas(apps, schema_editor):
+    """
+    Las solicitudes APROBADA existentes no reservaron stock al aprobarse.
+    Se reservan por orden de aprobación mientras el stock alcance; las que
+    no alcanzan quedan sin reserva y solo consumen unidades libres al entregar.
+    """
+    Stock = apps.get_model("inventory", "Stock")
+    SolicitudRepuesto = apps.get_model("inventory", "SolicitudRepuesto")
+    for stock in Stock.objects.all():
+        aprobadas = SolicitudRepuesto.objects.filter(
+            repuesto_id=stock.repuesto_id, estado="APROBADA"
+        ).order_by("fecha_aprobacion", "fecha_solicitud")
+        for solicitud in aprobadas:
+            if stock.cantidad_reservada + solicitud.cantidad_solicitada > stock.cantidad_actual:
+                continue
+            stock.cantidad_reservada += solicitud.cantidad_solicitada
+            solicitud.cantidad_reservada = solicitud.cantidad_solicitada
+            solicitud.save(update_fields=["cantidad_reservada"])
+        if stock.cantidad_reservada:
+            stock.save(update_fields=["cantidad_reservada"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='solicitudrepuesto',
+            name='cantidad_reservada',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='stock',
+            name='cantidad_reservada',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(reservar_aprobadas, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='stock',
+            constraint=models.CheckConstraint(condition=models.Q(('cantidad_reservada__lte', models.F('cantidad_actual'))), name='stock_reservada_lte_actual'),
+        ),
+    ]
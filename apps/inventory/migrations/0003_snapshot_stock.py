@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0002_stock_reservas'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SnapshotStock',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('fecha', models.DateField()),
+                ('hasta', models.DateTimeField()),
+                ('cantidad', models.PositiveIntegerField(default=0)),
+                ('costo_unitario', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('creado_en', models.DateTimeField(auto_now=True)),
+                ('repuesto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots_stock', to='inventory.repuesto')),
+            ],
+            options={
+                'ordering': ['fecha'],
+                'indexes': [models.Index(fields=['fecha'], name='inventory_s_fecha_f7f0d3_idx')],
+                'constraints': [models.UniqueConstraint(fields=('repuesto', 'fecha'), name='snapshot_stock_repuesto_fecha_unique')],
+            },
+        ),
+    ]
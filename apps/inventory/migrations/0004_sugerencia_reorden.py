@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0003_snapshot_stock'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SugerenciaReorden',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('semanas', models.PositiveSmallIntegerField()),
+                ('consumo_semanal', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('consumo_reciente', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('desviacion', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('punto_reorden', models.PositiveIntegerField()),
+                ('stock_objetivo', models.PositiveIntegerField()),
+                ('calculado_en', models.DateTimeField(auto_now=True)),
+                ('repuesto', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='sugerencia_reorden', to='inventory.repuesto')),
+            ],
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:14
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.db import migrations, models
+
+# Índices GIN de trigramas para el autocompletado y el SearchFilter del
+# catálogo. Se crean sobre UPPER(col::text), la expresión que Django genera
+# para icontains en PostgreSQL (igual que vehicles/0010_busqueda_patente).
+COLUMNAS_TRIGRAMA = ("codigo", "nombre", "marca")
+
+
+def _nombre_indice(columna):
+    return f"repuesto_{columna}_trgm_idx"
+
+
+def crear_indices_trigrama(apps, schema_editor):
+    """
+    Crea pg_trgm y los índices GIN si la extensión está disponible en el
+    servidor. Sin ella, las búsquedas siguen funcionando (scan secuencial).
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            return
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for columna in COLUMNAS_TRIGRAMA:
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS {_nombre_indice(columna)} '
+                f'ON inventory_repuesto USING gin (UPPER("{columna}"::text) gin_trgm_ops)'
+            )
+
+
+def eliminar_indices_trigrama(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for columna in COLUMNAS_TRIGRAMA:
+            cursor.execute(f"DROP INDEX IF EXISTS {_nombre_indice(columna)}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0004_sugerencia_reorden'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='repuesto',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('codigo'), name='text_pattern_ops'), name='repuesto_codigo_prefijo_idx'),
+        ),
+        migrations.RunPython(crear_indices_trigrama, eliminar_indices_trigrama),
+    ]
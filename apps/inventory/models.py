@@ -1,6 +1,8 @@
 # apps/inventory/models.py
 from django.db import models
 from django.conf import settings
+from django.contrib.postgres.indexes import OpClass
+from django.db.models.functions import Upper
 from apps.vehicles.models import Vehiculo
 from apps.workorders.models import OrdenTrabajo, ItemOT
 import uuid
@@ -25,6 +27,8 @@ class Repuesto(models.Model):
         indexes = [
             models.Index(fields=["codigo"]),
             models.Index(fields=["categoria", "activo"]),
+            # Autocompletado por prefijo: UPPER(codigo) LIKE 'ABC%'
+            models.Index(OpClass(Upper("codigo"), name="text_pattern_ops"), name="repuesto_codigo_prefijo_idx"),
         ]
         ordering = ["nombre"]
     
@@ -36,6 +40,8 @@ class Stock(models.Model):
     """Stock actual de repuestos en bodega"""
     repuesto = models.OneToOneField(Repuesto, on_delete=models.CASCADE, related_name="stock")
     cantidad_actual = models.PositiveIntegerField(default=0)
+    # Unidades comprometidas por solicitudes aprobadas y aún no entregadas
+    cantidad_reservada = models.PositiveIntegerField(default=0)
     cantidad_minima = models.PositiveIntegerField(default=0)  # Nivel de reorden
     ubicacion = models.CharField(max_length=128, blank=True)  # Ubicación física en bodega
     
@@ -45,10 +51,21 @@ class Stock(models.Model):
         indexes = [
             models.Index(fields=["cantidad_actual"]),
         ]
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(cantidad_reservada__lte=models.F("cantidad_actual")),
+                name="stock_reservada_lte_actual",
+            ),
+        ]
     
     def __str__(self):
         return f"{self.repuesto.codigo}: {self.cantidad_actual} unidades"
     
+    @property
+    def cantidad_disponible(self):
+        """Unidades que aún se pueden reservar (actual - reservada)"""
+        return self.cantidad_actual - self.cantidad_reservada
+    
     @property
     def necesita_reorden(self):
         """Indica si el stock está por debajo del mínimo"""
@@ -106,6 +123,8 @@ class SolicitudRepuesto(models.Model):
     repuesto = models.ForeignKey(Repuesto, on_delete=models.PROTECT, related_name="solicitudes")
     cantidad_solicitada = models.PositiveIntegerField()
     cantidad_entregada = models.PositiveIntegerField(default=0)
+    # Unidades reservadas en Stock al aprobar; se liberan al entregar
+    cantidad_reservada = models.PositiveIntegerField(default=0)
     estado = models.CharField(max_length=20, choices=Estado.choices, default=Estado.PENDIENTE)
     motivo = models.TextField(blank=True)
     
@@ -169,3 +188,79 @@ class HistorialRepuestoVehiculo(models.Model):
     def __str__(self):
         return f"{self.vehiculo.patente} - {self.repuesto.codigo} x{self.cantidad} - {self.fecha_uso}"
 
+
+
+class SnapshotStock(models.Model):
+    """
+    Foto diaria del stock de cada repuesto al cierre del día (hora local).
+
+    Permite responder "stock del repuesto X en el momento T" con el último
+    snapshot anterior a T más los movimientos entre ambos (a lo sumo un día
+    de movimientos), sin recorrer todo el historial de MovimientoStock.
+
+    Uso:
+    - Escrito por: apps/inventory/tasks.py (capturar_snapshot_stock)
+    - Leído por: apps/inventory/historico.py (stock_en, valorizar_bodega)
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    repuesto = models.ForeignKey(Repuesto, on_delete=models.CASCADE, related_name="snapshots_stock")
+
+    # Día de la foto (hora local); la cantidad corresponde al instante `hasta`
+    # (medianoche local del día siguiente)
+    fecha = models.DateField()
+    hasta = models.DateTimeField()
+    cantidad = models.PositiveIntegerField(default=0)
+
+    # precio_referencia del repuesto al momento de la foto (valorización histórica)
+    costo_unitario = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+
+    creado_en = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            # También sirve para buscar el último snapshot de un repuesto
+            models.UniqueConstraint(fields=["repuesto", "fecha"], name="snapshot_stock_repuesto_fecha_unique"),
+        ]
+        indexes = [
+            models.Index(fields=["fecha"]),
+        ]
+        ordering = ["fecha"]
+
+    def __str__(self):
+        return f"Snapshot {self.fecha} {self.repuesto_id}: {self.cantidad}"
+
+
+class SugerenciaReorden(models.Model):
+    """
+    Punto de reorden dinámico de un repuesto, calculado desde su consumo.
+
+    Lo recalcula cada noche la tarea calcular_sugerencias_reorden
+    (apps/inventory/tasks.py) a partir de las SALIDA de MovimientoStock.
+    La cantidad a pedir se calcula al consultar contra el stock vigente
+    (ver apps/inventory/reorden.py).
+
+    Uso:
+    - Escrito por: apps/inventory/reorden.py (calcular_sugerencias)
+    - Leído por: apps/inventory/views.py (StockViewSet.sugerencias_reorden)
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    repuesto = models.OneToOneField(Repuesto, on_delete=models.CASCADE, related_name="sugerencia_reorden")
+
+    # Semanas de historia usadas en el cálculo
+    semanas = models.PositiveSmallIntegerField()
+
+    # Consumo semanal: promedio de la ventana, promedio reciente y desviación estándar
+    consumo_semanal = models.DecimalField(max_digits=12, decimal_places=2)
+    consumo_reciente = models.DecimalField(max_digits=12, decimal_places=2)
+    desviacion = models.DecimalField(max_digits=12, decimal_places=2)
+
+    # Pedir cuando el disponible llegue a punto_reorden, hasta completar stock_objetivo
+    punto_reorden = models.PositiveIntegerField()
+    stock_objetivo = models.PositiveIntegerField()
+
+    calculado_en = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Reorden {self.repuesto_id}: punto {self.punto_reorden}, objetivo {self.stock_objetivo}"
@@ -0,0 +1,196 @@
+# apps/inventory/reorden.py
+"""
+Sugerencias de reorden a partir del consumo real de cada repuesto.
+
+Cálculo nocturno (calcular_sugerencias):
+1. Una consulta agrega las SALIDA de MovimientoStock por (repuesto, semana)
+   y luego por repuesto: suma, suma de cuadrados y suma reciente. Las
+   semanas sin consumo cuentan como 0 al dividir por el total de semanas.
+2. Por repuesto, en Python: consumo semanal promedio (ventana completa y
+   últimas semanas), desviación estándar y, con ellos,
+   - punto de reorden = consumo × plazo + Z × desviación × √plazo
+   - stock objetivo   = punto de reorden + consumo × semanas de cobertura
+3. Upsert en SugerenciaReorden y borrado de repuestos sin consumo.
+
+La cantidad a pedir no se guarda: se calcula al consultar
+(sugerencias_vigentes) contra el disponible actual del Stock, y
+cantidad_minima sigue actuando como piso del punto de reorden.
+
+Relaciones:
+- Usado por: apps/inventory/tasks.py (calcular_sugerencias_reorden)
+- Usado por: apps/inventory/views.py (StockViewSet.sugerencias_reorden)
+"""
+
+import math
+from datetime import timedelta
+
+from django.db import connection
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from apps.core.fechas import inicio_dia_local
+from .models import MovimientoStock, SugerenciaReorden
+
+# Semanas de historia del cálculo y semanas del promedio reciente
+SEMANAS_HISTORIA = 26
+SEMANAS_RECIENTES = 8
+
+# Plazo de reposición del proveedor y cobertura de cada pedido
+DIAS_REPOSICION = 14
+SEMANAS_COBERTURA = 4
+
+# Factor de seguridad: 1.65 ≈ 95% de probabilidad de no quebrar stock
+Z_NIVEL_SERVICIO = 1.65
+
+SEGUNDOS_SEMANA = 7 * 24 * 3600
+
+SQL_CONSUMO_SEMANAL = """
+    SELECT repuesto_id,
+           SUM(q) AS total,
+           SUM(q * q) AS total_cuadrados,
+           COALESCE(SUM(q) FILTER (WHERE semana >= %(semana_reciente)s), 0) AS total_reciente
+    FROM (
+        SELECT repuesto_id,
+               FLOOR(EXTRACT(EPOCH FROM fecha - %(inicio)s) / %(segundos_semana)s)::int AS semana,
+               SUM(cantidad)::bigint AS q
+        FROM {tabla}
+        WHERE tipo = %(tipo)s AND fecha >= %(inicio)s AND fecha < %(fin)s
+        GROUP BY 1, 2
+    ) AS semanal
+    GROUP BY repuesto_id
+"""
+
+
+def consumo_semanal(semanas, fin):
+    """
+    Consumo semanal agregado por repuesto en las `semanas` anteriores a `fin`.
+
+    Retorna:
+    - Iterador de (repuesto_id, total, total_cuadrados, total_reciente)
+    """
+    inicio = fin - timedelta(weeks=semanas)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            SQL_CONSUMO_SEMANAL.format(tabla=MovimientoStock._meta.db_table),
+            {
+                "inicio": inicio,
+                "fin": fin,
+                "tipo": MovimientoStock.TipoMovimiento.SALIDA,
+                "segundos_semana": SEGUNDOS_SEMANA,
+                "semana_reciente": semanas - min(SEMANAS_RECIENTES, semanas),
+            },
+        )
+        yield from cursor
+
+
+def calcular_parametros(total, total_cuadrados, total_reciente, semanas):
+    """
+    Parámetros de reorden de un repuesto desde sus sumas semanales.
+
+    Se usa el mayor entre el promedio de la ventana y el reciente, para
+    reaccionar rápido a un alza de consumo sin descartar la historia.
+
+    Retorna:
+    - dict con consumo_semanal, consumo_reciente, desviacion,
+      punto_reorden y stock_objetivo
+    """
+    total, total_cuadrados, total_reciente = float(total), float(total_cuadrados), float(total_reciente)
+    media = total / semanas
+    media_reciente = total_reciente / min(SEMANAS_RECIENTES, semanas)
+    varianza = (total_cuadrados - total * total / semanas) / (semanas - 1) if semanas > 1 else 0.0
+    desviacion = math.sqrt(max(varianza, 0.0))
+
+    consumo = max(media, media_reciente)
+    plazo = DIAS_REPOSICION / 7
+    punto_reorden = math.ceil(consumo * plazo + Z_NIVEL_SERVICIO * desviacion * math.sqrt(plazo))
+    stock_objetivo = punto_reorden + math.ceil(consumo * SEMANAS_COBERTURA)
+
+    return {
+        "consumo_semanal": round(media, 2),
+        "consumo_reciente": round(media_reciente, 2),
+        "desviacion": round(desviacion, 2),
+        "punto_reorden": punto_reorden,
+        "stock_objetivo": stock_objetivo,
+    }
+
+
+def calcular_sugerencias(semanas=SEMANAS_HISTORIA):
+    """
+    Recalcula SugerenciaReorden para todos los repuestos con consumo en la
+    ventana (que termina al inicio del día local de hoy).
+
+    Retorna:
+    - Cantidad de repuestos con sugerencia
+    """
+    inicio_calculo = timezone.now()
+    fin = inicio_dia_local(timezone.localdate())
+
+    sugerencias = [
+        SugerenciaReorden(
+            repuesto_id=repuesto_id,
+            semanas=semanas,
+            **calcular_parametros(total, cuadrados, reciente, semanas),
+        )
+        for repuesto_id, total, cuadrados, reciente in consumo_semanal(semanas, fin)
+    ]
+    SugerenciaReorden.objects.bulk_create(
+        sugerencias,
+        update_conflicts=True,
+        unique_fields=["repuesto"],
+        update_fields=[
+            "semanas", "consumo_semanal", "consumo_reciente", "desviacion",
+            "punto_reorden", "stock_objetivo", "calculado_en",
+        ],
+        batch_size=2000,
+    )
+
+    # Repuestos que ya no tienen consumo en la ventana
+    SugerenciaReorden.objects.filter(calculado_en__lt=inicio_calculo).delete()
+    return len(sugerencias)
+
+
+def sugerencias_vigentes(solo_bajo_punto=True):
+    """
+    Sugerencias contra el stock actual, de mayor a menor cantidad a pedir.
+
+    Parámetros:
+    - solo_bajo_punto: Solo repuestos cuyo disponible (actual - reservado)
+      llegó al punto de reorden
+
+    Retorna:
+    - QuerySet de dicts con repuesto_id, codigo, nombre, disponible,
+      punto_reorden, stock_objetivo, cantidad_sugerida, consumo_semanal,
+      consumo_reciente, desviacion y calculado_en
+    """
+    queryset = (
+        SugerenciaReorden.objects.filter(repuesto__activo=True)
+        .annotate(
+            disponible=Coalesce(F("repuesto__stock__cantidad_actual"), Value(0))
+            - Coalesce(F("repuesto__stock__cantidad_reservada"), Value(0)),
+            # cantidad_minima configurada a mano sigue siendo el piso
+            punto=Greatest(F("punto_reorden"), Coalesce(F("repuesto__stock__cantidad_minima"), Value(0))),
+        )
+        .annotate(
+            objetivo=Greatest(F("stock_objetivo"), F("punto")),
+        )
+        .annotate(
+            cantidad_sugerida=Greatest(F("objetivo") - F("disponible"), Value(0)),
+        )
+    )
+    if solo_bajo_punto:
+        queryset = queryset.filter(disponible__lte=F("punto"))
+
+    return queryset.order_by("-cantidad_sugerida", "repuesto__codigo").values(
+        "repuesto_id",
+        "consumo_semanal",
+        "consumo_reciente",
+        "desviacion",
+        "disponible",
+        "cantidad_sugerida",
+        "calculado_en",
+        codigo=F("repuesto__codigo"),
+        nombre=F("repuesto__nombre"),
+        punto_reorden_efectivo=F("punto"),
+        stock_objetivo_efectivo=F("objetivo"),
+    )
@@ -12,23 +12,37 @@ class RepuestoSerializer(serializers.ModelSerializer):
         fields = "__all__"
     
     def get_stock_actual(self, obj):
-        if hasattr(obj, 'stock'):
-            return obj.stock.cantidad_actual
-        return 0
+        # Anotado por RepuestoViewSet (mismo JOIN del listado)
+        if hasattr(obj, "stock_actual"):
+            return obj.stock_actual
+        stock = getattr(obj, "stock", None)
+        return stock.cantidad_actual if stock else 0
     
     def get_necesita_reorden(self, obj):
-        if hasattr(obj, 'stock'):
-            return obj.stock.necesita_reorden
-        return False
+        if hasattr(obj, "stock_necesita_reorden"):
+            return obj.stock_necesita_reorden
+        stock = getattr(obj, "stock", None)
+        return stock.necesita_reorden if stock else False
 
 
 class StockSerializer(serializers.ModelSerializer):
     repuesto_nombre = serializers.CharField(source="repuesto.nombre", read_only=True)
     repuesto_codigo = serializers.CharField(source="repuesto.codigo", read_only=True)
     
+    cantidad_disponible = serializers.IntegerField(read_only=True)
+    
     class Meta:
         model = Stock
         fields = "__all__"
+        # Las reservas solo cambian al aprobar/entregar (apps/inventory/services.py)
+        read_only_fields = ["cantidad_reservada"]
+    
+    def validate_cantidad_actual(self, value):
+        if self.instance is not None and value < self.instance.cantidad_reservada:
+            raise serializers.ValidationError(
+                f"No puede ser menor a la cantidad reservada ({self.instance.cantidad_reservada})."
+            )
+        return value
 
 
 class MovimientoStockSerializer(serializers.ModelSerializer):
@@ -54,6 +68,12 @@ class SolicitudRepuestoSerializer(serializers.ModelSerializer):
     class Meta:
         model = SolicitudRepuesto
         fields = "__all__"
+        # El flujo (aprobar, rechazar, cancelar, entregar) solo cambia por sus
+        # acciones: un PATCH de estado dejaría la reserva de stock colgada
+        read_only_fields = [
+            "estado", "cantidad_reservada", "cantidad_entregada",
+            "aprobador", "fecha_aprobacion", "entregador", "fecha_entrega",
+        ]
 
 
 class HistorialRepuestoVehiculoSerializer(serializers.ModelSerializer):
@@ -0,0 +1,343 @@
+# apps/inventory/services.py
+"""
+Operaciones atómicas sobre el stock de bodega.
+
+Toda variación de Stock se hace con un UPDATE condicional en la base de datos
+(UPDATE ... SET cantidad_actual = cantidad_actual - n WHERE cantidad_actual >= n)
+en vez de leer, restar en Python y guardar. Dos entregas concurrentes del
+mismo repuesto se serializan en el lock de la fila y la segunda evalúa la
+condición sobre el valor ya descontado, así que no se pierden descuentos ni
+el stock queda negativo. Si la condición no se cumple el UPDATE no afecta
+filas y se lanza StockInsuficiente.
+
+Reservas:
+- Al aprobar una solicitud se reservan sus unidades (Stock.cantidad_reservada
+  y SolicitudRepuesto.cantidad_reservada), de modo que dos aprobaciones no
+  comprometan las mismas unidades.
+- Al entregar se descuenta lo entregado y se libera la reserva de la
+  solicitud: lo no entregado vuelve a quedar disponible. Una solicitud sin
+  reserva propia solo puede consumir unidades no reservadas.
+- Al cancelar (cancelar_solicitud) o eliminar una solicitud aprobada
+  (también en cascada con su OT, ver apps/inventory/signals.py) su reserva
+  se devuelve con liberar_reserva_solicitud.
+
+Relaciones:
+- Usado por: apps/inventory/views.py (SolicitudRepuestoViewSet.aprobar,
+  cancelar, entregar y entregar_lote)
+- Usado por: apps/inventory/signals.py (pre_delete de SolicitudRepuesto)
+- Escribe: MovimientoStock, HistorialRepuestoVehiculo, Auditoria
+- Invalida: apps/inventory/catalogo.py (stock disponible del catálogo)
+"""
+
+import uuid
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from apps.workorders.models import Auditoria
+from .catalogo import invalidar_catalogo
+from .models import Stock, MovimientoStock, SolicitudRepuesto, HistorialRepuestoVehiculo
+
+# Máximo de solicitudes aceptadas en una entrega por lote
+MAX_ENTREGAS_POR_LOTE = 200
+
+
+class StockInsuficiente(ValueError):
+    """El stock disponible del repuesto no alcanza para la operación."""
+
+    def __init__(self, repuesto, disponible, solicitado):
+        self.repuesto = repuesto
+        self.disponible = disponible
+        self.solicitado = solicitado
+        super().__init__(
+            f"Stock insuficiente para {repuesto.codigo}. "
+            f"Disponible: {disponible}, Solicitado: {solicitado}"
+        )
+
+
+def _cantidades(repuesto_id):
+    """(cantidad_actual, cantidad_reservada) del repuesto, (0, 0) si no tiene Stock."""
+    fila = Stock.objects.filter(repuesto_id=repuesto_id).values_list(
+        "cantidad_actual", "cantidad_reservada"
+    ).first()
+    return fila or (0, 0)
+
+
+@transaction.atomic
+def aprobar_solicitud(solicitud, usuario):
+    """
+    Aprueba una solicitud PENDIENTE y reserva su cantidad.
+
+    Lanza:
+    - ValueError si la solicitud ya no está pendiente
+    - StockInsuficiente si el disponible (actual - reservado) no alcanza
+    """
+    solicitud = (
+        SolicitudRepuesto.objects.select_for_update(of=("self",))
+        .select_related("repuesto", "ot")
+        .get(pk=solicitud.pk)
+    )
+    if solicitud.estado != SolicitudRepuesto.Estado.PENDIENTE:
+        raise ValueError(f"La solicitud ya está {solicitud.estado}.")
+
+    cantidad = solicitud.cantidad_solicitada
+    filas = Stock.objects.filter(
+        repuesto_id=solicitud.repuesto_id,
+        cantidad_actual__gte=F("cantidad_reservada") + cantidad,
+    ).update(
+        cantidad_reservada=F("cantidad_reservada") + cantidad,
+        updated_at=timezone.now(),
+    )
+    if not filas:
+        actual, reservada = _cantidades(solicitud.repuesto_id)
+        raise StockInsuficiente(solicitud.repuesto, actual - reservada, cantidad)
+    # QuerySet.update no dispara señales
+    transaction.on_commit(invalidar_catalogo)
+
+    solicitud.estado = SolicitudRepuesto.Estado.APROBADA
+    solicitud.cantidad_reservada = cantidad
+    solicitud.aprobador = usuario
+    solicitud.fecha_aprobacion = timezone.now()
+    solicitud.save(update_fields=["estado", "cantidad_reservada", "aprobador", "fecha_aprobacion"])
+
+    Auditoria.objects.create(
+        usuario=usuario,
+        accion="APROBAR_SOLICITUD_REPUESTO",
+        objeto_tipo="SolicitudRepuesto",
+        objeto_id=str(solicitud.id),
+        payload={"ot_id": str(solicitud.ot_id), "cantidad_reservada": cantidad},
+    )
+    return solicitud
+
+
+def _liberar(repuesto_id, cantidad):
+    """
+    Devuelve `cantidad` unidades reservadas del repuesto al disponible con un
+    UPDATE condicional (la reserva nunca queda negativa).
+    """
+    Stock.objects.filter(
+        repuesto_id=repuesto_id,
+        cantidad_reservada__gte=cantidad,
+    ).update(
+        cantidad_reservada=F("cantidad_reservada") - cantidad,
+        updated_at=timezone.now(),
+    )
+    transaction.on_commit(invalidar_catalogo)
+
+
+def liberar_reserva_solicitud(solicitud):
+    """
+    Libera la reserva vigente de una solicitud que sale del flujo sin
+    entregarse (la lee con lock: el objeto en memoria puede estar desfasado).
+
+    Debe llamarse dentro de una transacción.
+    """
+    reservada = (
+        SolicitudRepuesto.objects.select_for_update()
+        .filter(pk=solicitud.pk, cantidad_reservada__gt=0)
+        .values_list("cantidad_reservada", flat=True)
+        .first()
+    )
+    if reservada:
+        _liberar(solicitud.repuesto_id, reservada)
+    return reservada or 0
+
+
+@transaction.atomic
+def cancelar_solicitud(solicitud, usuario, motivo=""):
+    """
+    Cancela una solicitud PENDIENTE o APROBADA y libera su reserva.
+
+    Lanza:
+    - ValueError si la solicitud ya fue entregada, rechazada o cancelada
+    """
+    solicitud = SolicitudRepuesto.objects.select_for_update(of=("self",)).get(pk=solicitud.pk)
+    if solicitud.estado not in (SolicitudRepuesto.Estado.PENDIENTE, SolicitudRepuesto.Estado.APROBADA):
+        raise ValueError(f"La solicitud ya está {solicitud.estado}.")
+
+    liberada = liberar_reserva_solicitud(solicitud)
+    solicitud.estado = SolicitudRepuesto.Estado.CANCELADA
+    solicitud.cantidad_reservada = 0
+    if motivo:
+        solicitud.motivo = motivo
+    solicitud.save(update_fields=["estado", "cantidad_reservada", "motivo"])
+
+    Auditoria.objects.create(
+        usuario=usuario,
+        accion="CANCELAR_SOLICITUD_REPUESTO",
+        objeto_tipo="SolicitudRepuesto",
+        objeto_id=str(solicitud.id),
+        payload={"ot_id": str(solicitud.ot_id), "reserva_liberada": liberada, "motivo": solicitud.motivo},
+    )
+    return solicitud
+
+
+def _validar_entregas(entregas):
+    """
+    Normaliza [(solicitud_id, cantidad_entregada | None), ...] a un dict
+    {solicitud_id: cantidad | None}. Lanza ValueError si el formato es inválido.
+    """
+    if not entregas:
+        raise ValueError("Debe indicar al menos una solicitud.")
+    if len(entregas) > MAX_ENTREGAS_POR_LOTE:
+        raise ValueError(f"Máximo {MAX_ENTREGAS_POR_LOTE} solicitudes por lote.")
+
+    cantidades = {}
+    for solicitud_id, cantidad in entregas:
+        try:
+            # Forma canónica (minúsculas, con guiones) para comparar con str(s.id)
+            solicitud_id = str(uuid.UUID(str(solicitud_id)))
+        except ValueError:
+            raise ValueError(f"La solicitud {solicitud_id} no es un identificador válido.")
+        if solicitud_id in cantidades:
+            raise ValueError(f"La solicitud {solicitud_id} está repetida en el lote.")
+        if cantidad is not None:
+            try:
+                cantidad = int(cantidad)
+            except (TypeError, ValueError):
+                raise ValueError("La cantidad entregada debe ser un número entero.")
+            if cantidad < 1:
+                raise ValueError("La cantidad entregada debe ser mayor a 0.")
+        cantidades[solicitud_id] = cantidad
+    return cantidades
+
+
+def _descontar(repuesto, entregar, liberar, ahora):
+    """
+    Descuenta `entregar` unidades y libera `liberar` unidades reservadas del
+    repuesto con un solo UPDATE condicional. Retorna la cantidad_actual final.
+
+    La condición exige que, tras el descuento, el stock siga cubriendo las
+    reservas de otras solicitudes (cantidad_reservada <= cantidad_actual).
+    """
+    reservada_final = F("cantidad_reservada") - liberar
+    filas = Stock.objects.filter(
+        repuesto_id=repuesto.id,
+        cantidad_actual__gte=reservada_final + entregar,
+    ).update(
+        cantidad_actual=F("cantidad_actual") - entregar,
+        cantidad_reservada=reservada_final,
+        updated_at=ahora,
+    )
+    if not filas:
+        actual, reservada = _cantidades(repuesto.id)
+        raise StockInsuficiente(repuesto, actual - (reservada - liberar), entregar)
+
+    # La fila quedó bloqueada por el UPDATE hasta el commit: el valor leído es el propio
+    return Stock.objects.filter(repuesto_id=repuesto.id).values_list("cantidad_actual", flat=True).get()
+
+
+@transaction.atomic
+def entregar_solicitudes(entregas, usuario):
+    """
+    Entrega una o varias solicitudes APROBADA en una sola transacción.
+
+    Parámetros:
+    - entregas: [(solicitud_id, cantidad_entregada | None), ...]; None entrega
+      la cantidad solicitada
+    - usuario: Usuario que entrega (bodega)
+
+    Es todo o nada: si una solicitud no es entregable o falta stock de algún
+    repuesto, no se aplica ninguna entrega.
+
+    Consultas: un SELECT ... FOR UPDATE de las solicitudes, dos consultas por
+    repuesto distinto (UPDATE condicional + lectura del saldo) y un bulk_create
+    por tabla de registro.
+
+    Retorna:
+    - Lista de SolicitudRepuesto entregadas, en el orden recibido
+
+    Lanza:
+    - ValueError si el lote o alguna solicitud no es válida
+    - StockInsuficiente si falta stock de algún repuesto
+    """
+    cantidades = _validar_entregas(entregas)
+
+    # Lock en orden de id para que lotes concurrentes no se bloqueen mutuamente
+    solicitudes = {
+        str(s.id): s
+        for s in SolicitudRepuesto.objects.select_for_update(of=("self",))
+        .select_related("repuesto", "ot", "ot__vehiculo")
+        .filter(id__in=list(cantidades))
+        .order_by("id")
+    }
+
+    por_repuesto = defaultdict(list)
+    for solicitud_id, cantidad in cantidades.items():
+        solicitud = solicitudes.get(solicitud_id)
+        if solicitud is None:
+            raise ValueError(f"La solicitud {solicitud_id} no existe.")
+        if solicitud.estado != SolicitudRepuesto.Estado.APROBADA:
+            raise ValueError(f"Solo se pueden entregar solicitudes aprobadas ({solicitud_id} está {solicitud.estado}).")
+        if cantidad is None:
+            cantidad = solicitud.cantidad_solicitada
+        if cantidad > solicitud.cantidad_solicitada:
+            raise ValueError(f"La cantidad entregada no puede ser mayor a la solicitada ({solicitud_id}).")
+        solicitud.cantidad_entregada = cantidad
+        por_repuesto[solicitud.repuesto_id].append(solicitud)
+
+    ahora = timezone.now()
+    movimientos, historial, auditorias = [], [], []
+
+    # Un UPDATE por repuesto, en orden de id (mismo orden de lock entre lotes)
+    for repuesto_id in sorted(por_repuesto):
+        grupo = por_repuesto[repuesto_id]
+        entregar = sum(s.cantidad_entregada for s in grupo)
+        liberar = sum(s.cantidad_reservada for s in grupo)
+        cantidad_final = _descontar(grupo[0].repuesto, entregar, liberar, ahora)
+
+        # Reconstruye el saldo de cada movimiento dentro del grupo
+        cantidad_anterior = cantidad_final + entregar
+        for solicitud in grupo:
+            cantidad_nueva = cantidad_anterior - solicitud.cantidad_entregada
+            movimientos.append(MovimientoStock(
+                repuesto_id=repuesto_id,
+                tipo=MovimientoStock.TipoMovimiento.SALIDA,
+                cantidad=solicitud.cantidad_entregada,
+                cantidad_anterior=cantidad_anterior,
+                cantidad_nueva=cantidad_nueva,
+                motivo=f"Entrega para OT {solicitud.ot_id}",
+                usuario=usuario,
+                ot_id=solicitud.ot_id,
+                item_ot_id=solicitud.item_ot_id,
+                vehiculo_id=solicitud.ot.vehiculo_id,
+            ))
+            cantidad_anterior = cantidad_nueva
+
+            historial.append(HistorialRepuestoVehiculo(
+                vehiculo_id=solicitud.ot.vehiculo_id,
+                repuesto_id=repuesto_id,
+                cantidad=solicitud.cantidad_entregada,
+                ot_id=solicitud.ot_id,
+                item_ot_id=solicitud.item_ot_id,
+                costo_unitario=solicitud.repuesto.precio_referencia,
+            ))
+            auditorias.append(Auditoria(
+                usuario=usuario,
+                accion="ENTREGAR_REPUESTO",
+                objeto_tipo="SolicitudRepuesto",
+                objeto_id=str(solicitud.id),
+                payload={
+                    "cantidad_entregada": solicitud.cantidad_entregada,
+                    "ot_id": str(solicitud.ot_id),
+                },
+            ))
+
+            solicitud.estado = SolicitudRepuesto.Estado.ENTREGADA
+            solicitud.cantidad_reservada = 0
+            solicitud.entregador = usuario
+            solicitud.fecha_entrega = ahora
+
+    MovimientoStock.objects.bulk_create(movimientos)
+    HistorialRepuestoVehiculo.objects.bulk_create(historial)
+    Auditoria.objects.bulk_create(auditorias)
+
+    transaction.on_commit(invalidar_catalogo)
+
+    entregadas = [solicitudes[solicitud_id] for solicitud_id in cantidades]
+    SolicitudRepuesto.objects.bulk_update(
+        entregadas, ["cantidad_entregada", "cantidad_reservada", "estado", "entregador", "fecha_entrega"]
+    )
+    return entregadas
@@ -0,0 +1,44 @@
+# apps/inventory/signals.py
+"""
+Señales de la app de inventario.
+
+Invalidan el catálogo de repuestos (apps/inventory/catalogo.py) cuando
+cambia un repuesto o su stock, tras el commit: si se borrara antes, otra
+solicitud podría volver a cachear el catálogo previo al commit. Los UPDATE
+condicionales de apps/inventory/services.py no disparan señales e invalidan
+por su cuenta.
+
+Al eliminar una solicitud aprobada (directamente o en cascada con su OT o
+ítem) se libera su reserva de stock.
+
+Se registran en InventoryConfig.ready() (apps/inventory/apps.py).
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import receiver
+
+from .catalogo import invalidar_catalogo
+from .models import Repuesto, SolicitudRepuesto, Stock
+from .services import liberar_reserva_solicitud
+
+
+@receiver(post_save, sender=Repuesto)
+@receiver(post_delete, sender=Repuesto)
+@receiver(post_save, sender=Stock)
+@receiver(post_delete, sender=Stock)
+def invalidar_catalogo_repuesto(sender, instance, **kwargs):
+    """
+    Invalida el catálogo al crear, modificar o eliminar un repuesto o su stock.
+    """
+    transaction.on_commit(invalidar_catalogo)
+
+
+@receiver(pre_delete, sender=SolicitudRepuesto)
+def liberar_reserva_al_eliminar(sender, instance, **kwargs):
+    """
+    Devuelve al disponible la reserva de una solicitud eliminada sin entregar.
+
+    Corre dentro de la transacción del delete (también en cascada).
+    """
+    liberar_reserva_solicitud(instance)
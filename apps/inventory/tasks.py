@@ -0,0 +1,52 @@
+# apps/inventory/tasks.py
+"""
+Tareas Celery de la app de inventario.
+
+- capturar_snapshot_stock: foto diaria del stock de cada repuesto al cierre
+  del día (programada en CELERY_BEAT_SCHEDULE, pgf_core/settings/dev.py)
+- calcular_sugerencias_reorden: puntos de reorden dinámicos desde el
+  consumo de las últimas semanas (programada, nocturna)
+"""
+
+from datetime import timedelta
+
+from celery import shared_task
+from django.utils import timezone
+
+
+@shared_task
+def capturar_snapshot_stock(fecha=None):
+    """
+    Guarda el stock de cada repuesto al cierre del día indicado.
+
+    Parámetros:
+    - fecha: Fecha ISO (YYYY-MM-DD). Default: ayer (hora local), porque se
+      ejecuta pasada la medianoche
+
+    Retorna:
+    - dict con la fecha y la cantidad de repuestos registrados
+    """
+    from datetime import date
+
+    from .historico import capturar_snapshots
+
+    dia = date.fromisoformat(fecha) if fecha else timezone.localdate() - timedelta(days=1)
+    return {"fecha": dia.isoformat(), "repuestos": capturar_snapshots(dia)}
+
+
+@shared_task
+def calcular_sugerencias_reorden(semanas=None):
+    """
+    Recalcula los puntos de reorden y stock objetivo de cada repuesto a
+    partir de su consumo (ver apps/inventory/reorden.py).
+
+    Parámetros:
+    - semanas: Semanas de historia a considerar. Default: SEMANAS_HISTORIA
+
+    Retorna:
+    - dict con las semanas usadas y la cantidad de repuestos con sugerencia
+    """
+    from .reorden import SEMANAS_HISTORIA, calcular_sugerencias
+
+    semanas = int(semanas or SEMANAS_HISTORIA)
+    return {"semanas": semanas, "repuestos": calcular_sugerencias(semanas)}
@@ -0,0 +1 @@
+# apps/inventory/tests/__init__.py
@@ -0,0 +1,143 @@
+# apps/inventory/tests/test_catalogo.py
+"""
+Tests para el listado de repuestos, el catálogo con ETag y el autocompletado.
+"""
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from apps.inventory import catalogo, services
+from apps.inventory.models import Repuesto, Stock, SolicitudRepuesto
+
+URL = "/api/v1/inventory/repuestos/"
+
+
+@pytest.fixture(autouse=True)
+def limpiar_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def repuestos(db):
+    """Tres repuestos con stock y uno inactivo."""
+    creados = [
+        Repuesto.objects.create(codigo="FIL-001", nombre="Filtro de aceite", marca="Bosch"),
+        Repuesto.objects.create(codigo="FRE-010", nombre="Pastillas de freno", marca="Brembo"),
+        Repuesto.objects.create(codigo="ACE-5W30", nombre="Aceite 5W30 filtrado", marca="Mobil"),
+    ]
+    for i, repuesto in enumerate(creados):
+        Stock.objects.create(repuesto=repuesto, cantidad_actual=10 * i, cantidad_minima=5)
+    Repuesto.objects.create(codigo="FIL-OLD", nombre="Filtro descontinuado", activo=False)
+    return creados
+
+
+@pytest.mark.django_db
+@pytest.mark.view
+@pytest.mark.api
+class TestListadoRepuestos:
+    """Tests para GET /inventory/repuestos/"""
+
+    def test_consultas_constantes(self, authenticated_client, repuestos):
+        """Test que el listado no consulta el stock por fila"""
+        with CaptureQueriesContext(connection) as pocos:
+            authenticated_client.get(URL)
+        for i in range(10):
+            Stock.objects.create(repuesto=Repuesto.objects.create(codigo=f"X-{i}", nombre=f"Extra {i}"), cantidad_actual=i)
+        with CaptureQueriesContext(connection) as muchos:
+            response = authenticated_client.get(URL)
+
+        assert len(muchos.captured_queries) == len(pocos.captured_queries)
+        fila = next(r for r in response.data if r["codigo"] == "FIL-001")
+        assert (fila["stock_actual"], fila["necesita_reorden"]) == (0, True)
+
+    def test_crear_sin_stock(self, authenticated_client):
+        """Test que la respuesta de creación (sin anotaciones) sigue funcionando"""
+        response = authenticated_client.post(URL, {"codigo": "NEW-1", "nombre": "Nuevo"}, format="json")
+        assert response.status_code == status.HTTP_201_CREATED
+        assert (response.data["stock_actual"], response.data["necesita_reorden"]) == (0, False)
+
+
+@pytest.mark.django_db
+@pytest.mark.service
+class TestCatalogo:
+    """Tests para apps/inventory/catalogo.py"""
+
+    def test_una_consulta_y_luego_cache(self, repuestos):
+        """Test que se arma con una consulta y luego sale de la caché"""
+        with CaptureQueriesContext(connection) as ctx:
+            etag, datos = catalogo.obtener_catalogo()
+        assert len(ctx.captured_queries) == 1
+        assert [r["codigo"] for r in datos] == ["ACE-5W30", "FIL-001", "FRE-010"]
+
+        with CaptureQueriesContext(connection) as ctx:
+            assert catalogo.obtener_catalogo()[0] == etag
+        assert len(ctx.captured_queries) == 0
+
+    def test_stock_disponible_e_invalidacion(
+        self, repuestos, orden_trabajo, jefe_taller_user, django_capture_on_commit_callbacks
+    ):
+        """Test que reservar y entregar invalidan el catálogo y cambian el ETag"""
+        etag, _ = catalogo.obtener_catalogo()
+        solicitud = SolicitudRepuesto.objects.create(
+            ot=orden_trabajo, repuesto=repuestos[1], cantidad_solicitada=4, solicitante=jefe_taller_user
+        )
+        with django_capture_on_commit_callbacks(execute=True):
+            services.aprobar_solicitud(solicitud, jefe_taller_user)
+
+        nuevo_etag, datos = catalogo.obtener_catalogo()
+        assert nuevo_etag != etag
+        assert next(r for r in datos if r["codigo"] == "FRE-010")["stock"] == 6
+
+    def test_senal_al_guardar_repuesto(self, repuestos, django_capture_on_commit_callbacks):
+        """Test que editar un repuesto invalida el catálogo tras el commit"""
+        catalogo.obtener_catalogo()
+        repuestos[0].nombre = "Filtro de aire"
+        with django_capture_on_commit_callbacks(execute=True):
+            repuestos[0].save()
+            # Antes del commit se sigue sirviendo el catálogo en caché
+            assert "Filtro de aire" not in [r["nombre"] for r in catalogo.obtener_catalogo()[1]]
+        _, datos = catalogo.obtener_catalogo()
+        assert "Filtro de aire" in [r["nombre"] for r in datos]
+
+    def test_autocompletar(self, repuestos):
+        """Test que prioriza códigos con el prefijo y excluye inactivos"""
+        assert [r["codigo"] for r in catalogo.autocompletar("fil")] == ["FIL-001", "ACE-5W30"]
+        assert [r["codigo"] for r in catalogo.autocompletar("br")] == ["FRE-010"]
+        assert catalogo.autocompletar("  ") == []
+
+
+@pytest.mark.django_db
+@pytest.mark.view
+@pytest.mark.api
+class TestCatalogoViews:
+    """Tests para GET /inventory/repuestos/catalogo/ y /autocompletar/"""
+
+    def test_etag_y_304(self, authenticated_client, repuestos, django_capture_on_commit_callbacks):
+        """Test que con If-None-Match vigente responde 304 sin cuerpo"""
+        response = authenticated_client.get(f"{URL}catalogo/")
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data) == 3
+        etag = response["ETag"]
+
+        response = authenticated_client.get(f"{URL}catalogo/", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert not response.content
+
+        with django_capture_on_commit_callbacks(execute=True):
+            Stock.objects.filter(repuesto=repuestos[0]).first().save()
+            Repuesto.objects.create(codigo="NEW-1", nombre="Nuevo")
+        response = authenticated_client.get(f"{URL}catalogo/", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response["ETag"] != etag
+
+    def test_autocompletar(self, authenticated_client, repuestos):
+        """Test que retorna sugerencias y exige q"""
+        response = authenticated_client.get(f"{URL}autocompletar/", {"q": "bosch"})
+        assert [r["codigo"] for r in response.data] == ["FIL-001"]
+
+        response = authenticated_client.get(f"{URL}autocompletar/")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
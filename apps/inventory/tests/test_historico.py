@@ -0,0 +1,159 @@
+# apps/inventory/tests/test_historico.py
+"""
+Tests para el stock histórico, los snapshots diarios y la valorización.
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from apps.core.fechas import inicio_dia_local, rango_dia_local
+from apps.inventory.historico import capturar_snapshots, stock_en, valorizar_bodega
+from apps.inventory.models import Repuesto, Stock, MovimientoStock, SnapshotStock
+from apps.inventory.tasks import capturar_snapshot_stock
+
+HOY = timezone.localdate()
+DIA_1, DIA_2, DIA_3 = (HOY - timedelta(days=n) for n in (3, 2, 1))
+
+
+def _a_las(dia, hora):
+    return inicio_dia_local(dia) + timedelta(hours=hora)
+
+
+@pytest.fixture
+def repuesto(db, admin_user):
+    """
+    Repuesto con tres movimientos:
+    DIA_1 10:00 ENTRADA 20 (0→20), DIA_2 12:00 SALIDA 5 (20→15),
+    DIA_3 09:00 AJUSTE 15→12. Stock actual: 12.
+    """
+    repuesto = Repuesto.objects.create(codigo="BAT-01", nombre="Batería", precio_referencia=Decimal("1000"))
+    Stock.objects.create(repuesto=repuesto, cantidad_actual=12)
+    for tipo, cantidad, anterior, nueva, momento in (
+        ("ENTRADA", 20, 0, 20, _a_las(DIA_1, 10)),
+        ("SALIDA", 5, 20, 15, _a_las(DIA_2, 12)),
+        ("AJUSTE", 3, 15, 12, _a_las(DIA_3, 9)),
+    ):
+        movimiento = MovimientoStock.objects.create(
+            repuesto=repuesto, tipo=tipo, cantidad=cantidad,
+            cantidad_anterior=anterior, cantidad_nueva=nueva, usuario=admin_user,
+        )
+        # fecha es auto_now_add: se fija después de crear
+        MovimientoStock.objects.filter(pk=movimiento.pk).update(fecha=momento)
+    return repuesto
+
+
+@pytest.mark.django_db
+@pytest.mark.service
+class TestStockEn:
+    """Tests para stock_en y capturar_snapshots"""
+
+    def test_sin_snapshots_revierte_desde_stock_actual(self, repuesto):
+        """Test que sin snapshots se revierten los movimientos posteriores"""
+        assert stock_en(repuesto.id, _a_las(DIA_1, 9))["cantidad"] == 0
+        assert stock_en(repuesto.id, _a_las(DIA_1, 23))["cantidad"] == 20
+        assert stock_en(repuesto.id, rango_dia_local(DIA_2)[1])["cantidad"] == 15
+        assert stock_en(repuesto.id, timezone.now())["cantidad"] == 12
+
+    def test_snapshot_mas_replay_acotado(self, repuesto):
+        """Test que con snapshot solo se reproducen los movimientos posteriores a él"""
+        assert capturar_snapshots(DIA_1) == 1
+        assert capturar_snapshots(DIA_2) == 1
+        assert list(SnapshotStock.objects.order_by("fecha").values_list("cantidad", flat=True)) == [20, 15]
+
+        resultado = stock_en(repuesto.id, _a_las(DIA_3, 12))
+        assert resultado == {"cantidad": 12, "snapshot": DIA_2, "movimientos": 1}
+
+        # Antes del ajuste, el snapshot de DIA_2 sin movimientos que reproducir
+        assert stock_en(repuesto.id, _a_las(DIA_3, 8)) == {"cantidad": 15, "snapshot": DIA_2, "movimientos": 0}
+
+    def test_recaptura_sobrescribe(self, repuesto):
+        """Test que capturar dos veces el mismo día no duplica filas"""
+        capturar_snapshots(DIA_2)
+        Stock.objects.filter(repuesto=repuesto).update(cantidad_actual=13)
+        capturar_snapshots(DIA_2)
+        assert SnapshotStock.objects.get(repuesto=repuesto, fecha=DIA_2).cantidad == 16
+
+    def test_tarea_captura_ayer(self, repuesto):
+        """Test que la tarea sin fecha captura el día anterior"""
+        resultado = capturar_snapshot_stock()
+        assert resultado == {"fecha": DIA_3.isoformat(), "repuestos": 1}
+        assert SnapshotStock.objects.get(fecha=DIA_3).cantidad == 12
+
+
+@pytest.mark.django_db
+@pytest.mark.service
+class TestValorizacion:
+    """Tests para valorizar_bodega"""
+
+    def test_valoriza_al_cierre(self, repuesto):
+        """Test que valoriza cantidad × precio al cierre del día, en una consulta"""
+        Repuesto.objects.create(codigo="SIN-STOCK", nombre="Sin stock")
+
+        with CaptureQueriesContext(connection) as ctx:
+            resultado = valorizar_bodega(DIA_2)
+        assert len(ctx.captured_queries) == 1
+
+        assert resultado["total_unidades"] == 15
+        assert resultado["valor_total"] == Decimal("15000")
+        assert [r["codigo"] for r in resultado["repuestos"]] == ["BAT-01"]
+
+    def test_con_y_sin_snapshots_coinciden(self, repuesto):
+        """Test que el resultado no depende de si existen snapshots"""
+        sin_snapshots = [valorizar_bodega(d)["total_unidades"] for d in (DIA_1, DIA_2, DIA_3, HOY)]
+        capturar_snapshots(DIA_1)
+        capturar_snapshots(DIA_2)
+        con_snapshots = [valorizar_bodega(d)["total_unidades"] for d in (DIA_1, DIA_2, DIA_3, HOY)]
+        assert sin_snapshots == con_snapshots == [20, 15, 12, 12]
+
+    def test_usa_costo_del_snapshot(self, repuesto):
+        """Test que un día con snapshot se valoriza al precio de ese momento"""
+        capturar_snapshots(DIA_1)
+        Repuesto.objects.filter(pk=repuesto.pk).update(precio_referencia=Decimal("2000"))
+
+        assert valorizar_bodega(DIA_1)["valor_total"] == Decimal("20000")
+
+    def test_sin_costo(self, repuesto):
+        """Test que los repuestos sin precio se informan aparte"""
+        Repuesto.objects.filter(pk=repuesto.pk).update(precio_referencia=None)
+        resultado = valorizar_bodega(HOY)
+        assert resultado["sin_costo"] == 1
+        assert resultado["valor_total"] == 0
+
+
+@pytest.mark.django_db
+@pytest.mark.view
+@pytest.mark.api
+class TestHistoricoViews:
+    """Tests para GET /inventory/stock/historico/ y /valorizacion/"""
+
+    def test_historico(self, authenticated_client, repuesto):
+        """Test que una fecha se interpreta como el cierre de ese día"""
+        response = authenticated_client.get(
+            "/api/v1/inventory/stock/historico/", {"repuesto": str(repuesto.id), "momento": DIA_2.isoformat()}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["cantidad"] == 15
+
+    def test_historico_requiere_repuesto(self, authenticated_client):
+        """Test que sin repuesto retorna 400"""
+        response = authenticated_client.get("/api/v1/inventory/stock/historico/")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_valorizacion(self, authenticated_client, repuesto):
+        """Test que retorna totales al cierre del día"""
+        response = authenticated_client.get("/api/v1/inventory/stock/valorizacion/", {"fecha": DIA_1.isoformat()})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["total_unidades"] == 20
+
+    def test_valorizacion_rol_sin_acceso(self, mecanico_user):
+        """Test que roles sin acceso reciben 403"""
+        client = APIClient()
+        client.force_authenticate(user=mecanico_user)
+        response = client.get("/api/v1/inventory/stock/valorizacion/")
+        assert response.status_code == status.HTTP_403_FORBIDDEN
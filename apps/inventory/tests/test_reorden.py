@@ -0,0 +1,133 @@
+# apps/inventory/tests/test_reorden.py
+"""
+Tests para las sugerencias de reorden basadas en consumo.
+"""
+
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from rest_framework import status
+from apps.core.fechas import inicio_dia_local
+from apps.inventory import reorden
+from apps.inventory.models import Repuesto, Stock, MovimientoStock, SugerenciaReorden
+from apps.inventory.tasks import calcular_sugerencias_reorden
+
+
+@pytest.fixture
+def registrar_salida(admin_user):
+    """Crea una SALIDA del repuesto hace `semanas` semanas (más medio día)."""
+    hoy = inicio_dia_local(timezone.localdate())
+
+    def registrar(repuesto, cantidad, semanas, tipo="SALIDA"):
+        movimiento = MovimientoStock.objects.create(
+            repuesto=repuesto, tipo=tipo, cantidad=cantidad,
+            cantidad_anterior=cantidad, cantidad_nueva=0, usuario=admin_user,
+        )
+        momento = hoy - timedelta(weeks=semanas) + timedelta(hours=12)
+        MovimientoStock.objects.filter(pk=movimiento.pk).update(fecha=momento)
+    return registrar
+
+
+@pytest.fixture
+def filtro(db):
+    repuesto = Repuesto.objects.create(codigo="FIL-01", nombre="Filtro de aceite")
+    Stock.objects.create(repuesto=repuesto, cantidad_actual=5, cantidad_minima=2)
+    return repuesto
+
+
+class TestCalcularParametros:
+    """Tests para calcular_parametros"""
+
+    @pytest.mark.unit
+    def test_formula(self):
+        """Test punto de reorden y stock objetivo para consumos semanales 2, 4, 6, 0"""
+        parametros = reorden.calcular_parametros(total=12, total_cuadrados=56, total_reciente=12, semanas=4)
+
+        assert parametros["consumo_semanal"] == 3
+        assert parametros["desviacion"] == pytest.approx(2.58, abs=0.01)
+        # 3 × 2 semanas de plazo + 1.65 × 2.58 × √2 → 13; + 3 × 4 semanas de cobertura
+        assert parametros["punto_reorden"] == 13
+        assert parametros["stock_objetivo"] == 25
+
+    @pytest.mark.unit
+    def test_alza_reciente(self):
+        """Test que un alza reciente pesa más que el promedio histórico"""
+        estable = reorden.calcular_parametros(total=26, total_cuadrados=26, total_reciente=8, semanas=26)
+        alza = reorden.calcular_parametros(total=26, total_cuadrados=26 * 9, total_reciente=26, semanas=26)
+        assert alza["punto_reorden"] > estable["punto_reorden"]
+
+
+@pytest.mark.django_db
+@pytest.mark.service
+class TestCalcularSugerencias:
+    """Tests para calcular_sugerencias y sugerencias_vigentes"""
+
+    def test_agrega_por_semana(self, filtro, registrar_salida):
+        """Test que solo cuenta SALIDA dentro de la ventana, sumando por semana"""
+        registrar_salida(filtro, 3, semanas=1)
+        registrar_salida(filtro, 1, semanas=1)
+        registrar_salida(filtro, 4, semanas=2)
+        registrar_salida(filtro, 50, semanas=2, tipo="ENTRADA")
+        registrar_salida(filtro, 99, semanas=30)
+
+        assert reorden.calcular_sugerencias(semanas=4) == 1
+
+        sugerencia = SugerenciaReorden.objects.get(repuesto=filtro)
+        assert float(sugerencia.consumo_semanal) == 2.0   # (4 + 4) / 4 semanas
+        # semanas: [0, 0, 4, 4] → varianza (32 - 16) / 3
+        assert float(sugerencia.desviacion) == pytest.approx(2.31, abs=0.01)
+
+    def test_borra_repuestos_sin_consumo(self, filtro, registrar_salida):
+        """Test que un repuesto sin consumo en la ventana pierde su sugerencia"""
+        registrar_salida(filtro, 3, semanas=1)
+        reorden.calcular_sugerencias(semanas=4)
+        MovimientoStock.objects.all().delete()
+
+        assert calcular_sugerencias_reorden(semanas=4) == {"semanas": 4, "repuestos": 0}
+        assert not SugerenciaReorden.objects.exists()
+
+    def test_vigentes_contra_disponible(self, filtro, registrar_salida):
+        """Test que la cantidad sugerida descuenta el disponible (actual - reservado)"""
+        for semana in range(1, 5):
+            registrar_salida(filtro, 5, semanas=semana)
+        reorden.calcular_sugerencias(semanas=4)
+        # Consumo 5/semana sin variación: punto 10, objetivo 30
+        Stock.objects.filter(repuesto=filtro).update(cantidad_actual=20)
+        assert list(reorden.sugerencias_vigentes()) == []
+
+        Stock.objects.filter(repuesto=filtro).update(cantidad_actual=12, cantidad_reservada=4)
+        (fila,) = reorden.sugerencias_vigentes()
+        assert fila["codigo"] == "FIL-01"
+        assert (fila["disponible"], fila["punto_reorden_efectivo"], fila["cantidad_sugerida"]) == (8, 10, 22)
+
+    def test_minimo_manual_es_piso(self, filtro, registrar_salida):
+        """Test que cantidad_minima sigue mandando si es mayor al punto calculado"""
+        registrar_salida(filtro, 1, semanas=1)
+        reorden.calcular_sugerencias(semanas=4)
+        Stock.objects.filter(repuesto=filtro).update(cantidad_minima=40)
+
+        (fila,) = reorden.sugerencias_vigentes()
+        assert fila["punto_reorden_efectivo"] == 40
+        assert fila["cantidad_sugerida"] == 35
+
+
+@pytest.mark.django_db
+@pytest.mark.view
+@pytest.mark.api
+class TestSugerenciasView:
+    """Tests para GET /inventory/stock/sugerencias-reorden/"""
+
+    URL = "/api/v1/inventory/stock/sugerencias-reorden/"
+
+    def test_lista(self, authenticated_client, filtro, registrar_salida):
+        """Test que lista los repuestos bajo el punto y todas=true incluye el resto"""
+        registrar_salida(filtro, 1, semanas=1)
+        reorden.calcular_sugerencias(semanas=4)
+
+        response = authenticated_client.get(self.URL)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == []
+
+        response = authenticated_client.get(self.URL, {"todas": "true"})
+        assert [f["codigo"] for f in response.data] == ["FIL-01"]
@@ -0,0 +1,345 @@
+# apps/inventory/tests/test_services.py
+"""
+Tests para las operaciones atómicas de stock (reservas y entregas).
+"""
+
+import threading
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from rest_framework import status
+from rest_framework.test import APIClient
+from apps.inventory import services
+from apps.inventory.models import (
+    Repuesto, Stock, MovimientoStock, SolicitudRepuesto, HistorialRepuestoVehiculo
+)
+
+
+@pytest.fixture
+def repuesto(db):
+    """Repuesto con 10 unidades en bodega."""
+    repuesto = Repuesto.objects.create(codigo="FRE-01", nombre="Pastillas de freno", precio_referencia=Decimal("15000"))
+    Stock.objects.create(repuesto=repuesto, cantidad_actual=10)
+    return repuesto
+
+
+@pytest.fixture
+def crear_solicitud(orden_trabajo, mecanico_user):
+    """Fábrica de solicitudes sobre la OT de prueba."""
+    def crear(repuesto, cantidad, estado=SolicitudRepuesto.Estado.PENDIENTE):
+        return SolicitudRepuesto.objects.create(
+            ot=orden_trabajo, repuesto=repuesto, cantidad_solicitada=cantidad,
+            estado=estado, solicitante=mecanico_user,
+        )
+    return crear
+
+
+def _stock(repuesto):
+    return Stock.objects.get(repuesto=repuesto)
+
+
+@pytest.mark.django_db
+@pytest.mark.service
+class TestReservas:
+    """Tests para aprobar_solicitud"""
+
+    def test_aprobar_reserva(self, repuesto, crear_solicitud, jefe_taller_user):
+        """Test que aprobar reserva la cantidad sin descontarla"""
+        solicitud = services.aprobar_solicitud(crear_solicitud(repuesto, 4), jefe_taller_user)
+
+        assert solicitud.estado == SolicitudRepuesto.Estado.APROBADA
+        assert solicitud.cantidad_reservada == 4
+        stock = _stock(repuesto)
+        assert (stock.cantidad_actual, stock.cantidad_reservada, stock.cantidad_disponible) == (10, 4, 6)
+
+    def test_no_aprueba_unidades_ya_reservadas(self, repuesto, crear_solicitud, jefe_taller_user):
+        """Test que una segunda aprobación no compromete las mismas unidades"""
+        services.aprobar_solicitud(crear_solicitud(repuesto, 7), jefe_taller_user)
+
+        with pytest.raises(services.StockInsuficiente) as exc:
+            services.aprobar_solicitud(crear_solicitud(repuesto, 4), jefe_taller_user)
+        assert exc.value.disponible == 3
+        assert _stock(repuesto).cantidad_reservada == 7
+
+    def test_solo_pendientes(self, repuesto, crear_solicitud, jefe_taller_user):
+        """Test que una solicitud ya aprobada no vuelve a reservar"""
+        solicitud = crear_solicitud(repuesto, 2)
+        services.aprobar_solicitud(solicitud, jefe_taller_user)
+        with pytest.raises(ValueError):
+            services.aprobar_solicitud(solicitud, jefe_taller_user)
+        assert _stock(repuesto).cantidad_reservada == 2
+
+    def test_repuesto_sin_stock(self, crear_solicitud, jefe_taller_user):
+        """Test que un repuesto sin fila de Stock no se aprueba"""
+        sin_stock = Repuesto.objects.create(codigo="X-1", nombre="Sin stock")
+        with pytest.raises(services.StockInsuficiente):
+            services.aprobar_solicitud(crear_solicitud(sin_stock, 1), jefe_taller_user)
+
+
+@pytest.mark.django_db
+@pytest.mark.service
+class TestEntregas:
+    """Tests para entregar_solicitudes"""
+
+    def test_entrega_parcial_libera_reserva(self, repuesto, crear_solicitud, jefe_taller_user):
+        """Test que se descuenta lo entregado y se libera toda la reserva"""
+        solicitud = services.aprobar_solicitud(crear_solicitud(repuesto, 4), jefe_taller_user)
+        services.entregar_solicitudes([(solicitud.id, 3)], jefe_taller_user)
+
+        stock = _stock(repuesto)
+        assert (stock.cantidad_actual, stock.cantidad_reservada) == (7, 0)
+        solicitud.refresh_from_db()
+        assert solicitud.estado == SolicitudRepuesto.Estado.ENTREGADA
+        assert solicitud.cantidad_entregada == 3
+        movimiento = MovimientoStock.objects.get(repuesto=repuesto)
+        assert (movimiento.cantidad_anterior, movimiento.cantidad_nueva) == (10, 7)
+        assert HistorialRepuestoVehiculo.objects.get(repuesto=repuesto).costo_unitario == Decimal("15000")
+
+    def test_lote_encadena_saldos(self, repuesto, crear_solicitud, jefe_taller_user):
+        """Test que un lote del mismo repuesto usa un UPDATE y deja saldos encadenados"""
+        otro = Repuesto.objects.create(codigo="ACE-01", nombre="Aceite")
+        Stock.objects.create(repuesto=otro, cantidad_actual=5)
+        solicitudes = [
+            services.aprobar_solicitud(crear_solicitud(r, n), jefe_taller_user)
+            for r, n in ((repuesto, 2), (repuesto, 3), (otro, 5))
+        ]
+
+        services.entregar_solicitudes([(s.id, None) for s in solicitudes], jefe_taller_user)
+
+        assert _stock(repuesto).cantidad_actual == 5
+        assert _stock(otro).cantidad_actual == 0
+        (anterior_1, nueva_1), (anterior_2, nueva_2) = sorted(
+            MovimientoStock.objects.filter(repuesto=repuesto).values_list("cantidad_anterior", "cantidad_nueva"),
+            reverse=True,
+        )
+        assert (anterior_1, nueva_2) == (10, 5)
+        assert nueva_1 == anterior_2
+
+    def test_lote_todo_o_nada(self, repuesto, crear_solicitud, jefe_taller_user):
+        """Test que si una solicitud falla no se entrega ninguna"""
+        aprobada = services.aprobar_solicitud(crear_solicitud(repuesto, 2), jefe_taller_user)
+        pendiente = crear_solicitud(repuesto, 1)
+
+        with pytest.raises(ValueError):
+            services.entregar_solicitudes([(aprobada.id, None), (pendiente.id, None)], jefe_taller_user)
+
+        aprobada.refresh_from_db()
+        assert aprobada.estado == SolicitudRepuesto.Estado.APROBADA
+        assert _stock(repuesto).cantidad_actual == 10
+        assert not MovimientoStock.objects.exists()
+
+    def test_no_entrega_dos_veces(self, repuesto, crear_solicitud, jefe_taller_user):
+        """Test que una solicitud entregada no vuelve a descontar"""
+        solicitud = services.aprobar_solicitud(crear_solicitud(repuesto, 2), jefe_taller_user)
+        services.entregar_solicitudes([(solicitud.id, None)], jefe_taller_user)
+        with pytest.raises(ValueError):
+            services.entregar_solicitudes([(solicitud.id, None)], jefe_taller_user)
+        assert _stock(repuesto).cantidad_actual == 8
+
+    def test_cantidad_mayor_a_solicitada(self, repuesto, crear_solicitud, jefe_taller_user):
+        """Test que no se entrega más de lo solicitado"""
+        solicitud = services.aprobar_solicitud(crear_solicitud(repuesto, 2), jefe_taller_user)
+        with pytest.raises(ValueError):
+            services.entregar_solicitudes([(solicitud.id, 3)], jefe_taller_user)
+
+    def test_no_consume_reservas_ajenas(self, repuesto, crear_solicitud, jefe_taller_user):
+        """Test que una solicitud aprobada sin reserva no consume lo reservado por otra"""
+        services.aprobar_solicitud(crear_solicitud(repuesto, 8), jefe_taller_user)
+        # Aprobada antes de existir las reservas (sin unidades reservadas)
+        antigua = crear_solicitud(repuesto, 5, estado=SolicitudRepuesto.Estado.APROBADA)
+
+        with pytest.raises(services.StockInsuficiente):
+            services.entregar_solicitudes([(antigua.id, None)], jefe_taller_user)
+        assert _stock(repuesto).cantidad_actual == 10
+
+        # Con 2 unidades libres sí se puede entregar parcialmente
+        services.entregar_solicitudes([(antigua.id, 2)], jefe_taller_user)
+        stock = _stock(repuesto)
+        assert (stock.cantidad_actual, stock.cantidad_reservada) == (8, 8)
+
+    def test_ids_invalidos_y_mayusculas(self, repuesto, crear_solicitud, jefe_taller_user):
+        """Test que un id malformado es ValueError y uno en mayúsculas se reconoce"""
+        solicitud = services.aprobar_solicitud(crear_solicitud(repuesto, 2), jefe_taller_user)
+        with pytest.raises(ValueError, match="no es un identificador válido"):
+            services.entregar_solicitudes([("abc", 1)], jefe_taller_user)
+
+        entregada, = services.entregar_solicitudes([(str(solicitud.id).upper(), None)], jefe_taller_user)
+        assert entregada.estado == SolicitudRepuesto.Estado.ENTREGADA
+
+
+@pytest.mark.django_db
+@pytest.mark.service
+class TestLiberarReserva:
+    """Tests de solicitudes aprobadas que salen del flujo sin entregarse"""
+
+    def test_cancelar_libera(self, repuesto, crear_solicitud, jefe_taller_user):
+        """Test que cancelar una aprobada devuelve su reserva"""
+        solicitud = services.aprobar_solicitud(crear_solicitud(repuesto, 4), jefe_taller_user)
+        solicitud = services.cancelar_solicitud(solicitud, jefe_taller_user, "Ya no se necesita")
+
+        assert (solicitud.estado, solicitud.cantidad_reservada) == (SolicitudRepuesto.Estado.CANCELADA, 0)
+        assert _stock(repuesto).cantidad_reservada == 0
+        with pytest.raises(ValueError):
+            services.cancelar_solicitud(solicitud, jefe_taller_user)
+
+    def test_eliminar_libera(self, repuesto, crear_solicitud, jefe_taller_user):
+        """Test que eliminar una aprobada devuelve solo su reserva"""
+        services.aprobar_solicitud(crear_solicitud(repuesto, 3), jefe_taller_user)
+        solicitud = services.aprobar_solicitud(crear_solicitud(repuesto, 4), jefe_taller_user)
+        solicitud.delete()
+        assert _stock(repuesto).cantidad_reservada == 3
+
+    def test_eliminar_ot_en_cascada_libera(self, repuesto, crear_solicitud, jefe_taller_user, orden_trabajo):
+        """Test que eliminar la OT libera las reservas de sus solicitudes"""
+        for cantidad in (2, 5):
+            services.aprobar_solicitud(crear_solicitud(repuesto, cantidad), jefe_taller_user)
+        orden_trabajo.delete()
+        assert _stock(repuesto).cantidad_reservada == 0
+
+
+def _en_paralelo(funcion, argumentos):
+    """
+    Ejecuta funcion(*args) en un hilo por elemento, liberándolos a la vez.
+    Retorna la lista de resultados o excepciones.
+    """
+    barrera = threading.Barrier(len(argumentos))
+    resultados = [None] * len(argumentos)
+
+    def ejecutar(indice, args):
+        try:
+            barrera.wait()
+            resultados[indice] = funcion(*args)
+        except Exception as e:  # noqa: BLE001 - se inspecciona en el test
+            resultados[indice] = e
+        finally:
+            connection.close()
+
+    hilos = [threading.Thread(target=ejecutar, args=(i, a)) for i, a in enumerate(argumentos)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    return resultados
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.service
+@pytest.mark.slow
+class TestConcurrencia:
+    """Aprobaciones y entregas concurrentes sobre el mismo repuesto"""
+
+    def test_sin_actualizaciones_perdidas(self, crear_solicitud, jefe_taller_user):
+        """
+        Test que 20 aprobaciones concurrentes de 3 unidades sobre 30 en stock
+        aprueban exactamente 10, y que entregarlas en paralelo deja el stock
+        en 0 con un movimiento por cada unidad de saldo.
+        """
+        repuesto = Repuesto.objects.create(codigo="FIL-99", nombre="Filtro")
+        Stock.objects.create(repuesto=repuesto, cantidad_actual=30)
+        solicitudes = [crear_solicitud(repuesto, 3) for _ in range(20)]
+
+        resultados = _en_paralelo(services.aprobar_solicitud, [(s, jefe_taller_user) for s in solicitudes])
+
+        aprobadas = [r for r in resultados if isinstance(r, SolicitudRepuesto)]
+        rechazos = [r for r in resultados if isinstance(r, services.StockInsuficiente)]
+        assert (len(aprobadas), len(rechazos)) == (10, 10)
+        assert _stock(repuesto).cantidad_reservada == 30
+
+        resultados = _en_paralelo(
+            services.entregar_solicitudes, [([(s.id, None)], jefe_taller_user) for s in aprobadas]
+        )
+        assert all(isinstance(r, list) for r in resultados)
+
+        stock = _stock(repuesto)
+        assert (stock.cantidad_actual, stock.cantidad_reservada) == (0, 0)
+        saldos = sorted(MovimientoStock.objects.filter(repuesto=repuesto).values_list("cantidad_nueva", flat=True))
+        assert saldos == list(range(0, 30, 3))
+
+
+@pytest.mark.django_db
+@pytest.mark.view
+@pytest.mark.api
+class TestSolicitudViews:
+    """Tests para aprobar / entregar / entregar-lote"""
+
+    URL = "/api/v1/inventory/solicitudes/"
+
+    @pytest.fixture
+    def client(self, jefe_taller_user):
+        client = APIClient()
+        client.force_authenticate(user=jefe_taller_user)
+        return client
+
+    def test_aprobar_sin_stock(self, client, repuesto, crear_solicitud):
+        """Test que aprobar sin disponible retorna 400 con el detalle"""
+        solicitud = crear_solicitud(repuesto, 11)
+        response = client.post(f"{self.URL}{solicitud.id}/aprobar/")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "Disponible: 10" in response.data["detail"]
+
+    def test_aprobar_y_entregar(self, client, repuesto, crear_solicitud):
+        """Test el flujo aprobar → entregar"""
+        solicitud = crear_solicitud(repuesto, 2)
+        assert client.post(f"{self.URL}{solicitud.id}/aprobar/").status_code == status.HTTP_200_OK
+
+        response = client.post(f"{self.URL}{solicitud.id}/entregar/", {"cantidad_entregada": 1}, format="json")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["estado"] == "ENTREGADA"
+        assert _stock(repuesto).cantidad_actual == 9
+
+    def test_entregar_lote(self, client, repuesto, crear_solicitud, jefe_taller_user):
+        """Test que el lote entrega todas las solicitudes"""
+        solicitudes = [services.aprobar_solicitud(crear_solicitud(repuesto, 2), jefe_taller_user) for _ in range(3)]
+        response = client.post(
+            f"{self.URL}entregar-lote/",
+            {"entregas": [{"solicitud": str(s.id)} for s in solicitudes]},
+            format="json",
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data) == 3
+        assert _stock(repuesto).cantidad_actual == 4
+
+    def test_entregar_lote_id_invalido(self, client):
+        """Test que un id malformado retorna 400 (no 500)"""
+        response = client.post(f"{self.URL}entregar-lote/", {"entregas": [{"solicitud": "abc"}]}, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "abc" in response.data["detail"]
+
+    def test_estado_no_editable(self, client, repuesto, crear_solicitud, jefe_taller_user):
+        """Test que un PATCH no cambia el estado ni deja la reserva colgada"""
+        solicitud = services.aprobar_solicitud(crear_solicitud(repuesto, 4), jefe_taller_user)
+        response = client.patch(f"{self.URL}{solicitud.id}/", {"estado": "CANCELADA"}, format="json")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["estado"] == "APROBADA"
+
+        response = client.post(f"{self.URL}{solicitud.id}/cancelar/", {"motivo": "Error"}, format="json")
+        assert response.data["estado"] == "CANCELADA"
+        assert _stock(repuesto).cantidad_reservada == 0
+
+    def test_delete_libera_reserva(self, client, repuesto, crear_solicitud, jefe_taller_user):
+        """Test que DELETE de una aprobada devuelve su reserva"""
+        solicitud = services.aprobar_solicitud(crear_solicitud(repuesto, 4), jefe_taller_user)
+        assert client.delete(f"{self.URL}{solicitud.id}/").status_code == status.HTTP_204_NO_CONTENT
+        assert _stock(repuesto).cantidad_reservada == 0
+
+    def test_cancelar_rol_sin_acceso(self, repuesto, crear_solicitud, guardia_user):
+        """Test que solo el solicitante o Bodega/Supervisor pueden cancelar"""
+        client = APIClient()
+        client.force_authenticate(user=guardia_user)
+        response = client.post(f"{self.URL}{crear_solicitud(repuesto, 1).id}/cancelar/")
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_entregar_lote_formato_invalido(self, client):
+        """Test que sin lista de entregas retorna 400"""
+        response = client.post(f"{self.URL}entregar-lote/", {"entregas": "x"}, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_entregar_lote_rol_sin_acceso(self, mecanico_user):
+        """Test que roles sin acceso reciben 403"""
+        client = APIClient()
+        client.force_authenticate(user=mecanico_user)
+        response = client.post(f"{self.URL}entregar-lote/", {"entregas": []}, format="json")
+        assert response.status_code == status.HTTP_403_FORBIDDEN
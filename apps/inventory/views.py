@@ -4,7 +4,10 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import OrderingFilter, SearchFilter
+from django.core.exceptions import ValidationError as DjangoValidationError
 from django.db import transaction
+from django.db.models import BooleanField, Case, F, Value, When
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from drf_spectacular.utils import extend_schema
 
@@ -13,11 +16,20 @@ from .serializers import (
     RepuestoSerializer, StockSerializer, MovimientoStockSerializer,
     SolicitudRepuestoSerializer, HistorialRepuestoVehiculoSerializer
 )
+from .services import aprobar_solicitud, cancelar_solicitud, entregar_solicitudes
 from apps.workorders.models import Auditoria
 
 
 class RepuestoViewSet(viewsets.ModelViewSet):
-    queryset = Repuesto.objects.filter(activo=True).select_related('stock')
+    # Stock anotado en el mismo JOIN: el serializer no consulta la relación por fila
+    queryset = Repuesto.objects.filter(activo=True).annotate(
+        stock_actual=Coalesce(F("stock__cantidad_actual"), Value(0)),
+        stock_necesita_reorden=Case(
+            When(stock__cantidad_actual__lte=F("stock__cantidad_minima"), then=Value(True)),
+            default=Value(False),
+            output_field=BooleanField(),
+        ),
+    )
     serializer_class = RepuestoSerializer
     permission_classes = [permissions.IsAuthenticated]
     
@@ -25,6 +37,56 @@ class RepuestoViewSet(viewsets.ModelViewSet):
     filterset_fields = ["categoria", "activo"]
     search_fields = ["codigo", "nombre", "marca", "descripcion"]
     ordering_fields = ["nombre", "codigo", "created_at"]
+    
+    @extend_schema(
+        description=(
+            "Catálogo liviano de repuestos activos (id, codigo, nombre, categoria, stock disponible) "
+            "para el selector de repuestos. Responde ETag; con If-None-Match vigente retorna 304."
+        )
+    )
+    @action(detail=False, methods=['get'])
+    def catalogo(self, request):
+        """
+        Catálogo completo desde caché (ver apps/inventory/catalogo.py).
+        
+        El cliente guarda el ETag y lo reenvía en If-None-Match: mientras no
+        cambien repuestos ni stock recibe 304 sin cuerpo.
+        """
+        from .catalogo import obtener_catalogo
+        
+        etag, repuestos = obtener_catalogo()
+        etags_cliente = [e.strip() for e in request.headers.get("If-None-Match", "").split(",")]
+        if etag in etags_cliente:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(repuestos)
+        response["ETag"] = etag
+        response["Cache-Control"] = "private, no-cache"
+        return response
+    
+    @extend_schema(
+        description=(
+            "Autocompletado de repuestos por codigo, nombre o marca. "
+            "Parámetros: q (requerido), limite (default 10, máx. 50)."
+        )
+    )
+    @action(detail=False, methods=['get'])
+    def autocompletar(self, request):
+        """Sugerencias para el selector de repuestos (ver apps/inventory/catalogo.py)"""
+        from .catalogo import autocompletar
+        
+        texto = request.query_params.get("q", "").strip()
+        if not texto:
+            return Response(
+                {"detail": "Se requiere el parámetro 'q'."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            limite = min(max(int(request.query_params.get("limite", 10)), 1), 50)
+        except ValueError:
+            limite = 10
+        
+        return Response(autocompletar(texto, limite))
 
 
 class StockViewSet(viewsets.ModelViewSet):
@@ -42,12 +104,119 @@ class StockViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def necesitan_reorden(self, request):
         """Lista repuestos con stock por debajo del mínimo"""
-        from django.db.models import F
         stocks = Stock.objects.filter(
             cantidad_actual__lte=F('cantidad_minima')
         ).select_related('repuesto')
         serializer = self.get_serializer(stocks, many=True)
         return Response(serializer.data)
+    
+    @extend_schema(
+        description=(
+            "Sugerencias de compra según consumo: punto de reorden dinámico, stock objetivo "
+            "y cantidad a pedir contra el disponible actual. Parámetros: todas=true (incluye "
+            "repuestos sobre el punto de reorden), limite (default 100, máx. 1000)."
+        )
+    )
+    @action(detail=False, methods=['get'], url_path='sugerencias-reorden')
+    def sugerencias_reorden(self, request):
+        """
+        Lista lo calculado por la tarea nocturna calcular_sugerencias_reorden
+        (ver apps/inventory/reorden.py), cruzado con el stock vigente.
+        """
+        from .reorden import sugerencias_vigentes
+        
+        try:
+            limite = min(max(int(request.query_params.get("limite", 100)), 1), 1000)
+        except ValueError:
+            limite = 100
+        todas = request.query_params.get("todas", "").lower() in ("1", "true")
+        
+        return Response(list(sugerencias_vigentes(solo_bajo_punto=not todas)[:limite]))
+    
+    @extend_schema(
+        description=(
+            "Stock de un repuesto en un momento dado. Parámetros: repuesto (id, requerido), "
+            "momento (ISO 8601; una fecha YYYY-MM-DD se interpreta como el cierre de ese día). "
+            "Default: ahora."
+        )
+    )
+    @action(detail=False, methods=['get'])
+    def historico(self, request):
+        """
+        Reconstruye el stock desde el último snapshot diario más los
+        movimientos posteriores (ver apps/inventory/historico.py).
+        """
+        from django.utils.dateparse import parse_date, parse_datetime
+        from apps.core.fechas import rango_dia_local
+        from .historico import stock_en
+        
+        repuesto_id = request.query_params.get("repuesto")
+        if not repuesto_id:
+            return Response(
+                {"detail": "Se requiere el parámetro 'repuesto'."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        momento = timezone.now()
+        valor = request.query_params.get("momento")
+        if valor:
+            try:
+                dia = parse_date(valor)
+                momento = rango_dia_local(dia)[1] if dia else parse_datetime(valor)
+            except ValueError:
+                momento = None
+            if momento is None:
+                return Response(
+                    {"detail": "Formato de momento inválido. Use ISO 8601 o YYYY-MM-DD"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if timezone.is_naive(momento):
+                momento = timezone.make_aware(momento)
+        
+        try:
+            repuesto = Repuesto.objects.only("id", "codigo").get(pk=repuesto_id)
+        except (Repuesto.DoesNotExist, ValueError, DjangoValidationError):
+            return Response({"detail": "Repuesto no encontrado."}, status=status.HTTP_404_NOT_FOUND)
+        
+        resultado = stock_en(repuesto.id, momento)
+        return Response({
+            "repuesto": str(repuesto.id),
+            "codigo": repuesto.codigo,
+            "momento": momento,
+            **resultado,
+        })
+    
+    @extend_schema(
+        description=(
+            "Valorización de toda la bodega al cierre de un día (cantidad × costo unitario). "
+            "Parámetro: fecha YYYY-MM-DD (default: hoy)."
+        )
+    )
+    @action(detail=False, methods=['get'])
+    def valorizacion(self, request):
+        """
+        Valorización de bodega a una fecha, para el cierre de inventario
+        mensual. Una sola consulta sobre snapshots y movimientos.
+        """
+        from datetime import date
+        from .historico import valorizar_bodega
+        
+        if request.user.rol not in ("SUPERVISOR", "ADMIN", "JEFE_TALLER"):
+            return Response(
+                {"detail": "No autorizado para ver la valorización de bodega."},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        try:
+            fecha = request.query_params.get("fecha")
+            dia = date.fromisoformat(fecha) if fecha else timezone.localdate()
+        except ValueError:
+            return Response(
+                {"detail": "Formato de fecha inválido. Use YYYY-MM-DD"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        return Response(valorizar_bodega(dia))
 
 
 class MovimientoStockViewSet(viewsets.ModelViewSet):
@@ -91,10 +260,9 @@ class SolicitudRepuestoViewSet(viewsets.ModelViewSet):
         )
     
     @extend_schema(
-        description="Aprueba una solicitud de repuesto (Bodega/Supervisor)"
+        description="Aprueba una solicitud de repuesto y reserva su cantidad (Bodega/Supervisor)"
     )
     @action(detail=True, methods=['post'], url_path='aprobar')
-    @transaction.atomic
     def aprobar(self, request, pk=None):
         """Aprueba una solicitud de repuesto"""
         if request.user.rol not in ("SUPERVISOR", "ADMIN", "JEFE_TALLER"):
@@ -103,35 +271,11 @@ class SolicitudRepuestoViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        solicitud = self.get_object()
-        
-        if solicitud.estado != SolicitudRepuesto.Estado.PENDIENTE:
-            return Response(
-                {"detail": f"La solicitud ya está {solicitud.estado}."},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        # Verificar stock disponible
-        stock = Stock.objects.get(repuesto=solicitud.repuesto)
-        if stock.cantidad_actual < solicitud.cantidad_solicitada:
-            return Response(
-                {"detail": f"Stock insuficiente. Disponible: {stock.cantidad_actual}, Solicitado: {solicitud.cantidad_solicitada}"},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        solicitud.estado = SolicitudRepuesto.Estado.APROBADA
-        solicitud.aprobador = request.user
-        solicitud.fecha_aprobacion = timezone.now()
-        solicitud.save()
-        
-        # Registrar auditoría
-        Auditoria.objects.create(
-            usuario=request.user,
-            accion="APROBAR_SOLICITUD_REPUESTO",
-            objeto_tipo="SolicitudRepuesto",
-            objeto_id=str(solicitud.id),
-            payload={"ot_id": str(solicitud.ot.id)}
-        )
+        # Reserva el stock con un UPDATE condicional (ver apps/inventory/services.py)
+        try:
+            solicitud = aprobar_solicitud(self.get_object(), request.user)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         
         return Response(SolicitudRepuestoSerializer(solicitud).data)
     
@@ -173,11 +317,30 @@ class SolicitudRepuestoViewSet(viewsets.ModelViewSet):
         
         return Response(SolicitudRepuestoSerializer(solicitud).data)
     
+    @extend_schema(
+        description="Cancela una solicitud pendiente o aprobada y libera su reserva"
+    )
+    @action(detail=True, methods=['post'], url_path='cancelar')
+    def cancelar(self, request, pk=None):
+        """Cancela una solicitud de repuesto (el solicitante o Bodega/Supervisor)"""
+        solicitud = self.get_object()
+        if request.user.rol not in ("SUPERVISOR", "ADMIN", "JEFE_TALLER") and solicitud.solicitante_id != request.user.id:
+            return Response(
+                {"detail": "No autorizado para cancelar esta solicitud."},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        try:
+            solicitud = cancelar_solicitud(solicitud, request.user, request.data.get("motivo", ""))
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response(SolicitudRepuestoSerializer(solicitud).data)
+    
     @extend_schema(
         description="Registra la entrega de un repuesto (Bodega)"
     )
     @action(detail=True, methods=['post'], url_path='entregar')
-    @transaction.atomic
     def entregar(self, request, pk=None):
         """Registra la entrega de un repuesto y actualiza el stock"""
         if request.user.rol not in ("SUPERVISOR", "ADMIN", "JEFE_TALLER"):
@@ -188,77 +351,48 @@ class SolicitudRepuestoViewSet(viewsets.ModelViewSet):
         
         solicitud = self.get_object()
         
-        if solicitud.estado != SolicitudRepuesto.Estado.APROBADA:
-            return Response(
-                {"detail": "Solo se pueden entregar solicitudes aprobadas."},
-                status=status.HTTP_400_BAD_REQUEST
+        try:
+            solicitud, = entregar_solicitudes(
+                [(solicitud.id, request.data.get("cantidad_entregada"))], request.user
             )
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         
-        cantidad_entregada = request.data.get("cantidad_entregada", solicitud.cantidad_solicitada)
-        
-        if cantidad_entregada > solicitud.cantidad_solicitada:
+        return Response(SolicitudRepuestoSerializer(solicitud).data)
+    
+    @extend_schema(
+        description=(
+            "Entrega varias solicitudes aprobadas en una sola transacción (todo o nada). "
+            "Body: {\"entregas\": [{\"solicitud\": \"<uuid>\", \"cantidad_entregada\": 2}, ...]}; "
+            "si se omite cantidad_entregada se entrega la cantidad solicitada."
+        )
+    )
+    @action(detail=False, methods=['post'], url_path='entregar-lote')
+    def entregar_lote(self, request):
+        """Entrega un lote de solicitudes aprobadas"""
+        if request.user.rol not in ("SUPERVISOR", "ADMIN", "JEFE_TALLER"):
             return Response(
-                {"detail": "La cantidad entregada no puede ser mayor a la solicitada."},
-                status=status.HTTP_400_BAD_REQUEST
+                {"detail": "No autorizado para entregar repuestos."},
+                status=status.HTTP_403_FORBIDDEN
             )
         
-        # Actualizar stock
-        stock = Stock.objects.get(repuesto=solicitud.repuesto)
-        cantidad_anterior = stock.cantidad_actual
-        
-        if stock.cantidad_actual < cantidad_entregada:
+        entregas = request.data.get("entregas")
+        if not isinstance(entregas, list) or not all(
+            isinstance(e, dict) and e.get("solicitud") for e in entregas
+        ):
             return Response(
-                {"detail": f"Stock insuficiente. Disponible: {stock.cantidad_actual}"},
+                {"detail": "Se requiere 'entregas': lista de {solicitud, cantidad_entregada}."},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        stock.cantidad_actual -= cantidad_entregada
-        stock.save()
-        
-        # Registrar movimiento de stock
-        MovimientoStock.objects.create(
-            repuesto=solicitud.repuesto,
-            tipo=MovimientoStock.TipoMovimiento.SALIDA,
-            cantidad=cantidad_entregada,
-            cantidad_anterior=cantidad_anterior,
-            cantidad_nueva=stock.cantidad_actual,
-            motivo=f"Entrega para OT {solicitud.ot.id}",
-            usuario=request.user,
-            ot=solicitud.ot,
-            item_ot=solicitud.item_ot,
-            vehiculo=solicitud.ot.vehiculo
-        )
-        
-        # Registrar en historial del vehículo
-        HistorialRepuestoVehiculo.objects.create(
-            vehiculo=solicitud.ot.vehiculo,
-            repuesto=solicitud.repuesto,
-            cantidad=cantidad_entregada,
-            ot=solicitud.ot,
-            item_ot=solicitud.item_ot,
-            costo_unitario=solicitud.repuesto.precio_referencia
-        )
-        
-        # Actualizar solicitud
-        solicitud.cantidad_entregada = cantidad_entregada
-        solicitud.estado = SolicitudRepuesto.Estado.ENTREGADA
-        solicitud.entregador = request.user
-        solicitud.fecha_entrega = timezone.now()
-        solicitud.save()
-        
-        # Registrar auditoría
-        Auditoria.objects.create(
-            usuario=request.user,
-            accion="ENTREGAR_REPUESTO",
-            objeto_tipo="SolicitudRepuesto",
-            objeto_id=str(solicitud.id),
-            payload={
-                "cantidad_entregada": cantidad_entregada,
-                "ot_id": str(solicitud.ot.id)
-            }
-        )
+        try:
+            solicitudes = entregar_solicitudes(
+                [(e["solicitud"], e.get("cantidad_entregada")) for e in entregas], request.user
+            )
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         
-        return Response(SolicitudRepuestoSerializer(solicitud).data)
+        return Response(SolicitudRepuestoSerializer(solicitudes, many=True).data)
 
 
 class HistorialRepuestoVehiculoViewSet(viewsets.ReadOnlyModelViewSet):
@@ -10,3 +10,8 @@ class NotificationsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.notifications'
 
+    def ready(self):
+        """
+        Registra las señales que invalidan el directorio de destinatarios.
+        """
+        from . import signals  # noqa: F401
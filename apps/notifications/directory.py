@@ -0,0 +1,174 @@
+# apps/notifications/directory.py
+"""
+Directorio de destinatarios para notificaciones.
+
+Este módulo mantiene en caché los mapas necesarios para decidir a quién
+notificar, evitando repetir las mismas consultas a User en cada evento:
+
+- rol → ids de usuarios activos con ese rol
+- site → ids de supervisores activos con vehículos en ese site
+- username → id (para resolver menciones en comentarios)
+
+El directorio completo se arma con tres consultas y se guarda en la caché
+de Django (Redis). Se invalida desde apps/notifications/signals.py cuando
+cambia el username, rol o is_active de un User o el site/supervisor de un
+Vehiculo.
+
+Relaciones:
+- Usado por: apps/notifications/utils.py (helpers de notificaciones)
+- Invalidado por: apps/notifications/signals.py
+"""
+
+from collections import defaultdict
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+User = get_user_model()
+
+# Clave y duración del directorio en caché
+DIRECTORIO_CACHE_KEY = "notificaciones:directorio_destinatarios"
+DIRECTORIO_CACHE_TIMEOUT = 60 * 60  # 1 hora (se invalida por señales antes)
+
+
+def _construir_directorio():
+    """
+    Construye el directorio completo desde la base de datos.
+
+    Retorna:
+    - dict con "por_rol", "por_site" y "por_username"
+    """
+    from apps.vehicles.models import Vehiculo
+
+    por_rol = defaultdict(list)
+    por_username = {}
+
+    # Una sola consulta para roles y usernames
+    for user_id, username, rol, is_active in User.objects.values_list(
+        "id", "username", "rol", "is_active"
+    ):
+        por_username[username] = user_id
+        if is_active:
+            por_rol[rol].append(user_id)
+
+    # Site de cada supervisor: se deriva de los vehículos que supervisa
+    por_site = defaultdict(list)
+    supervisores = (
+        Vehiculo.objects
+        .filter(supervisor__isnull=False, supervisor__is_active=True)
+        .exclude(site="")
+        .values_list("site", "supervisor_id")
+        .distinct()
+    )
+    for site, supervisor_id in supervisores:
+        por_site[site].append(supervisor_id)
+
+    return {
+        "por_rol": dict(por_rol),
+        "por_site": dict(por_site),
+        "por_username": por_username,
+    }
+
+
+def obtener_directorio():
+    """
+    Retorna el directorio de destinatarios, construyéndolo si no está en caché.
+    """
+    directorio = cache.get(DIRECTORIO_CACHE_KEY)
+    if directorio is None:
+        directorio = _construir_directorio()
+        cache.set(DIRECTORIO_CACHE_KEY, directorio, DIRECTORIO_CACHE_TIMEOUT)
+    return directorio
+
+
+def invalidar_directorio():
+    """
+    Elimina el directorio de la caché.
+
+    La próxima lectura lo reconstruye con datos actualizados.
+    """
+    cache.delete(DIRECTORIO_CACHE_KEY)
+
+
+def ids_por_rol(*roles):
+    """
+    Retorna el conjunto de ids de usuarios activos con alguno de los roles.
+
+    Ejemplo:
+    >>> ids_por_rol("ADMIN", "JEFE_TALLER")
+    {1, 4, 7}
+    """
+    por_rol = obtener_directorio()["por_rol"]
+    ids = set()
+    for rol in roles:
+        ids.update(por_rol.get(rol, ()))
+    return ids
+
+
+def ids_por_site(site):
+    """
+    Retorna el conjunto de ids de supervisores activos del site indicado.
+    """
+    if not site:
+        return set()
+    return set(obtener_directorio()["por_site"].get(site, ()))
+
+
+def usuarios_por_ids(ids):
+    """
+    Carga los usuarios indicados con una sola consulta por clave primaria.
+    """
+    if not ids:
+        return []
+    return list(User.objects.filter(id__in=ids))
+
+
+def usuarios_por_rol(*roles):
+    """
+    Retorna los usuarios activos con alguno de los roles indicados.
+
+    Reemplaza a User.objects.filter(rol__in=[...], is_active=True):
+    los ids salen de la caché y los usuarios se cargan por clave primaria.
+    """
+    return usuarios_por_ids(ids_por_rol(*roles))
+
+
+def resolver_menciones(menciones):
+    """
+    Resuelve una lista de menciones (@id o @username) a usuarios.
+
+    Mantiene la prioridad original: si la mención es numérica y corresponde
+    a un id existente, se usa el id; si no, se busca por username.
+    Todas las menciones se resuelven con una única consulta IN.
+
+    Parámetros:
+    - menciones: Lista de strings (ej: ["@jperez", "@12"])
+
+    Retorna:
+    - Lista de usuarios encontrados (sin duplicados, en orden de mención)
+    """
+    por_username = obtener_directorio()["por_username"]
+    ids_conocidos = set(por_username.values())
+
+    ids = []
+    for mencion in menciones:
+        if not mencion:
+            continue
+        mencion = str(mencion)
+        if mencion.startswith("@"):
+            mencion = mencion[1:]  # Remover @
+
+        user_id = None
+        if mencion.isdigit() and int(mencion) in ids_conocidos:
+            user_id = int(mencion)
+        elif mencion in por_username:
+            user_id = por_username[mencion]
+
+        if user_id is not None and user_id not in ids:
+            ids.append(user_id)
+
+    if not ids:
+        return []
+
+    usuarios = {u.id: u for u in User.objects.filter(id__in=ids)}
+    return [usuarios[i] for i in ids if i in usuarios]
@@ -0,0 +1,59 @@
+# apps/notifications/signals.py
+"""
+Señales de la app de notificaciones.
+
+Invalidan el directorio de destinatarios (apps/notifications/directory.py)
+cuando cambian los datos que lo componen: username, rol o is_active de un
+User, y el site o supervisor de un Vehiculo. La invalidación se hace en
+transaction.on_commit: si se borrara antes, otra solicitud podría volver a
+cachear los datos previos al commit.
+
+Se registran en NotificationsConfig.ready() (apps/notifications/apps.py).
+"""
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from apps.vehicles.models import Vehiculo
+
+from .directory import invalidar_directorio
+
+# Campos de User que componen el directorio (mapas por rol y por username)
+CAMPOS_USUARIO_DIRECTORIO = {"username", "rol", "is_active"}
+
+# Campos de Vehiculo que afectan el mapa site → supervisores
+CAMPOS_VEHICULO_DIRECTORIO = {"site", "supervisor", "supervisor_id"}
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def invalidar_directorio_usuario(sender, instance, update_fields=None, **kwargs):
+    """
+    Invalida el directorio cuando se crea, modifica o elimina un User.
+
+    Los guardados con update_fields que no tocan username/rol/is_active
+    (ej: last_login en cada login) no invalidan nada.
+    """
+    if update_fields is not None and not set(update_fields) & CAMPOS_USUARIO_DIRECTORIO:
+        return
+    transaction.on_commit(invalidar_directorio)
+
+
+@receiver(post_save, sender=Vehiculo)
+@receiver(post_delete, sender=Vehiculo)
+def invalidar_directorio_vehiculo(sender, instance, update_fields=None, signal=None, **kwargs):
+    """
+    Invalida el directorio cuando cambia el site o supervisor de un vehículo.
+
+    Los guardados con update_fields que no tocan esos campos (ej: cambio de
+    estado en el ingreso) o que no los cambian respecto de lo leído (ver
+    Vehiculo.from_db) no invalidan nada.
+    """
+    if signal is post_save:
+        if update_fields is not None and not set(update_fields) & CAMPOS_VEHICULO_DIRECTORIO:
+            return
+        if not instance.cambio_site_o_supervisor():
+            return
+    transaction.on_commit(invalidar_directorio)
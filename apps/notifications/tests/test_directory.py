@@ -0,0 +1,156 @@
+# apps/notifications/tests/test_directory.py
+"""
+Pruebas para el directorio de destinatarios de notificaciones.
+"""
+
+import pytest
+from django.contrib.auth.models import update_last_login
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from apps.notifications.directory import (
+    obtener_directorio, ids_por_rol, ids_por_site, usuarios_por_rol,
+    resolver_menciones, DIRECTORIO_CACHE_KEY,
+)
+from apps.users.models import User
+
+
+@pytest.fixture(autouse=True)
+def limpiar_directorio():
+    """Asegura que cada prueba parte sin directorio en caché."""
+    cache.delete(DIRECTORIO_CACHE_KEY)
+    yield
+    cache.delete(DIRECTORIO_CACHE_KEY)
+
+
+@pytest.mark.django_db
+@pytest.mark.service
+class TestDirectorioDestinatarios:
+    """Pruebas para los mapas rol/site/username en caché."""
+    
+    def test_ids_por_rol(self, admin_user, jefe_taller_user, mecanico_user):
+        """Test que el mapa rol → ids agrupa usuarios activos por rol."""
+        assert ids_por_rol("ADMIN", "JEFE_TALLER") == {admin_user.id, jefe_taller_user.id}
+        assert ids_por_rol("MECANICO") == {mecanico_user.id}
+        assert ids_por_rol("SPONSOR") == set()
+    
+    def test_ids_por_rol_excluye_inactivos(self, admin_user):
+        """Test que los usuarios inactivos no reciben notificaciones por rol."""
+        admin_user.is_active = False
+        admin_user.save()
+        assert admin_user.id not in ids_por_rol("ADMIN")
+    
+    def test_ids_por_site(self, vehiculo, supervisor_user):
+        """Test que el site se deriva de los vehículos supervisados."""
+        assert ids_por_site("SITE_TEST") == {supervisor_user.id}
+        assert ids_por_site("OTRO_SITE") == set()
+        assert ids_por_site("") == set()
+    
+    def test_directorio_se_cachea(self, admin_user):
+        """Test que la segunda lectura no consulta la base de datos."""
+        obtener_directorio()
+        with CaptureQueriesContext(connection) as ctx:
+            ids_por_rol("ADMIN")
+            ids_por_site("SITE_TEST")
+        assert len(ctx.captured_queries) == 0
+    
+    def test_post_save_user_invalida(self, admin_user, django_capture_on_commit_callbacks):
+        """Test que crear un User invalida el directorio al confirmar."""
+        obtener_directorio()
+        with django_capture_on_commit_callbacks(execute=True):
+            nuevo = User.objects.create_user(
+                username="admin_nuevo",
+                email="admin_nuevo@test.com",
+                password="testpass123",
+                rol=User.Rol.ADMIN,
+                rut="44444444-4"
+            )
+            # Antes del commit se sigue sirviendo el directorio confirmado
+            assert nuevo.id not in ids_por_rol("ADMIN")
+        assert nuevo.id in ids_por_rol("ADMIN")
+    
+    def test_last_login_no_invalida(self, admin_user, django_capture_on_commit_callbacks):
+        """Test que el login (update_fields=["last_login"]) no invalida el directorio."""
+        obtener_directorio()
+        with django_capture_on_commit_callbacks(execute=True):
+            update_last_login(None, admin_user)
+        assert cache.get(DIRECTORIO_CACHE_KEY) is not None
+    
+    def test_post_save_profile_no_invalida(self, admin_user, django_capture_on_commit_callbacks):
+        """Test que guardar un Profile no invalida el directorio (no contiene datos del perfil)."""
+        obtener_directorio()
+        with django_capture_on_commit_callbacks(execute=True):
+            admin_user.profile.phone_number = "+56911111111"
+            admin_user.profile.save()
+        assert cache.get(DIRECTORIO_CACHE_KEY) is not None
+    
+    def test_cambio_site_vehiculo_invalida(self, vehiculo, supervisor_user, django_capture_on_commit_callbacks):
+        """Test que cambiar el site de un vehículo actualiza el mapa site → ids."""
+        obtener_directorio()
+        with django_capture_on_commit_callbacks(execute=True):
+            vehiculo.site = "SITE_NUEVO"
+            vehiculo.save()
+        assert ids_por_site("SITE_NUEVO") == {supervisor_user.id}
+        assert ids_por_site("SITE_TEST") == set()
+    
+    def test_guardar_vehiculo_sin_cambiar_site_no_invalida(self, vehiculo, django_capture_on_commit_callbacks):
+        """Test que un save() completo que no cambia site/supervisor no invalida el directorio."""
+        obtener_directorio()
+        with django_capture_on_commit_callbacks(execute=True):
+            vehiculo.kilometraje_actual = 5_000
+            vehiculo.save()
+        assert cache.get(DIRECTORIO_CACHE_KEY) is not None
+    
+    def test_cambio_estado_vehiculo_no_invalida(self, vehiculo, django_capture_on_commit_callbacks):
+        """Test que guardar solo el estado no invalida el directorio."""
+        obtener_directorio()
+        with django_capture_on_commit_callbacks(execute=True):
+            vehiculo.estado_operativo = "EN_TALLER"
+            vehiculo.save(update_fields=["estado_operativo"])
+        assert cache.get(DIRECTORIO_CACHE_KEY) is not None
+    
+    def test_usuarios_por_rol(self, admin_user, jefe_taller_user):
+        """Test que usuarios_por_rol retorna instancias de User."""
+        usuarios = usuarios_por_rol("ADMIN", "JEFE_TALLER")
+        assert set(usuarios) == {admin_user, jefe_taller_user}
+
+
+@pytest.mark.django_db
+@pytest.mark.service
+class TestResolverMenciones:
+    """Pruebas para la resolución de menciones en comentarios."""
+    
+    def test_resuelve_username_e_id(self, admin_user, mecanico_user):
+        """Test que se resuelven menciones por username y por id."""
+        usuarios = resolver_menciones([f"@{admin_user.username}", f"@{mecanico_user.id}"])
+        assert usuarios == [admin_user, mecanico_user]
+    
+    def test_ignora_desconocidas_y_duplicadas(self, admin_user):
+        """Test que las menciones desconocidas se ignoran y no hay duplicados."""
+        usuarios = resolver_menciones(["@no_existe", f"@{admin_user.username}", f"@{admin_user.id}", ""])
+        assert usuarios == [admin_user]
+    
+    def test_una_sola_consulta(self, admin_user, mecanico_user, jefe_taller_user):
+        """Test que todas las menciones se resuelven con una sola consulta IN."""
+        obtener_directorio()
+        menciones = [f"@{u.username}" for u in (admin_user, mecanico_user, jefe_taller_user)]
+        with CaptureQueriesContext(connection) as ctx:
+            usuarios = resolver_menciones(menciones)
+        assert len(usuarios) == 3
+        assert len(ctx.captured_queries) == 1
+    
+    def test_comentario_notifica_mencionados(self, orden_trabajo, admin_user, mecanico_user):
+        """Test que crear_notificacion_ot_comentario notifica a los mencionados."""
+        from apps.notifications.utils import crear_notificacion_ot_comentario
+        from apps.workorders.models import ComentarioOT
+        
+        comentario = ComentarioOT.objects.create(
+            ot=orden_trabajo,
+            usuario=admin_user,
+            contenido="Revisar frenos",
+        )
+        notificaciones = crear_notificacion_ot_comentario(
+            comentario, [f"@{mecanico_user.username}", f"@{admin_user.username}"]
+        )
+        # El autor del comentario no se notifica a sí mismo
+        assert [n.usuario for n in notificaciones] == [mecanico_user]
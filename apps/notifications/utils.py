@@ -15,6 +15,7 @@ from django.utils.html import strip_tags
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
 from .serializers import NotificationSerializer
+from .directory import usuarios_por_rol, resolver_menciones
 
 User = get_user_model()
 
@@ -150,7 +151,7 @@ def crear_notificacion_evidencia(evidencia, usuario_subio):
     )
     
     if es_importante:
-        admins = User.objects.filter(rol="ADMIN", is_active=True)
+        admins = usuarios_por_rol("ADMIN")
         usuarios_a_notificar.extend(admins)
     
     # Eliminar duplicados y no notificar al usuario que subió
@@ -213,7 +214,7 @@ def crear_notificacion_ot_creada(ot, usuario_creo):
         usuarios_a_notificar.append(ot.supervisor)
     
     # Agregar ADMIN y JEFE_TALLER
-    admins = User.objects.filter(rol__in=["ADMIN", "JEFE_TALLER"], is_active=True)
+    admins = usuarios_por_rol("ADMIN", "JEFE_TALLER")
     usuarios_a_notificar.extend(admins)
     
     # Eliminar duplicados
@@ -250,29 +251,18 @@ def crear_notificacion_ot_comentario(comentario, menciones):
     """
     notificaciones = []
     
-    for mencion in menciones:
-        # Extraer ID de usuario de la mención (formato: @username o @id)
-        # Por ahora, asumimos que las menciones son IDs de usuario
+    # Resolver todas las menciones (@username o @id) con una sola consulta
+    try:
+        usuarios_mencionados = resolver_menciones(menciones)
+    except Exception as e:
+        import logging
+        logger = logging.getLogger(__name__)
+        logger.error(f"Error al resolver menciones {menciones}: {e}")
+        return notificaciones
+    
+    for usuario in usuarios_mencionados:
         try:
-            from django.contrib.auth import get_user_model
-            User = get_user_model()
-            
-            # Intentar obtener usuario por ID o username
-            if mencion.startswith("@"):
-                mencion = mencion[1:]  # Remover @
-            
-            usuario = None
-            try:
-                # Intentar por ID primero
-                usuario = User.objects.get(id=mencion)
-            except (User.DoesNotExist, ValueError):
-                try:
-                    # Intentar por username
-                    usuario = User.objects.get(username=mencion)
-                except User.DoesNotExist:
-                    pass
-            
-            if usuario and usuario != comentario.usuario:
+            if usuario != comentario.usuario:
                 notificacion = Notification.objects.create(
                     usuario=usuario,
                     tipo="GENERAL",
@@ -289,7 +279,7 @@ def crear_notificacion_ot_comentario(comentario, menciones):
         except Exception as e:
             import logging
             logger = logging.getLogger(__name__)
-            logger.error(f"Error al crear notificación de mención {mencion}: {e}")
+            logger.error(f"Error al crear notificación de mención {usuario.username}: {e}")
     
     return notificaciones
 
@@ -309,7 +299,7 @@ def crear_notificacion_ot_cerrada(ot, usuario_cerro):
     if ot.supervisor:
         usuarios_a_notificar.append(ot.supervisor)
     
-    ejecutivos = User.objects.filter(rol__in=["ADMIN", "SPONSOR", "EJECUTIVO"], is_active=True)
+    ejecutivos = usuarios_por_rol("ADMIN", "SPONSOR", "EJECUTIVO")
     usuarios_a_notificar.extend(ejecutivos)
     
     usuarios_a_notificar = list(set(usuarios_a_notificar))
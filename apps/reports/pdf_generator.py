@@ -13,6 +13,7 @@ from reportlab.pdfbase.ttfonts import TTFont
 from io import BytesIO
 from django.utils import timezone
 from datetime import timedelta
+from apps.core.fechas import filtro_dia_local, filtro_dias_locales
 # No importar views aquí para evitar circular imports
 
 
@@ -187,7 +188,7 @@ def generar_reporte_semanal_pdf(fecha_inicio=None, fecha_fin=None):
     Genera un reporte semanal en PDF con productividad del taller
     """
     if not fecha_inicio:
-        fecha_fin = timezone.now().date()
+        fecha_fin = timezone.localdate()
         fecha_inicio = fecha_fin - timedelta(days=7)
     
     # Crear buffer para el PDF
@@ -232,9 +233,8 @@ def generar_reporte_semanal_pdf(fecha_inicio=None, fecha_fin=None):
     
     # KPIs principales
     ot_cerradas = OrdenTrabajo.objects.filter(
+        filtro_dias_locales("cierre", fecha_inicio, fecha_fin),
         estado="CERRADA",
-        cierre__date__gte=fecha_inicio,
-        cierre__date__lte=fecha_fin
     )
     
     total_cerradas = ot_cerradas.count()
@@ -257,33 +257,29 @@ def generar_reporte_semanal_pdf(fecha_inicio=None, fecha_fin=None):
     mecanicos_stats = User.objects.filter(
         rol="MECANICO"
     ).annotate(
-        total_cerradas=Count('ots_asignadas', filter=Q(ots_asignadas__estado="CERRADA", ots_asignadas__cierre__date__gte=fecha_inicio, ots_asignadas__cierre__date__lte=fecha_fin))
+        total_cerradas=Count('ots_asignadas', filter=Q(ots_asignadas__estado="CERRADA") & filtro_dias_locales("ots_asignadas__cierre", fecha_inicio, fecha_fin))
     ).filter(total_cerradas__gt=0).order_by('-total_cerradas')
     
     # Retrabajos
     retrabajos = OrdenTrabajo.objects.filter(
+        filtro_dias_locales("apertura", fecha_inicio, fecha_fin),
         estado="RETRABAJO",
-        apertura__date__gte=fecha_inicio,
-        apertura__date__lte=fecha_fin
     ).count()
     
     # Mantenciones vs Emergencias
     mantenciones = OrdenTrabajo.objects.filter(
+        filtro_dias_locales("cierre", fecha_inicio, fecha_fin),
         tipo="MANTENCION",
-        cierre__date__gte=fecha_inicio,
-        cierre__date__lte=fecha_fin
     ).count()
     
     emergencias = OrdenTrabajo.objects.filter(
+        filtro_dias_locales("cierre", fecha_inicio, fecha_fin),
         tipo="EMERGENCIA",
-        cierre__date__gte=fecha_inicio,
-        cierre__date__lte=fecha_fin
     ).count()
     
     # Pausas más frecuentes
     pausas_frecuentes = Pausa.objects.filter(
-        inicio__date__gte=fecha_inicio,
-        inicio__date__lte=fecha_fin
+        filtro_dias_locales("inicio", fecha_inicio, fecha_fin),
     ).values('tipo').annotate(
         total=Count('id')
     ).order_by('-total')[:5]
@@ -394,7 +390,7 @@ def generar_reporte_diario_pdf(fecha=None):
     Genera un reporte diario en PDF con operación del día
     """
     if not fecha:
-        fecha = timezone.now().date()
+        fecha = timezone.localdate()
     
     buffer = BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=30, leftMargin=30, topMargin=30, bottomMargin=30)
@@ -430,8 +426,8 @@ def generar_reporte_diario_pdf(fecha=None):
     ot_en_pausa = OrdenTrabajo.objects.filter(estado="EN_PAUSA").count()
     ot_en_qa = OrdenTrabajo.objects.filter(estado="EN_QA").count()
     ot_cerradas_hoy = OrdenTrabajo.objects.filter(
+        filtro_dia_local("cierre", fecha),
         estado="CERRADA",
-        cierre__date=fecha
     ).count()
     
     # Pausas activas
@@ -23,6 +23,7 @@ from django.utils import timezone
 from datetime import timedelta
 from django.db.models import Count, Avg, Sum, Q, F, Max, Min
 from django.db.models.functions import Extract
+from apps.core.fechas import filtro_dias_locales, inicio_dia_local
 
 
 def _get_styles():
@@ -77,7 +78,7 @@ def generar_reporte_estado_flota(fecha=None, site=None, supervisor=None, tipo_ve
     - Filtros: Site, Supervisor, Tipo de vehículo, Estado operativo
     """
     if not fecha:
-        fecha = timezone.now().date()
+        fecha = timezone.localdate()
     
     buffer = BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=30, leftMargin=30, topMargin=30, bottomMargin=30)
@@ -120,7 +121,7 @@ def generar_reporte_estado_flota(fecha=None, site=None, supervisor=None, tipo_ve
     vehiculos_fuera_politica = vehiculos.filter(cumplimiento="FUERA_POLITICA").count()
     
     # Vehículos con revisión vencida
-    hoy = timezone.now().date()
+    hoy = timezone.localdate()
     vehiculos_revision_vencida = vehiculos.filter(
         proxima_revision__lt=hoy
     ).count()
@@ -146,25 +147,21 @@ def generar_reporte_estado_flota(fecha=None, site=None, supervisor=None, tipo_ve
     # OT por semana (últimos 7 días)
     fecha_semana = fecha - timedelta(days=7)
     ot_semana = OrdenTrabajo.objects.filter(
-        apertura__date__gte=fecha_semana,
-        apertura__date__lte=fecha,
+        filtro_dias_locales("apertura", fecha_semana, fecha),
         vehiculo__in=vehiculos
     ).count()
     
     # OT por mes (últimos 30 días)
     fecha_mes = fecha - timedelta(days=30)
     ot_mes = OrdenTrabajo.objects.filter(
-        apertura__date__gte=fecha_mes,
-        apertura__date__lte=fecha,
+        filtro_dias_locales("apertura", fecha_mes, fecha),
         vehiculo__in=vehiculos
     ).count()
     
     # Vehículos sin movimiento (más de X días, default 7)
     fecha_sin_movimiento = fecha - timedelta(days=7)
     vehiculos_sin_movimiento = vehiculos.filter(
-        ultimo_movimiento__lt=timezone.make_aware(
-            timezone.datetime.combine(fecha_sin_movimiento, timezone.datetime.min.time())
-        )
+        ultimo_movimiento__lt=inicio_dia_local(fecha_sin_movimiento)
     ).count()
     
     # Tabla de Resumen General
@@ -217,7 +214,7 @@ def generar_reporte_ordenes_trabajo(fecha_inicio=None, fecha_fin=None, site=None
     - Alertas: OT con SLA vencido, OT sin actividad, pausas prolongadas
     """
     if not fecha_inicio:
-        fecha_fin = timezone.now().date()
+        fecha_fin = timezone.localdate()
         fecha_inicio = fecha_fin - timedelta(days=30)
     
     buffer = BytesIO()
@@ -247,15 +244,13 @@ def generar_reporte_ordenes_trabajo(fecha_inicio=None, fecha_fin=None, site=None
     ot_en_ejecucion = OrdenTrabajo.objects.filter(estado="EN_EJECUCION", **filtros).count()
     ot_en_qa = OrdenTrabajo.objects.filter(estado="EN_QA", **filtros).count()
     ot_cerradas = OrdenTrabajo.objects.filter(
+        filtro_dias_locales("cierre", fecha_inicio, fecha_fin),
         estado="CERRADA",
-        cierre__date__gte=fecha_inicio,
-        cierre__date__lte=fecha_fin,
         **filtros
     ).count()
     ot_rechazadas = OrdenTrabajo.objects.filter(
+        filtro_dias_locales("apertura", fecha_inicio, fecha_fin),
         estado="RETRABAJO",
-        apertura__date__gte=fecha_inicio,
-        apertura__date__lte=fecha_fin,
         **filtros
     ).count()
     
@@ -274,8 +269,7 @@ def generar_reporte_ordenes_trabajo(fecha_inicio=None, fecha_fin=None, site=None
     
     # Información por OT
     ot_list = OrdenTrabajo.objects.filter(
-        apertura__date__gte=fecha_inicio,
-        apertura__date__lte=fecha_fin,
+        filtro_dias_locales("apertura", fecha_inicio, fecha_fin),
         **filtros
     ).select_related('vehiculo', 'supervisor', 'mecanico').order_by('-apertura')[:50]  # Limitar a 50 para el PDF
     
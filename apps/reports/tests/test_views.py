@@ -106,3 +106,80 @@ class TestReportePDFView:
         if response.status_code == status.HTTP_200_OK:
             assert response.get("Content-Type") == "application/pdf" or "pdf" in response.get("Content-Type", "").lower()
 
+
+
+@pytest.mark.django_db
+@pytest.mark.view
+@pytest.mark.api
+class TestTendenciaFlotaView:
+    """Pruebas para el snapshot diario y la tendencia de la flota."""
+    
+    def test_snapshot_por_site(self, vehiculo):
+        """Test que el snapshot agrupa conteos por site."""
+        from datetime import timedelta
+        from django.utils import timezone
+        from apps.vehicles.models import Vehiculo, SnapshotFlota
+        from apps.vehicles.tasks import generar_snapshot_flota
+        
+        Vehiculo.objects.create(
+            patente="SNAP01", tipo="DIESEL", site="SITE_TEST", estado_operativo="EN_TALLER",
+            tct=True, ultimo_movimiento=timezone.now() - timedelta(days=90)
+        )
+        Vehiculo.objects.create(patente="SNAP02", site="OTRO", estado="BAJA")
+        
+        resultado = generar_snapshot_flota()
+        assert resultado["sites"] == 1
+        
+        snapshot = SnapshotFlota.objects.get(site="SITE_TEST")
+        assert snapshot.total == 2
+        assert snapshot.operativos == 1
+        assert snapshot.en_taller == 1
+        assert snapshot.con_tct == 1
+        assert snapshot.inactivos == 1
+        assert snapshot.por_tipo == {"ELECTRICO": 1, "DIESEL": 1}
+    
+    def test_snapshot_idempotente(self, vehiculo):
+        """Test que re-ejecutar el mismo día sobrescribe la foto."""
+        from apps.vehicles.models import SnapshotFlota
+        from apps.vehicles.tasks import generar_snapshot_flota
+        
+        generar_snapshot_flota()
+        vehiculo.estado_operativo = "BLOQUEADO"
+        vehiculo.save()
+        generar_snapshot_flota()
+        
+        snapshot = SnapshotFlota.objects.get()
+        assert snapshot.bloqueados == 1
+        assert snapshot.operativos == 0
+    
+    def test_tendencia_una_consulta(self, authenticated_client):
+        """Test que la tendencia suma sites por día en una sola consulta."""
+        from datetime import timedelta
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from django.utils import timezone
+        from apps.vehicles.models import SnapshotFlota
+        
+        hoy = timezone.localdate()
+        for i in range(3):
+            for site in ("A", "B"):
+                SnapshotFlota.objects.create(fecha=hoy - timedelta(days=i), site=site, total=10, operativos=8)
+        SnapshotFlota.objects.create(fecha=hoy - timedelta(days=400), site="A", total=10)
+        
+        with CaptureQueriesContext(connection) as ctx:
+            response = authenticated_client.get("/api/v1/reports/tendencia-flota/")
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data["serie"]) == 3
+        assert response.data["serie"][-1]["total"] == 20
+        assert response.data["serie"][-1]["disponibilidad"] == 80.0
+        assert len([q for q in ctx.captured_queries if "snapshotflota" in q["sql"]]) == 1
+        
+        por_site = authenticated_client.get("/api/v1/reports/tendencia-flota/?site=A&dias=2")
+        assert [p["total"] for p in por_site.data["serie"]] == [10, 10]
+    
+    def test_tendencia_requiere_rol(self, mecanico_user):
+        """Test que un mecánico no puede ver la tendencia."""
+        client = APIClient()
+        client.force_authenticate(user=mecanico_user)
+        response = client.get("/api/v1/reports/tendencia-flota/")
+        assert response.status_code == status.HTTP_403_FORBIDDEN
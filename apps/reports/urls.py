@@ -4,7 +4,8 @@ from .views import (
     DashboardEjecutivoView,
     ReporteProductividadView,
     ReportePausasView,
-    ReportePDFView
+    ReportePDFView,
+    TendenciaFlotaView
 )
 
 urlpatterns = [
@@ -12,5 +13,6 @@ urlpatterns = [
     path('productividad/', ReporteProductividadView.as_view(), name='reporte-productividad'),
     path('pausas/', ReportePausasView.as_view(), name='reporte-pausas'),
     path('pdf/', ReportePDFView.as_view(), name='reporte-pdf'),
+    path('tendencia-flota/', TendenciaFlotaView.as_view(), name='tendencia-flota'),
 ]
 
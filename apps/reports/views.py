@@ -14,6 +14,7 @@ Relaciones:
 - Usa: apps/users/models.py (User)
 - Usa: apps/inventory/models.py (SolicitudRepuesto, MovimientoStock)
 - Usa: apps/reports/pdf_generator.py (generación de PDFs)
+- Usa: apps/users/auth_context.py (sites del supervisor en ReportePDFView)
 - Conectado a: apps/reports/urls.py
 
 Endpoints principales:
@@ -21,6 +22,7 @@ Endpoints principales:
 - /api/v1/reports/productividad/ → Reporte de productividad
 - /api/v1/reports/pdf/ → Generar reporte PDF
 - /api/v1/reports/pausas/ → Reporte de pausas
+- /api/v1/reports/tendencia-flota/ → Serie diaria de composición de la flota
 
 Características:
 - Caché de KPIs (2 minutos) para optimizar rendimiento
@@ -40,6 +42,8 @@ from apps.workorders.models import OrdenTrabajo, Pausa
 from apps.vehicles.models import Vehiculo
 from apps.users.models import User
 from apps.inventory.models import SolicitudRepuesto, MovimientoStock
+from apps.core.fechas import filtro_dia_local, filtro_dias_locales
+from apps.users.auth_context import obtener_contexto
 
 
 class DashboardEjecutivoView(views.APIView):
@@ -116,8 +120,7 @@ class DashboardEjecutivoView(views.APIView):
             return Response(cached_data)
         
         # Fecha actual para cálculos
-        hoy = timezone.now().date()
-        inicio_dia = timezone.make_aware(timezone.datetime.combine(hoy, timezone.datetime.min.time()))
+        hoy = timezone.localdate()
         
         # ==================== KPIs DE OT ====================
         # Contar OT por estado
@@ -130,8 +133,8 @@ class DashboardEjecutivoView(views.APIView):
         
         # OT cerradas hoy
         ot_cerradas_hoy = OrdenTrabajo.objects.filter(
+            filtro_dia_local("cierre", hoy),
             estado="CERRADA",
-            cierre__date=hoy
         ).count()
         
         # ==================== ÚLTIMAS 5 OT ====================
@@ -160,8 +163,8 @@ class DashboardEjecutivoView(views.APIView):
         # Productividad del taller (OT cerradas en los últimos 7 días)
         hace_7_dias = hoy - timedelta(days=7)
         ot_cerradas_7_dias = OrdenTrabajo.objects.filter(
+            filtro_dias_locales("cierre", desde=hace_7_dias),
             estado="CERRADA",
-            cierre__date__gte=hace_7_dias
         ).count()
         
         # ==================== PAUSAS MÁS FRECUENTES ====================
@@ -465,10 +468,10 @@ class ReportePDFView(views.APIView):
         # Si es supervisor, filtrar por su site
         site_filter = None
         if request.user.rol == "SUPERVISOR":
-            # Obtener el site del supervisor desde su perfil o vehículos supervisados
-            vehiculos_supervisados = Vehiculo.objects.filter(supervisor=request.user).values_list('site', flat=True).distinct()
-            if vehiculos_supervisados:
-                site_filter = list(vehiculos_supervisados)
+            # Sites de los vehículos supervisados (AuthContext, en caché)
+            contexto = obtener_contexto(request)
+            if contexto.vehiculos_supervisados:
+                site_filter = sorted(contexto.sites)
             else:
                 # Si no tiene vehículos asignados, no puede ver reportes
                 return Response(
@@ -682,3 +685,81 @@ class ReportePausasView(views.APIView):
             "pausas_por_motivo": list(pausas_por_motivo),
             "total_pausas_activas": pausas_activas.count(),
         })
+
+
+class TendenciaFlotaView(views.APIView):
+    """
+    Tendencia diaria de la composición de la flota.
+    
+    Endpoint: GET /api/v1/reports/tendencia-flota/
+    
+    Permisos:
+    - EJECUTIVO, ADMIN, SPONSOR, JEFE_TALLER, SUPERVISOR
+    
+    Query params:
+    - dias: Días hacia atrás (default 365, máximo 730)
+    - site: Filtrar por site (opcional; sin site se suman todos)
+    
+    Retorna:
+    - 200: {
+        "desde": "2024-01-16",
+        "hasta": "2025-01-15",
+        "serie": [
+            {"fecha": "2025-01-15", "total": 120, "operativos": 100, "en_taller": 12, ...},
+            ...
+        ]
+      }
+    - 403: Si no tiene permisos
+    
+    Lee la tabla SnapshotFlota (generada diariamente por
+    apps/vehicles/tasks.py) en una sola consulta.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    
+    @extend_schema(
+        description="Serie diaria de disponibilidad de la flota (desde snapshots)",
+        responses={200: None}
+    )
+    def get(self, request):
+        from apps.vehicles.models import SnapshotFlota
+        from apps.vehicles.tasks import CONTEOS_SNAPSHOT
+        
+        if request.user.rol not in ("EJECUTIVO", "ADMIN", "SPONSOR", "JEFE_TALLER", "SUPERVISOR"):
+            return Response(
+                {"detail": "No autorizado para ver la tendencia de la flota."},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        try:
+            dias = min(max(int(request.query_params.get("dias", 365)), 1), 730)
+        except ValueError:
+            return Response(
+                {"detail": "El parámetro 'dias' debe ser un entero."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        hasta = timezone.localdate()
+        desde = hasta - timedelta(days=dias - 1)
+        
+        snapshots = SnapshotFlota.objects.filter(fecha__gte=desde, fecha__lte=hasta)
+        site = request.query_params.get("site")
+        if site is not None:
+            snapshots = snapshots.filter(site=site)
+        
+        # Suma por día de todos los sites seleccionados (una sola consulta)
+        columnas = ["total", "inactivos", *CONTEOS_SNAPSHOT]
+        serie = list(
+            snapshots.values("fecha")
+            .annotate(**{columna: Sum(columna) for columna in columnas})
+            .order_by("fecha")
+        )
+        for punto in serie:
+            punto["fecha"] = punto["fecha"].isoformat()
+            punto["disponibilidad"] = round(punto["operativos"] / punto["total"] * 100, 1) if punto["total"] else None
+        
+        return Response({
+            "desde": desde.isoformat(),
+            "hasta": hasta.isoformat(),
+            "site": site,
+            "serie": serie,
+        })
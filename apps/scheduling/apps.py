@@ -6,3 +6,6 @@ class SchedulingConfig(AppConfig):
     name = 'apps.scheduling'
     verbose_name = 'Agenda y Programación'
 
+    def ready(self):
+        # Registrar señales (invalidación del calendario de disponibilidad)
+        from . import signals  # noqa: F401
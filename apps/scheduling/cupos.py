@@ -0,0 +1,163 @@
+# apps/scheduling/cupos.py
+"""
+Reserva atómica de cupos diarios del taller.
+
+Cada (fecha, zona) tiene una fila CupoDiario; zona vacía es el cupo general.
+La fila se crea si no existe con INSERT ... ON CONFLICT DO NOTHING, y la
+reserva es un UPDATE condicional:
+
+    UPDATE ... SET cupos_ocupados = cupos_ocupados + 1
+    WHERE id = ... AND cupos_ocupados < cupos_totales
+
+Dos coordinadores que reservan el último cupo a la vez se serializan en el
+lock de la fila; el segundo evalúa la condición sobre el valor ya
+incrementado, no afecta filas y recibe SinCupos. Liberar es el UPDATE
+inverso con cupos_ocupados > 0.
+
+La agenda guarda el cupo que reservó (Agenda.cupo), así que cancelar o
+reprogramar libera exactamente ese cupo aunque la zona o la fecha de la
+agenda se hayan editado.
+
+Relaciones:
+- Usado por: apps/scheduling/views.py (AgendaViewSet.perform_create,
+  perform_update, reprogramar, cancelar)
+- Usado por: apps/scheduling/planificador.py (reserva masiva al confirmar)
+- Usa: apps/scheduling/models.py (CupoDiario)
+- Invalida: apps/scheduling/disponibilidad.py (calendario en caché)
+"""
+
+from django.db import transaction
+from django.db.models import F
+
+from .disponibilidad import invalidar_disponibilidad
+from .models import CupoDiario
+
+# Cupos totales con que se crea el cupo de un día sin configurar
+CUPOS_POR_DEFECTO = CupoDiario._meta.get_field("cupos_totales").default
+
+
+class SinCupos(ValueError):
+    """El día (y zona) no tiene cupos disponibles."""
+
+    def __init__(self, fecha, zona=""):
+        self.fecha = fecha
+        self.zona = zona
+        destino = f"{fecha} (zona {zona})" if zona else str(fecha)
+        super().__init__(f"No hay cupos disponibles para {destino}")
+
+
+def obtener_cupo(fecha, zona=""):
+    """
+    Retorna el CupoDiario de (fecha, zona), creándolo sin carreras si no existe.
+
+    El INSERT ignora el conflicto con la restricción única, así que dos
+    llamadas concurrentes terminan leyendo la misma fila.
+    """
+    CupoDiario.objects.bulk_create(
+        [CupoDiario(fecha=fecha, zona=zona, cupos_totales=CUPOS_POR_DEFECTO)],
+        ignore_conflicts=True,
+    )
+    return CupoDiario.objects.get(fecha=fecha, zona=zona)
+
+
+def reservar_cupo(fecha, zona=""):
+    """
+    Ocupa un cupo de (fecha, zona).
+
+    Retorna:
+    - CupoDiario reservado (con cupos_ocupados ya actualizado)
+
+    Lanza:
+    - SinCupos si el día está lleno
+    """
+    cupo = obtener_cupo(fecha, zona)
+    actualizadas = CupoDiario.objects.filter(
+        pk=cupo.pk, cupos_ocupados__lt=F("cupos_totales")
+    ).update(cupos_ocupados=F("cupos_ocupados") + 1)
+    if not actualizadas:
+        raise SinCupos(fecha, zona)
+    transaction.on_commit(lambda: invalidar_disponibilidad(fecha, zona))
+    cupo.refresh_from_db(fields=["cupos_totales", "cupos_ocupados"])
+    return cupo
+
+
+def reservar_cupos(cantidades):
+    """
+    Reserva varios cupos de una vez, todo o nada.
+
+    Crea las filas faltantes con un solo INSERT y aplica un UPDATE
+    condicional por (fecha, zona), en orden, para que dos reservas masivas
+    concurrentes tomen los locks en el mismo orden.
+
+    Parámetros:
+    - cantidades: {(fecha, zona): cupos a reservar}
+
+    Retorna:
+    - {(fecha, zona): CupoDiario}
+
+    Lanza:
+    - SinCupos con el primer (fecha, zona) que no alcanza (no reserva nada)
+    """
+    claves = sorted(cantidades)
+    with transaction.atomic():
+        CupoDiario.objects.bulk_create(
+            [CupoDiario(fecha=fecha, zona=zona, cupos_totales=CUPOS_POR_DEFECTO) for fecha, zona in claves],
+            ignore_conflicts=True,
+        )
+        cupos = {
+            (cupo.fecha, cupo.zona): cupo
+            for cupo in CupoDiario.objects.filter(
+                fecha__in={fecha for fecha, _ in claves}, zona__in={zona for _, zona in claves}
+            )
+        }
+        for fecha, zona in claves:
+            cantidad = cantidades[(fecha, zona)]
+            actualizadas = CupoDiario.objects.filter(
+                pk=cupos[(fecha, zona)].pk, cupos_totales__gte=F("cupos_ocupados") + cantidad
+            ).update(cupos_ocupados=F("cupos_ocupados") + cantidad)
+            if not actualizadas:
+                raise SinCupos(fecha, zona)
+            transaction.on_commit(lambda fecha=fecha, zona=zona: invalidar_disponibilidad(fecha, zona))
+    return {clave: cupos[clave] for clave in claves}
+
+
+def liberar_cupo(cupo_id):
+    """
+    Devuelve un cupo reservado. No hace nada si cupo_id es None.
+
+    Retorna:
+    - True si se liberó un cupo
+    """
+    if cupo_id is None:
+        return False
+    liberado = CupoDiario.objects.filter(pk=cupo_id, cupos_ocupados__gt=0).update(
+        cupos_ocupados=F("cupos_ocupados") - 1
+    )
+    if not liberado:
+        return False
+    fecha, zona = CupoDiario.objects.values_list("fecha", "zona").get(pk=cupo_id)
+    transaction.on_commit(lambda: invalidar_disponibilidad(fecha, zona))
+    return True
+
+
+def mover_reserva(cupo_id, fecha, zona=""):
+    """
+    Traslada una reserva al cupo de (fecha, zona) en una sola transacción.
+
+    Primero reserva el destino y después libera el origen: si el destino
+    está lleno se lanza SinCupos y el origen queda intacto. Si el destino es
+    el mismo cupo no se toca nada.
+
+    Parámetros:
+    - cupo_id: Cupo reservado actualmente (None si la agenda no tenía)
+
+    Retorna:
+    - CupoDiario de destino
+    """
+    with transaction.atomic():
+        destino = obtener_cupo(fecha, zona)
+        if destino.pk == cupo_id:
+            return destino
+        destino = reservar_cupo(fecha, zona)
+        liberar_cupo(cupo_id)
+        return destino
@@ -0,0 +1,123 @@
+# apps/scheduling/disponibilidad.py
+"""
+Calendario de disponibilidad de cupos (solo lectura).
+
+La disponibilidad de un rango de días se arma con una consulta por rango a
+CupoDiario; los días sin fila se completan en memoria con los valores por
+defecto (cupos_totales del modelo, 0 ocupados). Nunca crea filas: la fila de
+un día se crea recién al reservar (apps/scheduling/cupos.py).
+
+El resultado se guarda en la caché de Django por (zona, mes), así que el
+calendario mensual del coordinador es una sola lectura de caché. Se invalida:
+- desde apps/scheduling/cupos.py al reservar o liberar (QuerySet.update no
+  dispara señales)
+- desde apps/scheduling/signals.py al guardar o eliminar un CupoDiario
+  (admin, seeds)
+
+Relaciones:
+- Usado por: apps/scheduling/views.py (AgendaViewSet.disponibilidad)
+- Usado por: apps/scheduling/cupos.py, apps/scheduling/signals.py (invalidación)
+- Usa: apps/scheduling/models.py (CupoDiario)
+"""
+
+import calendar
+from datetime import date
+from urllib.parse import quote
+
+from django.core.cache import cache
+
+from .models import CupoDiario
+
+# Duración del mes en caché (se invalida antes al cambiar las reservas)
+DISPONIBILIDAD_CACHE_TIMEOUT = 10 * 60  # 10 minutos
+
+# Máximo de días por consulta (un trimestre)
+MAX_DIAS_DISPONIBILIDAD = 93
+
+
+def _clave(zona, anio, mes):
+    return f"agenda:disponibilidad:{quote(zona)}:{anio}-{mes:02d}"
+
+
+def _meses(desde, hasta):
+    """Lista de (anio, mes) entre desde y hasta, ambos incluidos."""
+    meses = []
+    anio, mes = desde.year, desde.month
+    while (anio, mes) <= (hasta.year, hasta.month):
+        meses.append((anio, mes))
+        anio, mes = (anio + 1, 1) if mes == 12 else (anio, mes + 1)
+    return meses
+
+
+def _ultimo_dia(anio, mes):
+    return date(anio, mes, calendar.monthrange(anio, mes)[1])
+
+
+def _calcular_meses(meses, zona):
+    """
+    Días de los meses indicados, con una consulta sobre el rango que los cubre.
+
+    Retorna:
+    - {(anio, mes): [dia, ...]} con el formato de disponibilidad()
+    """
+    inicio, fin = date(*meses[0], 1), _ultimo_dia(*meses[-1])
+    filas = {
+        fecha: (totales, ocupados)
+        for fecha, totales, ocupados in CupoDiario.objects.filter(
+            zona=zona, fecha__range=(inicio, fin)
+        ).values_list("fecha", "cupos_totales", "cupos_ocupados")
+    }
+    por_defecto = (CupoDiario._meta.get_field("cupos_totales").default, 0)
+
+    resultado = {}
+    for anio, mes in meses:
+        dias = []
+        for dia in range(1, _ultimo_dia(anio, mes).day + 1):
+            fecha = date(anio, mes, dia)
+            totales, ocupados = filas.get(fecha, por_defecto)
+            dias.append({
+                "fecha": fecha.isoformat(),
+                "cupos_totales": totales,
+                "cupos_ocupados": ocupados,
+                "cupos_disponibles": max(totales - ocupados, 0),
+            })
+        resultado[(anio, mes)] = dias
+    return resultado
+
+
+def disponibilidad(desde, hasta, zona=""):
+    """
+    Disponibilidad diaria de cupos entre desde y hasta (incluidos).
+
+    Los meses que no están en caché se calculan juntos en una consulta.
+
+    Retorna:
+    - Lista de {"fecha": "2025-01-15", "cupos_totales": 10,
+                "cupos_ocupados": 3, "cupos_disponibles": 7}
+    """
+    meses = _meses(desde, hasta)
+    claves = {mes: _clave(zona, *mes) for mes in meses}
+    en_cache = cache.get_many(claves.values())
+
+    por_mes = {mes: en_cache[clave] for mes, clave in claves.items() if clave in en_cache}
+    faltantes = [mes for mes in meses if mes not in por_mes]
+    if faltantes:
+        calculados = _calcular_meses(faltantes, zona)
+        cache.set_many(
+            {claves[mes]: dias for mes, dias in calculados.items()},
+            DISPONIBILIDAD_CACHE_TIMEOUT,
+        )
+        por_mes.update(calculados)
+
+    desde_iso, hasta_iso = desde.isoformat(), hasta.isoformat()
+    return [
+        dia
+        for mes in meses
+        for dia in por_mes[mes]
+        if desde_iso <= dia["fecha"] <= hasta_iso
+    ]
+
+
+def invalidar_disponibilidad(fecha, zona=""):
+    """Elimina de la caché el mes de (fecha, zona)."""
+    cache.delete(_clave(zona, fecha.year, fecha.month))
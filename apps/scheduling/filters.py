@@ -0,0 +1,13 @@
+# apps/scheduling/filters.py
+import django_filters as filters
+from apps.core.filters import DiaLocalDesdeFilter, DiaLocalHastaFilter
+from .models import Agenda
+
+class AgendaFilter(filters.FilterSet):
+    # Rango [inicio, fin) sobre fecha_programada (usa el índice, a diferencia de date__gte/lte)
+    fecha_desde = DiaLocalDesdeFilter(field_name="fecha_programada")
+    fecha_hasta = DiaLocalHastaFilter(field_name="fecha_programada")
+
+    class Meta:
+        model = Agenda
+        fields = ["estado", "tipo_mantenimiento", "zona"]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+from django.utils import timezone
+
+
+def vincular_agendas(apps, schema_editor):
+    """
+    Vincula cada agenda no cancelada con el cupo de su día local y su zona, y
+    recalcula cupos_ocupados desde las agendas vinculadas. Antes el cupo se
+    buscaba por fecha_programada.date() (UTC al cancelar), así que los
+    contadores existentes no son confiables.
+    """
+    Agenda = apps.get_model("scheduling", "Agenda")
+    CupoDiario = apps.get_model("scheduling", "CupoDiario")
+    cupos = {(fecha, zona or ""): cupo_id for cupo_id, fecha, zona in CupoDiario.objects.values_list("id", "fecha", "zona")}
+    for agenda in Agenda.objects.exclude(estado="CANCELADA").only("id", "fecha_programada", "zona"):
+        cupo_id = cupos.get((timezone.localdate(agenda.fecha_programada), agenda.zona or ""))
+        if cupo_id is not None:
+            Agenda.objects.filter(pk=agenda.pk).update(cupo_id=cupo_id)
+
+    ocupados = dict(
+        Agenda.objects.filter(cupo__isnull=False).values("cupo").annotate(n=Count("id")).values_list("cupo", "n")
+    )
+    for cupo in CupoDiario.objects.all():
+        cupo.cupos_ocupados = ocupados.get(cupo.id, 0)
+        cupo.save(update_fields=["cupos_ocupados"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduling', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='cupodiario',
+            options={'ordering': ['fecha', 'zona']},
+        ),
+        migrations.RemoveIndex(
+            model_name='cupodiario',
+            name='scheduling__fecha_aa77d1_idx',
+        ),
+        migrations.AddField(
+            model_name='agenda',
+            name='cupo',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='agendas', to='scheduling.cupodiario'),
+        ),
+        migrations.AlterField(
+            model_name='cupodiario',
+            name='fecha',
+            field=models.DateField(db_index=True),
+        ),
+        migrations.RunPython(vincular_agendas, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='cupodiario',
+            constraint=models.UniqueConstraint(fields=('fecha', 'zona'), name='unique_cupo_fecha_zona'),
+        ),
+    ]
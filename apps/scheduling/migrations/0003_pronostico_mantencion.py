@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduling', '0002_cupos_por_zona'),
+        ('vehicles', '0010_busqueda_patente'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PronosticoMantencion',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('vencimiento_fecha', models.DateField(blank=True, null=True)),
+                ('vencimiento_km', models.DateField(blank=True, null=True)),
+                ('km_restantes', models.PositiveIntegerField(blank=True, null=True)),
+                ('km_mensual', models.PositiveIntegerField(blank=True, null=True)),
+                ('vencimiento', models.DateField(blank=True, null=True)),
+                ('criterio', models.CharField(blank=True, choices=[('FECHA', 'Fecha'), ('KILOMETRAJE', 'Kilometraje')], max_length=20)),
+                ('calculado_en', models.DateTimeField()),
+                ('vehiculo', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='pronostico_mantencion', to='vehicles.vehiculo')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['vencimiento'], name='scheduling__vencimi_6b9c28_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduling', '0003_pronostico_mantencion'),
+        ('vehicles', '0012_indices_alcance_por_rol'),
+        ('workorders', '0018_indices_alcance_por_rol'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='agenda',
+            index=models.Index(fields=['coordinador', 'fecha_programada'], name='scheduling__coordin_ccfd71_idx'),
+        ),
+    ]
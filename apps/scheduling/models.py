@@ -1,6 +1,7 @@
 # apps/scheduling/models.py
 from django.db import models
 from django.conf import settings
+from apps.core.alcance import TODOS, Condicion
 from apps.vehicles.models import Vehiculo
 from apps.workorders.models import OrdenTrabajo
 import uuid
@@ -40,6 +41,17 @@ class Agenda(models.Model):
     estado = models.CharField(max_length=20, choices=ESTADOS, default="PROGRAMADA")
     observaciones = models.TextField(blank=True)
     
+    # Cupo diario que ocupa esta agenda (ver apps/scheduling/cupos.py).
+    # Null si está cancelada o si se creó sin pasar por la reserva.
+    cupo = models.ForeignKey(
+        "CupoDiario",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name="agendas",
+    )
+    
     # Relación con OT (se crea cuando el vehículo ingresa)
     ot_asociada = models.OneToOneField(
         OrdenTrabajo,
@@ -52,12 +64,21 @@ class Agenda(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    # Visibilidad por rol (apps/core/alcance.py). Los roles no listados no ven agendas
+    ALCANCE_POR_ROL = {
+        "COORDINADOR_ZONA": Condicion("coordinador"),
+        "SUPERVISOR": TODOS,
+        "ADMIN": TODOS,
+        "JEFE_TALLER": TODOS,
+    }
+    
     class Meta:
         indexes = [
             models.Index(fields=["fecha_programada"]),
             models.Index(fields=["estado", "fecha_programada"]),
             models.Index(fields=["vehiculo", "estado"]),
             models.Index(fields=["zona", "fecha_programada"]),
+            models.Index(fields=["coordinador", "fecha_programada"]),  # Agendas del coordinador (orden por defecto)
         ]
         ordering = ["fecha_programada"]
         constraints = [
@@ -68,23 +89,40 @@ class Agenda(models.Model):
             )
         ]
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Guarda el vehículo leído de la base de datos: si la agenda se mueve a
+        otro vehículo, la señal invalida también el lookup de portería del
+        anterior (apps/vehicles/signals.py).
+        """
+        instance = super().from_db(db, field_names, values)
+        instance._vehiculo_id_guardado = instance.__dict__.get("vehiculo_id")
+        return instance
+    
     def __str__(self):
         return f"{self.vehiculo.patente} - {self.fecha_programada.strftime('%Y-%m-%d %H:%M')}"
 
 
 class CupoDiario(models.Model):
-    """Cupos disponibles por día para programación"""
+    """
+    Cupos disponibles por día para programación.
+    
+    Hay una fila por (fecha, zona); zona vacía es el cupo general del taller.
+    cupos_ocupados solo se modifica con los UPDATE condicionales de
+    apps/scheduling/cupos.py.
+    """
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    fecha = models.DateField(unique=True, db_index=True)
+    fecha = models.DateField(db_index=True)
     cupos_totales = models.PositiveIntegerField(default=10, help_text="Cupos totales del día")
     cupos_ocupados = models.PositiveIntegerField(default=0)
     zona = models.CharField(max_length=100, blank=True, help_text="Zona específica (opcional)")
     
     class Meta:
-        indexes = [
-            models.Index(fields=["fecha", "zona"]),
+        constraints = [
+            models.UniqueConstraint(fields=["fecha", "zona"], name="unique_cupo_fecha_zona"),
         ]
-        ordering = ["fecha"]
+        ordering = ["fecha", "zona"]
     
     @property
     def cupos_disponibles(self):
@@ -93,3 +131,48 @@ class CupoDiario(models.Model):
     def __str__(self):
         return f"{self.fecha} - {self.cupos_disponibles}/{self.cupos_totales} disponibles"
 
+
+
+class PronosticoMantencion(models.Model):
+    """
+    Próxima mantención preventiva proyectada de un vehículo.
+    
+    Una fila por vehículo no dado de baja, recalculada para toda la flota en
+    una sola sentencia (apps/scheduling/pronostico.py): por calendario
+    (proxima_revision, o ultima_revision + intervalo) y por kilometraje
+    (kilometraje_actual al ritmo de km_mensual_promedio del vehículo o, si no
+    tiene, de sus choferes). vencimiento es el menor de ambos.
+    
+    Uso:
+    - Escrito por: apps/scheduling/pronostico.py (recalcular_pronosticos)
+    - Leído por: apps/scheduling/planificador.py, AgendaViewSet.vencimientos
+    """
+    CRITERIOS = (
+        ("FECHA", "Fecha"),
+        ("KILOMETRAJE", "Kilometraje"),
+    )
+    
+    id = models.BigAutoField(primary_key=True)
+    vehiculo = models.OneToOneField(Vehiculo, on_delete=models.CASCADE, related_name="pronostico_mantencion")
+    
+    # Vencimiento por cada criterio (null si faltan datos)
+    vencimiento_fecha = models.DateField(null=True, blank=True)
+    vencimiento_km = models.DateField(null=True, blank=True)
+    
+    # Km hasta la próxima mantención y ritmo mensual usado en la proyección
+    km_restantes = models.PositiveIntegerField(null=True, blank=True)
+    km_mensual = models.PositiveIntegerField(null=True, blank=True)
+    
+    # Menor de ambos vencimientos y criterio que lo define
+    vencimiento = models.DateField(null=True, blank=True)
+    criterio = models.CharField(max_length=20, choices=CRITERIOS, blank=True)
+    
+    calculado_en = models.DateTimeField()
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=["vencimiento"]),  # "Vencen en los próximos N días"
+        ]
+    
+    def __str__(self):
+        return f"Pronóstico {self.vehiculo_id}: {self.vencimiento} ({self.criterio or 'sin datos'})"
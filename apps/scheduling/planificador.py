@@ -0,0 +1,260 @@
+# apps/scheduling/planificador.py
+"""
+Planificación automática de mantenciones preventivas.
+
+Propone una agenda para los vehículos cuya mantención vence dentro del
+horizonte, respetando:
+- cupos por (día, zona) de CupoDiario (días sin fila: cupos por defecto)
+- dotación de mecánicos: mecánicos activos × MANTENCIONES_POR_MECANICO_DIA
+  por día, descontando lo ya agendado
+- disponibilidad del vehículo: sin OT abierta ni agenda activa, no dado de baja
+- backups: por (site, día) no se retiran más vehículos que los de respaldo
+  libres del site (los vehículos de respaldo no necesitan backup)
+
+El vencimiento de cada vehículo sale de PronosticoMantencion
+(apps/scheduling/pronostico.py), recalculado cada noche para toda la flota
+y, al confirmar un plan, solo para la zona planificada.
+
+Heurística: se ordenan los vehículos por vencimiento (los vencidos primero)
+y cada uno toma el primer día hábil con capacidad desde
+ANTICIPACION_DIAS antes de su vencimiento. Todo se carga con un número fijo
+de consultas y se asigna en memoria; confirmar reserva los cupos en bloque y
+crea las agendas con bulk_create.
+
+Relaciones:
+- Usado por: apps/scheduling/views.py (AgendaViewSet.planificar)
+- Usa: apps/scheduling/cupos.py (reservar_cupos)
+- Usa: apps/scheduling/pronostico.py (vencimientos)
+- Lee: Vehiculo, BackupVehiculo, OrdenTrabajo, User (mecánicos)
+"""
+
+import bisect
+from collections import Counter, defaultdict
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Count, Exists, F, OuterRef, Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from apps.core.fechas import filtro_dias_locales
+from apps.users.models import User
+from apps.vehicles.models import Vehiculo
+from apps.workorders.models import OrdenTrabajo
+from .cupos import CUPOS_POR_DEFECTO, reservar_cupos
+from .models import Agenda, CupoDiario
+from .pronostico import recalcular_pronosticos
+
+# Horizonte por defecto y máximo de la planificación (días)
+HORIZONTE_DIAS = 90
+MAX_HORIZONTE_DIAS = 180
+
+# Días antes del vencimiento desde los que se puede agendar
+ANTICIPACION_DIAS = 7
+
+# Mantenciones que un mecánico atiende por día
+MANTENCIONES_POR_MECANICO_DIA = 2
+
+# Días hábiles del taller (lunes=0 ... viernes=4) y horario de las agendas
+DIAS_HABILES = (0, 1, 2, 3, 4)
+HORA_INICIO = 8
+HORAS_JORNADA = 9
+
+ESTADOS_AGENDA_ACTIVA = ("PROGRAMADA", "CONFIRMADA", "EN_PROCESO", "REPROGRAMADA")
+ESTADOS_OT_CERRADA = ("CERRADA", "ANULADA")
+
+MOTIVO_AGENDA = "Mantención preventiva (planificación automática)"
+
+
+def _es_respaldo(vehiculo):
+    return "RESPALDO" in (vehiculo["categoria"], vehiculo["tipo"])
+
+
+def _vehiculos_disponibles(zona, hasta):
+    """
+    Vehículos que pueden ir al taller (sin baja, sin OT abierta, sin agenda
+    activa) con vencimiento hasta `hasta` o sin pronóstico.
+    """
+    queryset = Vehiculo.objects.exclude(estado="BAJA").filter(
+        Q(pronostico_mantencion__vencimiento__lte=hasta) | Q(pronostico_mantencion__vencimiento__isnull=True),
+        ~Exists(OrdenTrabajo.objects.filter(vehiculo=OuterRef("pk")).exclude(estado__in=ESTADOS_OT_CERRADA)),
+        ~Exists(Agenda.objects.filter(vehiculo=OuterRef("pk"), estado__in=ESTADOS_AGENDA_ACTIVA)),
+    )
+    if zona is not None:
+        queryset = queryset.filter(zona=zona)
+    return queryset.values(
+        "id", "patente", "zona", "site", "categoria", "tipo",
+        vencimiento=F("pronostico_mantencion__vencimiento"),
+        criterio=F("pronostico_mantencion__criterio"),
+    )
+
+
+def _backups_libres():
+    """Vehículos de respaldo operativos sin backup activo, por site."""
+    return Counter(
+        dict(
+            Vehiculo.objects.filter(
+                Q(categoria="RESPALDO") | Q(tipo="RESPALDO"),
+                estado="ACTIVO",
+                estado_operativo="OPERATIVO",
+            )
+            .exclude(backups_asignados__estado="ACTIVO")
+            .values("site")
+            .annotate(n=Count("id"))
+            .values_list("site", "n")
+        )
+    )
+
+
+def planificar(hoy=None, dias=HORIZONTE_DIAS, zona=None, requiere_backup=True, recalcular=True):
+    """
+    Propone agendas de mantención preventiva para los próximos `dias` días.
+
+    No crea agendas (ver confirmar_plan()); con recalcular=True actualiza los
+    pronósticos de la zona (o de toda la flota si zona es None).
+
+    Parámetros:
+    - hoy: Día local desde el que se planifica (se agenda desde el día siguiente)
+    - zona: Solo vehículos de esa zona (None = todas)
+    - requiere_backup: Limitar por los vehículos de respaldo libres del site
+    - recalcular: Recalcular PronosticoMantencion de la zona antes de planificar
+
+    Retorna:
+    - {
+        "desde": date, "hasta": date,
+        "asignadas": [{"vehiculo_id", "patente", "zona", "fecha",
+                       "fecha_programada", "vencimiento", "criterio"}, ...],
+        "sin_asignar": [{"vehiculo_id", "patente", "zona", "vencimiento",
+                         "criterio", "motivo"}, ...],
+        "sin_datos": 12   # vehículos sin datos para pronosticar
+      }
+    """
+    hoy = hoy or timezone.localdate()
+    if recalcular:
+        recalcular_pronosticos(hoy, zona=zona)
+    desde, hasta = hoy + timedelta(days=1), hoy + timedelta(days=dias)
+    habiles = [
+        dia for dia in (desde + timedelta(days=n) for n in range((hasta - desde).days + 1))
+        if dia.weekday() in DIAS_HABILES
+    ]
+
+    # Vehículos con vencimiento dentro del horizonte, los más urgentes primero
+    pendientes, sin_datos = [], 0
+    for vehiculo in _vehiculos_disponibles(zona, hasta):
+        if vehiculo["vencimiento"] is None:
+            sin_datos += 1
+        else:
+            pendientes.append((vehiculo["vencimiento"], vehiculo["patente"], vehiculo["criterio"], vehiculo))
+    pendientes.sort(key=lambda p: (p[0], p[1]))
+
+    # Capacidad restante
+    cupos = {
+        (fecha, cupo_zona): max(totales - ocupados, 0)
+        for fecha, cupo_zona, totales, ocupados in CupoDiario.objects.filter(
+            fecha__range=(desde, hasta)
+        ).values_list("fecha", "zona", "cupos_totales", "cupos_ocupados")
+    }
+    mecanicos = User.objects.filter(rol=User.Rol.MECANICO, is_active=True).count()
+    capacidad_taller = defaultdict(lambda: mecanicos * MANTENCIONES_POR_MECANICO_DIA)
+    backups = _backups_libres()
+    backups_dia = {}
+    agendadas = (
+        # Rango sobre la columna (usa el índice); TruncDate solo para agrupar
+        Agenda.objects.filter(filtro_dias_locales("fecha_programada", desde, hasta), estado__in=ESTADOS_AGENDA_ACTIVA)
+        .annotate(dia=TruncDate("fecha_programada"))
+        .values("dia", "vehiculo__site")
+        .annotate(n=Count("id"))
+        .values_list("dia", "vehiculo__site", "n")
+    )
+    for dia, site, n in agendadas:
+        capacidad_taller[dia] -= n
+        backups_dia[(dia, site)] = backups_dia.get((dia, site), backups[site]) - n
+
+    asignadas, sin_asignar = [], []
+    asignadas_dia = Counter()
+    for vencimiento, patente, criterio, vehiculo in pendientes:
+        necesita_backup = requiere_backup and not _es_respaldo(vehiculo)
+        inicio = bisect.bisect_left(habiles, vencimiento - timedelta(days=ANTICIPACION_DIAS))
+        for dia in habiles[inicio:]:
+            clave_cupo = (dia, vehiculo["zona"])
+            clave_backup = (dia, vehiculo["site"])
+            if cupos.get(clave_cupo, CUPOS_POR_DEFECTO) <= 0 or capacidad_taller[dia] <= 0:
+                continue
+            if necesita_backup and backups_dia.get(clave_backup, backups[vehiculo["site"]]) <= 0:
+                continue
+            cupos[clave_cupo] = cupos.get(clave_cupo, CUPOS_POR_DEFECTO) - 1
+            capacidad_taller[dia] -= 1
+            if necesita_backup:
+                backups_dia[clave_backup] = backups_dia.get(clave_backup, backups[vehiculo["site"]]) - 1
+            hora = HORA_INICIO + asignadas_dia[dia] % HORAS_JORNADA
+            asignadas_dia[dia] += 1
+            asignadas.append({
+                "vehiculo_id": vehiculo["id"],
+                "patente": patente,
+                "zona": vehiculo["zona"],
+                "fecha": dia,
+                "fecha_programada": timezone.make_aware(datetime.combine(dia, time(hora))),
+                "vencimiento": vencimiento,
+                "criterio": criterio,
+            })
+            break
+        else:
+            sin_asignar.append({
+                "vehiculo_id": vehiculo["id"],
+                "patente": patente,
+                "zona": vehiculo["zona"],
+                "vencimiento": vencimiento,
+                "criterio": criterio,
+                "motivo": "Sin capacidad en el horizonte",
+            })
+
+    return {
+        "desde": desde,
+        "hasta": hasta,
+        "asignadas": asignadas,
+        "sin_asignar": sin_asignar,
+        "sin_datos": sin_datos,
+    }
+
+
+def confirmar_plan(asignadas, coordinador):
+    """
+    Crea las agendas propuestas por planificar() y reserva sus cupos.
+
+    En una transacción: descarta los vehículos que entretanto recibieron una
+    agenda activa, reserva los cupos agrupados por (día, zona) con
+    reservar_cupos (todo o nada) y crea las agendas con bulk_create.
+
+    Retorna:
+    - Lista de Agenda creadas
+
+    Lanza:
+    - SinCupos si algún día/zona se llenó desde que se calculó el plan
+    """
+    with transaction.atomic():
+        ocupados = set(
+            Agenda.objects.filter(
+                vehiculo_id__in=[a["vehiculo_id"] for a in asignadas],
+                estado__in=ESTADOS_AGENDA_ACTIVA,
+            ).values_list("vehiculo_id", flat=True)
+        )
+        asignadas = [a for a in asignadas if a["vehiculo_id"] not in ocupados]
+        if not asignadas:
+            return []
+
+        cupos = reservar_cupos(Counter((a["fecha"], a["zona"]) for a in asignadas))
+        return Agenda.objects.bulk_create(
+            [
+                Agenda(
+                    vehiculo_id=a["vehiculo_id"],
+                    coordinador=coordinador,
+                    fecha_programada=a["fecha_programada"],
+                    motivo=MOTIVO_AGENDA,
+                    tipo_mantenimiento="PREVENTIVO",
+                    zona=a["zona"],
+                    cupo=cupos[(a["fecha"], a["zona"])],
+                )
+                for a in asignadas
+            ],
+            batch_size=1000,
+        )
@@ -0,0 +1,131 @@
+# apps/scheduling/pronostico.py
+"""
+Pronóstico de la próxima mantención preventiva de toda la flota.
+
+recalcular_pronosticos() proyecta, para cada vehículo no dado de baja y en
+una sola sentencia (INSERT ... SELECT ... ON CONFLICT DO UPDATE):
+- por calendario: proxima_revision, o ultima_revision + INTERVALO_DIAS_MANTENCION
+- por kilometraje: el día en que kilometraje_actual llega al próximo múltiplo
+  de INTERVALO_KM_MANTENCION al ritmo de km_mensual_promedio del vehículo
+  (o, si no lo tiene, el promedio de sus choferes activos)
+y guarda ambos y el menor en PronosticoMantencion, indexado por vencimiento.
+Después se borran los pronósticos de los vehículos dados de baja (los
+eliminados se van en cascada). El borrado depende solo del estado del
+vehículo, no de la hora del cálculo, así dos ejecuciones simultáneas no se
+borran entre sí.
+
+Relaciones:
+- Usado por: apps/scheduling/tasks.py (recalcular_pronosticos_mantencion)
+- Usado por: apps/scheduling/planificador.py (vencimientos del plan)
+- Usado por: apps/scheduling/views.py (AgendaViewSet.vencimientos)
+- Lee: Vehiculo, Chofer (km_mensual_promedio)
+"""
+
+from datetime import timedelta
+
+from django.db import connection
+from django.utils import timezone
+
+from apps.drivers.models import Chofer
+from apps.vehicles.models import Vehiculo
+from .models import PronosticoMantencion
+
+# Mantención preventiva cada cuántos km y, sin proxima_revision, cada cuántos días
+INTERVALO_KM_MANTENCION = 10_000
+INTERVALO_DIAS_MANTENCION = 180
+
+SQL_PRONOSTICO = """
+    WITH ritmo_choferes AS (
+        SELECT vehiculo_asignado_id AS vehiculo_id, ROUND(AVG(km_mensual_promedio))::int AS km_mensual
+        FROM {chofer}
+        WHERE activo AND vehiculo_asignado_id IS NOT NULL AND km_mensual_promedio > 0
+        GROUP BY 1
+    ), base AS (
+        SELECT v.id AS vehiculo_id,
+               COALESCE(v.proxima_revision, v.ultima_revision + %(intervalo_dias)s) AS vencimiento_fecha,
+               %(intervalo_km)s - v.kilometraje_actual %% %(intervalo_km)s AS km_restantes,
+               COALESCE(NULLIF(v.km_mensual_promedio, 0), c.km_mensual) AS km_mensual
+        FROM {vehiculo} v
+        LEFT JOIN ritmo_choferes c ON c.vehiculo_id = v.id
+        WHERE v.estado <> 'BAJA'{filtro}
+    ), proyeccion AS (
+        SELECT base.*,
+               %(hoy)s::date + CEIL(km_restantes * 30.0 / km_mensual)::int AS vencimiento_km
+        FROM base
+    )
+    INSERT INTO {tabla} (vehiculo_id, vencimiento_fecha, vencimiento_km, km_restantes,
+                         km_mensual, vencimiento, criterio, calculado_en)
+    SELECT vehiculo_id, vencimiento_fecha, vencimiento_km, km_restantes, km_mensual,
+           LEAST(vencimiento_fecha, vencimiento_km),
+           CASE
+               WHEN vencimiento_km < vencimiento_fecha
+                    OR (vencimiento_fecha IS NULL AND vencimiento_km IS NOT NULL) THEN 'KILOMETRAJE'
+               WHEN vencimiento_fecha IS NOT NULL THEN 'FECHA'
+               ELSE ''
+           END,
+           %(ahora)s
+    FROM proyeccion
+    ON CONFLICT (vehiculo_id) DO UPDATE SET
+        vencimiento_fecha = EXCLUDED.vencimiento_fecha,
+        vencimiento_km = EXCLUDED.vencimiento_km,
+        km_restantes = EXCLUDED.km_restantes,
+        km_mensual = EXCLUDED.km_mensual,
+        vencimiento = EXCLUDED.vencimiento,
+        criterio = EXCLUDED.criterio,
+        calculado_en = EXCLUDED.calculado_en
+"""
+
+
+def recalcular_pronosticos(hoy=None, zona=None):
+    """
+    Recalcula PronosticoMantencion para toda la flota o solo una zona.
+
+    Parámetros:
+    - hoy: Día local desde el que se proyecta el kilometraje (default: hoy)
+    - zona: Solo vehículos de esa zona (None = toda la flota)
+
+    Retorna:
+    - Cantidad de vehículos con pronóstico
+    """
+    hoy = hoy or timezone.localdate()
+    ahora = timezone.now()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            SQL_PRONOSTICO.format(
+                tabla=PronosticoMantencion._meta.db_table,
+                vehiculo=Vehiculo._meta.db_table,
+                chofer=Chofer._meta.db_table,
+                filtro=" AND v.zona = %(zona)s" if zona is not None else "",
+            ),
+            {
+                "hoy": hoy,
+                "zona": zona,
+                "ahora": ahora,
+                "intervalo_km": INTERVALO_KM_MANTENCION,
+                "intervalo_dias": INTERVALO_DIAS_MANTENCION,
+            },
+        )
+        total = cursor.rowcount
+
+    # Vehículos dados de baja desde el cálculo anterior
+    bajas = PronosticoMantencion.objects.filter(vehiculo__estado="BAJA")
+    if zona is not None:
+        bajas = bajas.filter(vehiculo__zona=zona)
+    bajas.delete()
+    return total
+
+
+def vencen_en(dias, hoy=None, zona=None):
+    """
+    Vehículos cuya mantención vence en los próximos `dias` días (incluye vencidas).
+
+    Retorna:
+    - QuerySet de PronosticoMantencion por vencimiento, con el vehículo
+    """
+    hoy = hoy or timezone.localdate()
+    queryset = PronosticoMantencion.objects.select_related("vehiculo").filter(
+        vencimiento__lte=hoy + timedelta(days=dias)
+    )
+    if zona is not None:
+        queryset = queryset.filter(vehiculo__zona=zona)
+    return queryset.order_by("vencimiento", "vehiculo__patente")
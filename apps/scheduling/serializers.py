@@ -13,9 +13,10 @@ class AgendaSerializer(serializers.ModelSerializer):
         fields = [
             "id", "vehiculo", "vehiculo_info", "coordinador", "coordinador_nombre",
             "fecha_programada", "motivo", "tipo_mantenimiento", "zona",
-            "estado", "observaciones", "ot_asociada", "created_at", "updated_at"
+            "estado", "observaciones", "ot_asociada", "cupo", "created_at", "updated_at"
         ]
-        read_only_fields = ["id", "created_at", "updated_at", "ot_asociada"]
+        # coordinador lo asigna perform_create con el usuario autenticado
+        read_only_fields = ["id", "coordinador", "created_at", "updated_at", "ot_asociada", "cupo"]
 
 
 class AgendaListSerializer(serializers.ModelSerializer):
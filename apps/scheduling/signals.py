@@ -0,0 +1,31 @@
+# apps/scheduling/signals.py
+"""
+Señales de la app de agenda.
+
+Invalidan el calendario de disponibilidad (apps/scheduling/disponibilidad.py)
+cuando se guarda o elimina un CupoDiario, tras el commit: si se borrara
+antes, otra solicitud podría volver a cachear la disponibilidad previa al
+commit (cupos_ocupados cambia bajo select_for_update). Las reservas de
+apps/scheduling/cupos.py usan UPDATE condicionales, que no disparan señales,
+e invalidan por su cuenta.
+
+Se registran en SchedulingConfig.ready() (apps/scheduling/apps.py).
+"""
+
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .disponibilidad import invalidar_disponibilidad
+from .models import CupoDiario
+
+
+@receiver(post_save, sender=CupoDiario)
+@receiver(post_delete, sender=CupoDiario)
+def invalidar_disponibilidad_cupo(sender, instance, **kwargs):
+    """
+    Invalida el mes del cupo al crearlo, modificarlo o eliminarlo.
+    """
+    transaction.on_commit(partial(invalidar_disponibilidad, instance.fecha, instance.zona))
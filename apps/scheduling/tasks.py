@@ -0,0 +1,23 @@
+# apps/scheduling/tasks.py
+"""
+Tareas Celery de la app de agenda.
+
+- recalcular_pronosticos_mantencion: próxima mantención preventiva de toda
+  la flota (programada en CELERY_BEAT_SCHEDULE, pgf_core/settings/dev.py)
+"""
+
+from celery import shared_task
+
+
+@shared_task
+def recalcular_pronosticos_mantencion():
+    """
+    Recalcula PronosticoMantencion para toda la flota (ver
+    apps/scheduling/pronostico.py).
+
+    Retorna:
+    - dict con la cantidad de vehículos con pronóstico
+    """
+    from .pronostico import recalcular_pronosticos
+
+    return {"vehiculos": recalcular_pronosticos()}
@@ -0,0 +1,296 @@
+# apps/scheduling/tests/test_cupos.py
+"""
+Tests para la reserva atómica de cupos diarios y las acciones de agenda.
+"""
+
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from django.db import connection
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from apps.scheduling import cupos
+from apps.scheduling.models import Agenda, CupoDiario
+from apps.users.models import User
+from apps.vehicles.models import Vehiculo
+
+MANANA = timezone.localdate() + timedelta(days=1)
+PASADO = MANANA + timedelta(days=1)
+
+
+def _a_las(dia, hora):
+    return timezone.make_aware(datetime.combine(dia, datetime.min.time()) + timedelta(hours=hora))
+
+
+@pytest.fixture
+def coordinador(db):
+    return User.objects.create_user(
+        username="coordinador_test",
+        email="coordinador@test.com",
+        password="testpass123",
+        rol=User.Rol.COORDINADOR_ZONA,
+        is_active=True,
+        rut="11111111-1",
+    )
+
+
+@pytest.fixture
+def coordinador_client(coordinador):
+    client = APIClient()
+    client.force_authenticate(user=coordinador)
+    return client
+
+
+@pytest.fixture
+def crear_vehiculo(supervisor_user):
+    def crear(patente):
+        return Vehiculo.objects.create(
+            patente=patente, marca="Toyota", modelo="Hilux", anio=2020,
+            site="SITE_TEST", supervisor=supervisor_user,
+        )
+    return crear
+
+
+def _ocupados(fecha, zona=""):
+    return CupoDiario.objects.get(fecha=fecha, zona=zona).cupos_ocupados
+
+
+@pytest.mark.django_db
+@pytest.mark.service
+class TestReservarCupo:
+    """Tests para reservar_cupo, liberar_cupo y mover_reserva"""
+
+    def test_crea_y_reserva(self):
+        """Test que el primer uso crea el cupo con el total por defecto"""
+        cupo = cupos.reservar_cupo(MANANA)
+        assert (cupo.cupos_totales, cupo.cupos_ocupados) == (cupos.CUPOS_POR_DEFECTO, 1)
+
+    def test_dia_lleno(self):
+        """Test que sin cupos lanza SinCupos y no sobrepasa el total"""
+        CupoDiario.objects.create(fecha=MANANA, cupos_totales=1)
+        cupos.reservar_cupo(MANANA)
+        with pytest.raises(cupos.SinCupos):
+            cupos.reservar_cupo(MANANA)
+        assert _ocupados(MANANA) == 1
+
+    def test_zonas_independientes(self):
+        """Test que cada zona tiene su propio cupo para el mismo día"""
+        CupoDiario.objects.create(fecha=MANANA, zona="Norte", cupos_totales=1)
+        cupos.reservar_cupo(MANANA, "Norte")
+        cupos.reservar_cupo(MANANA, "Sur")
+        with pytest.raises(cupos.SinCupos):
+            cupos.reservar_cupo(MANANA, "Norte")
+        assert CupoDiario.objects.filter(fecha=MANANA).count() == 2
+
+    def test_liberar_no_baja_de_cero(self):
+        """Test que liberar un cupo vacío no lo deja negativo"""
+        cupo = CupoDiario.objects.create(fecha=MANANA)
+        assert cupos.liberar_cupo(cupo.pk) is False
+        assert cupos.liberar_cupo(None) is False
+        assert _ocupados(MANANA) == 0
+
+    def test_mover_destino_lleno_no_cambia_origen(self):
+        """Test que si el destino está lleno el origen mantiene su reserva"""
+        origen = cupos.reservar_cupo(MANANA)
+        CupoDiario.objects.create(fecha=PASADO, cupos_totales=0)
+        with pytest.raises(cupos.SinCupos):
+            cupos.mover_reserva(origen.pk, PASADO)
+        assert _ocupados(MANANA) == 1
+
+    def test_mover(self):
+        """Test que mover ocupa el destino y libera el origen"""
+        origen = cupos.reservar_cupo(MANANA)
+        destino = cupos.mover_reserva(origen.pk, PASADO)
+        assert (_ocupados(MANANA), _ocupados(PASADO)) == (0, 1)
+        assert cupos.mover_reserva(destino.pk, PASADO).pk == destino.pk
+        assert _ocupados(PASADO) == 1
+
+
+def _en_paralelo(funcion, argumentos):
+    """Ejecuta funcion(*args) en un hilo por elemento, liberados a la vez."""
+    barrera = threading.Barrier(len(argumentos))
+    resultados = [None] * len(argumentos)
+
+    def ejecutar(indice, args):
+        try:
+            barrera.wait()
+            resultados[indice] = funcion(*args)
+        except Exception as e:  # noqa: BLE001 - se inspecciona en el test
+            resultados[indice] = e
+        finally:
+            connection.close()
+
+    hilos = [threading.Thread(target=ejecutar, args=(i, a)) for i, a in enumerate(argumentos)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    return resultados
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.service
+@pytest.mark.slow
+class TestConcurrencia:
+    """Reservas concurrentes sobre el mismo día"""
+
+    def test_no_sobrevende(self):
+        """
+        Test que 20 reservas concurrentes sobre un día sin fila creada (se
+        crea en la carrera) con 5 cupos reservan exactamente 5.
+        """
+        resultados = _en_paralelo(cupos.reservar_cupo, [(MANANA, "Norte")] * 20)
+        assert not [r for r in resultados if not isinstance(r, (CupoDiario, cupos.SinCupos))]
+        assert sum(isinstance(r, CupoDiario) for r in resultados) == cupos.CUPOS_POR_DEFECTO
+        assert _ocupados(MANANA, "Norte") == cupos.CUPOS_POR_DEFECTO
+
+    def test_mover_y_liberar_concurrente(self):
+        """Test que mover reservas en paralelo conserva el total ocupado"""
+        origenes = [cupos.reservar_cupo(MANANA).pk for _ in range(8)]
+        CupoDiario.objects.create(fecha=PASADO, cupos_totales=3)
+
+        resultados = _en_paralelo(cupos.mover_reserva, [(pk, PASADO) for pk in origenes])
+
+        movidas = sum(isinstance(r, CupoDiario) for r in resultados)
+        assert movidas == 3
+        assert (_ocupados(MANANA), _ocupados(PASADO)) == (5, 3)
+
+    def test_misma_agenda_concurrente(self, coordinador, vehiculo):
+        """Test que dos reservas simultáneas del mismo vehículo y día crean una sola agenda"""
+        def crear():
+            client = APIClient()
+            client.force_authenticate(user=coordinador)
+            return client.post("/api/v1/scheduling/agendas/", {
+                "vehiculo": str(vehiculo.id), "fecha_programada": _a_las(MANANA, 10).isoformat(), "motivo": "PM",
+            }, format="json").status_code
+
+        assert sorted(_en_paralelo(crear, [()] * 2)) == [201, 400]
+        assert Agenda.objects.count() == 1
+        assert _ocupados(MANANA) == 1
+
+
+@pytest.mark.django_db
+@pytest.mark.view
+@pytest.mark.api
+class TestAgendaCupos:
+    """Tests para crear, reprogramar y cancelar agendas con cupos"""
+
+    URL = "/api/v1/scheduling/agendas/"
+
+    def _crear(self, client, vehiculo, dia, zona=""):
+        return client.post(self.URL, {
+            "vehiculo": str(vehiculo.id),
+            "fecha_programada": _a_las(dia, 10).isoformat(),
+            "motivo": "Mantención",
+            "zona": zona,
+        }, format="json")
+
+    def test_crear_reserva_cupo_de_la_zona(self, coordinador_client, vehiculo):
+        """Test que crear una agenda ocupa el cupo de su día local y zona"""
+        response = self._crear(coordinador_client, vehiculo, MANANA, "Norte")
+        assert response.status_code == status.HTTP_201_CREATED
+        agenda = Agenda.objects.get()
+        assert agenda.cupo == CupoDiario.objects.get(fecha=MANANA, zona="Norte")
+        assert agenda.cupo.cupos_ocupados == 1
+
+    def test_crear_sin_cupos(self, coordinador_client, crear_vehiculo):
+        """Test que un día lleno rechaza la agenda sin crearla"""
+        CupoDiario.objects.create(fecha=MANANA, cupos_totales=1)
+        assert self._crear(coordinador_client, crear_vehiculo("AAAA11"), MANANA).status_code == 201
+        response = self._crear(coordinador_client, crear_vehiculo("BBBB22"), MANANA)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert Agenda.objects.count() == 1
+        assert _ocupados(MANANA) == 1
+
+    def test_reprogramar_mueve_cupo(self, coordinador_client, vehiculo):
+        """Test que reprogramar traslada el cupo al nuevo día"""
+        agenda_id = self._crear(coordinador_client, vehiculo, MANANA).data["id"]
+        response = coordinador_client.post(
+            f"{self.URL}{agenda_id}/reprogramar/",
+            {"fecha_programada": _a_las(PASADO, 9).isoformat()}, format="json",
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["estado"] == "REPROGRAMADA"
+        assert (_ocupados(MANANA), _ocupados(PASADO)) == (0, 1)
+
+    def test_reprogramar_dia_lleno(self, coordinador_client, vehiculo):
+        """Test que reprogramar a un día lleno deja la agenda como estaba"""
+        agenda_id = self._crear(coordinador_client, vehiculo, MANANA).data["id"]
+        CupoDiario.objects.create(fecha=PASADO, cupos_totales=0)
+        response = coordinador_client.post(
+            f"{self.URL}{agenda_id}/reprogramar/",
+            {"fecha_programada": _a_las(PASADO, 9).isoformat()}, format="json",
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        agenda = Agenda.objects.get(pk=agenda_id)
+        assert (agenda.estado, timezone.localdate(agenda.fecha_programada)) == ("PROGRAMADA", MANANA)
+        assert _ocupados(MANANA) == 1
+
+    def test_cancelar_libera_una_vez(self, coordinador_client, vehiculo):
+        """Test que cancelar libera el cupo y una segunda cancelación no lo vuelve a liberar"""
+        self._crear(coordinador_client, vehiculo, MANANA)
+        CupoDiario.objects.filter(fecha=MANANA).update(cupos_ocupados=3)
+        agenda = Agenda.objects.get()
+
+        response = coordinador_client.post(f"{self.URL}{agenda.id}/cancelar/")
+        assert response.status_code == status.HTTP_200_OK
+        response = coordinador_client.post(f"{self.URL}{agenda.id}/cancelar/")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert _ocupados(MANANA) == 2
+        assert Agenda.objects.get().cupo is None
+
+    def test_editar_zona_mueve_cupo(self, coordinador_client, vehiculo):
+        """Test que editar la zona traslada la reserva al cupo de la nueva zona"""
+        agenda_id = self._crear(coordinador_client, vehiculo, MANANA).data["id"]
+        response = coordinador_client.patch(f"{self.URL}{agenda_id}/", {"zona": "Sur"}, format="json")
+        assert response.status_code == status.HTTP_200_OK
+        assert (_ocupados(MANANA), _ocupados(MANANA, "Sur")) == (0, 1)
+
+    def test_editar_fecha_verifica_solapamiento(self, coordinador_client, vehiculo):
+        """Test que editar la fecha a un día con otra agenda activa del vehículo se rechaza"""
+        self._crear(coordinador_client, vehiculo, MANANA)
+        agenda_id = self._crear(coordinador_client, vehiculo, PASADO).data["id"]
+
+        response = coordinador_client.patch(
+            f"{self.URL}{agenda_id}/", {"fecha_programada": _a_las(MANANA, 15).isoformat()}, format="json"
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert (_ocupados(MANANA), _ocupados(PASADO)) == (1, 1)
+
+        # Otra hora del mismo día no choca consigo misma
+        response = coordinador_client.patch(
+            f"{self.URL}{agenda_id}/", {"fecha_programada": _a_las(PASADO, 15).isoformat()}, format="json"
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_eliminar_libera_cupo(self, coordinador_client, vehiculo):
+        """Test que eliminar una agenda devuelve su cupo"""
+        agenda_id = self._crear(coordinador_client, vehiculo, MANANA).data["id"]
+        response = coordinador_client.delete(f"{self.URL}{agenda_id}/")
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert _ocupados(MANANA) == 0
+
+
+@pytest.mark.django_db
+@pytest.mark.service
+def test_migracion_vincula_por_fecha_y_zona(crear_vehiculo, coordinador):
+    """Test que la migración 0002 vincula cada agenda al cupo de su zona"""
+    from importlib import import_module
+    from django.apps import apps
+
+    migracion = import_module("apps.scheduling.migrations.0002_cupos_por_zona")
+    general = CupoDiario.objects.create(fecha=MANANA, zona="", cupos_ocupados=4)
+    norte = CupoDiario.objects.create(fecha=MANANA, zona="Norte", cupos_ocupados=4)
+    for i, zona in enumerate(("Norte", "Norte", "Sur")):
+        Agenda.objects.create(
+            vehiculo=crear_vehiculo(f"MIGR{i:02d}"), coordinador=coordinador, fecha_programada=_a_las(MANANA, 10), motivo="PM", zona=zona
+        )
+
+    migracion.vincular_agendas(apps, None)
+
+    assert Agenda.objects.filter(cupo=norte).count() == 2
+    assert not Agenda.objects.filter(zona="Sur", cupo__isnull=False).exists()
+    assert (_ocupados(MANANA), _ocupados(MANANA, "Norte")) == (0, 2)
+    assert general.agendas.count() == 0
@@ -0,0 +1,116 @@
+# apps/scheduling/tests/test_disponibilidad.py
+"""
+Tests para el calendario de disponibilidad de cupos.
+"""
+
+from datetime import date
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from apps.scheduling import cupos
+from apps.scheduling.disponibilidad import disponibilidad
+from apps.scheduling.models import CupoDiario
+
+URL = "/api/v1/scheduling/agendas/disponibilidad/"
+
+
+@pytest.fixture(autouse=True)
+def limpiar_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.mark.django_db
+@pytest.mark.service
+class TestDisponibilidad:
+    """Tests para disponibilidad()"""
+
+    def test_rango_sin_escrituras(self):
+        """Test que completa los días sin cupo con valores por defecto sin crear filas"""
+        CupoDiario.objects.create(fecha=date(2030, 3, 10), cupos_totales=4, cupos_ocupados=3)
+        CupoDiario.objects.create(fecha=date(2030, 3, 10), zona="Norte", cupos_totales=1, cupos_ocupados=1)
+
+        with CaptureQueriesContext(connection) as ctx:
+            dias = disponibilidad(date(2030, 3, 1), date(2030, 3, 31))
+        assert len(ctx.captured_queries) == 1
+        assert CupoDiario.objects.count() == 2
+
+        assert len(dias) == 31
+        assert dias[9] == {"fecha": "2030-03-10", "cupos_totales": 4, "cupos_ocupados": 3, "cupos_disponibles": 1}
+        assert dias[0]["cupos_disponibles"] == cupos.CUPOS_POR_DEFECTO
+
+    def test_cache_por_mes(self):
+        """Test que la segunda lectura del mes no consulta la base y un rango recorta los días"""
+        disponibilidad(date(2030, 3, 1), date(2030, 3, 31))
+        with CaptureQueriesContext(connection) as ctx:
+            dias = disponibilidad(date(2030, 3, 5), date(2030, 3, 7))
+        assert len(ctx.captured_queries) == 0
+        assert [d["fecha"] for d in dias] == ["2030-03-05", "2030-03-06", "2030-03-07"]
+
+    def test_meses_faltantes_en_una_consulta(self):
+        """Test que un rango entre meses calcula los meses faltantes juntos"""
+        disponibilidad(date(2030, 2, 1), date(2030, 2, 28))
+        with CaptureQueriesContext(connection) as ctx:
+            dias = disponibilidad(date(2030, 1, 30), date(2030, 3, 2))
+        assert len(ctx.captured_queries) == 1
+        assert (dias[0]["fecha"], dias[-1]["fecha"], len(dias)) == ("2030-01-30", "2030-03-02", 32)
+
+    def test_reserva_invalida_el_mes(self, django_capture_on_commit_callbacks):
+        """Test que reservar y liberar invalidan el mes en caché de su zona"""
+        disponibilidad(date(2030, 3, 1), date(2030, 3, 31), "Norte")
+        with django_capture_on_commit_callbacks(execute=True):
+            cupo = cupos.reservar_cupo(date(2030, 3, 10), "Norte")
+        assert disponibilidad(date(2030, 3, 10), date(2030, 3, 10), "Norte")[0]["cupos_ocupados"] == 1
+
+        with django_capture_on_commit_callbacks(execute=True):
+            cupos.liberar_cupo(cupo.pk)
+        assert disponibilidad(date(2030, 3, 10), date(2030, 3, 10), "Norte")[0]["cupos_ocupados"] == 0
+
+    def test_editar_cupo_invalida(self, django_capture_on_commit_callbacks):
+        """Test que modificar un CupoDiario (admin) invalida el mes tras el commit"""
+        cupo = CupoDiario.objects.create(fecha=date(2030, 3, 10))
+        disponibilidad(date(2030, 3, 1), date(2030, 3, 31))
+        cupo.cupos_totales = 2
+        with django_capture_on_commit_callbacks(execute=True):
+            cupo.save()
+            # Antes del commit se sigue sirviendo el mes en caché
+            assert disponibilidad(date(2030, 3, 10), date(2030, 3, 10))[0]["cupos_totales"] != 2
+        assert disponibilidad(date(2030, 3, 10), date(2030, 3, 10))[0]["cupos_totales"] == 2
+
+
+@pytest.mark.django_db
+@pytest.mark.view
+@pytest.mark.api
+class TestDisponibilidadView:
+    """Tests para GET /scheduling/agendas/disponibilidad/"""
+
+    def test_mes_por_defecto(self, authenticated_client):
+        """Test que solo con desde retorna hasta fin de mes"""
+        response = authenticated_client.get(URL, {"desde": "2030-02-10", "zona": "Sur"})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["zona"] == "Sur"
+        assert response.data["hasta"] == date(2030, 2, 28)
+        assert len(response.data["dias"]) == 19
+        assert not CupoDiario.objects.exists()
+
+    def test_fecha_unica(self, authenticated_client):
+        """Test que ?fecha mantiene el formato de un día sin crear el cupo"""
+        response = authenticated_client.get(URL, {"fecha": "2030-02-10"})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["cupos_disponibles"] == cupos.CUPOS_POR_DEFECTO
+        assert not CupoDiario.objects.exists()
+
+    @pytest.mark.parametrize("params", [
+        {},
+        {"desde": "10-02-2030"},
+        {"desde": "2030-02-10", "hasta": "2030-02-01"},
+        {"desde": "2030-01-01", "hasta": "2030-12-31"},
+    ])
+    def test_parametros_invalidos(self, authenticated_client, params):
+        """Test que faltantes, formato inválido, rango invertido o excesivo retornan 400"""
+        response = authenticated_client.get(URL, params)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,210 @@
+# apps/scheduling/tests/test_planificador.py
+"""
+Tests para la planificación automática de mantenciones preventivas.
+"""
+
+from datetime import date, datetime, timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from apps.scheduling import planificador
+from apps.scheduling.models import Agenda, CupoDiario, PronosticoMantencion
+from apps.scheduling.pronostico import recalcular_pronosticos
+from apps.users.models import User
+from apps.vehicles.models import Vehiculo
+from apps.workorders.models import OrdenTrabajo
+
+# Domingo: el primer día planificable es el lunes 2030-03-04
+HOY = date(2030, 3, 3)
+LUNES, MARTES = date(2030, 3, 4), date(2030, 3, 5)
+
+
+@pytest.fixture
+def crear_vehiculo(db):
+    def crear(patente, zona="Norte", site="STGO", **campos):
+        campos.setdefault("proxima_revision", LUNES)
+        return Vehiculo.objects.create(patente=patente, zona=zona, site=site, **campos)
+    return crear
+
+
+@pytest.fixture
+def mecanicos(db):
+    """Dos mecánicos activos: 4 mantenciones por día."""
+    return [
+        User.objects.create_user(
+            username=f"mec{i}", email=f"mec{i}@test.com", password="x", rol=User.Rol.MECANICO, rut=f"2000000{i}-{i}"
+        )
+        for i in range(2)
+    ]
+
+
+def _fechas(plan):
+    return {a["patente"]: a["fecha"] for a in plan["asignadas"]}
+
+
+@pytest.mark.django_db
+@pytest.mark.service
+class TestPlanificar:
+    """Tests para planificar"""
+
+    def test_respeta_cupo_de_la_zona(self, crear_vehiculo, mecanicos):
+        """Test que el más urgente toma el día y el resto pasa al siguiente con cupo"""
+        CupoDiario.objects.create(fecha=LUNES, zona="Norte", cupos_totales=1)
+        crear_vehiculo("AAAA11", proxima_revision=LUNES)
+        crear_vehiculo("BBBB22", proxima_revision=HOY - timedelta(days=10))
+        crear_vehiculo("CCCC33", zona="Sur")
+
+        plan = planificador.planificar(hoy=HOY, dias=30, requiere_backup=False)
+        assert _fechas(plan) == {"BBBB22": LUNES, "AAAA11": MARTES, "CCCC33": LUNES}
+
+    def test_dotacion_de_mecanicos(self, crear_vehiculo, mecanicos):
+        """Test que no se agendan más mantenciones por día que las que atiende la dotación"""
+        for i in range(6):
+            crear_vehiculo(f"VEH{i:03d}")
+        Agenda.objects.create(
+            vehiculo=crear_vehiculo("YAAG01", proxima_revision=None), coordinador=mecanicos[0],
+            fecha_programada=timezone.make_aware(datetime(2030, 3, 4, 10)), motivo="Ya agendada",
+        )
+
+        plan = planificador.planificar(hoy=HOY, dias=30, requiere_backup=False)
+        por_dia = [a["fecha"] for a in plan["asignadas"]]
+        assert (por_dia.count(LUNES), por_dia.count(MARTES)) == (3, 3)
+
+    def test_excluye_no_disponibles(self, crear_vehiculo, mecanicos, supervisor_user):
+        """Test que se omiten vehículos de baja, con OT abierta o sin datos"""
+        crear_vehiculo("BAJA01", estado="BAJA")
+        OrdenTrabajo.objects.create(vehiculo=crear_vehiculo("OTAB01"), responsable=supervisor_user, motivo="Falla")
+        crear_vehiculo("LEJOS1", proxima_revision=HOY + timedelta(days=200))
+        crear_vehiculo("SINDAT", proxima_revision=None)
+        crear_vehiculo("OK0001")
+
+        plan = planificador.planificar(hoy=HOY, dias=30, requiere_backup=False)
+        assert list(_fechas(plan)) == ["OK0001"]
+        assert plan["sin_datos"] == 1
+
+    def test_backups_por_site(self, crear_vehiculo, mecanicos):
+        """Test que por site y día no se retiran más vehículos que los respaldos libres"""
+        crear_vehiculo("RESP01", categoria="RESPALDO", proxima_revision=None)
+        crear_vehiculo("AAAA11")
+        crear_vehiculo("BBBB22")
+        crear_vehiculo("CCCC33", site="VALPO")
+
+        plan = planificador.planificar(hoy=HOY, dias=30)
+        assert _fechas(plan) == {"AAAA11": LUNES, "BBBB22": MARTES}
+        assert [s["patente"] for s in plan["sin_asignar"]] == ["CCCC33"]
+
+    def test_consultas_constantes(self, crear_vehiculo, mecanicos):
+        """Test que la cantidad de consultas no depende del tamaño de la flota"""
+        crear_vehiculo("AAAA11")
+        with CaptureQueriesContext(connection) as pocos:
+            planificador.planificar(hoy=HOY, requiere_backup=False)
+
+        Vehiculo.objects.bulk_create([
+            Vehiculo(patente=f"FL{i:04d}", zona=f"Z{i % 5}", site="STGO",
+                     kilometraje_actual=i * 37, km_mensual_promedio=1_500)
+            for i in range(2_000)
+        ])
+        with CaptureQueriesContext(connection) as muchos:
+            plan = planificador.planificar(hoy=HOY, requiere_backup=False)
+
+        assert len(muchos.captured_queries) == len(pocos.captured_queries)
+        assert len(plan["asignadas"]) + len(plan["sin_asignar"]) > 100
+
+    def test_agendadas_filtra_por_rango(self, crear_vehiculo, mecanicos):
+        """Test que las agendas del horizonte se filtran por rango sobre fecha_programada (usa el índice)"""
+        crear_vehiculo("AAAA11")
+        with CaptureQueriesContext(connection) as consultas:
+            planificador.planificar(hoy=HOY, requiere_backup=False)
+
+        sql = next(
+            q["sql"] for q in consultas.captured_queries
+            if 'FROM "scheduling_agenda"' in q["sql"].split("WHERE", 1)[0]
+        )
+        where = sql.split("WHERE", 1)[1].split("GROUP BY", 1)[0]
+        assert '"scheduling_agenda"."fecha_programada" >=' in where
+        assert '"scheduling_agenda"."fecha_programada" <' in where
+        assert "AT TIME ZONE" not in where
+
+
+@pytest.mark.django_db
+@pytest.mark.view
+@pytest.mark.api
+class TestPlanificarView:
+    """Tests para POST /scheduling/agendas/planificar/"""
+
+    URL = "/api/v1/scheduling/agendas/planificar/"
+
+    @pytest.fixture
+    def coordinador_client(self, db):
+        coordinador = User.objects.create_user(
+            username="coordinador_test", email="coordinador@test.com", password="x",
+            rol=User.Rol.COORDINADOR_ZONA, rut="11111111-1",
+        )
+        client = APIClient()
+        client.force_authenticate(user=coordinador)
+        return client
+
+    def test_propuesta_no_escribe(self, authenticated_client, crear_vehiculo, mecanicos):
+        """Test que sin confirmar solo retorna la propuesta"""
+        crear_vehiculo("AAAA11", proxima_revision=timezone.localdate())
+        recalcular_pronosticos()
+        response = authenticated_client.post(self.URL, {"requiere_backup": False}, format="json")
+        assert response.status_code == status.HTTP_200_OK
+        assert [a["patente"] for a in response.data["asignadas"]] == ["AAAA11"]
+        assert not Agenda.objects.exists()
+
+    def test_propuesta_usa_pronosticos_guardados(self, authenticated_client, crear_vehiculo, mecanicos):
+        """Test que la propuesta no recalcula los pronósticos de la flota"""
+        crear_vehiculo("AAAA11", proxima_revision=timezone.localdate())
+        response = authenticated_client.post(self.URL, {"requiere_backup": False}, format="json")
+        assert (response.data["asignadas"], response.data["sin_datos"]) == ([], 1)
+        assert not PronosticoMantencion.objects.exists()
+
+    def test_confirmar_recalcula_solo_la_zona(self, coordinador_client, crear_vehiculo, mecanicos):
+        """Test que confirmar recalcula los pronósticos de la zona pedida"""
+        crear_vehiculo("AAAA11", proxima_revision=timezone.localdate())
+        crear_vehiculo("SUR001", zona="Sur", proxima_revision=timezone.localdate())
+
+        response = coordinador_client.post(
+            self.URL, {"requiere_backup": False, "confirmar": True, "zona": "Norte"}, format="json"
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        assert [a["patente"] for a in response.data["asignadas"]] == ["AAAA11"]
+        assert list(PronosticoMantencion.objects.values_list("vehiculo__patente", flat=True)) == ["AAAA11"]
+
+    def test_confirmar_crea_y_reserva(self, coordinador_client, crear_vehiculo, mecanicos):
+        """Test que confirmar crea las agendas y ocupa sus cupos"""
+        for patente in ("AAAA11", "BBBB22"):
+            crear_vehiculo(patente, proxima_revision=timezone.localdate())
+
+        response = coordinador_client.post(
+            self.URL, {"requiere_backup": False, "confirmar": True, "dias": 30}, format="json"
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data["creadas"] == 2
+        agendas = list(Agenda.objects.select_related("cupo"))
+        assert {a.estado for a in agendas} == {"PROGRAMADA"}
+        assert sum(c.cupos_ocupados for c in CupoDiario.objects.all()) == 2
+        assert all(a.cupo.fecha == timezone.localdate(a.fecha_programada) for a in agendas)
+
+        # Los vehículos ya agendados no vuelven a proponerse
+        response = coordinador_client.post(self.URL, {"requiere_backup": False}, format="json")
+        assert response.data["asignadas"] == []
+
+    def test_solo_coordinador_confirma(self, authenticated_client, mecanico_user):
+        """Test que admin no confirma y un mecánico no planifica"""
+        response = authenticated_client.post(self.URL, {"confirmar": True}, format="json")
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+        client = APIClient()
+        client.force_authenticate(user=mecanico_user)
+        assert client.post(self.URL, {}, format="json").status_code == status.HTTP_403_FORBIDDEN
+
+    def test_horizonte_invalido(self, authenticated_client):
+        """Test que un horizonte fuera de rango retorna 400"""
+        response = authenticated_client.post(self.URL, {"dias": 365}, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,138 @@
+# apps/scheduling/tests/test_pronostico.py
+"""
+Tests para el pronóstico de la próxima mantención preventiva.
+"""
+
+from datetime import date, timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from apps.drivers.models import Chofer
+from apps.scheduling.models import PronosticoMantencion
+from apps.scheduling.pronostico import recalcular_pronosticos, vencen_en
+from apps.scheduling.tasks import recalcular_pronosticos_mantencion
+from apps.vehicles.models import Vehiculo
+
+HOY = date(2030, 3, 3)
+
+
+@pytest.fixture
+def crear_vehiculo(db):
+    def crear(patente, **campos):
+        return Vehiculo.objects.create(patente=patente, **campos)
+    return crear
+
+
+def _pronostico(vehiculo):
+    return PronosticoMantencion.objects.get(vehiculo=vehiculo)
+
+
+@pytest.mark.django_db
+@pytest.mark.service
+class TestRecalcularPronosticos:
+    """Tests para recalcular_pronosticos"""
+
+    def test_menor_entre_fecha_y_kilometraje(self, crear_vehiculo):
+        """Test que gana el criterio que vence primero"""
+        por_km = crear_vehiculo(
+            "AAAA11", proxima_revision=HOY + timedelta(days=60), kilometraje_actual=48_000, km_mensual_promedio=3_000
+        )
+        por_fecha = crear_vehiculo(
+            "BBBB22", proxima_revision=HOY + timedelta(days=5), kilometraje_actual=48_000, km_mensual_promedio=3_000
+        )
+        recalcular_pronosticos(HOY)
+
+        # Faltan 2.000 km a 100 km/día
+        pronostico = _pronostico(por_km)
+        assert (pronostico.vencimiento, pronostico.criterio, pronostico.km_restantes) == (
+            HOY + timedelta(days=20), "KILOMETRAJE", 2_000
+        )
+        assert (_pronostico(por_fecha).vencimiento, _pronostico(por_fecha).criterio) == (HOY + timedelta(days=5), "FECHA")
+
+    def test_ultima_revision_y_ritmo_de_choferes(self, crear_vehiculo):
+        """Test que sin proxima_revision usa ultima_revision + intervalo y el km de los choferes"""
+        vehiculo = crear_vehiculo("CCCC33", ultima_revision=HOY - timedelta(days=170), kilometraje_actual=5_000)
+        for rut, km in (("1-9", 1_000), ("2-7", 2_000)):
+            Chofer.objects.create(nombre_completo=rut, rut=rut, vehiculo_asignado=vehiculo, km_mensual_promedio=km)
+        recalcular_pronosticos(HOY)
+
+        pronostico = _pronostico(vehiculo)
+        assert pronostico.vencimiento_fecha == HOY + timedelta(days=10)
+        assert pronostico.km_mensual == 1_500
+        assert pronostico.vencimiento_km == HOY + timedelta(days=100)
+        assert (pronostico.vencimiento, pronostico.criterio) == (HOY + timedelta(days=10), "FECHA")
+
+    def test_sin_datos_y_bajas(self, crear_vehiculo):
+        """Test que sin datos queda sin vencimiento y las bajas se eliminan"""
+        sin_datos = crear_vehiculo("DDDD44", kilometraje_actual=1_000)
+        baja = crear_vehiculo("EEEE55", proxima_revision=HOY)
+        assert recalcular_pronosticos(HOY) == 2
+        assert (_pronostico(sin_datos).vencimiento, _pronostico(sin_datos).criterio) == (None, "")
+
+        Vehiculo.objects.filter(pk=baja.pk).update(estado="BAJA")
+        assert recalcular_pronosticos_mantencion() == {"vehiculos": 1}
+        assert not PronosticoMantencion.objects.filter(vehiculo=baja).exists()
+
+    def test_por_zona_no_toca_el_resto(self, crear_vehiculo):
+        """Test que recalcular una zona no borra ni actualiza los pronósticos de otras"""
+        norte = crear_vehiculo("NORT01", zona="Norte", proxima_revision=HOY)
+        sur = crear_vehiculo("SUR001", zona="Sur", proxima_revision=HOY)
+        recalcular_pronosticos(HOY)
+        calculado_sur = _pronostico(sur).calculado_en
+
+        Vehiculo.objects.filter(pk__in=(norte.pk, sur.pk)).update(proxima_revision=HOY + timedelta(days=7))
+        assert recalcular_pronosticos(HOY, zona="Norte") == 1
+        assert _pronostico(norte).vencimiento == HOY + timedelta(days=7)
+        assert (_pronostico(sur).vencimiento, _pronostico(sur).calculado_en) == (HOY, calculado_sur)
+
+    def test_una_sentencia_para_toda_la_flota(self, crear_vehiculo):
+        """Test que el cálculo no depende del tamaño de la flota"""
+        Vehiculo.objects.bulk_create([
+            Vehiculo(patente=f"FL{i:04d}", kilometraje_actual=i * 37, km_mensual_promedio=1_500)
+            for i in range(500)
+        ])
+        with CaptureQueriesContext(connection) as ctx:
+            assert recalcular_pronosticos(HOY) == 500
+        assert len(ctx.captured_queries) == 2  # upsert + borrado de bajas
+
+    def test_vencen_en(self, crear_vehiculo):
+        """Test que lista vencidas y próximas, ordenadas, sin las lejanas"""
+        crear_vehiculo("LEJOS1", proxima_revision=HOY + timedelta(days=90))
+        crear_vehiculo("PRONTO", proxima_revision=HOY + timedelta(days=10))
+        crear_vehiculo("VENCID", proxima_revision=HOY - timedelta(days=3), zona="Sur")
+        recalcular_pronosticos(HOY)
+
+        assert [p.vehiculo.patente for p in vencen_en(30, hoy=HOY)] == ["VENCID", "PRONTO"]
+        assert [p.vehiculo.patente for p in vencen_en(30, hoy=HOY, zona="Sur")] == ["VENCID"]
+
+
+@pytest.mark.django_db
+@pytest.mark.view
+@pytest.mark.api
+class TestVencimientosView:
+    """Tests para GET /scheduling/agendas/vencimientos/"""
+
+    URL = "/api/v1/scheduling/agendas/vencimientos/"
+
+    def test_lista(self, authenticated_client, crear_vehiculo):
+        """Test que retorna los vencimientos con días restantes"""
+        crear_vehiculo("AAAA11", proxima_revision=timezone.localdate() + timedelta(days=3))
+        recalcular_pronosticos()
+
+        response = authenticated_client.get(self.URL, {"dias": 7})
+        assert response.status_code == status.HTTP_200_OK
+        assert [(f["patente"], f["dias_restantes"]) for f in response.data] == [("AAAA11", 3)]
+
+    def test_dias_invalido(self, authenticated_client):
+        """Test que dias fuera de rango retorna 400"""
+        assert authenticated_client.get(self.URL, {"dias": "mucho"}).status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_rol_sin_acceso(self, mecanico_user):
+        """Test que roles sin acceso reciben 403"""
+        client = APIClient()
+        client.force_authenticate(user=mecanico_user)
+        assert client.get(self.URL).status_code == status.HTTP_403_FORBIDDEN
@@ -8,6 +8,7 @@ Este módulo define todos los endpoints de la API relacionados con:
 
 Relaciones:
 - Usa: apps/scheduling/models.py (Agenda, CupoDiario)
+- Usa: apps/scheduling/cupos.py (reserva atómica de cupos)
 - Usa: apps/scheduling/serializers.py (serializers para validación)
 - Usa: apps/vehicles/models.py (Vehiculo)
 - Usa: apps/workorders/models.py (OrdenTrabajo)
@@ -17,23 +18,31 @@ Endpoints principales:
 - /api/v1/scheduling/agendas/ → CRUD de agendas
 - /api/v1/scheduling/agendas/{id}/reprogramar/ → Reprogramar agenda
 - /api/v1/scheduling/agendas/{id}/cancelar/ → Cancelar agenda
-- /api/v1/scheduling/agendas/disponibilidad/ → Verificar disponibilidad
+- /api/v1/scheduling/agendas/disponibilidad/ → Calendario de disponibilidad
+- /api/v1/scheduling/agendas/planificar/ → Planificación automática de preventivas
+- /api/v1/scheduling/agendas/vencimientos/ → Mantenciones que vencen en N días
 - /api/v1/scheduling/cupos/ → Listar cupos diarios
 """
 
-from rest_framework import viewsets, permissions, status
+from rest_framework import viewsets, permissions, serializers, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
 from django.utils import timezone
+from django.db import transaction
 from django.db.models import Q
 from .models import Agenda, CupoDiario
+from .cupos import SinCupos, liberar_cupo, mover_reserva, reservar_cupo
+from .filters import AgendaFilter
 from .serializers import AgendaSerializer, AgendaListSerializer, CupoDiarioSerializer
+from apps.vehicles.models import Vehiculo
 from apps.workorders.models import OrdenTrabajo
+from apps.core.alcance import AlcancePorRolMixin
+from apps.core.fechas import filtro_dia_local
 
 
-class AgendaViewSet(viewsets.ModelViewSet):
+class AgendaViewSet(AlcancePorRolMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestión de agenda y programación.
     
@@ -47,15 +56,18 @@ class AgendaViewSet(viewsets.ModelViewSet):
     Acciones personalizadas:
     - POST /api/v1/scheduling/agendas/{id}/reprogramar/ → Reprogramar
     - POST /api/v1/scheduling/agendas/{id}/cancelar/ → Cancelar
-    - GET /api/v1/scheduling/agendas/disponibilidad/ → Verificar disponibilidad
+    - GET /api/v1/scheduling/agendas/disponibilidad/ → Calendario de disponibilidad
+    - POST /api/v1/scheduling/agendas/planificar/ → Planificar preventivas
+    - GET /api/v1/scheduling/agendas/vencimientos/ → Vencimientos de mantención
     
     Permisos:
     - Requiere autenticación
     - Solo COORDINADOR_ZONA puede crear agendas
-    - Filtrado por rol (cada rol ve solo sus agendas)
+    - Filtrado por rol (Agenda.ALCANCE_POR_ROL, apps/core/alcance.py)
     
     Filtros:
     - Por estado, tipo_mantenimiento, zona
+    - Por rango de días: ?fecha_desde=YYYY-MM-DD&fecha_hasta=YYYY-MM-DD
     - Búsqueda por patente, motivo
     - Ordenamiento por fecha_programada, created_at
     """
@@ -64,7 +76,7 @@ class AgendaViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
     
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
-    filterset_fields = ["estado", "tipo_mantenimiento", "zona"]
+    filterset_class = AgendaFilter
     search_fields = ["vehiculo__patente", "motivo"]
     ordering_fields = ["fecha_programada", "created_at"]
     ordering = ["fecha_programada"]  # Orden por defecto: más próximas primero
@@ -80,51 +92,42 @@ class AgendaViewSet(viewsets.ModelViewSet):
             return AgendaListSerializer
         return AgendaSerializer
     
-    def get_queryset(self):
+    def _verificar_solapamiento(self, vehiculo, fecha_programada, excluir=None):
         """
-        Filtrar agendas según rol del usuario.
+        Lanza ValidationError si el vehículo ya tiene una agenda activa ese día local.
         
-        Lógica:
-        - COORDINADOR_ZONA: Ve solo sus agendas
-        - SUPERVISOR/ADMIN/JEFE_TALLER: Ven todas
-        - Otros roles: No ven ninguna
+        Debe llamarse dentro de la transacción que guarda la agenda: bloquea
+        la fila del vehículo, así dos reservas concurrentes del mismo
+        vehículo se serializan y la segunda ve la agenda de la primera.
         
-        Retorna:
-        - QuerySet filtrado según permisos
+        Parámetros:
+        - excluir: Agenda a ignorar (la que se está reprogramando)
         """
-        user = self.request.user
-        queryset = super().get_queryset()
-        
-        # Coordinador ve todas las agendas de su zona
-        if user.rol == "COORDINADOR_ZONA":
-            return queryset.filter(coordinador=user)
-        
-        # Supervisor ve todas las agendas
-        if user.rol in ["SUPERVISOR", "ADMIN", "JEFE_TALLER"]:
-            return queryset
+        Vehiculo.objects.select_for_update().filter(pk=vehiculo.pk).values_list("pk", flat=True).first()
+        solapamiento = Agenda.objects.filter(
+            filtro_dia_local("fecha_programada", timezone.localdate(fecha_programada)),
+            vehiculo=vehiculo,
+            estado__in=["PROGRAMADA", "CONFIRMADA", "EN_PROCESO", "REPROGRAMADA"]
+        )
+        if excluir is not None:
+            solapamiento = solapamiento.exclude(pk=excluir.pk)
         
-        # Otros roles ven solo agendas relacionadas
-        return queryset.none()
+        if solapamiento.exists():
+            raise serializers.ValidationError(
+                "Ya existe una agenda activa para este vehículo en esta fecha"
+            )
     
     def perform_create(self, serializer):
         """
-        Crea una agenda verificando disponibilidad y cupos.
-        
-        Este método se ejecuta al crear una agenda.
+        Crea una agenda verificando disponibilidad y reservando su cupo.
         
         Validaciones:
         1. Solo COORDINADOR_ZONA puede crear
-        2. Verifica que no haya solapamiento (mismo vehículo, misma fecha)
-        3. Verifica cupos disponibles
-        4. Incrementa cupos ocupados
+        2. Verifica que no haya solapamiento (mismo vehículo, mismo día)
+        3. Reserva un cupo del día local y zona (apps/scheduling/cupos.py)
         
-        Proceso:
-        1. Valida permisos
-        2. Verifica solapamiento
-        3. Obtiene o crea CupoDiario para la fecha
-        4. Verifica cupos disponibles
-        5. Incrementa cupos ocupados
-        6. Asigna coordinador automáticamente
+        La reserva y la agenda se guardan en la misma transacción: si la
+        agenda falla, el cupo no queda ocupado.
         """
         user = self.request.user
         
@@ -136,38 +139,65 @@ class AgendaViewSet(viewsets.ModelViewSet):
         vehiculo = serializer.validated_data.get("vehiculo")
         zona = serializer.validated_data.get("zona", "")
         
-        # Verificar que no haya solapamiento
-        solapamiento = Agenda.objects.filter(
-            vehiculo=vehiculo,
-            fecha_programada__date=fecha_programada.date(),
-            estado__in=["PROGRAMADA", "CONFIRMADA", "EN_PROCESO"]
-        ).exists()
-        
-        if solapamiento:
-            from rest_framework import serializers
-            raise serializers.ValidationError(
-                "Ya existe una agenda activa para este vehículo en esta fecha"
-            )
-        
-        # Verificar cupos disponibles
-        fecha = fecha_programada.date()
-        cupo, _ = CupoDiario.objects.get_or_create(
-            fecha=fecha,
-            defaults={"cupos_totales": 10, "zona": zona}
-        )
-        
-        if cupo.cupos_disponibles <= 0:
-            from rest_framework import serializers
-            raise serializers.ValidationError(
-                "No hay cupos disponibles para esta fecha"
-            )
-        
-        # Incrementar cupos ocupados
-        cupo.cupos_ocupados += 1
-        cupo.save()
+        with transaction.atomic():
+            self._verificar_solapamiento(vehiculo, fecha_programada)
+            try:
+                cupo = reservar_cupo(timezone.localdate(fecha_programada), zona)
+            except SinCupos as e:
+                raise serializers.ValidationError(str(e))
+            
+            # Guardar agenda (asignar coordinador automáticamente)
+            serializer.save(coordinador=user, cupo=cupo)
+    
+    def perform_update(self, serializer):
+        """
+        Edita una agenda manteniendo su cupo consistente.
         
-        # Guardar agenda (asignar coordinador automáticamente)
-        serializer.save(coordinador=user)
+        - Si cambia el día local o la zona, la reserva se traslada
+        - Si pasa a CANCELADA, libera el cupo; si sale de CANCELADA, lo reserva
+        - Si cambia el día local o el vehículo, o la agenda sale de CANCELADA,
+          verifica que no haya solapamiento (igual que al crear o reprogramar)
+        """
+        agenda = serializer.instance
+        datos = serializer.validated_data
+        fecha_programada = datos.get("fecha_programada", agenda.fecha_programada)
+        vehiculo = datos.get("vehiculo", agenda.vehiculo)
+        zona = datos.get("zona", agenda.zona)
+        estado = datos.get("estado", agenda.estado)
+        
+        cambia_dia = timezone.localdate(fecha_programada) != timezone.localdate(agenda.fecha_programada)
+        reactiva = agenda.estado == "CANCELADA" and estado != "CANCELADA"
+        verificar = estado != "CANCELADA" and (cambia_dia or vehiculo.pk != agenda.vehiculo_id or reactiva)
+        cambia_cupo = cambia_dia or zona != agenda.zona or (estado == "CANCELADA") != (agenda.estado == "CANCELADA")
+        if not cambia_cupo and not verificar:
+            serializer.save()
+            return
+        
+        with transaction.atomic():
+            if verificar:
+                self._verificar_solapamiento(vehiculo, fecha_programada, excluir=agenda)
+            if not cambia_cupo:
+                serializer.save()
+                return
+            cupo_id = Agenda.objects.select_for_update().values_list("cupo_id", flat=True).get(pk=agenda.pk)
+            if estado == "CANCELADA":
+                liberar_cupo(cupo_id)
+                serializer.save(cupo=None)
+                return
+            try:
+                cupo = mover_reserva(cupo_id, timezone.localdate(fecha_programada), zona)
+            except SinCupos as e:
+                raise serializers.ValidationError(str(e))
+            serializer.save(cupo=cupo)
+    
+    def perform_destroy(self, instance):
+        """
+        Elimina una agenda liberando el cupo que tenía reservado (igual que cancelar).
+        """
+        with transaction.atomic():
+            cupo_id = Agenda.objects.select_for_update().values_list("cupo_id", flat=True).get(pk=instance.pk)
+            liberar_cupo(cupo_id)
+            instance.delete()
     
     @action(detail=True, methods=["post"])
     def reprogramar(self, request, pk=None):
@@ -185,15 +215,15 @@ class AgendaViewSet(viewsets.ModelViewSet):
         }
         
         Proceso:
-        1. Valida nueva fecha
-        2. Verifica disponibilidad (similar a perform_create)
-        3. Libera cupo de fecha anterior
-        4. Reserva cupo de nueva fecha
-        5. Cambia estado a REPROGRAMADA
+        1. Valida nueva fecha y que la agenda siga pendiente
+        2. En una transacción: verifica solapamiento del vehículo en el
+           nuevo día, reserva el cupo del nuevo día y libera el anterior
+           (si el nuevo día está lleno no cambia nada)
+        4. Cambia estado a REPROGRAMADA
         
         Retorna:
         - 200: Agenda serializada
-        - 400: Si falta fecha o no hay disponibilidad
+        - 400: Si falta fecha, la agenda no es reprogramable o no hay disponibilidad
         """
         agenda = self.get_object()
         nueva_fecha = request.data.get("fecha_programada")
@@ -203,16 +233,24 @@ class AgendaViewSet(viewsets.ModelViewSet):
                 {"detail": "Se requiere fecha_programada"},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        
-        # TODO: Verificar disponibilidad (lógica similar a perform_create)
-        # - Verificar solapamiento
-        # - Verificar cupos disponibles
-        # - Liberar cupo anterior
-        # - Reservar cupo nuevo
-        
-        agenda.fecha_programada = nueva_fecha
-        agenda.estado = "REPROGRAMADA"
-        agenda.save()
+        nueva_fecha = serializers.DateTimeField().to_internal_value(nueva_fecha)
+        
+        with transaction.atomic():
+            agenda = Agenda.objects.select_for_update().get(pk=agenda.pk)
+            if agenda.estado not in ("PROGRAMADA", "CONFIRMADA", "REPROGRAMADA"):
+                return Response(
+                    {"detail": f"No se puede reprogramar una agenda en estado {agenda.estado}"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            self._verificar_solapamiento(agenda.vehiculo, nueva_fecha, excluir=agenda)
+            try:
+                agenda.cupo = mover_reserva(agenda.cupo_id, timezone.localdate(nueva_fecha), agenda.zona)
+            except SinCupos as e:
+                return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            
+            agenda.fecha_programada = nueva_fecha
+            agenda.estado = "REPROGRAMADA"
+            agenda.save(update_fields=["fecha_programada", "estado", "cupo", "updated_at"])
         
         return Response(AgendaSerializer(agenda).data)
     
@@ -228,79 +266,257 @@ class AgendaViewSet(viewsets.ModelViewSet):
         
         Proceso:
         1. Cambia estado a CANCELADA
-        2. Libera cupo (decrementa cupos_ocupados)
+        2. Libera el cupo que la agenda tenía reservado
         
         Retorna:
         - 200: Agenda serializada
+        - 400: Si la agenda ya estaba cancelada
         """
         agenda = self.get_object()
-        agenda.estado = "CANCELADA"
-        agenda.save()
         
-        # Liberar cupo
-        fecha = agenda.fecha_programada.date()
-        try:
-            cupo = CupoDiario.objects.get(fecha=fecha)
-            if cupo.cupos_ocupados > 0:
-                cupo.cupos_ocupados -= 1
-                cupo.save()
-        except CupoDiario.DoesNotExist:
-            pass
+        with transaction.atomic():
+            agenda = Agenda.objects.select_for_update().get(pk=agenda.pk)
+            if agenda.estado == "CANCELADA":
+                return Response(
+                    {"detail": "La agenda ya está cancelada"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            liberar_cupo(agenda.cupo_id)
+            agenda.estado = "CANCELADA"
+            agenda.cupo = None
+            agenda.save(update_fields=["estado", "cupo", "updated_at"])
         
         return Response(AgendaSerializer(agenda).data)
     
     @action(detail=False, methods=["get"])
     def disponibilidad(self, request):
         """
-        Verifica disponibilidad de cupos para una fecha.
+        Calendario de disponibilidad de cupos (solo lectura, no crea cupos).
         
-        Endpoint: GET /api/v1/scheduling/agendas/disponibilidad/?fecha=2024-01-15
+        Endpoints:
+        - GET /api/v1/scheduling/agendas/disponibilidad/?desde=2024-01-01&hasta=2024-01-31&zona=Norte
+        - GET /api/v1/scheduling/agendas/disponibilidad/?fecha=2024-01-15 (un día)
         
         Permisos:
         - Requiere autenticación
         
         Parámetros:
-        - fecha: Fecha en formato YYYY-MM-DD (query parameter)
+        - desde / hasta: Rango de días YYYY-MM-DD (máximo 93 días). Sin
+          hasta, se usa el último día del mes de desde
+        - fecha: Un solo día YYYY-MM-DD (formato de respuesta anterior)
+        - zona: Zona del cupo (opcional, vacío = cupo general)
+        
+        Los días sin CupoDiario se informan con los cupos por defecto.
+        El resultado se cachea por (zona, mes); ver apps/scheduling/disponibilidad.py.
         
         Retorna:
-        - 200: {
+        - 200 (rango): {
+            "zona": "Norte",
+            "desde": "2024-01-01",
+            "hasta": "2024-01-31",
+            "dias": [{"fecha": "2024-01-01", "cupos_totales": 10,
+                      "cupos_ocupados": 3, "cupos_disponibles": 7}, ...]
+          }
+        - 200 (fecha): {
             "fecha": "2024-01-15",
+            "zona": "",
             "cupos_disponibles": 5,
             "cupos_totales": 10,
             "cupos_ocupados": 5
           }
-        - 400: Si falta fecha o formato inválido
+        - 400: Si faltan fechas, el formato es inválido o el rango excede el máximo
         """
-        fecha_str = request.query_params.get("fecha")
-        if not fecha_str:
+        from datetime import datetime
+        import calendar
+        from .disponibilidad import MAX_DIAS_DISPONIBILIDAD, disponibilidad
+        
+        params = request.query_params
+        zona = params.get("zona", "")
+        fecha_str = params.get("fecha")
+        un_dia = bool(fecha_str) and not params.get("desde")
+        desde_str = fecha_str if un_dia else params.get("desde")
+        if not desde_str:
             return Response(
-                {"detail": "Se requiere parámetro 'fecha' (YYYY-MM-DD)"},
+                {"detail": "Se requiere 'desde' (y opcionalmente 'hasta') o 'fecha' en formato YYYY-MM-DD"},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        from datetime import datetime
         try:
-            fecha = datetime.strptime(fecha_str, "%Y-%m-%d").date()
+            desde = datetime.strptime(desde_str, "%Y-%m-%d").date()
+            if un_dia:
+                hasta = desde
+            elif params.get("hasta"):
+                hasta = datetime.strptime(params["hasta"], "%Y-%m-%d").date()
+            else:
+                hasta = desde.replace(day=calendar.monthrange(desde.year, desde.month)[1])
         except ValueError:
             return Response(
                 {"detail": "Formato de fecha inválido. Use YYYY-MM-DD"},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Obtener o crear cupo para la fecha
-        cupo, _ = CupoDiario.objects.get_or_create(
-            fecha=fecha,
-            defaults={"cupos_totales": 10}
-        )
+        if hasta < desde:
+            return Response(
+                {"detail": "'hasta' debe ser igual o posterior a 'desde'"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if (hasta - desde).days + 1 > MAX_DIAS_DISPONIBILIDAD:
+            return Response(
+                {"detail": f"El rango no puede superar {MAX_DIAS_DISPONIBILIDAD} días"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        dias = disponibilidad(desde, hasta, zona)
+        
+        if un_dia:
+            (dia,) = dias
+            return Response({
+                "fecha": desde,
+                "zona": zona,
+                "cupos_disponibles": dia["cupos_disponibles"],
+                "cupos_totales": dia["cupos_totales"],
+                "cupos_ocupados": dia["cupos_ocupados"]
+            })
         
         return Response({
-            "fecha": fecha,
-            "cupos_disponibles": cupo.cupos_disponibles,
-            "cupos_totales": cupo.cupos_totales,
-            "cupos_ocupados": cupo.cupos_ocupados
+            "zona": zona,
+            "desde": desde,
+            "hasta": hasta,
+            "dias": dias,
         })
 
 
+    @action(detail=False, methods=["post"])
+    def planificar(self, request):
+        """
+        Propone (y opcionalmente crea) la agenda de mantenciones preventivas.
+        
+        Endpoint: POST /api/v1/scheduling/agendas/planificar/
+        
+        Permisos:
+        - COORDINADOR_ZONA, SUPERVISOR, ADMIN, JEFE_TALLER pueden ver la propuesta
+        - Solo COORDINADOR_ZONA puede confirmarla (las agendas quedan a su nombre)
+        
+        Body JSON (todo opcional):
+        {
+            "dias": 90,               # Horizonte (máximo 180)
+            "zona": "Norte",          # Solo vehículos de esa zona
+            "requiere_backup": true,  # Limitar por vehículos de respaldo libres
+            "confirmar": false        # true: reserva cupos y crea las agendas
+        }
+        
+        Ver apps/scheduling/planificador.py para las restricciones y la heurística.
+        La propuesta usa los pronósticos guardados (recalculados cada noche);
+        confirmar los recalcula antes, solo para la zona pedida.
+        
+        Retorna:
+        - 200: Propuesta ({"desde", "hasta", "asignadas", "sin_asignar", "sin_datos"})
+        - 201: Si confirmar=true, la propuesta más "creadas" (cantidad de agendas)
+        - 400: Parámetros inválidos o cupos tomados mientras se confirmaba
+        - 403: Rol sin permiso
+        """
+        from . import planificador
+        
+        user = request.user
+        confirmar = request.data.get("confirmar") in (True, "true", "1")
+        if user.rol not in ("COORDINADOR_ZONA", "SUPERVISOR", "ADMIN", "JEFE_TALLER"):
+            return Response(
+                {"detail": "No tiene permisos para planificar mantenciones"},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        if confirmar and user.rol != "COORDINADOR_ZONA":
+            return Response(
+                {"detail": "Solo coordinadores pueden confirmar la planificación"},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        try:
+            dias = int(request.data.get("dias", planificador.HORIZONTE_DIAS))
+        except (TypeError, ValueError):
+            dias = 0
+        if not 1 <= dias <= planificador.MAX_HORIZONTE_DIAS:
+            return Response(
+                {"detail": f"'dias' debe ser un entero entre 1 y {planificador.MAX_HORIZONTE_DIAS}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        plan = planificador.planificar(
+            dias=dias,
+            zona=request.data.get("zona"),
+            requiere_backup=request.data.get("requiere_backup", True) not in (False, "false", "0"),
+            recalcular=confirmar,
+        )
+        if not confirmar:
+            return Response(plan)
+        
+        try:
+            creadas = planificador.confirmar_plan(plan["asignadas"], user)
+        except SinCupos as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({**plan, "creadas": len(creadas)}, status=status.HTTP_201_CREATED)
+
+
+    @action(detail=False, methods=["get"])
+    def vencimientos(self, request):
+        """
+        Vehículos cuya mantención preventiva vence en los próximos N días.
+        
+        Endpoint: GET /api/v1/scheduling/agendas/vencimientos/?dias=30&zona=Norte
+        
+        Permisos:
+        - COORDINADOR_ZONA, SUPERVISOR, ADMIN, JEFE_TALLER
+        
+        Parámetros:
+        - dias: Días hacia adelante (default 30, máximo 365). Incluye vencidas
+        - zona: Solo vehículos de esa zona (opcional)
+        
+        Lee PronosticoMantencion (recalculado cada noche, ver
+        apps/scheduling/pronostico.py).
+        
+        Retorna:
+        - 200: [{"vehiculo_id", "patente", "zona", "vencimiento", "criterio",
+                 "vencimiento_fecha", "vencimiento_km", "km_restantes",
+                 "dias_restantes"}, ...]
+        - 400: dias inválido
+        - 403: Rol sin permiso
+        """
+        from .pronostico import vencen_en
+        
+        if request.user.rol not in ("COORDINADOR_ZONA", "SUPERVISOR", "ADMIN", "JEFE_TALLER"):
+            return Response(
+                {"detail": "No tiene permisos para ver vencimientos de mantención"},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        try:
+            dias = int(request.query_params.get("dias", 30))
+        except ValueError:
+            dias = -1
+        if not 0 <= dias <= 365:
+            return Response(
+                {"detail": "'dias' debe ser un entero entre 0 y 365"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        hoy = timezone.localdate()
+        pronosticos = vencen_en(dias, hoy=hoy, zona=request.query_params.get("zona"))
+        return Response([
+            {
+                "vehiculo_id": p.vehiculo_id,
+                "patente": p.vehiculo.patente,
+                "zona": p.vehiculo.zona,
+                "vencimiento": p.vencimiento,
+                "criterio": p.criterio,
+                "vencimiento_fecha": p.vencimiento_fecha,
+                "vencimiento_km": p.vencimiento_km,
+                "km_restantes": p.km_restantes,
+                "dias_restantes": (p.vencimiento - hoy).days,
+            }
+            for p in pronosticos
+        ])
+
+
 class CupoDiarioViewSet(viewsets.ReadOnlyModelViewSet):
     """
     ViewSet de solo lectura para cupos diarios.
@@ -318,7 +534,7 @@ class CupoDiarioViewSet(viewsets.ReadOnlyModelViewSet):
     
     Nota:
     - Solo lectura (no permite crear/editar/eliminar)
-    - Los cupos se crean automáticamente al crear agendas
+    - Los cupos se crean automáticamente al crear agendas (uno por fecha y zona)
     """
     queryset = CupoDiario.objects.all()
     serializer_class = CupoDiarioSerializer
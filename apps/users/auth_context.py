@@ -0,0 +1,171 @@
+# apps/users/auth_context.py
+"""
+Contexto de autorización por usuario (rol, sites y vehículos supervisados).
+
+Los permisos y querysets por rol necesitan saber, además del rol, los
+sites del usuario y los vehículos que supervisa. Antes cada uno lo
+resolvía por su cuenta: WorkOrderPermission y EvidenciaViewSet leían
+user.profile.site (una consulta a Profile, que además no tiene site) y
+ReportePDFView consultaba los sites de los vehículos supervisados en cada
+request.
+
+AuthContext reúne esos datos y se resuelve una vez por request:
+
+1. Memo en el HttpRequest (permisos, get_queryset y la vista comparten
+   el mismo objeto)
+2. Caché de Django (Redis) por usuario, con una versión global: una sola
+   lectura get_many trae la versión y el contexto
+3. Si no está o su versión es antigua, se construye con una consulta a
+   Vehiculo
+
+El site de un usuario se deriva de los vehículos que supervisa (igual que
+apps/notifications/directory.py), ya que Profile no tiene site.
+
+Invalidación:
+- invalidar_contexto(user_id): al guardar/eliminar un User
+  (apps/users/signals.py)
+- invalidar_contextos(): cambia la versión global cuando cambia el
+  site o supervisor de un vehículo (apps/vehicles/signals.py y la
+  importación masiva de vehículos)
+
+Relaciones:
+- Usado por: apps/workorders/permissions.py (WorkOrderPermission)
+- Usado por: apps/workorders/views.py (EvidenciaViewSet.get_queryset)
+- Usado por: apps/reports/views.py (ReportePDFView)
+- Invalidado por: apps/users/signals.py, apps/vehicles/signals.py,
+  apps/vehicles/importacion.py
+"""
+
+import secrets
+
+from django.core.cache import cache
+
+# Claves y duración del contexto en caché
+CONTEXTO_CACHE_PREFIX = "auth:contexto"
+CONTEXTO_VERSION_KEY = "auth:contexto:version"
+CONTEXTO_CACHE_TIMEOUT = 60 * 10  # 10 minutos (se invalida por señales antes)
+
+# Campos de User que forman parte del contexto
+CAMPOS_USUARIO_CONTEXTO = {"rol", "is_active", "is_superuser"}
+
+# Atributo del HttpRequest donde se memoriza el contexto
+_ATRIBUTO_REQUEST = "_auth_context"
+
+
+class AuthContext:
+    """
+    Datos de autorización de un usuario.
+
+    Atributos:
+    - user_id, rol, is_active, is_superuser
+    - sites: frozenset de sites de los vehículos que supervisa
+    - vehiculos_supervisados: frozenset de ids de esos vehículos
+    - version: versión global con la que se construyó (None si aún no
+      hubo invalidaciones)
+    """
+
+    __slots__ = ("user_id", "rol", "is_active", "is_superuser", "sites", "vehiculos_supervisados", "version")
+
+    def __init__(self, user_id, rol, is_active=True, is_superuser=False,
+                 sites=frozenset(), vehiculos_supervisados=frozenset(), version=None):
+        self.user_id = user_id
+        self.rol = rol
+        self.is_active = is_active
+        self.is_superuser = is_superuser
+        self.sites = frozenset(sites)
+        self.vehiculos_supervisados = frozenset(vehiculos_supervisados)
+        self.version = version
+
+    def __repr__(self):
+        return f"<AuthContext user={self.user_id} rol={self.rol} sites={sorted(self.sites)}>"
+
+    @property
+    def es_admin(self):
+        return self.rol == "ADMIN"
+
+    def tiene_rol(self, *roles):
+        return self.rol in roles
+
+    def ve_site(self, site):
+        """True si el site está entre los del usuario."""
+        return bool(site) and site in self.sites
+
+
+def _clave(user_id):
+    return f"{CONTEXTO_CACHE_PREFIX}:{user_id}"
+
+
+def construir_contexto(user, version=None):
+    """
+    Construye el contexto desde la base de datos (una consulta a Vehiculo).
+    """
+    from apps.vehicles.models import Vehiculo
+
+    vehiculos, sites = set(), set()
+    for vehiculo_id, site in Vehiculo.objects.filter(supervisor_id=user.pk).values_list("id", "site"):
+        vehiculos.add(vehiculo_id)
+        if site:
+            sites.add(site)
+
+    return AuthContext(
+        user_id=user.pk,
+        rol=user.rol,
+        is_active=user.is_active,
+        is_superuser=user.is_superuser,
+        sites=sites,
+        vehiculos_supervisados=vehiculos,
+        version=version,
+    )
+
+
+def contexto_de_usuario(user):
+    """
+    Retorna el AuthContext del usuario desde la caché, construyéndolo si
+    falta, si su versión es antigua o si el rol cambió.
+    """
+    clave = _clave(user.pk)
+    en_cache = cache.get_many([CONTEXTO_VERSION_KEY, clave])
+    version = en_cache.get(CONTEXTO_VERSION_KEY)
+    contexto = en_cache.get(clave)
+
+    # El rol viene del User ya cargado por la autenticación: si no coincide
+    # la entrada es de antes de un cambio aún no invalidado
+    if contexto is None or contexto.version != version or contexto.rol != user.rol:
+        contexto = construir_contexto(user, version)
+        cache.set(clave, contexto, CONTEXTO_CACHE_TIMEOUT)
+    return contexto
+
+
+def obtener_contexto(request):
+    """
+    Retorna el AuthContext del usuario del request (None si es anónimo).
+
+    Se resuelve una vez por request: acepta tanto el Request de DRF como
+    el HttpRequest y memoriza el resultado en este último.
+    """
+    user = getattr(request, "user", None)
+    if not user or not user.is_authenticated:
+        return None
+
+    http_request = getattr(request, "_request", request)
+    contexto = getattr(http_request, _ATRIBUTO_REQUEST, None)
+    if contexto is None or contexto.user_id != user.pk:
+        contexto = contexto_de_usuario(user)
+        setattr(http_request, _ATRIBUTO_REQUEST, contexto)
+    return contexto
+
+
+def invalidar_contexto(*user_ids):
+    """Elimina de la caché el contexto de los usuarios indicados."""
+    cache.delete_many([_clave(user_id) for user_id in user_ids])
+
+
+def invalidar_contextos():
+    """
+    Invalida el contexto de todos los usuarios cambiando la versión global.
+
+    La versión es un token aleatorio: basta un SET (atómico en Redis) y dos
+    invalidaciones concurrentes nunca vuelven a una versión anterior. Las
+    entradas antiguas se ignoran en la próxima lectura y expiran solas.
+    """
+    cache.set(CONTEXTO_VERSION_KEY, secrets.token_hex(8), None)
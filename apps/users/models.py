@@ -17,8 +17,6 @@ Relaciones:
 from django.db import models
 from django.contrib.auth.models import AbstractUser  # Extiende el modelo de usuario base de Django
 from django.conf import settings
-from django.db.models.signals import post_save  # Señal que se dispara después de guardar
-from django.dispatch import receiver  # Decorador para conectar señales
 import uuid  # Para generar IDs únicos
 import secrets  # Para generar tokens seguros
 from django.utils import timezone  # Para manejar fechas con timezone
@@ -88,6 +86,23 @@ class User(AbstractUser):
     # REQUIRED_FIELDS: le dice a Django que el email es obligatorio al crear superusuario
     # Además de username (que ya es requerido por AbstractUser)
     REQUIRED_FIELDS = ['email']
+    
+    # Campos que se copian al Profile (ver apps/users/signals.py)
+    CAMPOS_PERFIL = ("first_name", "last_name")
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Guarda los nombres leídos de la base de datos para que la señal de
+        post_save solo toque el Profile cuando cambiaron.
+        """
+        instance = super().from_db(db, field_names, values)
+        instance._nombres_guardados = instance.nombres_cargados()
+        return instance
+    
+    def nombres_cargados(self):
+        """(first_name, last_name) sin disparar la carga de campos diferidos."""
+        return tuple(self.__dict__.get(campo) for campo in self.CAMPOS_PERFIL)
 
 
 class Profile(models.Model):
@@ -95,7 +110,7 @@ class Profile(models.Model):
     Perfil extendido del usuario.
     
     Almacena información adicional que no está en el modelo User base.
-    Se crea automáticamente cuando se crea un User (ver señales abajo).
+    Se crea automáticamente cuando se crea un User (ver apps/users/signals.py).
     
     Relaciones:
     - OneToOne con User (a través de AUTH_USER_MODEL)
@@ -139,65 +154,8 @@ class Profile(models.Model):
         return self.user.username
 
 
-# ==================== SEÑALES (SIGNALS) ====================
-# Las señales permiten ejecutar código automáticamente cuando ocurren eventos en los modelos
-
-@receiver(post_save, sender=settings.AUTH_USER_MODEL)
-def create_user_profile(sender, instance, created, **kwargs):
-    """
-    Señal que se dispara después de guardar un User.
-    
-    Crea un Profile automáticamente cuando se crea un nuevo User.
-    
-    Parámetros:
-    - sender: El modelo que envió la señal (User)
-    - instance: La instancia del User que se guardó
-    - created: True si es un nuevo registro, False si es una actualización
-    - **kwargs: Argumentos adicionales
-    """
-    if created:  # Solo crear perfil si es un usuario nuevo
-        Profile.objects.create(user=instance)
-
-
-@receiver(post_save, sender=settings.AUTH_USER_MODEL)
-def save_user_profile(sender, instance, **kwargs):
-    """
-    Señal que se dispara después de guardar un User.
-    
-    Guarda el Profile automáticamente cuando se guarda el User.
-    Esto asegura que los cambios en el perfil se persistan.
-    """
-    # Verificar que el perfil existe antes de guardarlo
-    if hasattr(instance, 'profile'):
-        instance.profile.save()
-
-
-@receiver(post_save, sender=User)
-def ensure_user_profile(sender, instance, created, **kwargs):
-    """
-    Señal adicional para asegurar que el perfil existe.
-    
-    Esta función es idempotente: si el perfil ya existe, no lo crea de nuevo.
-    También sincroniza los nombres del User con el Profile.
-    
-    Se ejecuta después de create_user_profile para garantizar consistencia.
-    """
-    # get_or_create: obtiene el perfil si existe, o lo crea si no existe
-    # defaults: valores por defecto si se crea
-    Profile.objects.get_or_create(
-        user=instance,
-        defaults={
-            "first_name": instance.first_name or "",
-            "last_name": instance.last_name or "",
-        }
-    )
-    
-    # Sincronizar nombres cada vez que cambien en User
-    # Esto asegura que Profile.first_name y Profile.last_name siempre coincidan con User
-    Profile.objects.filter(user=instance).update(
-        first_name=instance.first_name or "",
-        last_name=instance.last_name or "",
-    )
+# Las señales que crean y sincronizan el Profile están en apps/users/signals.py
+# (registradas en UsersConfig.ready()).
 
 
 class PasswordResetToken(models.Model):
@@ -0,0 +1,125 @@
+# apps/users/signals.py
+"""
+Señales de la app de usuarios: mantienen el Profile de cada User.
+
+Un solo receptor de post_save de User reemplaza a los tres anteriores
+(create_user_profile, save_user_profile y ensure_user_profile), que en
+cada User.save() — incluido el de last_login en cada login — hacían un
+profile.save() completo, un get_or_create y un UPDATE de nombres:
+
+- User nuevo: crea su Profile con los nombres (1 consulta)
+- User existente: solo si first_name/last_name cambiaron respecto de lo
+  leído de la base de datos (User.from_db), actualiza los nombres del
+  Profile (1 consulta; lo crea si faltaba)
+- save(update_fields=[...]) sin campos de nombre, ej. last_login: nada
+
+Para comandos que crean o editan muchos usuarios, perfiles_en_bloque()
+difiere ese trabajo y al salir crea/sincroniza todos los Profile con
+bulk_create/bulk_update (un número fijo de consultas).
+
+invalidar_contexto_usuario elimina el AuthContext en caché del usuario
+(apps/users/auth_context.py) cuando cambia su rol o sus flags, en
+transaction.on_commit: si se borrara antes, otra solicitud podría volver
+a cachear los permisos previos al commit.
+
+Se registran en UsersConfig.ready() (apps/users/apps.py).
+
+Relaciones:
+- Escribe: Profile
+- Invalida: apps/users/auth_context.py
+- Usado por: apps/workorders/management/commands/seed_completo.py (perfiles_en_bloque)
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .auth_context import CAMPOS_USUARIO_CONTEXTO, invalidar_contexto
+from .models import Profile, User
+
+# {user_id: (first_name, last_name)} pendientes dentro de perfiles_en_bloque()
+_pendientes = ContextVar("perfiles_pendientes", default=None)
+
+
+def _nombres(user):
+    return {"first_name": user.first_name or "", "last_name": user.last_name or ""}
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def sincronizar_perfil(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    """
+    Crea el Profile de un User nuevo o copia sus nombres si cambiaron.
+    """
+    if raw:
+        # loaddata: los Profile vienen en el mismo fixture
+        return
+    if update_fields is not None and not set(update_fields) & set(User.CAMPOS_PERFIL):
+        return
+
+    cargados = instance.nombres_cargados()
+    if not created and cargados == getattr(instance, "_nombres_guardados", None):
+        return
+    instance._nombres_guardados = cargados
+
+    pendientes = _pendientes.get()
+    if pendientes is not None:
+        pendientes[instance.pk] = instance
+        return
+
+    if created:
+        Profile.objects.create(user=instance, **_nombres(instance))
+    elif not Profile.objects.filter(user=instance).update(**_nombres(instance)):
+        Profile.objects.create(user=instance, **_nombres(instance))
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def invalidar_contexto_usuario(sender, instance, update_fields=None, **kwargs):
+    """
+    Invalida el AuthContext del usuario al confirmar su guardado o eliminación.
+
+    Los guardados con update_fields que no tocan rol/is_active/is_superuser
+    (ej: last_login en cada login) no invalidan nada.
+    """
+    if update_fields is not None and not set(update_fields) & CAMPOS_USUARIO_CONTEXTO:
+        return
+    transaction.on_commit(partial(invalidar_contexto, instance.pk))
+
+
+@contextmanager
+def perfiles_en_bloque():
+    """
+    Difiere la creación/sincronización de Profile de los User guardados
+    dentro del bloque y la hace al salir con bulk_create/bulk_update.
+
+    Dentro del bloque user.profile no existe todavía para los usuarios
+    nuevos. Si el bloque lanza una excepción no se escribe nada.
+
+    Uso:
+        with transaction.atomic(), perfiles_en_bloque():
+            for datos in filas:
+                User.objects.create_user(**datos)
+    """
+    pendientes = {}
+    token = _pendientes.set(pendientes)
+    try:
+        yield
+    finally:
+        _pendientes.reset(token)
+    if not pendientes:
+        return
+
+    existentes = {p.user_id: p for p in Profile.objects.filter(user_id__in=list(pendientes))}
+    for user_id, perfil in existentes.items():
+        for campo, valor in _nombres(pendientes[user_id]).items():
+            setattr(perfil, campo, valor)
+    Profile.objects.bulk_update(list(existentes.values()), list(User.CAMPOS_PERFIL), batch_size=1000)
+    Profile.objects.bulk_create(
+        [Profile(user=user, **_nombres(user)) for user_id, user in pendientes.items() if user_id not in existentes],
+        batch_size=1000,
+    )
@@ -0,0 +1,192 @@
+# apps/users/tests/test_auth_context.py
+"""
+Tests para el contexto de autorización por usuario (apps/users/auth_context.py).
+"""
+
+import pickle
+
+import pytest
+from django.contrib.auth.models import update_last_login
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+from apps.users.auth_context import (
+    CONTEXTO_VERSION_KEY, AuthContext, _clave, contexto_de_usuario, invalidar_contextos, obtener_contexto,
+)
+from apps.users.models import Profile, User
+from apps.vehicles.models import Vehiculo
+from apps.workorders.models import Evidencia, OrdenTrabajo
+
+
+@pytest.fixture(autouse=True)
+def limpiar_contextos():
+    """Asegura que cada prueba parte sin versión global en caché."""
+    cache.delete(CONTEXTO_VERSION_KEY)
+    yield
+    cache.delete(CONTEXTO_VERSION_KEY)
+
+
+def _consultas(ctx, modelo):
+    return [q["sql"] for q in ctx.captured_queries if modelo._meta.db_table in q["sql"]]
+
+
+@pytest.mark.django_db
+@pytest.mark.service
+class TestAuthContext:
+    """Tests de construcción, caché e invalidación del AuthContext"""
+
+    def test_sites_y_vehiculos_supervisados(self, vehiculo, supervisor_user):
+        """Test que los sites se derivan de los vehículos supervisados"""
+        contexto = contexto_de_usuario(supervisor_user)
+        assert contexto.rol == "SUPERVISOR"
+        assert contexto.sites == {"SITE_TEST"}
+        assert contexto.vehiculos_supervisados == {vehiculo.id}
+        assert contexto.ve_site("SITE_TEST") and not contexto.ve_site("") and not contexto.es_admin
+
+    def test_se_cachea(self, vehiculo, supervisor_user):
+        """Test que la segunda lectura no consulta la base de datos"""
+        contexto_de_usuario(supervisor_user)
+        with CaptureQueriesContext(connection) as ctx:
+            contexto = contexto_de_usuario(supervisor_user)
+        assert ctx.captured_queries == []
+        assert contexto.sites == {"SITE_TEST"}
+
+    def test_es_serializable(self):
+        """Test que el contexto se puede guardar en Redis (pickle)"""
+        contexto = AuthContext(1, "SUPERVISOR", sites={"A"}, vehiculos_supervisados={3}, version="v1")
+        copia = pickle.loads(pickle.dumps(contexto))
+        assert (copia.rol, copia.sites, copia.vehiculos_supervisados, copia.version) == (
+            "SUPERVISOR", {"A"}, {3}, "v1"
+        )
+
+    def test_cambio_de_site_invalida(self, vehiculo, supervisor_user, django_capture_on_commit_callbacks):
+        """Test que cambiar el site de un vehículo cambia la versión global al confirmar"""
+        contexto_de_usuario(supervisor_user)
+        with django_capture_on_commit_callbacks(execute=True):
+            vehiculo.site = "OTRO_SITE"
+            vehiculo.save()
+            # Antes del commit se sigue sirviendo el contexto confirmado
+            assert contexto_de_usuario(supervisor_user).sites == {"SITE_TEST"}
+        assert contexto_de_usuario(supervisor_user).sites == {"OTRO_SITE"}
+
+    def test_cambio_de_estado_no_invalida(self, vehiculo, supervisor_user, django_capture_on_commit_callbacks):
+        """Test que un guardado con update_fields sin site/supervisor no invalida"""
+        contexto_de_usuario(supervisor_user)
+        with django_capture_on_commit_callbacks(execute=True):
+            vehiculo.estado_operativo = "EN_TALLER"
+            vehiculo.save(update_fields=["estado_operativo"])
+        with CaptureQueriesContext(connection) as ctx:
+            contexto_de_usuario(supervisor_user)
+        assert ctx.captured_queries == []
+
+    def test_guardar_sin_cambiar_site_no_invalida(self, vehiculo, supervisor_user, django_capture_on_commit_callbacks):
+        """Test que un save() completo que no cambia site/supervisor no invalida"""
+        contexto_de_usuario(supervisor_user)
+        cargado = Vehiculo.objects.get(pk=vehiculo.pk)
+        with django_capture_on_commit_callbacks(execute=True) as callbacks:
+            cargado.marca = "Nissan"
+            cargado.kilometraje_actual = 12_345
+            cargado.save()
+            vehiculo.marca = "Ford"
+            vehiculo.save()
+        assert invalidar_contextos not in callbacks
+        with CaptureQueriesContext(connection) as ctx:
+            contexto_de_usuario(supervisor_user)
+        assert ctx.captured_queries == []
+
+    def test_cambio_de_supervisor_invalida(self, vehiculo, supervisor_user, django_capture_on_commit_callbacks):
+        """Test que quitar el supervisor de un vehículo leído de la base invalida"""
+        contexto_de_usuario(supervisor_user)
+        with django_capture_on_commit_callbacks(execute=True):
+            cargado = Vehiculo.objects.get(pk=vehiculo.pk)
+            cargado.supervisor = None
+            cargado.save()
+        assert contexto_de_usuario(supervisor_user).sites == set()
+
+    def test_cambio_de_rol_invalida(self, supervisor_user, django_capture_on_commit_callbacks):
+        """Test que cambiar el rol elimina el contexto en caché al confirmar"""
+        contexto_de_usuario(supervisor_user)
+        with django_capture_on_commit_callbacks(execute=True):
+            supervisor_user.rol = User.Rol.JEFE_TALLER
+            supervisor_user.save()
+            assert cache.get(_clave(supervisor_user.pk)) is not None
+        assert cache.get(_clave(supervisor_user.pk)) is None
+        assert contexto_de_usuario(supervisor_user).rol == "JEFE_TALLER"
+
+    def test_last_login_no_invalida(self, admin_user, django_capture_on_commit_callbacks):
+        """Test que el login (update_fields=["last_login"]) no invalida"""
+        contexto_de_usuario(admin_user)
+        with django_capture_on_commit_callbacks(execute=True):
+            update_last_login(None, admin_user)
+        assert cache.get(_clave(admin_user.pk)) is not None
+
+    def test_rol_desactualizado_se_reconstruye(self, admin_user):
+        """Test que una entrada con otro rol (invalidación perdida) no se usa"""
+        cache.set(_clave(admin_user.pk), AuthContext(admin_user.pk, "GUARDIA"))
+        assert contexto_de_usuario(admin_user).rol == "ADMIN"
+
+    def test_version_antigua_se_reconstruye(self, vehiculo, supervisor_user):
+        """Test que las entradas de una versión anterior se ignoran"""
+        contexto_de_usuario(supervisor_user)
+        Vehiculo.objects.filter(pk=vehiculo.pk).update(site="SIN_SENAL")
+        invalidar_contextos()
+        assert contexto_de_usuario(supervisor_user).sites == {"SIN_SENAL"}
+
+    def test_una_vez_por_request(self, vehiculo, supervisor_user):
+        """Test que el contexto se memoriza en el request"""
+        request = RequestFactory().get("/")
+        request.user = supervisor_user
+        cache.delete(_clave(supervisor_user.pk))
+        with CaptureQueriesContext(connection) as ctx:
+            primero = obtener_contexto(request)
+            segundo = obtener_contexto(request)
+        assert primero is segundo
+        assert len(ctx.captured_queries) == 1
+
+    def test_anonimo(self):
+        """Test que un request anónimo no tiene contexto"""
+        from django.contrib.auth.models import AnonymousUser
+        request = RequestFactory().get("/")
+        request.user = AnonymousUser()
+        assert obtener_contexto(request) is None
+
+
+@pytest.mark.django_db
+@pytest.mark.api
+class TestAuthContextEnVistas:
+    """Tests de permisos y querysets que leen el AuthContext"""
+
+    def test_evidencias_supervisor_por_site(self, evidencia, supervisor_user, jefe_taller_user):
+        """Test que el supervisor ve solo evidencias de sus sites, sin consultar Profile"""
+        otro = Vehiculo.objects.create(patente="OTRO01", marca="Ford", modelo="Ranger", anio=2021, site="OTRO")
+        ot = OrdenTrabajo.objects.create(vehiculo=otro, jefe_taller=jefe_taller_user, motivo="Otra", site="OTRO")
+        ajena = Evidencia.objects.create(ot=ot, url="https://s3.example.com/otra.jpg", tipo="FOTO")
+
+        client = APIClient()
+        client.force_authenticate(user=supervisor_user)
+        contexto_de_usuario(supervisor_user)
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get("/api/v1/work/evidencias/")
+        assert response.status_code == status.HTTP_200_OK
+        resultados = response.data["results"] if isinstance(response.data, dict) else response.data
+        ids = {str(e["id"]) for e in resultados}
+        assert str(evidencia.id) in ids and str(ajena.id) not in ids
+        assert _consultas(ctx, Profile) == []
+        # El contexto ya estaba en caché: ninguna consulta propia a Vehiculo
+        assert not [sql for sql in _consultas(ctx, Vehiculo) if sql.startswith(f'SELECT "{Vehiculo._meta.db_table}"')]
+
+        detalle = client.get(f"/api/v1/work/evidencias/{ajena.id}/")
+        assert detalle.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_pdf_supervisor_sin_vehiculos(self):
+        """Test que un supervisor sin vehículos supervisados recibe 403"""
+        supervisor = User.objects.create_user(
+            username="sup_sin_vehiculos", email="sup_sin@test.com", password="x", rol="SUPERVISOR"
+        )
+        client = APIClient()
+        client.force_authenticate(user=supervisor)
+        response = client.get("/api/v1/reports/pdf/?tipo=diario")
+        assert response.status_code == status.HTTP_403_FORBIDDEN
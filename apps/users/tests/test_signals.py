@@ -0,0 +1,122 @@
+# apps/users/tests/test_signals.py
+"""
+Tests para la sincronización User → Profile (apps/users/signals.py).
+"""
+
+import pytest
+from django.contrib.auth.models import update_last_login
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+from apps.users.models import Profile, User
+from apps.users.signals import perfiles_en_bloque
+
+
+def _consultas_perfil(ctx):
+    return [q["sql"] for q in ctx.captured_queries if Profile._meta.db_table in q["sql"]]
+
+
+@pytest.mark.django_db
+@pytest.mark.unit
+class TestSincronizarPerfil:
+    """Tests para el receptor sincronizar_perfil"""
+
+    def test_crea_perfil_con_nombres(self):
+        """Test que un User nuevo recibe su Profile con los nombres"""
+        user = User.objects.create_user(
+            username="nuevo", email="nuevo@test.com", password="x", first_name="Ana", last_name="Soto"
+        )
+        assert (user.profile.first_name, user.profile.last_name) == ("Ana", "Soto")
+
+    def test_last_login_no_toca_perfil(self, admin_user, django_assert_num_queries):
+        """Test que actualizar last_login es una sola consulta"""
+        user = User.objects.get(pk=admin_user.pk)
+        with django_assert_num_queries(1):
+            update_last_login(None, user)
+
+    def test_guardar_sin_cambio_de_nombres(self, admin_user, django_assert_num_queries):
+        """Test que un save() completo sin cambiar nombres no consulta Profile"""
+        user = User.objects.get(pk=admin_user.pk)
+        user.rol = User.Rol.SUPERVISOR
+        with django_assert_num_queries(1):
+            user.save()
+
+    def test_cambio_de_nombre_actualiza_perfil(self, admin_user):
+        """Test que cambiar el nombre actualiza el Profile con una consulta"""
+        user = User.objects.get(pk=admin_user.pk)
+        user.first_name = "Nuevo"
+        with CaptureQueriesContext(connection) as ctx:
+            user.save()
+        assert len(_consultas_perfil(ctx)) == 1
+        assert Profile.objects.get(user=user).first_name == "Nuevo"
+
+        # Un segundo save() de la misma instancia ya no cambia nada
+        with CaptureQueriesContext(connection) as ctx:
+            user.save()
+        assert _consultas_perfil(ctx) == []
+
+    def test_recrea_perfil_faltante(self, admin_user):
+        """Test que si el Profile no existe se crea al cambiar los nombres"""
+        Profile.objects.filter(user=admin_user).delete()
+        user = User.objects.get(pk=admin_user.pk)
+        user.last_name = "Apellido"
+        user.save()
+        assert Profile.objects.get(user=user).last_name == "Apellido"
+
+
+@pytest.mark.django_db
+@pytest.mark.unit
+class TestPerfilesEnBloque:
+    """Tests para perfiles_en_bloque"""
+
+    def test_crea_y_sincroniza_al_salir(self, admin_user):
+        """Test que los Profile se crean/sincronizan al salir con consultas fijas"""
+        existente = User.objects.get(pk=admin_user.pk)
+        with CaptureQueriesContext(connection) as ctx:
+            with perfiles_en_bloque():
+                for i in range(20):
+                    User.objects.create(username=f"bloque{i}", email=f"bloque{i}@test.com", first_name=f"N{i}")
+                existente.first_name = "Renombrado"
+                existente.save()
+                assert not Profile.objects.filter(user__username="bloque0").exists()
+
+        assert Profile.objects.filter(user__username__startswith="bloque").count() == 20
+        assert Profile.objects.get(user=existente).first_name == "Renombrado"
+        # select de existentes + bulk_update + bulk_create (+ la verificación de arriba)
+        assert len(_consultas_perfil(ctx)) == 4
+
+    def test_excepcion_no_escribe(self):
+        """Test que si el bloque falla no se crean perfiles"""
+        with pytest.raises(RuntimeError), perfiles_en_bloque():
+            User.objects.create(username="falla", email="falla@test.com")
+            raise RuntimeError
+        assert not Profile.objects.filter(user__username="falla").exists()
+
+
+@pytest.mark.django_db
+@pytest.mark.api
+class TestConsultasLoginYEdicion:
+    """Tests de cantidad de consultas en login y edición de usuarios"""
+
+    def test_login_no_toca_perfil(self, admin_user):
+        """Test que el login no consulta ni escribe Profile por señales"""
+        with CaptureQueriesContext(connection) as ctx:
+            response = APIClient().post(
+                "/api/v1/auth/login/", {"username": "admin_test", "password": "testpass123"}, format="json"
+            )
+        assert response.status_code == status.HTTP_200_OK
+        assert not [sql for sql in _consultas_perfil(ctx) if not sql.startswith("SELECT")]
+
+    def test_edicion_de_usuario(self, authenticated_client, supervisor_user):
+        """Test que editar el rol no toca Profile y editar el nombre hace un UPDATE"""
+        url = f"/api/v1/users/{supervisor_user.id}/"
+        with CaptureQueriesContext(connection) as ctx:
+            response = authenticated_client.patch(url, {"rol": "JEFE_TALLER"}, format="json")
+        assert response.status_code == status.HTTP_200_OK
+        assert not [sql for sql in _consultas_perfil(ctx) if not sql.startswith("SELECT")]
+
+        with CaptureQueriesContext(connection) as ctx:
+            authenticated_client.patch(url, {"first_name": "Cambiado"}, format="json")
+        assert len([sql for sql in _consultas_perfil(ctx) if sql.startswith("UPDATE")]) == 1
+        assert Profile.objects.get(user=supervisor_user).first_name == "Cambiado"
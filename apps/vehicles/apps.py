@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class VehiclesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.vehicles'
+
+    def ready(self):
+        # Registrar señales (invalidación del lookup de portería)
+        from . import signals  # noqa: F401
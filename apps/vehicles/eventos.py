@@ -0,0 +1,234 @@
+"""
+Línea de tiempo unificada de eventos de un vehículo.
+
+El ciclo de vida de un vehículo está repartido en siete tablas. Este módulo
+las combina en un solo feed cronológico (más recientes primero):
+
+- HISTORIAL: HistorialVehiculo (creado_en)
+- INGRESO: IngresoVehiculo (fecha_ingreso)
+- OT: OrdenTrabajo (apertura)
+- BACKUP: BackupVehiculo como vehículo principal (fecha_inicio)
+- BLOQUEO: BloqueoVehiculo (creado_en)
+- ASIGNACION: HistorialAsignacionVehiculo (fecha_asignacion)
+- REPUESTO: HistorialRepuestoVehiculo (fecha_uso)
+
+Cada fuente se lee por lotes en orden del índice (vehiculo, fecha) y las
+fuentes se combinan con heapq.merge (merge k-way con heap). La memoria
+depende solo del tamaño de lote, no del largo del historial.
+
+La continuación es por keyset: el cursor guarda (fecha, fuente, id) del
+último evento entregado y cada fuente retoma con un WHERE sobre su índice.
+
+Relaciones:
+- Importado por: apps/vehicles/views.py (VehiculoViewSet.eventos)
+"""
+
+import base64
+import heapq
+import json
+import uuid
+from itertools import islice
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+# Orden global: (fecha, fuente, id) descendente en los tres componentes
+FUENTES_EVENTOS = ("HISTORIAL", "INGRESO", "OT", "BACKUP", "BLOQUEO", "ASIGNACION", "REPUESTO")
+
+
+class CursorInvalido(ValueError):
+    """El cursor de continuación no se pudo decodificar."""
+
+
+def codificar_cursor(evento):
+    """
+    Codifica la posición de un evento como cursor opaco (base64 de JSON).
+    """
+    data = {"f": evento["fecha"], "s": evento["fuente"], "id": evento["id"]}
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).decode()
+
+
+def decodificar_cursor(cursor):
+    """
+    Decodifica un cursor a la tupla (fecha, fuente, id).
+
+    Lanza CursorInvalido si el cursor está mal formado.
+    """
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+        fecha = parse_datetime(data["f"])
+        fuente = data["s"]
+        id_evento = uuid.UUID(data["id"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise CursorInvalido(str(e))
+    if fecha is None or fuente not in FUENTES_EVENTOS:
+        raise CursorInvalido("Cursor inválido")
+    return fecha, fuente, id_evento
+
+
+def _definicion_fuentes(vehiculo):
+    """
+    Retorna {fuente: (queryset, campo_fecha, serializar)} para el vehículo.
+
+    Cada queryset filtra por el vehículo y queda cubierto por un índice
+    (vehiculo, campo_fecha).
+    """
+    from apps.vehicles.models import HistorialVehiculo, IngresoVehiculo, BackupVehiculo
+    from apps.workorders.models import OrdenTrabajo, BloqueoVehiculo
+    from apps.drivers.models import HistorialAsignacionVehiculo
+    from apps.inventory.models import HistorialRepuestoVehiculo
+
+    return {
+        "HISTORIAL": (
+            HistorialVehiculo.objects.filter(vehiculo=vehiculo),
+            "creado_en",
+            lambda h: {
+                "titulo": h.get_tipo_evento_display(),
+                "descripcion": h.descripcion,
+                "ot_id": str(h.ot_id) if h.ot_id else None,
+            },
+        ),
+        "INGRESO": (
+            IngresoVehiculo.objects.filter(vehiculo=vehiculo).select_related("guardia"),
+            "fecha_ingreso",
+            lambda i: {
+                "titulo": "Ingreso a taller",
+                "descripcion": i.observaciones,
+                "guardia": i.guardia.get_full_name() or i.guardia.username,
+                "kilometraje": i.kilometraje,
+                "salio": i.salio,
+            },
+        ),
+        "OT": (
+            OrdenTrabajo.objects.filter(vehiculo=vehiculo),
+            "apertura",
+            lambda ot: {
+                "titulo": f"OT {ot.get_estado_display()}",
+                "descripcion": ot.motivo,
+                "tipo": ot.tipo,
+                "estado": ot.estado,
+                "cierre": ot.cierre.isoformat() if ot.cierre else None,
+            },
+        ),
+        "BACKUP": (
+            BackupVehiculo.objects.filter(vehiculo_principal=vehiculo).select_related("vehiculo_backup"),
+            "fecha_inicio",
+            lambda b: {
+                "titulo": f"Backup {b.vehiculo_backup.patente}",
+                "descripcion": b.motivo,
+                "estado": b.estado,
+                "fecha_devolucion": b.fecha_devolucion.isoformat() if b.fecha_devolucion else None,
+            },
+        ),
+        "BLOQUEO": (
+            BloqueoVehiculo.objects.filter(vehiculo=vehiculo),
+            "creado_en",
+            lambda b: {
+                "titulo": f"Bloqueo: {b.get_tipo_display()}",
+                "descripcion": b.motivo,
+                "estado": b.estado,
+            },
+        ),
+        "ASIGNACION": (
+            HistorialAsignacionVehiculo.objects.filter(vehiculo=vehiculo).select_related("chofer"),
+            "fecha_asignacion",
+            lambda a: {
+                "titulo": f"Asignado a {a.chofer.nombre_completo}",
+                "descripcion": a.motivo_fin,
+                "activa": a.activa,
+                "fecha_fin": a.fecha_fin.isoformat() if a.fecha_fin else None,
+            },
+        ),
+        "REPUESTO": (
+            HistorialRepuestoVehiculo.objects.filter(vehiculo=vehiculo).select_related("repuesto"),
+            "fecha_uso",
+            lambda r: {
+                "titulo": f"Repuesto {r.repuesto.codigo}",
+                "descripcion": r.repuesto.nombre,
+                "cantidad": r.cantidad,
+                "ot_id": str(r.ot_id) if r.ot_id else None,
+            },
+        ),
+    }
+
+
+def _filtro_continuacion(fuente, campo_fecha, cursor):
+    """
+    Condición keyset para retomar una fuente después del cursor.
+
+    Con orden (fecha, fuente, id) descendente, lo pendiente es todo lo
+    estrictamente menor que (fecha_c, fuente_c, id_c):
+    - fuente > fuente_c: fecha < fecha_c
+    - fuente == fuente_c: fecha < fecha_c, o misma fecha e id < id_c
+    - fuente < fuente_c: fecha <= fecha_c
+    """
+    fecha_c, fuente_c, id_c = cursor
+    if fuente > fuente_c:
+        return Q(**{f"{campo_fecha}__lt": fecha_c})
+    if fuente == fuente_c:
+        return Q(**{f"{campo_fecha}__lt": fecha_c}) | Q(**{campo_fecha: fecha_c, "id__lt": id_c})
+    return Q(**{f"{campo_fecha}__lte": fecha_c})
+
+
+def _iterar_fuente(fuente, queryset, campo_fecha, serializar, cursor, tamano_lote):
+    """
+    Recorre una fuente en orden (fecha, id) descendente, por lotes de tamano_lote.
+
+    Cada elemento producido es una tupla (fecha, fuente, id, evento) para que
+    heapq.merge pueda ordenarlos sin comparar los dicts.
+    """
+    posicion = cursor
+    while True:
+        qs = queryset
+        if posicion is not None:
+            qs = qs.filter(_filtro_continuacion(fuente, campo_fecha, posicion))
+        lote = list(qs.order_by(f"-{campo_fecha}", "-id")[:tamano_lote])
+
+        for obj in lote:
+            fecha = getattr(obj, campo_fecha)
+            yield fecha, fuente, obj.id, {
+                "fuente": fuente,
+                "id": str(obj.id),
+                "fecha": fecha.isoformat(),
+                **serializar(obj),
+            }
+
+        if len(lote) < tamano_lote:
+            return
+        ultimo = lote[-1]
+        posicion = (getattr(ultimo, campo_fecha), fuente, ultimo.id)
+
+
+def obtener_eventos(vehiculo, limite=50, cursor=None, fuentes=None):
+    """
+    Retorna una página del feed de eventos del vehículo.
+
+    Parámetros:
+    - vehiculo: Instancia de Vehiculo
+    - limite: Cantidad máxima de eventos a retornar
+    - cursor: Cursor retornado por la página anterior (opcional)
+    - fuentes: Iterable de fuentes a incluir (default: todas)
+
+    Retorna:
+    - (eventos, siguiente_cursor) donde siguiente_cursor es None si no hay más
+
+    Consultas:
+    - Una por fuente incluida. Cada fuente lee como máximo limite + 1 filas,
+      suficiente para llenar la página y saber si hay más.
+    """
+    posicion = decodificar_cursor(cursor) if cursor else None
+    definiciones = _definicion_fuentes(vehiculo)
+    seleccionadas = [f for f in FUENTES_EVENTOS if fuentes is None or f in fuentes]
+
+    iteradores = [
+        _iterar_fuente(fuente, *definiciones[fuente], posicion, limite + 1)
+        for fuente in seleccionadas
+    ]
+    combinados = heapq.merge(*iteradores, key=lambda e: e[:3], reverse=True)
+
+    pagina = [e[3] for e in islice(combinados, limite + 1)]
+    siguiente = None
+    if len(pagina) > limite:
+        pagina = pagina[:limite]
+        siguiente = codificar_cursor(pagina[-1])
+    return pagina, siguiente
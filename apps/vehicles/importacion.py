@@ -0,0 +1,301 @@
+"""
+Importación masiva de vehículos desde CSV o XLSX (exportaciones SAP).
+
+Reemplaza el alta vehículo por vehículo (POST /vehicles/) al incorporar
+flotas de miles de unidades:
+
+1. Lee el archivo en streaming, fila por fila (CSV con csv.DictReader,
+   XLSX con openpyxl en modo read_only)
+2. Valida por lotes en memoria: formato de patente, duplicados dentro del
+   archivo (sets), choices y supervisores (un dict precargado)
+3. Hace upsert por lote con bulk_create(update_conflicts=True) sobre patente
+4. Retorna un reporte de errores por fila
+
+Las filas inválidas se reportan y se omiten; las válidas se importan en
+una sola transacción.
+
+Relaciones:
+- Usado por: apps/vehicles/views.py (VehiculoViewSet.importar)
+- Usado por: apps/vehicles/management/commands/importar_vehiculos.py
+- Usado por: apps/drivers/importacion.py (leer_filas)
+- Invalida: apps/notifications/directory.py, apps/vehicles/lookup.py,
+  apps/users/auth_context.py
+"""
+
+import csv
+import io
+import zipfile
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+from apps.core.validators import MAX_ENTERO_POSITIVO, validar_formato_patente
+from .models import Vehiculo
+
+# Filas por lote de validación/upsert
+TAMANO_LOTE = 1000
+
+# Columnas aceptadas en el archivo (encabezados, sin distinguir mayúsculas)
+COLUMNAS_TEXTO = ("marca", "modelo", "vin", "tipo", "categoria", "zona", "sucursal", "site", "ceco", "equipo_sap")
+COLUMNAS_ENTERAS = ("anio", "km_mensual_promedio", "kilometraje_actual")
+COLUMNAS_IMPORTABLES = COLUMNAS_TEXTO + COLUMNAS_ENTERAS + ("supervisor",)
+
+# Alias frecuentes en exportaciones SAP → columna del modelo
+ALIAS_COLUMNAS = {
+    "año": "anio",
+    "ano": "anio",
+    "centro_costo": "ceco",
+    "equipo": "equipo_sap",
+    "km": "kilometraje_actual",
+}
+
+# Roles que pueden quedar como supervisor del vehículo (Vehiculo.supervisor.limit_choices_to)
+ROLES_SUPERVISOR = ("SUPERVISOR", "COORDINADOR_ZONA")
+
+
+class ArchivoInvalido(ValueError):
+    """El archivo no se puede leer o no tiene la columna patente."""
+
+
+def _normalizar_encabezado(nombre, alias=ALIAS_COLUMNAS):
+    clave = (nombre or "").strip().lower().replace(" ", "_")
+    return alias.get(clave, clave)
+
+
+def _decodificadas(filas):
+    """Convierte un error de codificación a mitad del archivo en ArchivoInvalido."""
+    try:
+        yield from filas
+    except UnicodeDecodeError:
+        raise ArchivoInvalido("El archivo CSV debe estar codificado en UTF-8.")
+
+
+def leer_filas(archivo, nombre_archivo, columna_requerida="patente", alias=ALIAS_COLUMNAS):
+    """
+    Itera las filas del archivo como dicts {columna_normalizada: valor}.
+
+    Parámetros:
+    - archivo: Archivo binario (UploadedFile o archivo abierto en modo "rb")
+    - nombre_archivo: Nombre del archivo (define el formato por extensión)
+    - columna_requerida: Columna obligatoria (también la usa apps/drivers/importacion.py)
+    - alias: Encabezados alternativos → columna
+
+    Lanza ArchivoInvalido si el formato no es soportado o falta la columna requerida.
+    """
+    nombre = (nombre_archivo or "").lower()
+
+    if nombre.endswith(".xlsx"):
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise ArchivoInvalido("El soporte XLSX requiere openpyxl instalado. Use CSV.")
+        try:
+            libro = load_workbook(archivo, read_only=True, data_only=True)
+        except (zipfile.BadZipFile, KeyError, ValueError):
+            raise ArchivoInvalido("El archivo no es un XLSX válido.")
+        filas = libro.active.iter_rows(values_only=True)
+        encabezados = [_normalizar_encabezado(str(c) if c is not None else "", alias) for c in next(filas, ())]
+        iterador = (
+            {col: ("" if valor is None else str(valor).strip()) for col, valor in zip(encabezados, fila)}
+            for fila in filas
+        )
+    elif nombre.endswith(".csv"):
+        texto = io.TextIOWrapper(archivo, encoding="utf-8-sig", newline="")
+        try:
+            muestra = texto.read(4096)
+        except UnicodeDecodeError:
+            raise ArchivoInvalido("El archivo CSV debe estar codificado en UTF-8.")
+        texto.seek(0)
+        try:
+            dialecto = csv.Sniffer().sniff(muestra, delimiters=",;\t")
+        except csv.Error:
+            dialecto = csv.excel
+        lector = csv.DictReader(_decodificadas(texto), dialect=dialecto)
+        encabezados = [_normalizar_encabezado(c, alias) for c in (lector.fieldnames or [])]
+        lector.fieldnames = encabezados
+        iterador = (
+            {col: (valor or "").strip() for col, valor in fila.items() if col}
+            for fila in lector
+        )
+    else:
+        raise ArchivoInvalido("Formato no soportado. Use un archivo .csv o .xlsx.")
+
+    if columna_requerida not in encabezados:
+        raise ArchivoInvalido(f"El archivo debe tener una columna '{columna_requerida}'.")
+
+    return encabezados, iterador
+
+
+def _mapa_supervisores():
+    """
+    Carga en una consulta los supervisores activos indexados por username, email y RUT.
+    """
+    mapa = {}
+    usuarios = get_user_model().objects.filter(
+        rol__in=ROLES_SUPERVISOR, is_active=True
+    ).values_list("id", "username", "email", "rut")
+    for user_id, username, email, rut in usuarios:
+        for clave in (username, email, rut):
+            if clave:
+                mapa[str(clave).strip().lower()] = user_id
+    return mapa
+
+
+def _validar_fila(fila, columnas, supervisores, choices):
+    """
+    Valida una fila y construye la instancia de Vehiculo (sin guardar).
+
+    Retorna:
+    - (vehiculo, []) si es válida
+    - (None, [errores]) si no lo es
+    """
+    errores = []
+
+    es_valida, patente = validar_formato_patente(fila.get("patente", ""))
+    if not es_valida:
+        errores.append(patente)
+
+    datos = {}
+    for columna in columnas:
+        valor = fila.get(columna, "")
+        if columna in COLUMNAS_ENTERAS:
+            if valor == "":
+                datos[columna] = None
+                continue
+            try:
+                datos[columna] = int(float(valor))
+            except (ValueError, OverflowError):
+                # OverflowError: "1e400" o "inf"
+                errores.append(f"{columna} debe ser numérico.")
+                continue
+            if datos[columna] < 0:
+                errores.append(f"{columna} no puede ser negativo.")
+            elif datos[columna] > MAX_ENTERO_POSITIVO:
+                errores.append(f"{columna} no puede superar {MAX_ENTERO_POSITIVO}.")
+            elif columna == "anio" and not (1900 <= datos[columna] <= 2100):
+                errores.append("anio debe estar entre 1900 y 2100.")
+        elif columna == "supervisor":
+            if valor == "":
+                datos["supervisor_id"] = None
+            elif valor.lower() in supervisores:
+                datos["supervisor_id"] = supervisores[valor.lower()]
+            else:
+                errores.append(f"Supervisor '{valor}' no existe o no tiene rol de supervisor.")
+        elif columna in choices:
+            valor = valor.upper()
+            if valor and valor not in choices[columna]:
+                errores.append(f"{columna} '{valor}' inválido. Válidos: {', '.join(sorted(choices[columna]))}.")
+            datos[columna] = valor
+        else:
+            largo = Vehiculo._meta.get_field(columna).max_length
+            if len(valor) > largo:
+                errores.append(f"{columna} no puede superar {largo} caracteres.")
+            datos[columna] = valor
+
+    if errores:
+        return None, errores
+    return Vehiculo(patente=patente, **datos), []
+
+
+def importar_vehiculos(encabezados, filas, solo_validar=False, tamano_lote=TAMANO_LOTE):
+    """
+    Valida e importa (upsert por patente) las filas leídas con leer_filas.
+
+    Parámetros:
+    - encabezados: Columnas normalizadas del archivo
+    - filas: Iterador de dicts (ver leer_filas)
+    - solo_validar: Si es True, valida sin escribir en la base de datos
+    - tamano_lote: Filas por lote de validación/upsert
+
+    Retorna:
+    - dict: {
+        "total_filas": 10000,
+        "creados": 9800,
+        "actualizados": 150,
+        "con_errores": 50,
+        "errores": [{"fila": 12, "patente": "XX", "errores": ["..."]}, ...]
+      }
+
+    Notas:
+    - Solo se actualizan las columnas presentes en el archivo
+    - Patentes repetidas dentro del archivo: se importa la primera y las
+      siguientes se reportan como error
+    - Consultas: una para supervisores y dos por lote (existentes + upsert)
+    """
+    columnas = [c for c in encabezados if c in COLUMNAS_IMPORTABLES]
+    # updated_at es auto_now, pero en el UPDATE del upsert solo van los campos listados
+    campos_actualizables = columnas + ["updated_at"] if columnas else []
+    choices = {
+        "tipo": {valor for valor, _ in Vehiculo.TIPOS},
+        "categoria": {valor for valor, _ in Vehiculo.CATEGORIAS},
+    }
+    supervisores = _mapa_supervisores() if "supervisor" in columnas else {}
+
+    resultado = {"total_filas": 0, "creados": 0, "actualizados": 0, "con_errores": 0, "errores": []}
+    patentes_vistas = set()
+    patentes_escritas = []
+    numero_fila = 1  # La fila 1 es el encabezado
+
+    with transaction.atomic():
+        while True:
+            lote = list(islice(filas, tamano_lote))
+            if not lote:
+                break
+
+            vehiculos = []
+            for fila in lote:
+                numero_fila += 1
+                resultado["total_filas"] += 1
+                vehiculo, errores = _validar_fila(fila, columnas, supervisores, choices)
+                if vehiculo is not None and vehiculo.patente in patentes_vistas:
+                    vehiculo, errores = None, ["Patente duplicada en el archivo."]
+                if errores:
+                    resultado["con_errores"] += 1
+                    resultado["errores"].append({
+                        "fila": numero_fila,
+                        "patente": fila.get("patente", ""),
+                        "errores": errores,
+                    })
+                    continue
+                patentes_vistas.add(vehiculo.patente)
+                vehiculos.append(vehiculo)
+
+            if not vehiculos:
+                continue
+
+            # Existentes del lote en una consulta (para distinguir creados/actualizados)
+            existentes = set(
+                Vehiculo.objects.filter(patente__in=[v.patente for v in vehiculos]).values_list("patente", flat=True)
+            )
+            resultado["actualizados"] += len(existentes)
+            resultado["creados"] += len(vehiculos) - len(existentes)
+
+            if solo_validar:
+                continue
+
+            patentes_escritas.extend(v.patente for v in vehiculos)
+            if campos_actualizables:
+                Vehiculo.objects.bulk_create(
+                    vehiculos,
+                    update_conflicts=True,
+                    unique_fields=["patente"],
+                    update_fields=campos_actualizables,
+                )
+            else:
+                # Solo patentes: crear las que faltan
+                Vehiculo.objects.bulk_create(vehiculos, ignore_conflicts=True)
+
+        if not solo_validar and {"site", "supervisor"} & set(columnas):
+            # bulk_create no dispara post_save: invalidar el directorio de notificaciones
+            # y los AuthContext (sites de los supervisores)
+            from apps.notifications.directory import invalidar_directorio
+            from apps.users.auth_context import invalidar_contextos
+            transaction.on_commit(invalidar_directorio)
+            transaction.on_commit(invalidar_contextos)
+        if patentes_escritas:
+            # Las patentes nuevas pueden estar cacheadas como inexistentes en portería
+            from .lookup import invalidar_patentes
+            transaction.on_commit(lambda: invalidar_patentes(*patentes_escritas))
+
+    return resultado
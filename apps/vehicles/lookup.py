@@ -0,0 +1,268 @@
+"""
+Búsqueda rápida de vehículos para la portería (patente / código QR).
+
+Cada escaneo del guardia necesita saber si la patente existe, en qué estado
+está el vehículo y si tiene agenda para hoy. Este módulo responde eso sin ir
+a la base de datos en el caso común, con dos niveles de caché:
+
+1. Local (en el proceso): LRU acotado con TTL corto. Responde sin red.
+2. Compartido (caché de Django / Redis): una clave por patente y día.
+
+Las claves del nivel compartido incluyen la fecha local, así que la agenda
+"de hoy" nunca se arrastra al día siguiente. Se precalientan cada mañana
+desde las Agenda del día (apps/vehicles/tasks.py, precalentar_lookup_porteria)
+y se invalidan desde apps/vehicles/signals.py al guardar Vehiculo, Agenda o
+IngresoVehiculo (este último define el mapeo QR → patente).
+
+El nivel local de otros procesos no recibe la invalidación: su TTL
+(LOOKUP_LOCAL_TTL) acota cuánto puede quedar desactualizado. Por eso el
+lookup solo pre-valida; el ingreso sigue consultando la base de datos.
+
+Relaciones:
+- Usado por: apps/vehicles/views.py (VehiculoViewSet.lookup)
+- Precalentado por: apps/vehicles/tasks.py
+- Invalidado por: apps/vehicles/signals.py, apps/vehicles/services.py,
+  apps/vehicles/importacion.py (operaciones masivas sin señales)
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from apps.core.fechas import rango_dia_local
+
+# Nivel local: entradas máximas y segundos de vigencia
+LOOKUP_LOCAL_MAX = 2048
+LOOKUP_LOCAL_TTL = 30
+
+# Nivel compartido: vigencia de cada clave (la fecha en la clave la acota al día)
+LOOKUP_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Estados de agenda que el ingreso toma como "agenda de hoy"
+ESTADOS_AGENDA_INGRESO = ("PROGRAMADA", "CONFIRMADA")
+
+
+class _CacheLocal:
+    """
+    LRU en memoria con TTL, seguro entre hilos del mismo proceso.
+    """
+
+    def __init__(self, max_entradas, ttl):
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, clave):
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is None:
+                return None
+            expira, valor = entrada
+            if expira < time.monotonic():
+                del self._datos[clave]
+                return None
+            self._datos.move_to_end(clave)
+            return valor
+
+    def set(self, clave, valor):
+        with self._lock:
+            self._datos[clave] = (time.monotonic() + self.ttl, valor)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_entradas:
+                self._datos.popitem(last=False)
+
+    def delete(self, clave):
+        with self._lock:
+            self._datos.pop(clave, None)
+
+    def clear(self):
+        with self._lock:
+            self._datos.clear()
+
+
+_local = _CacheLocal(LOOKUP_LOCAL_MAX, LOOKUP_LOCAL_TTL)
+
+
+def _clave_patente(patente, dia):
+    return f"vehiculos:lookup:{dia.isoformat()}:patente:{patente}"
+
+
+def _clave_qr(qr_code):
+    return f"vehiculos:lookup:qr:{qr_code}"
+
+
+def _normalizar_patente(patente):
+    return (patente or "").strip().upper()
+
+
+def _dato_lookup(vehiculo, agenda):
+    """
+    Arma el valor cacheado para una patente (vehiculo=None: no existe).
+    """
+    if vehiculo is None:
+        return {"existe": False}
+    return {
+        "existe": True,
+        "vehiculo_id": str(vehiculo.id),
+        "patente": vehiculo.patente,
+        "estado": vehiculo.estado,
+        "estado_operativo": vehiculo.estado_operativo,
+        "agenda_id": str(agenda.id) if agenda else None,
+        "tipo_mantenimiento": agenda.tipo_mantenimiento if agenda else None,
+    }
+
+
+def _cargar_patente(patente, dia):
+    """
+    Consulta el vehículo y su agenda del día en la base de datos.
+    """
+    from apps.scheduling.models import Agenda
+    from .models import Vehiculo
+
+    vehiculo = Vehiculo.objects.filter(patente=patente).first()
+    agenda = None
+    if vehiculo is not None:
+        inicio, fin = rango_dia_local(dia)
+        agenda = Agenda.objects.filter(
+            vehiculo=vehiculo,
+            estado__in=ESTADOS_AGENDA_INGRESO,
+            fecha_programada__gte=inicio,
+            fecha_programada__lt=fin,
+        ).order_by("fecha_programada").first()
+    return _dato_lookup(vehiculo, agenda)
+
+
+def buscar_por_patente(patente):
+    """
+    Retorna el estado de portería de una patente.
+
+    Retorna:
+    - (dato, nivel) donde nivel es "local", "compartido" o "db"
+    - dato: {"existe": False} o {
+        "existe": True, "vehiculo_id": "...", "patente": "ABC123",
+        "estado": "ACTIVO", "estado_operativo": "OPERATIVO",
+        "agenda_id": "..." | None, "tipo_mantenimiento": "PREVENTIVO" | None
+      }
+
+    Las patentes inexistentes también se cachean; el post_save que crea
+    el vehículo borra esa entrada.
+    """
+    patente = _normalizar_patente(patente)
+    clave = _clave_patente(patente, timezone.localdate())
+
+    dato = _local.get(clave)
+    if dato is not None:
+        return dato, "local"
+
+    dato = cache.get(clave)
+    nivel = "compartido"
+    if dato is None:
+        dato = _cargar_patente(patente, timezone.localdate())
+        cache.set(clave, dato, LOOKUP_CACHE_TIMEOUT)
+        nivel = "db"
+
+    _local.set(clave, dato)
+    return dato, nivel
+
+
+def buscar_por_qr(qr_code):
+    """
+    Resuelve un código QR a su patente y retorna buscar_por_patente(patente).
+
+    El QR se asocia a la patente del último ingreso que lo registró.
+    Retorna ({"existe": False}, nivel) si el QR no se conoce.
+    """
+    from .models import IngresoVehiculo
+
+    clave = _clave_qr(qr_code)
+    patente = _local.get(clave)
+    if patente is None:
+        patente = cache.get(clave)
+        if patente is None:
+            patente = (
+                IngresoVehiculo.objects.filter(qr_code=qr_code)
+                .order_by("-fecha_ingreso")
+                .values_list("vehiculo__patente", flat=True)
+                .first()
+            ) or ""
+            cache.set(clave, patente, LOOKUP_CACHE_TIMEOUT)
+        _local.set(clave, patente)
+
+    if not patente:
+        return {"existe": False}, "db"
+    return buscar_por_patente(patente)
+
+
+def invalidar_patentes(*patentes):
+    """
+    Borra de ambos niveles las entradas de hoy de las patentes dadas.
+    """
+    dia = timezone.localdate()
+    claves = [_clave_patente(_normalizar_patente(p), dia) for p in patentes if p]
+    for clave in claves:
+        _local.delete(clave)
+    if claves:
+        cache.delete_many(claves)
+
+
+def invalidar_qr(qr_code):
+    """
+    Borra de ambos niveles el mapeo QR → patente.
+    """
+    clave = _clave_qr(qr_code)
+    _local.delete(clave)
+    cache.delete(clave)
+
+
+def precalentar(dia=None):
+    """
+    Carga en el nivel compartido las patentes con agenda en el día indicado.
+
+    Parámetros:
+    - dia: date local (default: hoy)
+
+    Consultas:
+    - Una para las agendas del día (con su vehículo)
+    - Una para los QR registrados por esos vehículos
+
+    Retorna:
+    - int: cantidad de patentes cargadas
+    """
+    from apps.scheduling.models import Agenda
+    from .models import IngresoVehiculo
+
+    dia = dia or timezone.localdate()
+    inicio, fin = rango_dia_local(dia)
+    agendas = (
+        Agenda.objects.filter(
+            estado__in=ESTADOS_AGENDA_INGRESO,
+            fecha_programada__gte=inicio,
+            fecha_programada__lt=fin,
+        )
+        .select_related("vehiculo")
+        .order_by("-fecha_programada")  # La más temprana del día queda al final y gana
+    )
+
+    datos = {}
+    vehiculo_ids = set()
+    for agenda in agendas:
+        datos[_clave_patente(agenda.vehiculo.patente, dia)] = _dato_lookup(agenda.vehiculo, agenda)
+        vehiculo_ids.add(agenda.vehiculo_id)
+
+    # Último QR de cada vehículo (orden ascendente: el más reciente sobrescribe)
+    qrs = (
+        IngresoVehiculo.objects.filter(vehiculo_id__in=vehiculo_ids)
+        .exclude(qr_code="")
+        .order_by("fecha_ingreso")
+        .values_list("qr_code", "vehiculo__patente")
+    )
+    for qr_code, patente in qrs:
+        datos[_clave_qr(qr_code)] = patente
+
+    if datos:
+        cache.set_many(datos, LOOKUP_CACHE_TIMEOUT)
+    return len(vehiculo_ids)
@@ -0,0 +1,117 @@
+import re
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.core.busqueda import filtro_patente, normalizar_patente_busqueda
+from apps.core.fechas import filtro_dia_local
+from apps.vehicles.models import Vehiculo, IngresoVehiculo
+
+MARCAS = (("Toyota", "Hilux"), ("Nissan", "NP300"), ("Chevrolet", "N300"), ("Hyundai", "H100"), ("Mercedes", "Sprinter"))
+LETRAS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
+def _patente(indice):
+    """AA0000, AA0001, ... (únicas hasta 6.760.000 vehículos)"""
+    grupo, numero = divmod(indice, 10000)
+    return f"{LETRAS[grupo // 26 % 26]}{LETRAS[grupo % 26]}{numero:04d}"
+
+
+class _Rollback(Exception):
+    """Descarta los datos generados al terminar el benchmark."""
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide las búsquedas por patente/texto sobre datos sintéticos "
+        "(los datos se generan en una transacción que se revierte al final)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--vehiculos', type=int, default=100_000, help='Vehículos a generar (default: 100000)')
+        parser.add_argument('--ingresos', type=int, default=1_000_000, help='Ingresos a generar (default: 1000000)')
+        parser.add_argument('--repeticiones', type=int, default=20, help='Ejecuciones por consulta (default: 20)')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._generar(options['vehiculos'], options['ingresos'])
+                self._medir(options['repeticiones'])
+                raise _Rollback()
+        except _Rollback:
+            self.stdout.write(self.style.SUCCESS('✅ Benchmark terminado (datos revertidos).'))
+
+    def _generar(self, total_vehiculos, total_ingresos):
+        self.stdout.write(f'Generando {total_vehiculos} vehículos y {total_ingresos} ingresos...')
+        inicio = time.perf_counter()
+
+        for desde in range(0, total_vehiculos, 5000):
+            Vehiculo.objects.bulk_create([
+                Vehiculo(
+                    patente=_patente(i),
+                    marca=MARCAS[i % len(MARCAS)][0],
+                    modelo=MARCAS[i % len(MARCAS)][1],
+                    vin=f"VIN{i:014d}",
+                    site=f"SITE-{i % 40}",
+                )
+                for i in range(desde, min(desde + 5000, total_vehiculos))
+            ])
+
+        guardia = get_user_model().objects.create(username="benchmark_guardia", rol="GUARDIA")
+        with connection.cursor() as cursor:
+            # Ingresos repartidos en el último año, asignados a vehículos al azar
+            cursor.execute(
+                """
+                WITH v AS (SELECT array_agg(id) AS ids, count(*) AS n FROM vehicles_vehiculo)
+                INSERT INTO vehicles_ingresovehiculo
+                    (id, vehiculo_id, guardia_id, fecha_ingreso, observaciones,
+                     observaciones_salida, qr_code, salio)
+                SELECT gen_random_uuid(), v.ids[1 + floor(random() * v.n)::int], %s,
+                       now() - (random() * interval '365 days'), '', '', '', false
+                FROM generate_series(1, %s), v
+                """,
+                [guardia.id, total_ingresos],
+            )
+            cursor.execute("ANALYZE vehicles_vehiculo")
+            cursor.execute("ANALYZE vehicles_ingresovehiculo")
+
+        self.stdout.write(f'   Datos generados en {time.perf_counter() - inicio:.1f}s')
+
+    def _medir(self, repeticiones):
+        termino = "AB12"
+        consultas = {
+            "Buscador de vehículos (patente/marca/modelo/vin)": Vehiculo.objects.filter(
+                Q(patente__icontains=termino) | Q(marca__icontains=termino)
+                | Q(modelo__icontains=termino) | Q(vin__icontains=termino)
+            ),
+            "Patente por contenido (filtro_patente 'B123')": Vehiculo.objects.filter(filtro_patente("B123")),
+            "Patente por prefijo (autocompletado 'AB1')": Vehiculo.objects.filter(
+                patente__istartswith=normalizar_patente_busqueda("ab-1")
+            ).order_by("patente")[:10],
+            "Historial de ingresos por patente ('AB123')": IngresoVehiculo.objects.filter(
+                filtro_patente("AB123", "vehiculo__patente")
+            ).order_by("-fecha_ingreso")[:50],
+            "Ingresos de hoy por patente ('AB1')": IngresoVehiculo.objects.filter(
+                filtro_dia_local("fecha_ingreso", timezone.localdate()),
+                filtro_patente("AB1", "vehiculo__patente"),
+            ),
+        }
+
+        self.stdout.write('')
+        self.stdout.write(f'{"Consulta":<52} {"mediana ms":>10}  índices usados')
+        for nombre, queryset in consultas.items():
+            tiempos = []
+            for _ in range(repeticiones):
+                inicio = time.perf_counter()
+                list(queryset.values_list("id", flat=True))
+                tiempos.append((time.perf_counter() - inicio) * 1000)
+            plan = queryset.explain()
+            indices = sorted(set(re.findall(r"(?:Index|Bitmap Index) Scan (?:Backward )?(?:using|on) (\w+)", plan)))
+            self.stdout.write(
+                f'{nombre:<52} {statistics.median(tiempos):>10.2f}  {", ".join(indices) or "scan secuencial"}'
+            )
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vehicles', '0006_ingresovehiculo_fecha_salida_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingresovehiculo',
+            name='clave_idempotencia',
+            field=models.CharField(blank=True, max_length=64, null=True, unique=True),
+        ),
+    ]
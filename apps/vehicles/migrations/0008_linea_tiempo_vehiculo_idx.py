@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vehicles', '0007_ingresovehiculo_clave_idempotencia'),
+        ('workorders', '0014_ordentrabajo_vehiculo_apertura_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='backupvehiculo',
+            index=models.Index(fields=['vehiculo_principal', 'fecha_inicio'], name='vehicles_ba_vehicul_00cab2_idx'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:17
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vehicles', '0008_linea_tiempo_vehiculo_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SnapshotFlota',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('fecha', models.DateField()),
+                ('site', models.CharField(blank=True, max_length=100)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('operativos', models.PositiveIntegerField(default=0)),
+                ('en_taller', models.PositiveIntegerField(default=0)),
+                ('bloqueados', models.PositiveIntegerField(default=0)),
+                ('fuera_politica', models.PositiveIntegerField(default=0)),
+                ('revision_vencida', models.PositiveIntegerField(default=0)),
+                ('sin_movimiento', models.PositiveIntegerField(default=0)),
+                ('con_tct', models.PositiveIntegerField(default=0)),
+                ('incumplimiento', models.PositiveIntegerField(default=0)),
+                ('inactivos', models.PositiveIntegerField(default=0)),
+                ('dias_sin_movimiento', models.PositiveSmallIntegerField(default=30)),
+                ('por_tipo', models.JSONField(blank=True, default=dict)),
+                ('creado_en', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['fecha', 'site'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='vehiculo',
+            index=models.Index(fields=['ultimo_movimiento'], name='vehicles_ve_ultimo__75095c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='snapshotflota',
+            index=models.Index(fields=['site', 'fecha'], name='vehicles_sn_site_3eb0a3_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='snapshotflota',
+            constraint=models.UniqueConstraint(fields=('fecha', 'site'), name='snapshot_flota_fecha_site_unique'),
+        ),
+    ]
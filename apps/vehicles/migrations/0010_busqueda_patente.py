@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:33
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+# Índices GIN de trigramas para icontains (SearchFilter, filtros por patente).
+# Se crean sobre UPPER(col::text), la misma expresión que Django genera para
+# icontains en PostgreSQL, para que el planner los pueda usar.
+COLUMNAS_TRIGRAMA = ("patente", "marca", "modelo", "vin")
+
+
+def _nombre_indice(columna):
+    return f"vehiculo_{columna}_trgm_idx"
+
+
+def crear_indices_trigrama(apps, schema_editor):
+    """
+    Crea pg_trgm y los índices GIN si la extensión está disponible en el
+    servidor. Sin ella, las búsquedas siguen funcionando (scan secuencial).
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            return
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for columna in COLUMNAS_TRIGRAMA:
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS {_nombre_indice(columna)} '
+                f'ON vehicles_vehiculo USING gin (UPPER("{columna}"::text) gin_trgm_ops)'
+            )
+
+
+def eliminar_indices_trigrama(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for columna in COLUMNAS_TRIGRAMA:
+            cursor.execute(f"DROP INDEX IF EXISTS {_nombre_indice(columna)}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vehicles', '0009_snapshotflota'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='vehiculo',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('patente'), name='text_pattern_ops'), name='vehiculo_patente_prefijo_idx'),
+        ),
+        migrations.RunPython(crear_indices_trigrama, eliminar_indices_trigrama),
+    ]
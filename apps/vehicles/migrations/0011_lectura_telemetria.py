@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:33
+
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vehicles', '0010_busqueda_patente'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LecturaTelemetria',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('registrada_en', models.DateTimeField()),
+                ('odometro', models.PositiveIntegerField(blank=True, null=True)),
+                ('horas_motor', models.FloatField(blank=True, null=True)),
+                ('vehiculo', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='lecturas_telemetria', to='vehicles.vehiculo')),
+            ],
+            options={
+                'indexes': [django.contrib.postgres.indexes.BrinIndex(fields=['registrada_en'], name='telemetria_registrada_brin')],
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vehicles', '0011_lectura_telemetria'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='vehiculo',
+            index=models.Index(fields=['site', 'estado'], name='vehicles_ve_site_738368_idx'),
+        ),
+    ]
@@ -21,6 +21,8 @@ Estados del vehículo:
 """
 
 from django.db import models
+from django.db.models.functions import Upper
+from django.contrib.postgres.indexes import BrinIndex, OpClass
 from django.conf import settings  # Para acceder a AUTH_USER_MODEL
 import uuid  # Para generar IDs únicos
 
@@ -256,7 +258,12 @@ class Vehiculo(models.Model):
         """
         indexes = [
             models.Index(fields=["estado"]),  # Filtros por estado (muy frecuente)
+            models.Index(fields=["site", "estado"]),  # Visibilidad por site (apps/core/alcance.py)
             models.Index(fields=["marca", "modelo"]),  # Búsquedas por marca/modelo
+            models.Index(fields=["ultimo_movimiento"]),  # Vehículos sin movimiento (snapshot diario)
+            # Prefijo de patente (istartswith, portería). Las búsquedas por contenido
+            # usan índices GIN de trigramas (migración 0010_busqueda_patente)
+            models.Index(OpClass(Upper("patente"), name="text_pattern_ops"), name="vehiculo_patente_prefijo_idx"),
         ]
         constraints = [
             # Validar que el año esté en un rango razonable
@@ -269,6 +276,35 @@ class Vehiculo(models.Model):
             ),
         ]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Guarda la patente, el site y el supervisor leídos de la base de datos:
+        si se renombra, la señal invalida también el lookup de portería de la
+        patente anterior, y los AuthContext y el directorio de notificaciones
+        solo se invalidan si cambia el site o el supervisor.
+        """
+        instance = super().from_db(db, field_names, values)
+        instance._patente_guardada = instance.__dict__.get("patente")
+        instance._site_supervisor_guardado = instance._site_supervisor()
+        return instance
+
+    def _site_supervisor(self):
+        # __dict__: no carga campos diferidos
+        return self.__dict__.get("site"), self.__dict__.get("supervisor_id")
+
+    def cambio_site_o_supervisor(self):
+        """
+        True si site o supervisor difieren de lo último leído o guardado
+        (siempre True para un vehículo que no viene de la base de datos).
+        """
+        return self._site_supervisor() != getattr(self, "_site_supervisor_guardado", None)
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # Después de los post_save: todos los receptores comparan contra lo anterior
+        self._site_supervisor_guardado = self._site_supervisor()
+
     def __str__(self):
         """
         Representación en string del vehículo.
@@ -344,7 +380,11 @@ class IngresoVehiculo(models.Model):
     
     # Indica si el vehículo ya salió del taller
     salio = models.BooleanField(default=False)
-    
+
+    # Clave generada por el cliente (tablet del guardia) para sincronización offline.
+    # Permite reintentar un lote sin duplicar ingresos.
+    clave_idempotencia = models.CharField(max_length=64, unique=True, null=True, blank=True)
+
     class Meta:
         """
         Configuración del modelo.
@@ -657,6 +697,7 @@ class BackupVehiculo(models.Model):
             models.Index(fields=["vehiculo_principal", "estado"]),
             models.Index(fields=["vehiculo_backup", "estado"]),
             models.Index(fields=["fecha_inicio"]),
+            models.Index(fields=["vehiculo_principal", "fecha_inicio"]),  # Línea de tiempo del vehículo
         ]
     
     def __str__(self):
@@ -679,3 +720,101 @@ class BackupVehiculo(models.Model):
         self.duracion_dias = delta.total_seconds() / 86400  # Convertir a días
         self.save(update_fields=["duracion_dias"])
         return self.duracion_dias
+
+
+class SnapshotFlota(models.Model):
+    """
+    Foto diaria de la composición de la flota por site.
+
+    Una fila por (fecha, site) con conteos por estado operativo, TCT,
+    cumplimiento y tipo. La genera la tarea generar_snapshot_flota
+    (apps/vehicles/tasks.py) una vez al día, lo que permite graficar
+    tendencias de disponibilidad sin recalcular sobre Vehiculo.
+
+    Uso:
+    - Escrito por: apps/vehicles/tasks.py (generar_snapshot_flota)
+    - Leído por: apps/reports/views.py (TendenciaFlotaView)
+    """
+
+    id = models.BigAutoField(primary_key=True)
+
+    # Día de la foto (hora local) y site ("" para vehículos sin site)
+    fecha = models.DateField()
+    site = models.CharField(max_length=100, blank=True)
+
+    # Total de vehículos del site (excluye los dados de BAJA)
+    total = models.PositiveIntegerField(default=0)
+
+    # Conteos por estado_operativo
+    operativos = models.PositiveIntegerField(default=0)
+    en_taller = models.PositiveIntegerField(default=0)
+    bloqueados = models.PositiveIntegerField(default=0)
+    fuera_politica = models.PositiveIntegerField(default=0)
+    revision_vencida = models.PositiveIntegerField(default=0)
+    sin_movimiento = models.PositiveIntegerField(default=0)
+
+    # TCT activo y cumplimiento fuera de política
+    con_tct = models.PositiveIntegerField(default=0)
+    incumplimiento = models.PositiveIntegerField(default=0)
+
+    # Vehículos cuyo último movimiento es anterior a dias_sin_movimiento
+    inactivos = models.PositiveIntegerField(default=0)
+    dias_sin_movimiento = models.PositiveSmallIntegerField(default=30)
+
+    # Conteo por tipo de vehículo: {"ELECTRICO": 3, "DIESEL": 10, ...}
+    por_tipo = models.JSONField(default=dict, blank=True)
+
+    creado_en = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["fecha", "site"], name="snapshot_flota_fecha_site_unique"),
+        ]
+        indexes = [
+            models.Index(fields=["site", "fecha"]),  # Tendencia de un site
+        ]
+        ordering = ["fecha", "site"]
+
+    def __str__(self):
+        return f"Snapshot {self.fecha} {self.site or '(sin site)'}"
+
+
+class LecturaTelemetria(models.Model):
+    """
+    Lectura de odómetro / horas de motor enviada por la telemetría.
+    
+    Tabla solo de inserción y de alto volumen: filas angostas, sin índice
+    B-tree por vehículo y un índice BRIN por registrada_en (las filas llegan
+    aproximadamente en orden de tiempo, así que el BRIN ocupa unas pocas
+    páginas y acota por rango de fechas). Las consultas por vehículo deben
+    filtrar también por rango de tiempo.
+    
+    Uso:
+    - Escrito por: apps/vehicles/telemetria.py (ingerir_lecturas)
+    - La última lectura de cada lote actualiza Vehiculo.kilometraje_actual
+    """
+    id = models.BigAutoField(primary_key=True)
+    
+    # Sin índice propio: el volumen hace que un B-tree por vehículo cueste más
+    # que lo que aporta (ver docstring)
+    vehiculo = models.ForeignKey(
+        Vehiculo,
+        on_delete=models.CASCADE,
+        related_name="lecturas_telemetria",
+        db_index=False,
+    )
+    
+    # Momento de la lectura en el dispositivo
+    registrada_en = models.DateTimeField()
+    
+    # Odómetro (km) y horas de motor; al menos uno viene informado
+    odometro = models.PositiveIntegerField(null=True, blank=True)
+    horas_motor = models.FloatField(null=True, blank=True)
+    
+    class Meta:
+        indexes = [
+            BrinIndex(fields=["registrada_en"], name="telemetria_registrada_brin"),
+        ]
+    
+    def __str__(self):
+        return f"Telemetría {self.vehiculo_id} {self.registrada_en:%Y-%m-%d %H:%M} {self.odometro} km"
@@ -40,6 +40,14 @@ class VehiclePermission(BasePermission):
         if request.method == "POST" and action == "create":
             return rol in {"JEFE_TALLER", "COORDINADOR_ZONA", "ADMIN"}
 
+        # Importación masiva (CSV/XLSX): mismos roles que crear vehículo
+        if request.method == "POST" and action == "importar":
+            return rol in {"JEFE_TALLER", "COORDINADOR_ZONA", "ADMIN"}
+
+        # Ingesta de telemetría (odómetro/horas de motor): integraciones del taller
+        if request.method == "POST" and action == "telemetria":
+            return rol in {"JEFE_TALLER", "ADMIN"}
+
         # Actualizar vehículo: JEFE_TALLER (limitado), COORDINADOR_ZONA y ADMIN
         if request.method in ("PUT", "PATCH") and action in ("update", "partial_update"):
             return rol in {"JEFE_TALLER", "COORDINADOR_ZONA", "ADMIN"}
@@ -0,0 +1,428 @@
+"""
+Servicios para registro masivo de ingresos de vehículos.
+
+Este módulo implementa la sincronización por lotes de ingresos registrados
+offline por los guardias (tablets en sites con mala conectividad).
+
+El flujo es equivalente a VehiculoViewSet.ingreso, pero en vez de ~12
+consultas por vehículo usa una consulta IN por tipo de objeto y bulk_create:
+
+1. Descarta claves de idempotencia ya sincronizadas
+2. Resuelve vehículos, agendas y choferes con una consulta IN cada uno
+3. Crea ingresos, OT, historial y auditoría con bulk_create
+
+Relaciones:
+- Importado por: apps/vehicles/views.py (VehiculoViewSet.ingresos_batch)
+- Usa: apps/vehicles/utils.py (SLA_DIAS_POR_TIPO)
+- Invalida: apps/vehicles/lookup.py (lookup de portería)
+"""
+
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.core.fechas import rango_dias_locales
+from apps.core.validators import MAX_ENTERO_POSITIVO
+from .models import Vehiculo, IngresoVehiculo, HistorialVehiculo
+from .utils import SLA_DIAS_POR_TIPO, SLA_DIAS_DEFAULT
+
+# Máximo de ingresos aceptados en un lote
+MAX_INGRESOS_POR_LOTE = 200
+
+# Estados de agenda que se vinculan con la OT al ingresar
+ESTADOS_AGENDA_VINCULABLES = ["PROGRAMADA", "CONFIRMADA"]
+
+# Prioridades válidas de la OT generada
+PRIORIDADES_OT = {"CRITICA", "ALTA", "MEDIA", "BAJA"}
+
+# Largo máximo de los campos de texto que se copian a Vehiculo/OT
+LARGOS_MAXIMOS = {
+    "patente": 32, "marca": 64, "modelo": 64, "vin": 64,
+    "qr_code": 255, "zona": 100, "site": 100, "chofer_nombre": 255,
+}
+
+
+def _entero(valor, campo, minimo=0, maximo=MAX_ENTERO_POSITIVO):
+    """
+    Convierte un valor opcional a entero dentro del rango de la columna.
+
+    Retorna:
+    - (entero o None, None) si es válido
+    - (None, mensaje_error) si no lo es
+    """
+    if valor in (None, ""):
+        return None, None
+    try:
+        valor = int(valor)
+    except (TypeError, ValueError, OverflowError):
+        return None, f"{campo} debe ser un número entero."
+    if valor < minimo:
+        return None, f"{campo} no puede ser menor que {minimo}."
+    if valor > maximo:
+        return None, f"{campo} no puede superar {maximo}."
+    return valor, None
+
+
+def _validar_item(item):
+    """
+    Valida y normaliza un ingreso del lote.
+
+    Retorna:
+    - (datos_normalizados, None) si es válido
+    - (None, mensaje_error) si no lo es
+    """
+    if not isinstance(item, dict):
+        return None, "Formato inválido: se esperaba un objeto."
+
+    clave = str(item.get("clave_idempotencia") or "").strip()
+    if not clave:
+        return None, "La clave_idempotencia es requerida."
+    if len(clave) > 64:
+        return None, "La clave_idempotencia no puede superar 64 caracteres."
+
+    patente = str(item.get("patente") or "").strip().upper()
+    if not patente:
+        return None, "La patente es requerida."
+
+    # Fecha registrada por el cliente (si no viene, se usa la hora del servidor)
+    ahora = timezone.now()
+    fecha_ingreso = ahora
+    if item.get("fecha_ingreso"):
+        try:
+            fecha_ingreso = parse_datetime(str(item["fecha_ingreso"]))
+        except ValueError:
+            # Formato ISO correcto pero fecha inexistente (ej: 2025-02-30)
+            fecha_ingreso = None
+        if fecha_ingreso is None:
+            return None, "fecha_ingreso no tiene un formato válido (ISO 8601)."
+        if timezone.is_naive(fecha_ingreso):
+            fecha_ingreso = timezone.make_aware(fecha_ingreso)
+        # No aceptar fechas futuras (reloj de la tablet adelantado)
+        fecha_ingreso = min(fecha_ingreso, ahora)
+
+    kilometraje, error = _entero(item.get("kilometraje"), "kilometraje")
+    if error:
+        return None, error
+    anio, error = _entero(item.get("anio") or None, "anio", minimo=1900, maximo=2100)  # vehiculo_anio_valid
+    if error:
+        return None, error
+
+    prioridad = str(item.get("prioridad", "MEDIA") or "MEDIA").upper()
+    if prioridad not in PRIORIDADES_OT:
+        return None, f"prioridad debe ser una de: {', '.join(sorted(PRIORIDADES_OT))}."
+
+    datos = {
+        "clave": clave,
+        "patente": patente,
+        "fecha_ingreso": fecha_ingreso,
+        "kilometraje": kilometraje,
+        "marca": str(item.get("marca", "") or ""),
+        "modelo": str(item.get("modelo", "") or ""),
+        "anio": anio,
+        "vin": str(item.get("vin", "") or ""),
+        "observaciones": item.get("observaciones", "") or "",
+        "qr_code": str(item.get("qr_code", "") or ""),
+        "motivo": (item.get("motivo", "") or "").strip(),
+        "prioridad": prioridad,
+        "zona": str(item["zona"]) if item.get("zona") is not None else None,
+        "site": str(item["site"]) if item.get("site") is not None else None,
+        "chofer_rut": str(item.get("chofer_rut", "") or "").strip(),
+        "chofer_nombre": str(item.get("chofer_nombre", "") or "").strip(),
+    }
+    for campo, largo in LARGOS_MAXIMOS.items():
+        if datos[campo] and len(datos[campo]) > largo:
+            return None, f"{campo} no puede superar {largo} caracteres."
+    return datos, None
+
+
+def _rango_dias_locales(fechas):
+    """
+    Retorna el rango [inicio, fin) que cubre los días locales de las fechas dadas.
+    """
+    dias = [timezone.localtime(f).date() for f in fechas]
+    return rango_dias_locales(min(dias), max(dias))
+
+
+@transaction.atomic
+def registrar_ingresos_lote(items, guardia):
+    """
+    Registra un lote de ingresos de vehículos en una sola transacción.
+
+    Parámetros:
+    - items: Lista de dicts con el mismo formato que POST /vehicles/ingreso/
+      más "clave_idempotencia" (requerida) y "fecha_ingreso" (opcional, ISO 8601)
+    - guardia: Usuario GUARDIA que sincroniza el lote
+
+    Retorna:
+    - Lista de resultados en el mismo orden que items. Cada resultado tiene:
+      {"indice", "clave_idempotencia", "estado": "CREADO"|"DUPLICADO"|"ERROR", ...}
+
+    Idempotencia:
+    - Si una clave ya fue sincronizada (o se repite en el lote), el ítem se
+      marca DUPLICADO y se retorna el ingreso existente sin crear nada nuevo.
+
+    Consultas:
+    - Un número constante de consultas, independiente del tamaño del lote.
+    """
+    resultados = [None] * len(items)
+    validos = []  # (indice, datos)
+
+    # ==================== VALIDACIÓN ====================
+    claves_vistas = {}
+    for indice, item in enumerate(items):
+        datos, error = _validar_item(item)
+        if error:
+            clave = item.get("clave_idempotencia") if isinstance(item, dict) else None
+            resultados[indice] = {
+                "indice": indice,
+                "clave_idempotencia": clave,
+                "estado": "ERROR",
+                "detail": error,
+            }
+            continue
+        if datos["clave"] in claves_vistas:
+            # Clave repetida dentro del mismo lote: se resuelve al final
+            resultados[indice] = {"indice": indice, "duplicado_de": claves_vistas[datos["clave"]]}
+            continue
+        claves_vistas[datos["clave"]] = indice
+        validos.append((indice, datos))
+
+    # ==================== IDEMPOTENCIA ====================
+    existentes = dict(
+        IngresoVehiculo.objects
+        .filter(clave_idempotencia__in=list(claves_vistas))
+        .values_list("clave_idempotencia", "id")
+    )
+    pendientes = []
+    for indice, datos in validos:
+        if datos["clave"] in existentes:
+            resultados[indice] = {
+                "indice": indice,
+                "clave_idempotencia": datos["clave"],
+                "estado": "DUPLICADO",
+                "ingreso_id": str(existentes[datos["clave"]]),
+                "patente": datos["patente"],
+            }
+        else:
+            pendientes.append((indice, datos))
+
+    if pendientes:
+        _crear_ingresos(pendientes, guardia, resultados)
+
+    # Claves repetidas dentro del lote: copiar el resultado del primer ítem
+    for indice, resultado in enumerate(resultados):
+        if resultado and "duplicado_de" in resultado:
+            original = resultados[resultado["duplicado_de"]]
+            resultados[indice] = {
+                "indice": indice,
+                "clave_idempotencia": original["clave_idempotencia"],
+                "estado": "DUPLICADO",
+                "ingreso_id": original.get("ingreso_id"),
+                "patente": original.get("patente"),
+            }
+
+    return resultados
+
+
+def _crear_ingresos(pendientes, guardia, resultados):
+    """
+    Crea ingresos, OT, historial y auditoría para los ítems pendientes.
+
+    Modifica resultados en su lugar.
+    """
+    from apps.workorders.models import OrdenTrabajo, Auditoria
+    from apps.scheduling.models import Agenda
+    from apps.drivers.models import Chofer
+    from apps.core.validators import validar_rut_chileno
+
+    ahora = timezone.now()
+    nombre_guardia = guardia.get_full_name() or guardia.username
+
+    # ==================== VEHÍCULOS (1 consulta + bulk_create) ====================
+    patentes = {datos["patente"] for _, datos in pendientes}
+    vehiculos = {v.patente: v for v in Vehiculo.objects.filter(patente__in=patentes)}
+    nuevos = []
+    for _, datos in pendientes:
+        if datos["patente"] not in vehiculos:
+            vehiculo = Vehiculo(
+                patente=datos["patente"],
+                marca=datos["marca"],
+                modelo=datos["modelo"],
+                anio=datos["anio"],
+                vin=datos["vin"],
+            )
+            vehiculos[datos["patente"]] = vehiculo
+            nuevos.append(vehiculo)
+    if nuevos:
+        Vehiculo.objects.bulk_create(nuevos)
+    patentes_creadas = {v.patente for v in nuevos}
+
+    # ==================== AGENDAS (1 consulta) ====================
+    # Agenda vinculable del día local del ingreso para cada vehículo
+    inicio, fin = _rango_dias_locales([datos["fecha_ingreso"] for _, datos in pendientes])
+    agendas = {}
+    for agenda in Agenda.objects.filter(
+        vehiculo_id__in=[v.id for v in vehiculos.values()],
+        estado__in=ESTADOS_AGENDA_VINCULABLES,
+        fecha_programada__gte=inicio,
+        fecha_programada__lt=fin,
+    ):
+        clave = (agenda.vehiculo_id, timezone.localtime(agenda.fecha_programada).date())
+        agendas.setdefault(clave, agenda)
+
+    # ==================== CHOFERES (1 consulta + bulk_create/bulk_update) ====================
+    ruts = {}
+    for _, datos in pendientes:
+        if datos["chofer_rut"]:
+            es_valido, rut_formateado = validar_rut_chileno(datos["chofer_rut"])
+            if es_valido:
+                # Limpiar RUT (sin puntos ni guión)
+                datos["rut_limpio"] = rut_formateado.replace("-", "").replace(".", "")
+                ruts[datos["rut_limpio"]] = datos["chofer_nombre"] or ruts.get(datos["rut_limpio"], "")
+    choferes = {c.rut: c for c in Chofer.objects.filter(rut__in=list(ruts))} if ruts else {}
+    choferes_nuevos = []
+    choferes_renombrados = []
+    for rut, nombre in ruts.items():
+        if rut not in choferes:
+            chofer = Chofer(rut=rut, nombre_completo=nombre or "Chofer sin nombre", activo=True)
+            choferes[rut] = chofer
+            choferes_nuevos.append(chofer)
+        elif nombre and choferes[rut].nombre_completo != nombre:
+            choferes[rut].nombre_completo = nombre
+            choferes_renombrados.append(choferes[rut])
+    if choferes_nuevos:
+        Chofer.objects.bulk_create(choferes_nuevos)
+    if choferes_renombrados:
+        Chofer.objects.bulk_update(choferes_renombrados, ["nombre_completo"])
+
+    # ==================== CONSTRUCCIÓN EN MEMORIA ====================
+    ingresos, ots, historiales, auditorias = [], [], [], []
+    agendas_usadas = []
+    fechas = []  # fecha_ingreso del cliente, en el mismo orden que ingresos/ots
+
+    for indice, datos in pendientes:
+        vehiculo = vehiculos[datos["patente"]]
+        fecha = datos["fecha_ingreso"]
+        fechas.append(fecha)
+
+        ingreso = IngresoVehiculo(
+            vehiculo=vehiculo,
+            guardia=guardia,
+            observaciones=datos["observaciones"],
+            kilometraje=datos["kilometraje"],
+            qr_code=datos["qr_code"],
+            clave_idempotencia=datos["clave"],
+        )
+        ingresos.append(ingreso)
+
+        # Agenda del día: combinar motivo y tomar tipo de mantenimiento
+        motivo = datos["motivo"]
+        agenda = agendas.pop((vehiculo.id, timezone.localtime(fecha).date()), None)
+        if agenda:
+            motivo = f"{agenda.motivo}. {motivo}".strip()
+            tipo_mantenimiento = agenda.tipo_mantenimiento
+        else:
+            tipo_mantenimiento = "CORRECTIVO" if not motivo else "MANTENCION"
+
+        # Estado operativo antes del ingreso (si el vehículo se repite en el lote,
+        # el segundo ingreso ya lo ve EN_TALLER)
+        estado_antes = vehiculo.estado_operativo
+        vehiculo.estado_operativo = "EN_TALLER"
+
+        fecha_limite_sla = fecha + timedelta(days=SLA_DIAS_POR_TIPO.get(tipo_mantenimiento, SLA_DIAS_DEFAULT))
+        ot = OrdenTrabajo(
+            vehiculo=vehiculo,
+            estado="ABIERTA",
+            tipo=tipo_mantenimiento,
+            motivo=motivo or "Ingreso al taller",
+            prioridad=datos["prioridad"],
+            zona=datos["zona"] if datos["zona"] is not None else (vehiculo.zona or ""),
+            site=datos["site"] if datos["site"] is not None else (vehiculo.site or ""),
+            causa_ingreso=datos["observaciones"],
+            chofer=choferes.get(datos.get("rut_limpio")),
+            estado_operativo_antes=estado_antes,
+            fecha_limite_sla=fecha_limite_sla,
+            sla_vencido=ahora > fecha_limite_sla,
+        )
+        ots.append(ot)
+
+        if agenda:
+            agenda.estado = "EN_PROCESO"
+            agenda.ot_asociada = ot
+            agendas_usadas.append(agenda)
+
+        historiales.append(HistorialVehiculo(
+            vehiculo=vehiculo,
+            ot=ot,
+            tipo_evento="OT_CREADA",
+            fecha_ingreso=fecha,
+            descripcion=f"OT creada por {nombre_guardia}. Motivo: {ot.motivo[:100]}",
+            supervisor=guardia,
+            site=ot.site or vehiculo.site,
+            estado_antes=estado_antes,
+            estado_despues="EN_TALLER",
+        ))
+
+        auditorias.append(Auditoria(
+            usuario=guardia,
+            accion="REGISTRAR_INGRESO_VEHICULO",
+            objeto_tipo="IngresoVehiculo",
+            objeto_id=str(ingreso.id),
+            payload={
+                "vehiculo_id": str(vehiculo.id),
+                "patente": vehiculo.patente,
+                "vehiculo_creado": vehiculo.patente in patentes_creadas,
+                "ot_generada": str(ot.id),
+                "clave_idempotencia": datos["clave"],
+                "origen": "LOTE_OFFLINE",
+            },
+        ))
+
+        resultados[indice] = {
+            "indice": indice,
+            "clave_idempotencia": datos["clave"],
+            "estado": "CREADO",
+            "ingreso_id": str(ingreso.id),
+            "ot_id": str(ot.id),
+            "patente": vehiculo.patente,
+            "vehiculo_creado": vehiculo.patente in patentes_creadas,
+            "agenda_id": str(agenda.id) if agenda else None,
+        }
+
+    # ==================== ESCRITURA EN BLOQUE ====================
+    IngresoVehiculo.objects.bulk_create(ingresos)
+    OrdenTrabajo.objects.bulk_create(ots)
+
+    # fecha_ingreso y apertura son auto_now_add: bulk_create las pisa con la
+    # hora del servidor, así que se restaura la hora registrada por el cliente
+    for ingreso, ot, fecha in zip(ingresos, ots, fechas):
+        ingreso.fecha_ingreso = fecha
+        ot.apertura = fecha
+    IngresoVehiculo.objects.bulk_update(ingresos, ["fecha_ingreso"])
+    OrdenTrabajo.objects.bulk_update(ots, ["apertura"])
+
+    HistorialVehiculo.objects.bulk_create(historiales)
+    Auditoria.objects.bulk_create(auditorias)
+    if agendas_usadas:
+        Agenda.objects.bulk_update(agendas_usadas, ["estado", "ot_asociada"])
+
+    # Estado de todos los vehículos del lote en una sola actualización
+    Vehiculo.objects.filter(id__in={v.id for v in vehiculos.values()}).update(
+        estado="EN_ESPERA",
+        estado_operativo="EN_TALLER",
+        ultimo_movimiento=ahora,
+    )
+
+    # Las escrituras en bloque no disparan señales: invalidar el lookup de
+    # portería (estado y agenda del día) y los QR registrados, tras el commit
+    from .lookup import invalidar_patentes, invalidar_qr
+    qrs = {i.qr_code for i in ingresos if i.qr_code}
+
+    def _invalidar_lookup():
+        invalidar_patentes(*patentes)
+        for qr_code in qrs:
+            invalidar_qr(qr_code)
+
+    transaction.on_commit(_invalidar_lookup)
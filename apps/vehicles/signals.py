@@ -0,0 +1,97 @@
+# apps/vehicles/signals.py
+"""
+Señales de la app de vehículos.
+
+Invalidan el lookup de portería (apps/vehicles/lookup.py) cuando cambian
+los datos que lo componen: el vehículo, su agenda del día o el QR de un
+ingreso. También invalidan el AuthContext de los usuarios
+(apps/users/auth_context.py) cuando cambia el site o supervisor de un
+vehículo.
+
+Toda invalidación se hace en transaction.on_commit: si se borrara antes,
+otra solicitud podría volver a cachear la fila previa al commit.
+
+Se registran en VehiclesConfig.ready() (apps/vehicles/apps.py).
+"""
+
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from apps.scheduling.models import Agenda
+from apps.users.auth_context import invalidar_contextos
+
+from .lookup import invalidar_patentes, invalidar_qr
+from .models import Vehiculo, IngresoVehiculo
+
+
+@receiver(post_save, sender=Vehiculo)
+@receiver(post_delete, sender=Vehiculo)
+def invalidar_lookup_vehiculo(sender, instance, **kwargs):
+    """
+    Invalida el lookup de la patente al crear, modificar o eliminar un vehículo.
+
+    Incluye los guardados con update_fields=["estado"] del ingreso: el
+    estado es parte del dato cacheado. Si la patente cambió, invalida
+    también la anterior (ver Vehiculo.from_db).
+    """
+    patentes = {instance.patente, getattr(instance, "_patente_guardada", None)}
+    instance._patente_guardada = instance.patente
+    transaction.on_commit(partial(invalidar_patentes, *patentes))
+
+
+# Campos de Vehiculo que forman parte del AuthContext (sites y supervisados)
+CAMPOS_VEHICULO_CONTEXTO = {"site", "supervisor", "supervisor_id"}
+
+
+@receiver(post_save, sender=Vehiculo)
+@receiver(post_delete, sender=Vehiculo)
+def invalidar_contexto_vehiculo(sender, instance, update_fields=None, signal=None, **kwargs):
+    """
+    Invalida el AuthContext de todos los usuarios cuando cambia el site o
+    supervisor de un vehículo.
+
+    Los guardados con update_fields que no tocan esos campos (ej: cambio de
+    estado en el ingreso) o que no los cambian respecto de lo leído (ej:
+    PATCH de kilometraje, ver Vehiculo.from_db) no invalidan nada.
+    """
+    if signal is post_save:
+        if update_fields is not None and not set(update_fields) & CAMPOS_VEHICULO_CONTEXTO:
+            return
+        if not instance.cambio_site_o_supervisor():
+            return
+    transaction.on_commit(invalidar_contextos)
+
+
+@receiver(post_save, sender=Agenda)
+@receiver(post_delete, sender=Agenda)
+def invalidar_lookup_agenda(sender, instance, **kwargs):
+    """
+    Invalida el lookup del vehículo agendado (cambia su agenda del día) y,
+    si la agenda cambió de vehículo, el del anterior (ver Agenda.from_db).
+
+    La patente se toma del vehículo ya cargado en la agenda (select_related
+    de las vistas o el asignado por el serializer); solo se consulta la base
+    para los vehículos que no están cargados, como el anterior.
+    """
+    ids = {instance.vehiculo_id, getattr(instance, "_vehiculo_id_guardado", None)} - {None}
+    instance._vehiculo_id_guardado = instance.vehiculo_id
+
+    patentes = set()
+    if Agenda.vehiculo.is_cached(instance) and instance.vehiculo.pk in ids:
+        patentes.add(instance.vehiculo.patente)
+        ids.discard(instance.vehiculo.pk)
+    if ids:
+        patentes.update(Vehiculo.objects.filter(pk__in=ids).values_list("patente", flat=True))
+    transaction.on_commit(partial(invalidar_patentes, *patentes))
+
+
+@receiver(post_save, sender=IngresoVehiculo)
+def invalidar_lookup_qr(sender, instance, created, **kwargs):
+    """
+    Invalida el mapeo QR → patente cuando un ingreso registra un QR.
+    """
+    if created and instance.qr_code:
+        transaction.on_commit(partial(invalidar_qr, instance.qr_code))
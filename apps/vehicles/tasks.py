@@ -0,0 +1,116 @@
+# apps/vehicles/tasks.py
+"""
+Tareas Celery de la app de vehículos.
+
+- generar_snapshot_flota: foto diaria de la composición de la flota
+  (programada en CELERY_BEAT_SCHEDULE, pgf_core/settings/dev.py)
+- precalentar_lookup_porteria: carga cada mañana el lookup de portería
+  con las patentes agendadas del día
+"""
+
+from datetime import timedelta
+
+from celery import shared_task
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .models import Vehiculo, SnapshotFlota
+
+# Días sin movimiento para considerar un vehículo inactivo
+DIAS_SIN_MOVIMIENTO = 30
+
+# Columnas del snapshot → condición sobre Vehiculo
+CONTEOS_SNAPSHOT = {
+    "operativos": Q(estado_operativo="OPERATIVO"),
+    "en_taller": Q(estado_operativo="EN_TALLER"),
+    "bloqueados": Q(estado_operativo="BLOQUEADO"),
+    "fuera_politica": Q(estado_operativo="FUERA_POLITICA"),
+    "revision_vencida": Q(estado_operativo="REVISION_VENCIDA"),
+    "sin_movimiento": Q(estado_operativo="SIN_MOVIMIENTO"),
+    "con_tct": Q(tct=True),
+    "incumplimiento": Q(cumplimiento="FUERA_POLITICA"),
+}
+
+
+@shared_task
+def generar_snapshot_flota(fecha=None, dias_sin_movimiento=DIAS_SIN_MOVIMIENTO):
+    """
+    Guarda la composición de la flota por site para el día indicado.
+
+    Parámetros:
+    - fecha: Fecha ISO (YYYY-MM-DD) del snapshot. Default: hoy (hora local)
+    - dias_sin_movimiento: Umbral para contar vehículos inactivos
+
+    Proceso:
+    1. Una consulta agregada por site con COUNT ... FILTER por cada columna
+    2. Una consulta agregada por (site, tipo)
+    3. Upsert de una fila por (fecha, site): re-ejecutar el mismo día
+       sobrescribe la foto en vez de duplicarla
+
+    Notas:
+    - Excluye vehículos dados de BAJA
+    - "inactivos" usa el índice sobre ultimo_movimiento; vehículos sin
+      movimiento registrado (NULL) no se cuentan
+
+    Retorna:
+    - dict con la fecha y la cantidad de sites registrados
+    """
+    from datetime import date
+
+    dia = date.fromisoformat(fecha) if fecha else timezone.localdate()
+    limite_movimiento = timezone.now() - timedelta(days=dias_sin_movimiento)
+
+    flota = Vehiculo.objects.exclude(estado="BAJA")
+
+    agregados = {nombre: Count("id", filter=condicion) for nombre, condicion in CONTEOS_SNAPSHOT.items()}
+    agregados["inactivos"] = Count("id", filter=Q(ultimo_movimiento__lt=limite_movimiento))
+    por_site = flota.values("site").annotate(total=Count("id"), **agregados).order_by()
+
+    por_tipo = {}
+    for fila in flota.values("site", "tipo").annotate(cantidad=Count("id")).order_by():
+        por_tipo.setdefault(fila["site"], {})[fila["tipo"] or "SIN_TIPO"] = fila["cantidad"]
+
+    snapshots = [
+        SnapshotFlota(
+            fecha=dia,
+            site=fila["site"],
+            total=fila["total"],
+            dias_sin_movimiento=dias_sin_movimiento,
+            por_tipo=por_tipo.get(fila["site"], {}),
+            **{campo: fila[campo] for campo in agregados},
+        )
+        for fila in por_site
+    ]
+
+    campos_actualizables = ["total", "dias_sin_movimiento", "por_tipo", "creado_en", *agregados]
+    SnapshotFlota.objects.bulk_create(
+        snapshots,
+        update_conflicts=True,
+        unique_fields=["fecha", "site"],
+        update_fields=campos_actualizables,
+    )
+
+    # Sites que ya no tienen vehículos: eliminar filas obsoletas del mismo día
+    SnapshotFlota.objects.filter(fecha=dia).exclude(site__in=[s.site for s in snapshots]).delete()
+
+    return {"fecha": dia.isoformat(), "sites": len(snapshots)}
+
+
+@shared_task
+def precalentar_lookup_porteria(fecha=None):
+    """
+    Precalienta el lookup de portería (apps/vehicles/lookup.py) con las
+    patentes que tienen agenda en el día indicado.
+
+    Parámetros:
+    - fecha: Fecha ISO (YYYY-MM-DD). Default: hoy (hora local)
+
+    Retorna:
+    - dict con la fecha y la cantidad de patentes cargadas
+    """
+    from datetime import date
+
+    from .lookup import precalentar
+
+    dia = date.fromisoformat(fecha) if fecha else timezone.localdate()
+    return {"fecha": dia.isoformat(), "patentes": precalentar(dia)}
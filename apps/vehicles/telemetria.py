@@ -0,0 +1,268 @@
+# apps/vehicles/telemetria.py
+"""
+Ingesta de lecturas de telemetría (odómetro y horas de motor).
+
+Los dispositivos envían lotes en JSON lines o CSV con las columnas
+patente, registrada_en (ISO 8601), odometro y/o horas_motor. Por cada
+sub-lote de TAMANO_LOTE líneas:
+
+1. Se valida cada línea en memoria (las patentes del sub-lote se resuelven
+   con una sola consulta)
+2. Las lecturas válidas se insertan con bulk_create en LecturaTelemetria
+   (tabla solo de inserción con índice BRIN por tiempo)
+
+Al final, la última lectura de odómetro de cada vehículo del lote actualiza
+Vehiculo.kilometraje_actual con un único UPDATE ... FROM (VALUES ...) por
+sub-lote de vehículos, solo si el odómetro avanzó (una lectura atrasada
+nunca hace retroceder el kilometraje).
+
+Las líneas inválidas se reportan y se omiten; el resto se guarda en una
+sola transacción.
+
+Relaciones:
+- Usado por: apps/vehicles/views.py (VehiculoViewSet.telemetria)
+- Escribe: LecturaTelemetria, Vehiculo (kilometraje_actual, ultimo_movimiento)
+- Usa: apps/core/busqueda.py (normalización de patentes)
+"""
+
+import csv
+import json
+import math
+from datetime import timedelta
+from itertools import islice
+
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.core.busqueda import normalizar_patente_busqueda
+from apps.core.validators import MAX_ENTERO_POSITIVO
+from .models import LecturaTelemetria, Vehiculo
+
+# Líneas por sub-lote de validación/inserción
+TAMANO_LOTE = 5000
+
+# Máximo de líneas aceptadas por solicitud
+MAX_LECTURAS_POR_SOLICITUD = 200_000
+
+# Errores detallados que se incluyen en la respuesta (el conteo es completo)
+MAX_ERRORES_REPORTADOS = 100
+
+# Tolerancia para relojes de dispositivos adelantados
+TOLERANCIA_FUTURO = timedelta(minutes=5)
+
+
+class FormatoInvalido(ValueError):
+    """El cuerpo no se puede leer como JSON lines / CSV o excede el máximo."""
+
+
+def leer_lecturas(lineas, formato):
+    """
+    Itera las lecturas de un lote como (numero_linea, dict | None).
+
+    Parámetros:
+    - lineas: Iterable de líneas (str o bytes)
+    - formato: "jsonl" o "csv" (con encabezado)
+
+    Una línea JSON mal formada produce (numero_linea, None).
+
+    Lanza:
+    - FormatoInvalido si el cuerpo no está codificado en UTF-8
+    """
+    texto = _decodificadas(lineas)
+
+    if formato == "csv":
+        lector = csv.reader(texto)
+        encabezados = [c.strip().lower() for c in next(lector, [])]
+        if "patente" not in encabezados or "registrada_en" not in encabezados:
+            raise FormatoInvalido("El CSV debe tener las columnas 'patente' y 'registrada_en'.")
+        for numero, fila in enumerate(lector, start=2):
+            if fila:
+                yield numero, dict(zip(encabezados, (v.strip() for v in fila)))
+    elif formato == "jsonl":
+        for numero, linea in enumerate(texto, start=1):
+            if not linea.strip():
+                continue
+            try:
+                lectura = json.loads(linea)
+            except ValueError:
+                yield numero, None
+                continue
+            yield numero, lectura if isinstance(lectura, dict) else None
+    else:
+        raise FormatoInvalido("Formato no soportado. Use JSON lines o CSV.")
+
+
+def _decodificadas(lineas):
+    for linea in lineas:
+        if isinstance(linea, bytes):
+            try:
+                linea = linea.decode("utf-8-sig")
+            except UnicodeDecodeError:
+                raise FormatoInvalido("El cuerpo debe estar codificado en UTF-8.")
+        yield linea
+
+
+def _numero(valor, tipo, nombre, errores):
+    if valor in (None, ""):
+        return None
+    try:
+        numero = tipo(valor)
+    except (TypeError, ValueError, OverflowError):
+        errores.append(f"{nombre} debe ser numérico.")
+        return None
+    if not math.isfinite(numero):
+        errores.append(f"{nombre} debe ser un número finito.")
+        return None
+    if numero < 0:
+        errores.append(f"{nombre} no puede ser negativo.")
+        return None
+    if numero > MAX_ENTERO_POSITIVO:
+        errores.append(f"{nombre} no puede superar {MAX_ENTERO_POSITIVO}.")
+        return None
+    return numero
+
+
+def _validar(lectura, limite_futuro):
+    """
+    Valida una lectura ya parseada.
+
+    Retorna:
+    - (patente, registrada_en, odometro, horas_motor, errores)
+    """
+    errores = []
+    if lectura is None:
+        return None, None, None, None, ["Línea JSON inválida."]
+
+    patente = normalizar_patente_busqueda(str(lectura.get("patente") or ""))
+    if not patente:
+        errores.append("patente es requerida.")
+
+    registrada_en = None
+    valor = lectura.get("registrada_en")
+    try:
+        registrada_en = parse_datetime(str(valor)) if valor else None
+    except ValueError:
+        pass
+    if registrada_en is None:
+        errores.append("registrada_en debe ser una fecha/hora ISO 8601.")
+    else:
+        if timezone.is_naive(registrada_en):
+            registrada_en = timezone.make_aware(registrada_en)
+        if registrada_en > limite_futuro:
+            errores.append("registrada_en está en el futuro.")
+
+    odometro = _numero(lectura.get("odometro"), int, "odometro", errores)
+    horas_motor = _numero(lectura.get("horas_motor"), float, "horas_motor", errores)
+    if odometro is None and horas_motor is None and not errores:
+        errores.append("Debe informar odometro u horas_motor.")
+
+    return patente, registrada_en, odometro, horas_motor, errores
+
+
+def _actualizar_kilometraje(ultimas):
+    """
+    Aplica la última lectura de odómetro por vehículo con UPDATE ... FROM VALUES.
+
+    Parámetros:
+    - ultimas: {vehiculo_id: (registrada_en, odometro)}
+
+    Retorna:
+    - Cantidad de vehículos cuyo kilometraje avanzó
+    """
+    tabla = Vehiculo._meta.db_table
+    filas = list(ultimas.items())
+    actualizados = 0
+    with connection.cursor() as cursor:
+        for inicio in range(0, len(filas), TAMANO_LOTE):
+            sub_lote = filas[inicio:inicio + TAMANO_LOTE]
+            valores = ", ".join(["(%s::uuid, %s::integer, %s::timestamptz)"] * len(sub_lote))
+            parametros = [timezone.now()]
+            for vehiculo_id, (registrada_en, odometro) in sub_lote:
+                parametros.extend((vehiculo_id, odometro, registrada_en))
+            cursor.execute(
+                f"""
+                UPDATE {tabla} AS v
+                SET kilometraje_actual = l.odometro,
+                    ultimo_movimiento = GREATEST(v.ultimo_movimiento, l.registrada_en),
+                    updated_at = %s
+                FROM (VALUES {valores}) AS l(id, odometro, registrada_en)
+                WHERE v.id = l.id
+                  AND (v.kilometraje_actual IS NULL OR v.kilometraje_actual < l.odometro)
+                """,
+                parametros,
+            )
+            actualizados += cursor.rowcount
+    return actualizados
+
+
+def ingerir_lecturas(lecturas):
+    """
+    Valida, guarda y aplica un lote de lecturas leído con leer_lecturas.
+
+    Retorna:
+    - dict: {
+        "recibidas": 5000,
+        "guardadas": 4990,
+        "con_errores": 10,
+        "errores": [{"linea": 12, "errores": ["..."]}, ...],  # primeros 100
+        "vehiculos_actualizados": 350
+      }
+
+    Lanza:
+    - FormatoInvalido si el lote supera MAX_LECTURAS_POR_SOLICITUD o no está
+      codificado en UTF-8
+    """
+    resultado = {"recibidas": 0, "guardadas": 0, "con_errores": 0, "errores": [], "vehiculos_actualizados": 0}
+    limite_futuro = timezone.now() + TOLERANCIA_FUTURO
+    ultimas = {}
+
+    def registrar_error(numero, errores):
+        resultado["con_errores"] += 1
+        if len(resultado["errores"]) < MAX_ERRORES_REPORTADOS:
+            resultado["errores"].append({"linea": numero, "errores": errores})
+
+    with transaction.atomic():
+        while True:
+            sub_lote = list(islice(lecturas, TAMANO_LOTE))
+            if not sub_lote:
+                break
+            resultado["recibidas"] += len(sub_lote)
+            if resultado["recibidas"] > MAX_LECTURAS_POR_SOLICITUD:
+                raise FormatoInvalido(f"El lote supera el máximo de {MAX_LECTURAS_POR_SOLICITUD} lecturas.")
+
+            validas = []
+            for numero, lectura in sub_lote:
+                patente, registrada_en, odometro, horas_motor, errores = _validar(lectura, limite_futuro)
+                if errores:
+                    registrar_error(numero, errores)
+                else:
+                    validas.append((numero, patente, registrada_en, odometro, horas_motor))
+
+            vehiculos = dict(
+                Vehiculo.objects.filter(patente__in={v[1] for v in validas}).values_list("patente", "id")
+            )
+            nuevas = []
+            for numero, patente, registrada_en, odometro, horas_motor in validas:
+                vehiculo_id = vehiculos.get(patente)
+                if vehiculo_id is None:
+                    registrar_error(numero, [f"Patente {patente} no existe."])
+                    continue
+                nuevas.append(LecturaTelemetria(
+                    vehiculo_id=vehiculo_id,
+                    registrada_en=registrada_en,
+                    odometro=odometro,
+                    horas_motor=horas_motor,
+                ))
+                if odometro is not None and (
+                    vehiculo_id not in ultimas or registrada_en >= ultimas[vehiculo_id][0]
+                ):
+                    ultimas[vehiculo_id] = (registrada_en, odometro)
+
+            LecturaTelemetria.objects.bulk_create(nuevas, batch_size=TAMANO_LOTE)
+            resultado["guardadas"] += len(nuevas)
+
+        if ultimas:
+            resultado["vehiculos_actualizados"] = _actualizar_kilometraje(ultimas)
+
+    return resultado
@@ -0,0 +1,149 @@
+# apps/vehicles/tests/test_importacion.py
+"""
+Tests para la importación masiva de vehículos (CSV/XLSX).
+"""
+
+import io
+import time
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from rest_framework import status
+from rest_framework.test import APIClient
+from apps.vehicles.models import Vehiculo
+from apps.vehicles.importacion import leer_filas, importar_vehiculos
+
+URL = "/api/v1/vehicles/importar/"
+
+
+def _csv(texto, nombre="flota.csv"):
+    return SimpleUploadedFile(nombre, texto.encode("utf-8"), content_type="text/csv")
+
+
+@pytest.mark.django_db
+@pytest.mark.view
+@pytest.mark.api
+class TestImportarVehiculosView:
+    """Tests para POST /vehicles/importar/"""
+    
+    def test_importa_y_reporta_errores(self, authenticated_client, supervisor_user):
+        """Test que se importan las filas válidas y se reportan las inválidas"""
+        contenido = (
+            "Patente;Marca;Año;Site;Supervisor;CeCo;Tipo\n"
+            "AB1234;Toyota;2020;SANTIAGO;supervisor_test;CC01;DIESEL\n"
+            "BCDF12;Ford;2019;SANTIAGO;;CC02;\n"
+            "XX;Ford;2019;SANTIAGO;;CC02;\n"
+            "AB1234;Toyota;2021;SANTIAGO;;CC01;\n"
+            "CDFG34;Ford;abc;SANTIAGO;nadie;CC03;AVION\n"
+        )
+        response = authenticated_client.post(URL, {"archivo": _csv(contenido)}, format="multipart")
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["total_filas"] == 5
+        assert response.data["creados"] == 2
+        assert response.data["con_errores"] == 3
+        assert [e["fila"] for e in response.data["errores"]] == [4, 5, 6]
+        assert len(response.data["errores"][2]["errores"]) == 3  # anio, supervisor y tipo
+        
+        vehiculo = Vehiculo.objects.get(patente="AB1234")
+        assert vehiculo.supervisor == supervisor_user
+        assert vehiculo.anio == 2020
+        assert vehiculo.ceco == "CC01"
+    
+    def test_upsert_actualiza_solo_columnas_presentes(self, authenticated_client, vehiculo):
+        """Test que una patente existente se actualiza sin tocar otras columnas"""
+        contenido = f"patente,ceco,equipo_sap\n{vehiculo.patente},CC99,EQ-1\n"
+        response = authenticated_client.post(URL, {"archivo": _csv(contenido)}, format="multipart")
+        
+        assert response.data["actualizados"] == 1
+        vehiculo.refresh_from_db()
+        assert vehiculo.ceco == "CC99"
+        assert vehiculo.marca == "Toyota"
+        assert vehiculo.site == "SITE_TEST"
+    
+    def test_solo_validar_no_escribe(self, authenticated_client):
+        """Test que solo_validar no guarda vehículos"""
+        response = authenticated_client.post(
+            URL, {"archivo": _csv("patente\nAB1234\n"), "solo_validar": "true"}, format="multipart"
+        )
+        assert response.data["creados"] == 1
+        assert not Vehiculo.objects.filter(patente="AB1234").exists()
+    
+    def test_archivo_invalido(self, authenticated_client):
+        """Test formato no soportado y falta de columna patente"""
+        sin_patente = authenticated_client.post(URL, {"archivo": _csv("marca\nToyota\n")}, format="multipart")
+        txt = authenticated_client.post(URL, {"archivo": _csv("patente\n", "flota.txt")}, format="multipart")
+        assert sin_patente.status_code == status.HTTP_400_BAD_REQUEST
+        assert txt.status_code == status.HTTP_400_BAD_REQUEST
+    
+    def test_codificacion_y_xlsx_invalidos(self, authenticated_client):
+        """Test que un CSV no UTF-8 (al inicio o a mitad) y un XLSX corrupto dan 400"""
+        latin1 = SimpleUploadedFile("flota.csv", "patente,marca\nAB1234,Citroën\n".encode("latin-1"))
+        tardio = SimpleUploadedFile(
+            "flota.csv", ("patente\n" + "AB1234\n" * 2000).encode() + "ZZ12ñ\n".encode("latin-1")
+        )
+        xlsx = SimpleUploadedFile("flota.xlsx", b"no es un zip")
+        for archivo in (latin1, tardio, xlsx):
+            response = authenticated_client.post(URL, {"archivo": archivo}, format="multipart")
+            assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert not Vehiculo.objects.exists()
+    
+    def test_numeros_y_textos_fuera_de_rango(self, authenticated_client):
+        """Test que 1e400, enteros sobre el rango y textos largos son errores de fila"""
+        contenido = (
+            "patente,kilometraje_actual,km_mensual_promedio,marca\n"
+            "AB1234,1e400,,\n"
+            "BCDF12,,3000000000,\n"
+            f"CDFG34,,,{'X' * 65}\n"
+            "DFGH56,1000,500,Toyota\n"
+        )
+        response = authenticated_client.post(URL, {"archivo": _csv(contenido)}, format="multipart")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["creados"] == 1
+        assert [e["fila"] for e in response.data["errores"]] == [2, 3, 4]
+    
+    def test_requiere_rol(self, guardia_user):
+        """Test que un guardia no puede importar vehículos"""
+        client = APIClient()
+        client.force_authenticate(user=guardia_user)
+        response = client.post(URL, {"archivo": _csv("patente\nAB1234\n")}, format="multipart")
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db
+@pytest.mark.service
+class TestImportacionMasiva:
+    """Tests del servicio y del comando de importación"""
+    
+    @pytest.mark.slow
+    def test_importa_10k_filas(self):
+        """Test que 10.000 filas se importan en pocos segundos"""
+        letras = "BCDFGHJKLPRSTVWXYZ"
+        filas = ["patente,marca,modelo,anio,site"]
+        for i in range(10000):
+            patente = f"{letras[i // 1000 % 18]}{letras[i // 100 % 18]}{i % 10000:04d}"
+            filas.append(f"{patente},Toyota,Hilux,2020,SITE_{i % 7}")
+        archivo = io.BytesIO("\n".join(filas).encode())
+        
+        inicio = time.monotonic()
+        encabezados, iterador = leer_filas(archivo, "flota.csv")
+        resultado = importar_vehiculos(encabezados, iterador)
+        duracion = time.monotonic() - inicio
+        
+        assert resultado["con_errores"] == 0
+        assert Vehiculo.objects.count() == 10000
+        assert duracion < 20
+    
+    def test_comando_importar_vehiculos(self, tmp_path):
+        """Test el management command importar_vehiculos"""
+        ruta = tmp_path / "flota.csv"
+        ruta.write_text("patente,marca\nAB1234,Toyota\nMALA,Ford\n", encoding="utf-8")
+        reporte = tmp_path / "errores.json"
+        salida = io.StringIO()
+        
+        call_command("importar_vehiculos", str(ruta), "--reporte", str(reporte), stdout=salida)
+        
+        assert Vehiculo.objects.filter(patente="AB1234").exists()
+        assert "1 nuevas" in salida.getvalue()
+        assert "MALA" in reporte.read_text(encoding="utf-8")
@@ -0,0 +1,165 @@
+# apps/vehicles/tests/test_ingresos_batch.py
+"""
+Tests para la sincronización en lote de ingresos offline.
+"""
+
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from apps.vehicles.models import Vehiculo, IngresoVehiculo, HistorialVehiculo
+from apps.workorders.models import OrdenTrabajo, Auditoria
+from apps.scheduling.models import Agenda
+from apps.drivers.models import Chofer
+
+URL = "/api/v1/vehicles/ingresos/batch/"
+
+
+@pytest.fixture
+def guardia_client(guardia_user):
+    """Cliente autenticado como GUARDIA."""
+    client = APIClient()
+    client.force_authenticate(user=guardia_user)
+    return client
+
+
+def _lote(n, prefijo="K"):
+    return [
+        {"clave_idempotencia": f"{prefijo}-{i}", "patente": f"BT{i:04d}", "motivo": "Revisión"}
+        for i in range(n)
+    ]
+
+
+@pytest.mark.django_db
+@pytest.mark.view
+@pytest.mark.api
+class TestIngresosBatch:
+    """Tests para POST /vehicles/ingresos/batch/"""
+    
+    def test_requiere_guardia(self, authenticated_client):
+        """Test que solo GUARDIA puede sincronizar lotes"""
+        response = authenticated_client.post(URL, {"ingresos": _lote(1)}, format="json")
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+    
+    def test_lote_vacio(self, guardia_client):
+        """Test que un lote vacío retorna 400"""
+        response = guardia_client.post(URL, {"ingresos": []}, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+    
+    def test_crea_ingresos_ot_historial_y_auditoria(self, guardia_client, vehiculo):
+        """Test que cada ítem genera ingreso, OT, historial y auditoría"""
+        items = _lote(3)
+        items.append({"clave_idempotencia": "K-existente", "patente": vehiculo.patente})
+        response = guardia_client.post(URL, {"ingresos": items}, format="json")
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["creados"] == 4
+        assert [r["estado"] for r in response.data["resultados"]] == ["CREADO"] * 4
+        assert IngresoVehiculo.objects.count() == 4
+        assert OrdenTrabajo.objects.filter(estado="ABIERTA").count() == 4
+        assert HistorialVehiculo.objects.filter(tipo_evento="OT_CREADA").count() == 4
+        assert Auditoria.objects.filter(accion="REGISTRAR_INGRESO_VEHICULO").count() == 4
+        
+        # Vehículos nuevos creados y existentes actualizados
+        assert Vehiculo.objects.filter(patente__startswith="BT").count() == 3
+        vehiculo.refresh_from_db()
+        assert vehiculo.estado == "EN_ESPERA"
+        assert vehiculo.estado_operativo == "EN_TALLER"
+        ot = OrdenTrabajo.objects.get(vehiculo=vehiculo)
+        assert ot.estado_operativo_antes == "OPERATIVO"
+        assert ot.fecha_limite_sla is not None
+    
+    def test_reintento_es_idempotente(self, guardia_client):
+        """Test que reenviar el mismo lote no duplica ingresos"""
+        items = _lote(2)
+        primera = guardia_client.post(URL, {"ingresos": items}, format="json")
+        segunda = guardia_client.post(URL, {"ingresos": items}, format="json")
+        
+        assert segunda.data["duplicados"] == 2
+        assert segunda.data["creados"] == 0
+        assert IngresoVehiculo.objects.count() == 2
+        assert (
+            [r["ingreso_id"] for r in segunda.data["resultados"]]
+            == [r["ingreso_id"] for r in primera.data["resultados"]]
+        )
+    
+    def test_clave_repetida_en_el_lote(self, guardia_client):
+        """Test que una clave repetida dentro del lote se registra una sola vez"""
+        items = _lote(1) + _lote(1)
+        response = guardia_client.post(URL, {"ingresos": items}, format="json")
+        estados = [r["estado"] for r in response.data["resultados"]]
+        assert estados == ["CREADO", "DUPLICADO"]
+        assert IngresoVehiculo.objects.count() == 1
+    
+    def test_item_invalido_no_bloquea_el_lote(self, guardia_client):
+        """Test que los errores se reportan por ítem"""
+        items = _lote(1) + [{"clave_idempotencia": "sin-patente"}, {"patente": "NOKEY1"}]
+        response = guardia_client.post(URL, {"ingresos": items}, format="json")
+        estados = [r["estado"] for r in response.data["resultados"]]
+        assert estados == ["CREADO", "ERROR", "ERROR"]
+        assert response.data["errores"] == 2
+        assert IngresoVehiculo.objects.count() == 1
+    
+    @pytest.mark.parametrize("campos", [
+        {"anio": "dosmil"},
+        {"anio": 10 ** 12},
+        {"anio": 3000},
+        {"kilometraje": "1e400"},
+        {"fecha_ingreso": "2025-02-30T10:00:00"},
+        {"prioridad": "URGENTISIMA"},
+        {"marca": "X" * 65},
+    ])
+    def test_valores_fuera_de_rango_son_error_del_item(self, guardia_client, campos):
+        """Test que las conversiones fallidas se reportan por ítem (no 500)"""
+        items = _lote(1) + [{"clave_idempotencia": "MALO-1", "patente": "MALO01", **campos}]
+        response = guardia_client.post(URL, {"ingresos": items}, format="json")
+        assert response.status_code == status.HTTP_200_OK
+        assert [r["estado"] for r in response.data["resultados"]] == ["CREADO", "ERROR"]
+        assert IngresoVehiculo.objects.count() == 1
+    
+    def test_conserva_fecha_del_cliente(self, guardia_client):
+        """Test que la fecha registrada por la tablet se conserva"""
+        fecha = (timezone.now() - timedelta(hours=3)).replace(microsecond=0)
+        items = [{"clave_idempotencia": "F-1", "patente": "FECHA1", "fecha_ingreso": fecha.isoformat()}]
+        guardia_client.post(URL, {"ingresos": items}, format="json")
+        
+        ingreso = IngresoVehiculo.objects.get(clave_idempotencia="F-1")
+        assert ingreso.fecha_ingreso == fecha
+        assert OrdenTrabajo.objects.get(vehiculo=ingreso.vehiculo).apertura == fecha
+    
+    def test_vincula_agenda_y_chofer(self, guardia_client, vehiculo, supervisor_user):
+        """Test que se vincula la agenda del día y se crea el chofer"""
+        agenda = Agenda.objects.create(
+            vehiculo=vehiculo,
+            coordinador=supervisor_user,
+            fecha_programada=timezone.now(),
+            motivo="Mantención programada",
+            tipo_mantenimiento="PREVENTIVO",
+        )
+        items = [{
+            "clave_idempotencia": "A-1",
+            "patente": vehiculo.patente,
+            "chofer_rut": "12.345.678-5",
+            "chofer_nombre": "Juan Pérez",
+        }]
+        response = guardia_client.post(URL, {"ingresos": items}, format="json")
+        
+        resultado = response.data["resultados"][0]
+        agenda.refresh_from_db()
+        assert resultado["agenda_id"] == str(agenda.id)
+        assert agenda.estado == "EN_PROCESO"
+        assert str(agenda.ot_asociada_id) == resultado["ot_id"]
+        chofer = Chofer.objects.get(rut="123456785")
+        assert OrdenTrabajo.objects.get(id=resultado["ot_id"]).chofer == chofer
+    
+    def test_consultas_constantes(self, guardia_client, guardia_user):
+        """Test que el número de consultas no crece con el tamaño del lote"""
+        with CaptureQueriesContext(connection) as chico:
+            guardia_client.post(URL, {"ingresos": _lote(2, "C")}, format="json")
+        with CaptureQueriesContext(connection) as grande:
+            guardia_client.post(URL, {"ingresos": _lote(20, "G")}, format="json")
+        assert len(grande.captured_queries) == len(chico.captured_queries)
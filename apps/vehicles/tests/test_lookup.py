@@ -0,0 +1,252 @@
+# apps/vehicles/tests/test_lookup.py
+"""
+Tests para el lookup de portería (patente / QR con caché en dos niveles).
+"""
+
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from apps.vehicles import lookup
+from apps.vehicles.models import Vehiculo, IngresoVehiculo
+from apps.vehicles.tasks import precalentar_lookup_porteria
+from apps.scheduling.models import Agenda
+
+URL = "/api/v1/vehicles/lookup/"
+
+
+@pytest.fixture(autouse=True)
+def limpiar_lookup():
+    """Asegura que cada prueba parte con ambos niveles vacíos."""
+    cache.clear()
+    lookup._local.clear()
+    yield
+    cache.clear()
+    lookup._local.clear()
+
+
+@pytest.fixture
+def guardia_client(guardia_user):
+    """Cliente autenticado como GUARDIA."""
+    client = APIClient()
+    client.force_authenticate(user=guardia_user)
+    return client
+
+
+@pytest.fixture
+def agenda_hoy(vehiculo, supervisor_user):
+    """Agenda PROGRAMADA del vehículo para hoy."""
+    return Agenda.objects.create(
+        vehiculo=vehiculo,
+        coordinador=supervisor_user,
+        fecha_programada=timezone.now(),
+        motivo="Mantención programada",
+        tipo_mantenimiento="PREVENTIVO",
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.service
+class TestLookupPorteria:
+    """Tests para apps/vehicles/lookup.py"""
+
+    def test_niveles_de_cache(self, vehiculo, agenda_hoy):
+        """Test que la segunda consulta no va a la base y la tercera sale del nivel compartido"""
+        dato, nivel = lookup.buscar_por_patente(vehiculo.patente.lower())
+        assert nivel == "db"
+        assert dato["vehiculo_id"] == str(vehiculo.id)
+        assert dato["agenda_id"] == str(agenda_hoy.id)
+
+        with CaptureQueriesContext(connection) as ctx:
+            _, nivel = lookup.buscar_por_patente(vehiculo.patente)
+        assert nivel == "local"
+        assert len(ctx.captured_queries) == 0
+
+        lookup._local.clear()
+        with CaptureQueriesContext(connection) as ctx:
+            _, nivel = lookup.buscar_por_patente(vehiculo.patente)
+        assert nivel == "compartido"
+        assert len(ctx.captured_queries) == 0
+
+    def test_agenda_de_otro_dia_no_cuenta(self, vehiculo, supervisor_user):
+        """Test que solo se considera la agenda del día local"""
+        Agenda.objects.create(
+            vehiculo=vehiculo,
+            coordinador=supervisor_user,
+            fecha_programada=timezone.now() + timedelta(days=1),
+            motivo="Mañana",
+        )
+        dato, _ = lookup.buscar_por_patente(vehiculo.patente)
+        assert dato["agenda_id"] is None
+
+    def test_patente_inexistente_se_invalida_al_crear(self, django_capture_on_commit_callbacks):
+        """Test que una patente desconocida se cachea y se libera al crear el vehículo"""
+        dato, _ = lookup.buscar_por_patente("ZZ9999")
+        assert dato == {"existe": False}
+
+        with django_capture_on_commit_callbacks(execute=True):
+            Vehiculo.objects.create(patente="ZZ9999")
+        dato, nivel = lookup.buscar_por_patente("ZZ9999")
+        assert nivel == "db"
+        assert dato["existe"] is True
+
+    def test_guardar_vehiculo_y_agenda_invalida(self, vehiculo, agenda_hoy, django_capture_on_commit_callbacks):
+        """Test que cambios de estado o de agenda invalidan la entrada"""
+        lookup.buscar_por_patente(vehiculo.patente)
+
+        vehiculo.estado = "EN_ESPERA"
+        with django_capture_on_commit_callbacks(execute=True):
+            vehiculo.save(update_fields=["estado"])
+        dato, nivel = lookup.buscar_por_patente(vehiculo.patente)
+        assert nivel == "db"
+        assert dato["estado"] == "EN_ESPERA"
+
+        agenda_hoy.estado = "CANCELADA"
+        with django_capture_on_commit_callbacks(execute=True):
+            agenda_hoy.save()
+        dato, nivel = lookup.buscar_por_patente(vehiculo.patente)
+        assert nivel == "db"
+        assert dato["agenda_id"] is None
+
+    def test_invalida_despues_del_commit(self, vehiculo, django_capture_on_commit_callbacks):
+        """Test que dentro de la transacción la entrada sigue en caché hasta el commit"""
+        lookup.buscar_por_patente(vehiculo.patente)
+        with django_capture_on_commit_callbacks(execute=True):
+            vehiculo.estado = "EN_ESPERA"
+            vehiculo.save(update_fields=["estado"])
+            _, nivel = lookup.buscar_por_patente(vehiculo.patente)
+            assert nivel != "db"
+        _, nivel = lookup.buscar_por_patente(vehiculo.patente)
+        assert nivel == "db"
+
+    def test_renombrar_patente_invalida_la_anterior(self, vehiculo, django_capture_on_commit_callbacks):
+        """Test que al cambiar la patente la anterior deja de resolverse"""
+        anterior = vehiculo.patente
+        vehiculo = Vehiculo.objects.get(pk=vehiculo.pk)
+        assert lookup.buscar_por_patente(anterior)[0]["existe"] is True
+
+        vehiculo.patente = "NUEVA1"
+        with django_capture_on_commit_callbacks(execute=True):
+            vehiculo.save()
+        assert lookup.buscar_por_patente(anterior)[0] == {"existe": False}
+
+    def test_guardar_agenda_sin_consultar_vehiculo(self, agenda_hoy):
+        """Test que la patente se toma del vehículo ya cargado en la agenda"""
+        agenda = Agenda.objects.select_related("vehiculo").get(pk=agenda_hoy.pk)
+        agenda.observaciones = "Llega temprano"
+        with CaptureQueriesContext(connection) as ctx:
+            agenda.save()
+        assert not [q for q in ctx.captured_queries if 'FROM "vehicles_vehiculo"' in q["sql"]]
+
+    def test_cambiar_vehiculo_de_agenda_invalida_ambos(
+        self, vehiculo, agenda_hoy, django_capture_on_commit_callbacks
+    ):
+        """Test que mover la agenda a otro vehículo invalida también el lookup del anterior"""
+        otro = Vehiculo.objects.create(patente="OTRO99", marca="Ford", modelo="Ranger", anio=2021)
+        assert lookup.buscar_por_patente(vehiculo.patente)[0]["agenda_id"] == str(agenda_hoy.id)
+        assert lookup.buscar_por_patente(otro.patente)[0]["agenda_id"] is None
+
+        agenda = Agenda.objects.get(pk=agenda_hoy.pk)
+        agenda.vehiculo = otro
+        with django_capture_on_commit_callbacks(execute=True):
+            agenda.save()
+        dato, nivel = lookup.buscar_por_patente(vehiculo.patente)
+        assert (dato["agenda_id"], nivel) == (None, "db")
+        assert lookup.buscar_por_patente(otro.patente)[0]["agenda_id"] == str(agenda_hoy.id)
+
+    def test_buscar_por_qr(self, vehiculo, guardia_user, django_capture_on_commit_callbacks):
+        """Test que el QR se resuelve a la patente del último ingreso que lo registró"""
+        dato, _ = lookup.buscar_por_qr("QR-1")
+        assert dato == {"existe": False}
+
+        with django_capture_on_commit_callbacks(execute=True):
+            IngresoVehiculo.objects.create(vehiculo=vehiculo, guardia=guardia_user, qr_code="QR-1")
+        dato, _ = lookup.buscar_por_qr("QR-1")
+        assert dato["patente"] == vehiculo.patente
+
+    def test_precalentar_desde_agendas(self, vehiculo, agenda_hoy, guardia_user):
+        """Test que la tarea de la mañana deja las patentes agendadas en el nivel compartido"""
+        IngresoVehiculo.objects.create(vehiculo=vehiculo, guardia=guardia_user, qr_code="QR-7")
+        cache.clear()
+
+        resultado = precalentar_lookup_porteria()
+        assert resultado["patentes"] == 1
+
+        with CaptureQueriesContext(connection) as ctx:
+            dato, nivel = lookup.buscar_por_qr("QR-7")
+        assert nivel == "compartido"
+        assert dato["agenda_id"] == str(agenda_hoy.id)
+        assert len(ctx.captured_queries) == 0
+
+    def test_lru_acotado(self):
+        """Test que el nivel local descarta la entrada menos usada"""
+        local = lookup._CacheLocal(max_entradas=2, ttl=60)
+        local.set("a", 1)
+        local.set("b", 2)
+        local.get("a")
+        local.set("c", 3)
+        assert local.get("b") is None
+        assert local.get("a") == 1
+        assert local.get("c") == 3
+
+
+@pytest.mark.django_db
+@pytest.mark.view
+@pytest.mark.api
+class TestLookupView:
+    """Tests para GET /vehicles/lookup/"""
+
+    def test_lookup_patente(self, guardia_client, vehiculo, agenda_hoy):
+        """Test que el guardia obtiene vehículo, estado y agenda del día"""
+        response = guardia_client.get(URL, {"patente": vehiculo.patente})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["existe"] is True
+        assert response.data["agenda_id"] == str(agenda_hoy.id)
+        assert response.data["cache"] == "db"
+
+        response = guardia_client.get(URL, {"patente": vehiculo.patente})
+        assert response.data["cache"] == "local"
+
+    def test_requiere_parametro(self, guardia_client):
+        """Test que sin patente ni qr retorna 400"""
+        response = guardia_client.get(URL)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_rol_sin_acceso(self, mecanico_user, vehiculo):
+        """Test que roles fuera de portería reciben 403"""
+        client = APIClient()
+        client.force_authenticate(user=mecanico_user)
+        response = client.get(URL, {"patente": vehiculo.patente})
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db
+@pytest.mark.view
+@pytest.mark.api
+class TestAutocompletadoPatentes:
+    """Tests para GET /vehicles/patentes/"""
+
+    def test_sugiere_por_prefijo(self, guardia_client):
+        """Test que retorna las patentes con el prefijo, en orden"""
+        Vehiculo.objects.bulk_create([Vehiculo(patente=p) for p in ("ABCD13", "ABCD12", "XABC34")])
+        response = guardia_client.get("/api/v1/vehicles/patentes/", {"prefijo": "ab-c", "limite": 5})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [v["patente"] for v in response.data] == ["ABCD12", "ABCD13"]
+
+    def test_limite(self, guardia_client):
+        """Test que respeta el límite de sugerencias"""
+        Vehiculo.objects.bulk_create([Vehiculo(patente=f"AB{i:04d}") for i in range(5)])
+        response = guardia_client.get("/api/v1/vehicles/patentes/", {"prefijo": "AB", "limite": 2})
+        assert len(response.data) == 2
+
+    def test_requiere_prefijo(self, guardia_client):
+        """Test que sin prefijo retorna 400"""
+        response = guardia_client.get("/api/v1/vehicles/patentes/")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,171 @@
+# apps/vehicles/tests/test_telemetria.py
+"""
+Tests para la ingesta de lecturas de telemetría (odómetro/horas de motor).
+"""
+
+import json
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from apps.vehicles.models import LecturaTelemetria, Vehiculo
+from apps.vehicles.telemetria import ingerir_lecturas, leer_lecturas
+
+URL = "/api/v1/vehicles/telemetria/"
+
+BASE = timezone.make_aware(datetime(2025, 1, 15, 10, 0))
+
+
+def _jsonl(*lecturas):
+    return "\n".join(json.dumps(l) for l in lecturas)
+
+
+def _lectura(patente, minutos, **campos):
+    return {"patente": patente, "registrada_en": (BASE + timedelta(minutes=minutos)).isoformat(), **campos}
+
+
+def _ingerir(texto, formato="jsonl"):
+    return ingerir_lecturas(leer_lecturas(texto.encode().splitlines(keepends=True), formato))
+
+
+@pytest.mark.django_db
+@pytest.mark.service
+class TestIngerirLecturas:
+    """Tests para ingerir_lecturas"""
+
+    def test_ultima_lectura_actualiza_kilometraje(self, vehiculo):
+        """Test que se guardan todas las lecturas y el kilometraje queda en la más reciente"""
+        resultado = _ingerir(_jsonl(
+            _lectura(vehiculo.patente, 2, odometro=1_200),
+            _lectura(vehiculo.patente.lower(), 5, odometro=1_500, horas_motor=80.5),
+            _lectura(vehiculo.patente, 1, odometro=1_100),  # llega desordenada
+            _lectura(vehiculo.patente, 9, horas_motor=81),  # sin odómetro
+        ))
+
+        assert resultado["guardadas"] == 4
+        assert resultado["vehiculos_actualizados"] == 1
+        vehiculo.refresh_from_db()
+        assert vehiculo.kilometraje_actual == 1_500
+        assert vehiculo.ultimo_movimiento == BASE + timedelta(minutes=5)
+
+    def test_odometro_no_retrocede(self, vehiculo):
+        """Test que una lectura menor al kilometraje actual no lo hace retroceder"""
+        Vehiculo.objects.filter(pk=vehiculo.pk).update(kilometraje_actual=50_000)
+        resultado = _ingerir(_jsonl(_lectura(vehiculo.patente, 0, odometro=49_000)))
+
+        assert (resultado["guardadas"], resultado["vehiculos_actualizados"]) == (1, 0)
+        vehiculo.refresh_from_db()
+        assert vehiculo.kilometraje_actual == 50_000
+
+    def test_reporta_lineas_invalidas(self, vehiculo):
+        """Test que las líneas inválidas se reportan con su número y el resto se guarda"""
+        futuro = (timezone.now() + timedelta(hours=1)).isoformat()
+        texto = "\n".join([
+            json.dumps(_lectura(vehiculo.patente, 0, odometro=10)),
+            "{no es json",
+            json.dumps(_lectura("ZZZZ99", 0, odometro=10)),
+            json.dumps({"patente": vehiculo.patente, "registrada_en": futuro, "odometro": 10}),
+            json.dumps(_lectura(vehiculo.patente, 0, odometro=-1)),
+            json.dumps(_lectura(vehiculo.patente, 0)),
+            "",
+            json.dumps({"patente": vehiculo.patente, "registrada_en": "ayer", "odometro": 10}),
+        ])
+        resultado = _ingerir(texto)
+
+        assert (resultado["recibidas"], resultado["guardadas"], resultado["con_errores"]) == (7, 1, 6)
+        assert sorted(e["linea"] for e in resultado["errores"]) == [2, 3, 4, 5, 6, 8]
+
+    def test_numeros_fuera_de_rango(self, vehiculo):
+        """Test que odómetros sobre el máximo de la columna y valores no finitos son errores de línea"""
+        texto = "\n".join([
+            json.dumps(_lectura(vehiculo.patente, 0, odometro=3_000_000_000)),
+            json.dumps(_lectura(vehiculo.patente, 0, odometro=1e400)),
+            json.dumps(_lectura(vehiculo.patente, 0, horas_motor=float("nan"))),
+            json.dumps(_lectura(vehiculo.patente, 0, horas_motor=float("inf"))),
+            json.dumps(_lectura(vehiculo.patente, 0, odometro=2_147_483_647)),
+        ])
+        resultado = _ingerir(texto)
+
+        assert (resultado["guardadas"], resultado["con_errores"]) == (1, 4)
+        assert [e["linea"] for e in resultado["errores"]] == [1, 2, 3, 4]
+
+    def test_csv(self, vehiculo):
+        """Test lectura CSV con encabezado"""
+        texto = f"Patente,Registrada_En,Odometro,Horas_Motor\n{vehiculo.patente},{BASE.isoformat()},700,\n"
+        resultado = _ingerir(texto, "csv")
+
+        assert resultado["guardadas"] == 1
+        assert LecturaTelemetria.objects.get().horas_motor is None
+
+    def test_consultas_constantes(self, vehiculo):
+        """Test que la cantidad de consultas no depende del tamaño del lote"""
+        Vehiculo.objects.bulk_create([Vehiculo(patente=f"TL{i:04d}") for i in range(300)])
+
+        def lote(n):
+            return _jsonl(*(_lectura(f"TL{i % 300:04d}", i, odometro=i) for i in range(n)))
+
+        with CaptureQueriesContext(connection) as pocos:
+            _ingerir(lote(3))
+        with CaptureQueriesContext(connection) as muchos:
+            resultado = _ingerir(lote(3_000))
+
+        assert resultado["vehiculos_actualizados"] == 300
+        assert len(muchos.captured_queries) == len(pocos.captured_queries)
+
+    @pytest.mark.slow
+    def test_miles_de_lecturas_por_segundo(self):
+        """Test que un feed simulado de 20.000 lecturas se ingiere a más de 2.000 por segundo"""
+        Vehiculo.objects.bulk_create([Vehiculo(patente=f"FD{i:04d}") for i in range(1_000)])
+        texto = _jsonl(*(
+            _lectura(f"FD{i % 1_000:04d}", i // 1_000, odometro=i, horas_motor=i / 100)
+            for i in range(20_000)
+        ))
+
+        inicio = time.monotonic()
+        resultado = _ingerir(texto)
+        duracion = time.monotonic() - inicio
+
+        assert resultado["guardadas"] == 20_000
+        assert 20_000 / duracion > 2_000
+
+
+@pytest.mark.django_db
+@pytest.mark.view
+@pytest.mark.api
+class TestTelemetriaView:
+    """Tests para POST /vehicles/telemetria/"""
+
+    def test_ingesta_jsonl(self, authenticated_client, vehiculo):
+        """Test que el endpoint lee JSON lines del cuerpo"""
+        cuerpo = _jsonl(_lectura(vehiculo.patente, 0, odometro=900), _lectura(vehiculo.patente, 1, odometro=950))
+        response = authenticated_client.post(URL, cuerpo, content_type="application/x-ndjson")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["guardadas"] == 2
+        vehiculo.refresh_from_db()
+        assert vehiculo.kilometraje_actual == 950
+
+    def test_csv_sin_encabezado(self, authenticated_client, vehiculo):
+        """Test que un CSV sin las columnas requeridas retorna 400"""
+        response = authenticated_client.post(URL, "foo,bar\n1,2\n", content_type="text/csv")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_cuerpo_no_utf8(self, authenticated_client, vehiculo):
+        """Test que un cuerpo que no es UTF-8 retorna 400 y no guarda nada"""
+        cuerpo = _jsonl(_lectura(vehiculo.patente, 0, odometro=900)).encode() + b"\n\xff\xfe\n"
+        response = authenticated_client.post(URL, cuerpo, content_type="application/x-ndjson")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert not LecturaTelemetria.objects.exists()
+
+    def test_requiere_rol(self, guardia_user):
+        """Test que un guardia no puede enviar telemetría"""
+        client = APIClient()
+        client.force_authenticate(user=guardia_user)
+        response = client.post(URL, "", content_type="application/x-ndjson")
+        assert response.status_code == status.HTTP_403_FORBIDDEN
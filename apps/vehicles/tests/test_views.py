@@ -202,3 +202,154 @@ class TestVehiculoViewSet:
         assert "ordenes_trabajo" in response.data
         assert "ingresos" in response.data
 
+
+
+@pytest.mark.django_db
+class TestHistorialSecciones:
+    """Tests para el resumen y las secciones paginadas del historial"""
+    
+    @pytest.fixture
+    def historial_poblado(self, vehiculo, guardia_user):
+        """Vehículo con 5 OT, 3 ingresos y 2 repuestos usados"""
+        from apps.workorders.models import OrdenTrabajo
+        from apps.vehicles.models import IngresoVehiculo
+        from apps.inventory.models import Repuesto, HistorialRepuestoVehiculo
+        
+        ots = [OrdenTrabajo.objects.create(vehiculo=vehiculo, motivo=f"OT {i}") for i in range(5)]
+        for _ in range(3):
+            IngresoVehiculo.objects.create(vehiculo=vehiculo, guardia=guardia_user)
+        repuesto = Repuesto.objects.create(codigo="FIL-01", nombre="Filtro")
+        for ot in ots[:2]:
+            HistorialRepuestoVehiculo.objects.create(vehiculo=vehiculo, repuesto=repuesto, cantidad=1, ot=ot)
+        return vehiculo
+    
+    @pytest.mark.view
+    @pytest.mark.api
+    def test_historial_resumen(self, authenticated_client, historial_poblado):
+        """Test que el resumen retorna conteos y último evento por sección"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        
+        url = f"/api/v1/vehicles/{historial_poblado.id}/historial/?resumen=true"
+        with CaptureQueriesContext(connection) as ctx:
+            response = authenticated_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["ordenes_trabajo"]["total"] == 5
+        assert response.data["ingresos"]["total"] == 3
+        assert response.data["historial_repuestos"]["total"] == 2
+        assert response.data["ordenes_trabajo"]["ultimo"] is not None
+        # Vehículo + una consulta agregada (más las de autenticación/sesión)
+        consultas_resumen = [q for q in ctx.captured_queries if "COUNT" in q["sql"].upper()]
+        assert len(consultas_resumen) == 1
+    
+    @pytest.mark.view
+    @pytest.mark.api
+    def test_historial_resumen_vacio(self, authenticated_client, vehiculo):
+        """Test que el resumen de un vehículo sin historial retorna ceros"""
+        url = f"/api/v1/vehicles/{vehiculo.id}/historial/?resumen=true"
+        response = authenticated_client.get(url)
+        assert response.data["ingresos"] == {"total": 0, "ultimo": None}
+    
+    @pytest.mark.view
+    @pytest.mark.api
+    def test_historial_ordenes_paginado_por_cursor(self, authenticated_client, historial_poblado):
+        """Test que recorrer los cursores entrega todas las OT sin repetir"""
+        url = f"/api/v1/vehicles/{historial_poblado.id}/historial/ordenes/?page_size=2"
+        ids = []
+        paginas = 0
+        while url:
+            response = authenticated_client.get(url)
+            assert response.status_code == status.HTTP_200_OK
+            ids.extend(ot["id"] for ot in response.data["results"])
+            url = response.data["next"]
+            paginas += 1
+        assert paginas == 3
+        assert len(ids) == len(set(ids)) == 5
+    
+    @pytest.mark.view
+    @pytest.mark.api
+    def test_historial_ingresos_y_repuestos(self, authenticated_client, historial_poblado):
+        """Test las secciones de ingresos y repuestos"""
+        base = f"/api/v1/vehicles/{historial_poblado.id}/historial"
+        ingresos = authenticated_client.get(f"{base}/ingresos/")
+        repuestos = authenticated_client.get(f"{base}/repuestos/")
+        assert len(ingresos.data["results"]) == 3
+        assert len(repuestos.data["results"]) == 2
+        assert repuestos.data["results"][0]["repuesto_codigo"] == "FIL-01"
+
+
+@pytest.mark.django_db
+class TestEventosVehiculo:
+    """Tests para la línea de tiempo unificada del vehículo"""
+    
+    @pytest.fixture
+    def vehiculo_con_eventos(self, vehiculo, guardia_user, admin_user):
+        """Vehículo con eventos en varias fuentes y fechas distintas"""
+        from datetime import timedelta
+        from django.utils import timezone
+        from apps.vehicles.models import IngresoVehiculo, HistorialVehiculo
+        from apps.workorders.models import OrdenTrabajo, BloqueoVehiculo
+        
+        base = timezone.now() - timedelta(days=30)
+        for i in range(4):
+            ingreso = IngresoVehiculo.objects.create(vehiculo=vehiculo, guardia=guardia_user)
+            IngresoVehiculo.objects.filter(pk=ingreso.pk).update(fecha_ingreso=base + timedelta(days=i * 3))
+            ot = OrdenTrabajo.objects.create(vehiculo=vehiculo, motivo=f"OT {i}")
+            OrdenTrabajo.objects.filter(pk=ot.pk).update(apertura=base + timedelta(days=i * 3, hours=1))
+        HistorialVehiculo.objects.create(vehiculo=vehiculo, tipo_evento="OTRO", descripcion="Nota")
+        BloqueoVehiculo.objects.create(
+            vehiculo=vehiculo, creado_por=admin_user, tipo="SANCION", motivo="Multa"
+        )
+        return vehiculo
+    
+    @pytest.mark.view
+    @pytest.mark.api
+    def test_eventos_orden_cronologico(self, authenticated_client, vehiculo_con_eventos):
+        """Test que el feed mezcla las fuentes en orden descendente"""
+        response = authenticated_client.get(f"/api/v1/vehicles/{vehiculo_con_eventos.id}/eventos/")
+        assert response.status_code == status.HTTP_200_OK
+        eventos = response.data["results"]
+        assert len(eventos) == 10
+        fechas = [e["fecha"] for e in eventos]
+        assert fechas == sorted(fechas, reverse=True)
+        assert {e["fuente"] for e in eventos} == {"INGRESO", "OT", "HISTORIAL", "BLOQUEO"}
+        assert response.data["next"] is None
+    
+    @pytest.mark.view
+    @pytest.mark.api
+    def test_eventos_continuacion_por_cursor(self, authenticated_client, vehiculo_con_eventos):
+        """Test que recorrer las páginas entrega el mismo feed sin repetir"""
+        base = f"/api/v1/vehicles/{vehiculo_con_eventos.id}/eventos/"
+        completo = authenticated_client.get(base).data["results"]
+        
+        url = f"{base}?limite=3"
+        paginado = []
+        while url:
+            response = authenticated_client.get(url)
+            assert len(response.data["results"]) <= 3
+            paginado.extend(response.data["results"])
+            url = response.data["next"]
+        assert [e["id"] for e in paginado] == [e["id"] for e in completo]
+    
+    @pytest.mark.view
+    @pytest.mark.api
+    def test_eventos_una_consulta_por_fuente(self, authenticated_client, vehiculo_con_eventos):
+        """Test que cada página lee cada fuente una sola vez"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        
+        url = f"/api/v1/vehicles/{vehiculo_con_eventos.id}/eventos/?limite=2&fuentes=OT,INGRESO"
+        with CaptureQueriesContext(connection) as ctx:
+            response = authenticated_client.get(url)
+        assert [e["fuente"] for e in response.data["results"]] == ["OT", "INGRESO"]
+        sql = [q["sql"] for q in ctx.captured_queries]
+        assert len([q for q in sql if "workorders_ordentrabajo" in q]) == 1
+        assert len([q for q in sql if "vehicles_ingresovehiculo" in q]) == 1
+    
+    @pytest.mark.view
+    @pytest.mark.api
+    def test_eventos_parametros_invalidos(self, authenticated_client, vehiculo):
+        """Test validación de cursor y fuentes"""
+        base = f"/api/v1/vehicles/{vehiculo.id}/eventos/"
+        assert authenticated_client.get(f"{base}?cursor=xyz").status_code == status.HTTP_400_BAD_REQUEST
+        assert authenticated_client.get(f"{base}?fuentes=FOO").status_code == status.HTTP_400_BAD_REQUEST
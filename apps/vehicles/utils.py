@@ -12,6 +12,16 @@ from django.utils import timezone
 from .models import HistorialVehiculo, BackupVehiculo, Vehiculo
 from apps.workorders.models import OrdenTrabajo
 
+# SLA por defecto: 7 días para mantención, 3 días para reparación, 1 día para emergencia
+SLA_DIAS_POR_TIPO = {
+    "MANTENCION": 7,
+    "REPARACION": 3,
+    "EMERGENCIA": 1,
+    "DIAGNOSTICO": 2,
+    "OTRO": 5,
+}
+SLA_DIAS_DEFAULT = 5  # Tipos no listados
+
 
 def registrar_evento_historial(
     vehiculo,
@@ -230,16 +240,7 @@ def calcular_sla_ot(ot):
     Retorna:
     - True si el SLA está vencido, False en caso contrario
     """
-    # SLA por defecto: 7 días para mantención, 3 días para reparación, 1 día para emergencia
-    sla_dias = {
-        "MANTENCION": 7,
-        "REPARACION": 3,
-        "EMERGENCIA": 1,
-        "DIAGNOSTICO": 2,
-        "OTRO": 5,
-    }
-    
-    dias_sla = sla_dias.get(ot.tipo, 5)  # Default 5 días
+    dias_sla = SLA_DIAS_POR_TIPO.get(ot.tipo, SLA_DIAS_DEFAULT)
     
     # Calcular fecha límite
     if not ot.fecha_limite_sla:
@@ -19,6 +19,9 @@ Relaciones:
 Endpoints principales:
 - /api/v1/vehicles/ → CRUD de vehículos
 - /api/v1/vehicles/ingreso/ → Registrar ingreso rápido (Guardia)
+- /api/v1/vehicles/ingresos/batch/ → Sincronizar ingresos offline en lote (Guardia)
+- /api/v1/vehicles/importar/ → Importación masiva desde CSV/XLSX
+- /api/v1/vehicles/telemetria/ → Ingesta de lecturas de odómetro/horas de motor
 - /api/v1/vehicles/{id}/ingreso/evidencias/ → Agregar evidencias al ingreso
 - /api/v1/vehicles/{id}/historial/ → Historial completo del vehículo
 """
@@ -28,7 +31,7 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.filters import OrderingFilter
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db import transaction  # Para transacciones atómicas
+from django.db import transaction, IntegrityError  # Para transacciones atómicas
 from django.utils import timezone  # Para timestamps
 from drf_spectacular.utils import extend_schema  # Para documentación OpenAPI
 
@@ -43,6 +46,8 @@ from .serializers import (
 from .permissions import VehiclePermission
 from apps.workorders.models import Auditoria
 from apps.core.serializers import EmptySerializer
+from apps.core.fechas import filtro_dia_local, filtro_dias_locales
+from apps.core.busqueda import filtro_patente, normalizar_patente_busqueda
 
 
 class VehiculoViewSet(viewsets.ModelViewSet):
@@ -58,6 +63,7 @@ class VehiculoViewSet(viewsets.ModelViewSet):
     
     Acciones personalizadas:
     - POST /api/v1/vehicles/ingreso/ → Registrar ingreso rápido (Guardia)
+    - POST /api/v1/vehicles/ingresos/batch/ → Sincronizar ingresos offline (Guardia)
     - POST /api/v1/vehicles/{id}/ingreso/evidencias/ → Agregar evidencias
     - GET /api/v1/vehicles/{id}/historial/ → Historial completo
     
@@ -207,9 +213,9 @@ class VehiculoViewSet(viewsets.ModelViewSet):
         
         # Buscar si hay una agenda programada para este vehículo hoy
         agenda = Agenda.objects.filter(
+            filtro_dia_local("fecha_programada", timezone.localdate()),  # Solo del día actual
             vehiculo=vehiculo,
             estado__in=["PROGRAMADA", "CONFIRMADA"],  # Estados válidos
-            fecha_programada__date=timezone.now().date()  # Solo del día actual
         ).first()
         
         # Obtener motivo del ingreso
@@ -315,6 +321,290 @@ class VehiculoViewSet(viewsets.ModelViewSet):
             }
         }, status=status.HTTP_201_CREATED)
 
+    @extend_schema(
+        responses={200: None},
+        description="Sincroniza un lote de ingresos registrados offline (Guardia)"
+    )
+    @action(detail=False, methods=['post'], url_path='ingresos/batch', permission_classes=[permissions.IsAuthenticated])
+    def ingresos_batch(self, request):
+        """
+        Registra en bloque los ingresos que un guardia acumuló sin conexión.
+
+        Endpoint: POST /api/v1/vehicles/ingresos/batch/
+
+        Permisos:
+        - Solo GUARDIA puede registrar ingresos
+
+        Body JSON:
+        {
+            "ingresos": [
+                {
+                    "clave_idempotencia": "tablet-07-000123",  // Requerida, única por ingreso
+                    "fecha_ingreso": "2025-01-15T08:12:00-03:00",  // Opcional, hora de la tablet
+                    "patente": "ABC123",
+                    ...  // Mismos campos que POST /vehicles/ingreso/
+                },
+                ...
+            ]
+        }
+
+        Retorna:
+        - 200: {
+            "total": 50, "creados": 48, "duplicados": 1, "errores": 1,
+            "resultados": [{"indice": 0, "estado": "CREADO", "ingreso_id": "...", "ot_id": "..."}, ...]
+          }
+        - 403: Si no es GUARDIA
+        - 400: Si el body no es una lista válida
+
+        Características especiales:
+        - Reintentar el mismo lote es seguro: las claves ya sincronizadas
+          se marcan DUPLICADO y no se crea nada nuevo
+        - Un ítem inválido no impide registrar el resto del lote
+        """
+        from .services import registrar_ingresos_lote, MAX_INGRESOS_POR_LOTE
+
+        if request.user.rol != "GUARDIA":
+            return Response(
+                {"detail": "Solo el Guardia puede registrar ingresos."},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        items = request.data.get("ingresos") if isinstance(request.data, dict) else request.data
+        if not isinstance(items, list) or not items:
+            return Response(
+                {"detail": "Se requiere una lista 'ingresos' no vacía."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(items) > MAX_INGRESOS_POR_LOTE:
+            return Response(
+                {"detail": f"Máximo {MAX_INGRESOS_POR_LOTE} ingresos por lote."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            resultados = registrar_ingresos_lote(items, request.user)
+        except IntegrityError:
+            # Otro envío del mismo lote se sincronizó en paralelo: al reintentar
+            # esas claves aparecerán como DUPLICADO
+            return Response(
+                {"detail": "Conflicto al sincronizar el lote. Reintente el envío."},
+                status=status.HTTP_409_CONFLICT
+            )
+
+        estados = [r["estado"] for r in resultados]
+        return Response({
+            "total": len(resultados),
+            "creados": estados.count("CREADO"),
+            "duplicados": estados.count("DUPLICADO"),
+            "errores": estados.count("ERROR"),
+            "resultados": resultados,
+        }, status=status.HTTP_200_OK)
+
+    @extend_schema(
+        responses={200: None},
+        description="Pre-valida una patente o código QR en portería (respuesta cacheada)"
+    )
+    @action(detail=False, methods=['get'], url_path='lookup', permission_classes=[permissions.IsAuthenticated])
+    def lookup(self, request):
+        """
+        Consulta rápida de una patente o QR para la pantalla de portería.
+
+        Endpoint: GET /api/v1/vehicles/lookup/?patente=ABC123
+                  GET /api/v1/vehicles/lookup/?qr=QR123
+
+        Permisos:
+        - GUARDIA, JEFE_TALLER y ADMIN
+
+        Retorna:
+        - 200: {
+            "existe": true, "vehiculo_id": "...", "patente": "ABC123",
+            "estado": "ACTIVO", "estado_operativo": "OPERATIVO",
+            "agenda_id": "..." | null, "tipo_mantenimiento": "PREVENTIVO" | null,
+            "cache": "local" | "compartido" | "db"
+          }
+          o {"existe": false, "cache": "..."} si la patente/QR no se conoce
+        - 400: Si no se envía patente ni qr
+        - 403: Si el rol no tiene acceso
+
+        Características especiales:
+        - No consulta la base de datos si la patente está en caché
+          (ver apps/vehicles/lookup.py)
+        - Solo pre-valida: POST /vehicles/ingreso/ vuelve a consultar la base
+        """
+        from .lookup import buscar_por_patente, buscar_por_qr
+
+        if request.user.rol not in ("GUARDIA", "JEFE_TALLER", "ADMIN"):
+            return Response(
+                {"detail": "No tiene permisos para consultar la portería."},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        patente = request.query_params.get("patente", "").strip()
+        qr_code = request.query_params.get("qr", "").strip()
+        if patente:
+            dato, nivel = buscar_por_patente(patente)
+        elif qr_code:
+            dato, nivel = buscar_por_qr(qr_code)
+        else:
+            return Response(
+                {"detail": "Debe indicar 'patente' o 'qr'."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response({**dato, "cache": nivel}, status=status.HTTP_200_OK)
+
+    @extend_schema(
+        responses={200: None},
+        description="Autocompletado de patentes por prefijo (portería)"
+    )
+    @action(detail=False, methods=['get'], url_path='patentes', permission_classes=[permissions.IsAuthenticated])
+    def patentes(self, request):
+        """
+        Sugiere patentes que comienzan con el texto escrito en portería.
+
+        Endpoint: GET /api/v1/vehicles/patentes/?prefijo=AB&limite=10
+
+        Permisos:
+        - GUARDIA, JEFE_TALLER y ADMIN
+
+        Query params:
+        - prefijo: Inicio de la patente (se ignoran guiones y espacios)
+        - limite: Máximo de sugerencias (default 10, máximo 50)
+
+        Retorna:
+        - 200: [{"id": "...", "patente": "ABCD12", "estado": "ACTIVO"}, ...]
+        - 400: Si falta el prefijo
+        - 403: Si el rol no tiene acceso
+
+        Características especiales:
+        - Usa el índice de prefijo sobre patente (vehiculo_patente_prefijo_idx):
+          recorre solo el rango de patentes con ese prefijo
+        """
+        if request.user.rol not in ("GUARDIA", "JEFE_TALLER", "ADMIN"):
+            return Response(
+                {"detail": "No tiene permisos para consultar la portería."},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        prefijo = normalizar_patente_busqueda(request.query_params.get("prefijo", ""))
+        if not prefijo:
+            return Response(
+                {"detail": "Debe indicar 'prefijo'."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            limite = min(max(int(request.query_params.get("limite", 10)), 1), 50)
+        except ValueError:
+            limite = 10
+
+        sugerencias = (
+            Vehiculo.objects.filter(patente__istartswith=prefijo)
+            .order_by("patente")
+            .values("id", "patente", "estado")[:limite]
+        )
+        return Response(list(sugerencias), status=status.HTTP_200_OK)
+
+    @extend_schema(
+        responses={200: None},
+        description="Importa vehículos en bloque desde CSV o XLSX (upsert por patente)"
+    )
+    @action(detail=False, methods=['post'], url_path='importar')
+    def importar(self, request):
+        """
+        Importa o actualiza vehículos desde un archivo CSV/XLSX (ej: exportación SAP).
+
+        Endpoint: POST /api/v1/vehicles/importar/ (multipart/form-data)
+
+        Permisos:
+        - JEFE_TALLER, COORDINADOR_ZONA, ADMIN (ver VehiclePermission)
+
+        Form data:
+        - archivo: Archivo .csv o .xlsx con columna "patente" y opcionalmente
+          marca, modelo, anio, vin, tipo, categoria, zona, sucursal, site,
+          supervisor (username/email/RUT), ceco, equipo_sap, km_mensual_promedio,
+          kilometraje_actual
+        - solo_validar: "true" para validar sin guardar (opcional)
+
+        Retorna:
+        - 200: {"total_filas", "creados", "actualizados", "con_errores", "errores": [...]}
+        - 400: Si no se envió archivo o el formato no es soportado
+
+        Ver apps/vehicles/importacion.py para el detalle del proceso.
+        """
+        from .importacion import leer_filas, importar_vehiculos, ArchivoInvalido
+
+        archivo = request.FILES.get("archivo")
+        if not archivo:
+            return Response(
+                {"detail": "Debe enviar un archivo en el campo 'archivo'."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        solo_validar = str(request.data.get("solo_validar", "")).lower() in ("1", "true")
+        try:
+            encabezados, filas = leer_filas(archivo, archivo.name)
+            resultado = importar_vehiculos(encabezados, filas, solo_validar=solo_validar)
+        except ArchivoInvalido as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        Auditoria.objects.create(
+            usuario=request.user,
+            accion="IMPORTAR_VEHICULOS",
+            objeto_tipo="Vehiculo",
+            objeto_id="",
+            payload={
+                "archivo": archivo.name,
+                "solo_validar": solo_validar,
+                **{k: v for k, v in resultado.items() if k != "errores"},
+            }
+        )
+
+        return Response(resultado, status=status.HTTP_200_OK)
+
+    @extend_schema(
+        request=None,
+        responses={200: None},
+        description="Ingiere lecturas de odómetro/horas de motor en lote (JSON lines o CSV)"
+    )
+    @action(detail=False, methods=['post'], url_path='telemetria')
+    def telemetria(self, request):
+        """
+        Recibe un lote de lecturas de telemetría y actualiza el kilometraje.
+
+        Endpoint: POST /api/v1/vehicles/telemetria/
+
+        Permisos:
+        - JEFE_TALLER, ADMIN (ver VehiclePermission)
+
+        Body (se lee en streaming, sin cargarlo completo en memoria):
+        - Content-Type text/csv: encabezado con patente, registrada_en y
+          odometro y/o horas_motor
+        - Cualquier otro (application/x-ndjson, application/json): un objeto
+          JSON por línea, ej:
+          {"patente": "ABCD12", "registrada_en": "2025-01-15T10:30:00-03:00", "odometro": 45210}
+
+        Cada línea debe traer odometro u horas_motor. La última lectura de
+        odómetro de cada vehículo actualiza kilometraje_actual solo si avanzó.
+
+        Retorna:
+        - 200: {"recibidas", "guardadas", "con_errores", "errores": [...],
+                "vehiculos_actualizados"}
+        - 400: Si el CSV no tiene encabezado válido o el lote excede el máximo
+
+        Ver apps/vehicles/telemetria.py para el detalle del proceso.
+        """
+        from .telemetria import leer_lecturas, ingerir_lecturas, FormatoInvalido
+
+        formato = "csv" if request.content_type.startswith("text/csv") else "jsonl"
+        cuerpo = request.stream
+        lineas = iter(cuerpo.readline, b"") if cuerpo is not None else iter(())
+        try:
+            resultado = ingerir_lecturas(leer_lecturas(lineas, formato))
+        except FormatoInvalido as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(resultado, status=status.HTTP_200_OK)
+
     @extend_schema(
         responses={200: None},
         description="Genera un PDF del ticket de ingreso de un vehículo"
@@ -520,17 +810,17 @@ class VehiculoViewSet(viewsets.ModelViewSet):
             )
         
         # Obtener fecha de hoy
-        hoy = timezone.now().date()
+        hoy = timezone.localdate()
         
         # Filtrar ingresos del día
         ingresos = IngresoVehiculo.objects.filter(
-            fecha_ingreso__date=hoy
+            filtro_dia_local("fecha_ingreso", hoy)
         ).select_related("vehiculo", "guardia", "guardia_salida").order_by("-fecha_ingreso")
         
         # Filtrar por patente si se proporciona
         patente = request.query_params.get("patente", "").strip().upper()
         if patente:
-            ingresos = ingresos.filter(vehiculo__patente__icontains=patente)
+            ingresos = ingresos.filter(filtro_patente(patente, "vehiculo__patente"))
         
         # Serializar
         serializer = IngresoVehiculoSerializer(ingresos, many=True)
@@ -586,14 +876,14 @@ class VehiculoViewSet(viewsets.ModelViewSet):
         
         # Filtrar por patente si se proporciona
         if patente:
-            ingresos = ingresos.filter(vehiculo__patente__icontains=patente)
+            ingresos = ingresos.filter(filtro_patente(patente, "vehiculo__patente"))
         
         # Filtrar por fecha desde
         if fecha_desde:
             try:
                 from datetime import datetime
                 fecha_desde_obj = datetime.strptime(fecha_desde, "%Y-%m-%d").date()
-                ingresos = ingresos.filter(fecha_ingreso__date__gte=fecha_desde_obj)
+                ingresos = ingresos.filter(filtro_dias_locales("fecha_ingreso", desde=fecha_desde_obj))
             except ValueError:
                 pass  # Ignorar fecha inválida
         
@@ -602,15 +892,15 @@ class VehiculoViewSet(viewsets.ModelViewSet):
             try:
                 from datetime import datetime
                 fecha_hasta_obj = datetime.strptime(fecha_hasta, "%Y-%m-%d").date()
-                ingresos = ingresos.filter(fecha_ingreso__date__lte=fecha_hasta_obj)
+                ingresos = ingresos.filter(filtro_dias_locales("fecha_ingreso", hasta=fecha_hasta_obj))
             except ValueError:
                 pass  # Ignorar fecha inválida
         
         # Si no se proporcionaron fechas, usar últimos 30 días por defecto
         if not fecha_desde and not fecha_hasta:
             from datetime import timedelta
-            fecha_desde_default = timezone.now().date() - timedelta(days=30)
-            ingresos = ingresos.filter(fecha_ingreso__date__gte=fecha_desde_default)
+            fecha_desde_default = timezone.localdate() - timedelta(days=30)
+            ingresos = ingresos.filter(filtro_dias_locales("fecha_ingreso", desde=fecha_desde_default))
         
         # Filtrar por estado de salida
         if salio_param.lower() == "true":
@@ -704,7 +994,7 @@ class VehiculoViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     
     @extend_schema(
-        description="Obtiene el historial completo del vehículo (OT, repuestos, ingresos)",
+        description="Obtiene el historial completo del vehículo (OT, repuestos, ingresos). Con ?resumen=true retorna solo conteos y último evento por sección",
         responses={200: None}
     )
     @action(detail=True, methods=['get'], url_path='historial')
@@ -717,6 +1007,10 @@ class VehiculoViewSet(viewsets.ModelViewSet):
         Permisos:
         - Requiere autenticación
         
+        Query params:
+        - resumen: "true" para retornar solo el resumen (recomendado para la
+          primera carga de la ficha del vehículo)
+        
         Retorna:
         - 200: {
             "vehiculo": {...},
@@ -727,6 +1021,12 @@ class VehiculoViewSet(viewsets.ModelViewSet):
             "total_repuestos": 5,
             "total_ingresos": 8
           }
+        - 200 (resumen): {
+            "vehiculo": {...},
+            "ordenes_trabajo": {"total": 10, "ultimo": "2025-01-15T..."},
+            "historial_repuestos": {"total": 5, "ultimo": "..."},
+            "ingresos": {"total": 8, "ultimo": "..."}
+          }
         
         Incluye:
         - Información del vehículo
@@ -737,89 +1037,39 @@ class VehiculoViewSet(viewsets.ModelViewSet):
         Optimizaciones:
         - Usa select_related para reducir queries
         - Usa prefetch_related para items y evidencias
+        - Para vehículos con mucho historial usar el resumen y las secciones
+          paginadas: /historial/ordenes/, /historial/repuestos/, /historial/ingresos/
         """
         # Obtener vehículo
         vehiculo = self.get_object()
         
-        # ==================== HISTORIAL DE OT ====================
-        from apps.workorders.models import OrdenTrabajo, ItemOT
-        
-        # Obtener todas las OT del vehículo con optimizaciones
-        ordenes = OrdenTrabajo.objects.filter(vehiculo=vehiculo).select_related(
-            'responsable'  # Reducir queries para responsable
-        ).prefetch_related('items').order_by('-apertura')  # Más recientes primero
-        
-        # Serializar OT con sus items
-        ordenes_data = []
-        for ot in ordenes:
-            ordenes_data.append({
-                "id": str(ot.id),
-                "estado": ot.estado,
-                "tipo": ot.tipo,
-                "prioridad": ot.prioridad,
-                "motivo": ot.motivo,
-                "responsable": f"{ot.responsable.first_name} {ot.responsable.last_name}" if ot.responsable else None,
-                "apertura": ot.apertura.isoformat(),
-                "cierre": ot.cierre.isoformat() if ot.cierre else None,
-                "items": [{
-                    "tipo": item.tipo,
-                    "descripcion": item.descripcion,
-                    "cantidad": item.cantidad,
-                    "costo_unitario": str(item.costo_unitario),
-                } for item in ot.items.all()],
+        if request.query_params.get("resumen", "").lower() in ("1", "true"):
+            return Response({
+                "vehiculo": _vehiculo_historial_data(vehiculo),
+                **_resumen_historial(vehiculo),
             })
         
+        # ==================== HISTORIAL DE OT ====================
+        ordenes_data = [
+            _ot_historial_data(ot) for ot in _ordenes_historial_qs(vehiculo).order_by('-apertura')
+        ]
+        
         # ==================== HISTORIAL DE REPUESTOS ====================
         historial_repuestos = []
-        try:
-            # Intentar obtener historial de repuestos (si existe módulo de inventario)
-            from apps.inventory.models import HistorialRepuestoVehiculo
-            repuestos = HistorialRepuestoVehiculo.objects.filter(
-                vehiculo=vehiculo
-            ).select_related('repuesto', 'ot').order_by('-fecha_uso')
-            
-            historial_repuestos = [{
-                "repuesto_codigo": h.repuesto.codigo,
-                "repuesto_nombre": h.repuesto.nombre,
-                "cantidad": h.cantidad,
-                "fecha_uso": h.fecha_uso.isoformat(),
-                "ot_id": str(h.ot.id) if h.ot else None,
-                "costo_unitario": str(h.costo_unitario) if h.costo_unitario else None,
-            } for h in repuestos]
-        except ImportError:
-            # Si el módulo de inventario no existe, continuar sin errores
-            pass
+        repuestos = _repuestos_historial_qs(vehiculo)
+        if repuestos is not None:
+            historial_repuestos = [
+                _repuesto_historial_data(h) for h in repuestos.order_by('-fecha_uso')
+            ]
         
         # ==================== HISTORIAL DE INGRESOS ====================
-        # Obtener todos los ingresos con optimizaciones
-        ingresos = IngresoVehiculo.objects.filter(
-            vehiculo=vehiculo
-        ).select_related('guardia').prefetch_related('evidencias').order_by('-fecha_ingreso')
-        
-        # Serializar ingresos con evidencias
-        ingresos_data = [{
-            "id": str(ing.id),
-            "fecha_ingreso": ing.fecha_ingreso.isoformat(),
-            "guardia": f"{ing.guardia.first_name} {ing.guardia.last_name}",
-            "kilometraje": ing.kilometraje,
-            "observaciones": ing.observaciones,
-            "evidencias": [{
-                "tipo": ev.tipo,
-                "url": ev.url,
-                "descripcion": ev.descripcion,
-            } for ev in ing.evidencias.all()],
-        } for ing in ingresos]
+        ingresos_data = [
+            _ingreso_historial_data(ing) for ing in _ingresos_historial_qs(vehiculo).order_by('-fecha_ingreso')
+        ]
         
         # Retornar historial completo
         return Response({
-            "vehiculo": {
-                "id": str(vehiculo.id),
-                "patente": vehiculo.patente,
-                "marca": vehiculo.marca,
-                "modelo": vehiculo.modelo,
-                "anio": vehiculo.anio,
-                "estado": vehiculo.estado,
-            },
+            "vehiculo": _vehiculo_historial_data(vehiculo),
             "ordenes_trabajo": ordenes_data,
             "historial_repuestos": historial_repuestos,
             "ingresos": ingresos_data,
@@ -828,6 +1078,268 @@ class VehiculoViewSet(viewsets.ModelViewSet):
             "total_ingresos": len(ingresos_data),
         })
 
+    def _seccion_historial_paginada(self, request, queryset, ordering, serializar):
+        """
+        Pagina una sección del historial por cursor y serializa la página.
+        """
+        from apps.core.pagination import FechaCursorPagination
+        
+        paginator = FechaCursorPagination(ordering=ordering)
+        pagina = paginator.paginate_queryset(queryset, request, view=self)
+        return paginator.get_paginated_response([serializar(obj) for obj in pagina])
+
+    @extend_schema(
+        description="OT del vehículo paginadas por cursor (más recientes primero)",
+        responses={200: None}
+    )
+    @action(detail=True, methods=['get'], url_path='historial/ordenes')
+    def historial_ordenes(self, request, pk=None):
+        """
+        Sección de OT del historial, paginada por cursor.
+        
+        Endpoint: GET /api/v1/vehicles/{id}/historial/ordenes/?cursor=...&page_size=20
+        
+        Retorna:
+        - 200: {"next": "...", "previous": null, "results": [...]}
+        """
+        vehiculo = self.get_object()
+        return self._seccion_historial_paginada(
+            request, _ordenes_historial_qs(vehiculo), ("-apertura", "-id"), _ot_historial_data
+        )
+
+    @extend_schema(
+        description="Repuestos usados en el vehículo paginados por cursor",
+        responses={200: None}
+    )
+    @action(detail=True, methods=['get'], url_path='historial/repuestos')
+    def historial_repuestos(self, request, pk=None):
+        """
+        Sección de repuestos del historial, paginada por cursor.
+        
+        Endpoint: GET /api/v1/vehicles/{id}/historial/repuestos/?cursor=...&page_size=20
+        """
+        vehiculo = self.get_object()
+        repuestos = _repuestos_historial_qs(vehiculo)
+        if repuestos is None:
+            return Response({"next": None, "previous": None, "results": []})
+        return self._seccion_historial_paginada(
+            request, repuestos, ("-fecha_uso", "-id"), _repuesto_historial_data
+        )
+
+    @extend_schema(
+        description="Ingresos al taller del vehículo paginados por cursor",
+        responses={200: None}
+    )
+    @action(detail=True, methods=['get'], url_path='historial/ingresos')
+    def historial_ingresos(self, request, pk=None):
+        """
+        Sección de ingresos del historial, paginada por cursor.
+        
+        Endpoint: GET /api/v1/vehicles/{id}/historial/ingresos/?cursor=...&page_size=20
+        """
+        vehiculo = self.get_object()
+        return self._seccion_historial_paginada(
+            request, _ingresos_historial_qs(vehiculo), ("-fecha_ingreso", "-id"), _ingreso_historial_data
+        )
+
+    @extend_schema(
+        description="Línea de tiempo unificada del vehículo (historial, ingresos, OT, backups, bloqueos, asignaciones y repuestos)",
+        responses={200: None}
+    )
+    @action(detail=True, methods=['get'], url_path='eventos')
+    def eventos(self, request, pk=None):
+        """
+        Retorna los eventos del vehículo de todas las fuentes, en orden cronológico.
+
+        Endpoint: GET /api/v1/vehicles/{id}/eventos/
+
+        Query params:
+        - limite: Eventos por página (default 50, máximo 200)
+        - cursor: Cursor de continuación retornado en "next"
+        - fuentes: Lista separada por comas para filtrar (ej: "OT,INGRESO")
+
+        Retorna:
+        - 200: {
+            "results": [{"fuente": "OT", "id": "...", "fecha": "...", "titulo": "...", ...}, ...],
+            "next": "http://.../eventos/?cursor=..."  // null si no hay más
+          }
+        - 400: Si el cursor, el límite o las fuentes son inválidos
+
+        Ver apps/vehicles/eventos.py para el detalle del merge por keyset.
+        """
+        from rest_framework.utils.urls import replace_query_param
+        from .eventos import obtener_eventos, CursorInvalido, FUENTES_EVENTOS
+
+        vehiculo = self.get_object()
+
+        try:
+            limite = min(int(request.query_params.get("limite", 50)), 200)
+            if limite < 1:
+                raise ValueError
+        except ValueError:
+            return Response(
+                {"detail": "El parámetro 'limite' debe ser un entero positivo."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        fuentes = None
+        if request.query_params.get("fuentes"):
+            fuentes = {f.strip().upper() for f in request.query_params["fuentes"].split(",") if f.strip()}
+            invalidas = fuentes - set(FUENTES_EVENTOS)
+            if invalidas:
+                return Response(
+                    {"detail": f"Fuentes inválidas: {', '.join(sorted(invalidas))}. Válidas: {', '.join(FUENTES_EVENTOS)}"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        try:
+            eventos, siguiente = obtener_eventos(
+                vehiculo,
+                limite=limite,
+                cursor=request.query_params.get("cursor"),
+                fuentes=fuentes,
+            )
+        except CursorInvalido:
+            return Response({"detail": "Cursor inválido."}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            "results": eventos,
+            "next": replace_query_param(request.build_absolute_uri(), "cursor", siguiente) if siguiente else None,
+        })
+
+
+# ==================== HELPERS DEL HISTORIAL DEL VEHÍCULO ====================
+# Compartidos por el historial completo y las secciones paginadas.
+
+def _vehiculo_historial_data(vehiculo):
+    return {
+        "id": str(vehiculo.id),
+        "patente": vehiculo.patente,
+        "marca": vehiculo.marca,
+        "modelo": vehiculo.modelo,
+        "anio": vehiculo.anio,
+        "estado": vehiculo.estado,
+    }
+
+
+def _ordenes_historial_qs(vehiculo):
+    from apps.workorders.models import OrdenTrabajo
+    
+    return OrdenTrabajo.objects.filter(vehiculo=vehiculo).select_related(
+        'responsable'  # Reducir queries para responsable
+    ).prefetch_related('items')
+
+
+def _repuestos_historial_qs(vehiculo):
+    """
+    Retorna el queryset de repuestos usados, o None si no existe el módulo de inventario.
+    """
+    try:
+        from apps.inventory.models import HistorialRepuestoVehiculo
+    except ImportError:
+        # Si el módulo de inventario no existe, continuar sin errores
+        return None
+    return HistorialRepuestoVehiculo.objects.filter(
+        vehiculo=vehiculo
+    ).select_related('repuesto', 'ot')
+
+
+def _ingresos_historial_qs(vehiculo):
+    return IngresoVehiculo.objects.filter(
+        vehiculo=vehiculo
+    ).select_related('guardia').prefetch_related('evidencias')
+
+
+def _ot_historial_data(ot):
+    return {
+        "id": str(ot.id),
+        "estado": ot.estado,
+        "tipo": ot.tipo,
+        "prioridad": ot.prioridad,
+        "motivo": ot.motivo,
+        "responsable": f"{ot.responsable.first_name} {ot.responsable.last_name}" if ot.responsable else None,
+        "apertura": ot.apertura.isoformat(),
+        "cierre": ot.cierre.isoformat() if ot.cierre else None,
+        "items": [{
+            "tipo": item.tipo,
+            "descripcion": item.descripcion,
+            "cantidad": item.cantidad,
+            "costo_unitario": str(item.costo_unitario),
+        } for item in ot.items.all()],
+    }
+
+
+def _repuesto_historial_data(h):
+    return {
+        "repuesto_codigo": h.repuesto.codigo,
+        "repuesto_nombre": h.repuesto.nombre,
+        "cantidad": h.cantidad,
+        "fecha_uso": h.fecha_uso.isoformat(),
+        "ot_id": str(h.ot.id) if h.ot else None,
+        "costo_unitario": str(h.costo_unitario) if h.costo_unitario else None,
+    }
+
+
+def _ingreso_historial_data(ing):
+    return {
+        "id": str(ing.id),
+        "fecha_ingreso": ing.fecha_ingreso.isoformat(),
+        "guardia": f"{ing.guardia.first_name} {ing.guardia.last_name}",
+        "kilometraje": ing.kilometraje,
+        "observaciones": ing.observaciones,
+        "evidencias": [{
+            "tipo": ev.tipo,
+            "url": ev.url,
+            "descripcion": ev.descripcion,
+        } for ev in ing.evidencias.all()],
+    }
+
+
+def _resumen_historial(vehiculo):
+    """
+    Conteo y fecha del último evento de cada sección en una sola consulta.
+    
+    Cada sección se calcula con subconsultas escalares (COUNT y MAX) sobre
+    los índices (vehiculo, fecha), evitando el producto cartesiano que
+    generaría un JOIN de las tres tablas.
+    """
+    from django.db.models import Count, Max, OuterRef, Subquery, Value
+    from django.db.models.functions import Coalesce
+    from apps.workorders.models import OrdenTrabajo
+    
+    def _agregado(queryset, expresion):
+        return Subquery(
+            queryset.filter(vehiculo=OuterRef("pk"))
+            .order_by()
+            .values("vehiculo")
+            .annotate(valor=expresion)
+            .values("valor")[:1]
+        )
+    
+    secciones = {
+        "ordenes_trabajo": (OrdenTrabajo.objects.all(), "apertura"),
+        "ingresos": (IngresoVehiculo.objects.all(), "fecha_ingreso"),
+    }
+    repuestos = _repuestos_historial_qs(vehiculo)
+    if repuestos is not None:
+        secciones["historial_repuestos"] = (repuestos.model.objects.all(), "fecha_uso")
+    
+    anotaciones = {}
+    for nombre, (queryset, campo_fecha) in secciones.items():
+        anotaciones[f"{nombre}_total"] = Coalesce(_agregado(queryset, Count("pk")), Value(0))
+        anotaciones[f"{nombre}_ultimo"] = _agregado(queryset, Max(campo_fecha))
+    
+    valores = Vehiculo.objects.filter(pk=vehiculo.pk).values(**anotaciones).get()
+    
+    resumen = {}
+    for nombre in ("ordenes_trabajo", "historial_repuestos", "ingresos"):
+        ultimo = valores.get(f"{nombre}_ultimo")
+        resumen[nombre] = {
+            "total": valores.get(f"{nombre}_total", 0),
+            "ultimo": ultimo.isoformat() if ultimo else None,
+        }
+    return resumen
+
 
 class HistorialVehiculoViewSet(viewsets.ReadOnlyModelViewSet):
     """
@@ -0,0 +1,166 @@
+# apps/workorders/busqueda.py
+"""
+Búsqueda de texto completo (español) sobre órdenes de trabajo.
+
+Busca en motivo, diagnostico y causa_ingreso de la OT y en el contenido de
+sus comentarios. Cada tabla tiene una columna tsvector (busqueda) con índice
+GIN, mantenida por triggers de la base de datos (migración
+0017_busqueda_texto), así que la búsqueda no recalcula to_tsvector por fila.
+
+Consultas por búsqueda:
+1. OT coincidentes (GIN de OT + GIN de comentarios), ordenadas por relevancia
+2. Fragmentos resaltados de la página (ts_headline solo sobre las OT a mostrar)
+3. Mejor comentario coincidente de cada OT de la página
+
+Los fragmentos son HTML seguro: ts_headline marca las coincidencias con
+caracteres de control neutros, el texto (escrito por usuarios) se escapa
+con html.escape y recién entonces las marcas se reemplazan por <mark>.
+
+Relaciones:
+- Usado por: apps/workorders/views.py (OrdenTrabajoViewSet.buscar)
+"""
+
+import html
+
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+from django.db.models import F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from apps.core.fechas import filtro_dias_locales
+from .models import OrdenTrabajo, ComentarioOT
+
+# Configuración de texto creada por la migración (spanish + unaccent si existe)
+CONFIG_BUSQUEDA = "pgf_es"
+
+# Peso de un comentario coincidente frente al texto propio de la OT
+PESO_COMENTARIOS = 0.5
+
+# Marcas de resaltado en los fragmentos
+INICIO_RESALTADO = "<mark>"
+FIN_RESALTADO = "</mark>"
+
+# Centinelas que usa ts_headline: html.escape no los altera
+INICIO_CENTINELA = "\x02"
+FIN_CENTINELA = "\x03"
+
+OPCIONES_HEADLINE = {
+    "config": CONFIG_BUSQUEDA,
+    "start_sel": INICIO_CENTINELA,
+    "stop_sel": FIN_CENTINELA,
+    "max_words": 25,
+    "min_words": 8,
+    "max_fragments": 2,
+}
+
+
+def _resaltado_html(fragmento):
+    """Escapa el fragmento de ts_headline y convierte los centinelas en <mark>."""
+    if fragmento is None:
+        return None
+    return (
+        html.escape(fragmento)
+        .replace(INICIO_CENTINELA, INICIO_RESALTADO)
+        .replace(FIN_CENTINELA, FIN_RESALTADO)
+    )
+
+
+def _consulta(texto):
+    """
+    Consulta con sintaxis de buscador web: "frenos traseros" (frase),
+    embrague OR clutch, frenos -delanteros.
+    """
+    return SearchQuery(texto, config=CONFIG_BUSQUEDA, search_type="websearch")
+
+
+def buscar_ots(texto, site=None, desde=None, hasta=None, limite=20, pagina=1, queryset=None):
+    """
+    Busca OT por texto, ordenadas por relevancia.
+
+    Parámetros:
+    - texto: Términos de búsqueda (sintaxis websearch)
+    - site: Filtra por OrdenTrabajo.site (opcional)
+    - desde, hasta: Días locales de apertura, ambos incluidos (opcional)
+    - limite: Resultados por página
+    - pagina: Número de página (desde 1)
+    - queryset: Queryset base de OT (default: todas)
+
+    Retorna:
+    - (resultados, hay_mas) donde cada resultado es:
+      {
+        "ot": OrdenTrabajo (con vehiculo cargado),
+        "relevancia": 0.42,
+        "resaltado": {"motivo": "...<mark>embrague</mark>...", "diagnostico": "...",
+                      "causa_ingreso": "...", "comentario": "..." | None}
+      }
+      Los fragmentos son HTML con el texto original escapado.
+    """
+    consulta = _consulta(texto)
+    comentarios = ComentarioOT.objects.filter(busqueda=consulta)
+
+    # Mejor relevancia entre los comentarios de cada OT (0 si ninguno coincide)
+    rango_comentarios = Subquery(
+        comentarios.filter(ot=OuterRef("pk"))
+        .annotate(r=SearchRank(F("busqueda"), consulta))
+        .order_by("-r")
+        .values("r")[:1]
+    )
+
+    ots = (queryset if queryset is not None else OrdenTrabajo.objects.all()).filter(
+        Q(busqueda=consulta) | Q(id__in=comentarios.values("ot_id"))
+    )
+    if site:
+        ots = ots.filter(site=site)
+    if desde or hasta:
+        ots = ots.filter(filtro_dias_locales("apertura", desde, hasta))
+
+    inicio = (pagina - 1) * limite
+    pagina_ots = list(
+        ots.annotate(
+            relevancia=Coalesce(SearchRank(F("busqueda"), consulta), Value(0.0))
+            + Coalesce(rango_comentarios, Value(0.0)) * PESO_COMENTARIOS
+        )
+        .select_related("vehiculo")
+        .defer("busqueda")
+        .order_by("-relevancia", "-apertura")[inicio:inicio + limite + 1]
+    )
+    hay_mas = len(pagina_ots) > limite
+    pagina_ots = pagina_ots[:limite]
+    ids = [ot.id for ot in pagina_ots]
+
+    # ts_headline solo para la página (es la parte costosa)
+    resaltados = {
+        fila["id"]: fila
+        for fila in OrdenTrabajo.objects.filter(id__in=ids).annotate(
+            motivo_resaltado=SearchHeadline("motivo", consulta, **OPCIONES_HEADLINE),
+            diagnostico_resaltado=SearchHeadline("diagnostico", consulta, **OPCIONES_HEADLINE),
+            causa_resaltado=SearchHeadline("causa_ingreso", consulta, **OPCIONES_HEADLINE),
+        ).values("id", "motivo_resaltado", "diagnostico_resaltado", "causa_resaltado")
+    }
+
+    # Mejor comentario coincidente por OT (DISTINCT ON ot_id)
+    fragmentos_comentarios = {
+        fila["ot_id"]: _resaltado_html(fila["fragmento"])
+        for fila in comentarios.filter(ot_id__in=ids)
+        .annotate(
+            r=SearchRank(F("busqueda"), consulta),
+            fragmento=SearchHeadline("contenido", consulta, **OPCIONES_HEADLINE),
+        )
+        .order_by("ot_id", "-r")
+        .distinct("ot_id")
+        .values("ot_id", "fragmento")
+    }
+
+    resultados = []
+    for ot in pagina_ots:
+        fila = resaltados.get(ot.id, {})
+        resultados.append({
+            "ot": ot,
+            "relevancia": ot.relevancia,
+            "resaltado": {
+                "motivo": _resaltado_html(fila.get("motivo_resaltado") or ""),
+                "diagnostico": _resaltado_html(fila.get("diagnostico_resaltado") or ""),
+                "causa_ingreso": _resaltado_html(fila.get("causa_resaltado") or ""),
+                "comentario": fragmentos_comentarios.get(ot.id),
+            },
+        })
+    return resultados, hay_mas
@@ -1,16 +1,18 @@
 # apps/workorders/filters.py
 import django_filters as filters
-from django.db.models import Q
+from apps.core.busqueda import filtro_patente
+from apps.core.filters import DiaLocalDesdeFilter, DiaLocalHastaFilter
 from .models import OrdenTrabajo
 
 class OrdenTrabajoFilter(filters.FilterSet):
     estado = filters.CharFilter(field_name="estado", lookup_expr="iexact")
-    apertura_from = filters.DateFilter(field_name="apertura", lookup_expr="date__gte")
-    apertura_to   = filters.DateFilter(field_name="apertura", lookup_expr="date__lte")
+    # Rango [inicio, fin) sobre apertura (usa el índice, a diferencia de date__gte/lte)
+    apertura_from = DiaLocalDesdeFilter(field_name="apertura")
+    apertura_to   = DiaLocalHastaFilter(field_name="apertura")
     patente = filters.CharFilter(label="Patente", method="filter_patente")
 
     def filter_patente(self, queryset, name, value):
-        return queryset.filter(Q(vehiculo__patente__icontains=value))
+        return queryset.filter(filtro_patente(value, "vehiculo__patente"))
 
     class Meta:
         model = OrdenTrabajo
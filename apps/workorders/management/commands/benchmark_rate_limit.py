@@ -0,0 +1,75 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.core import limite_tasa
+from apps.workorders.middleware import RateLimitMiddleware
+
+
+def _respuesta(request):
+    return HttpResponse("ok")
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide el costo por solicitud de RateLimitMiddleware (limitador en memoria "
+        "y, si la caché es django-redis, el script Lua en Redis)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--solicitudes', type=int, default=20_000, help='Solicitudes por escenario (default: 20000)')
+
+    def handle(self, *args, **options):
+        total = options['solicitudes']
+        limitadores = {"memoria": limite_tasa.LimitadorLocal()}
+        if settings.CACHES["default"]["BACKEND"].startswith("django_redis"):
+            try:
+                limitadores["redis"] = limite_tasa.LimitadorRedis()
+                limitadores["redis"].consumir("benchmark:ping", 1, 1)
+            except Exception as exc:
+                limitadores.pop("redis", None)
+                self.stdout.write(self.style.WARNING(f'Redis no disponible, se omite: {exc}'))
+
+        token = AccessToken()
+        token["user_id"] = 1
+        factory = RequestFactory()
+        escenarios = {
+            "GET con JWT (lectura, por usuario)": lambda: factory.get(
+                "/api/v1/vehicles/", HTTP_AUTHORIZATION=f"Bearer {token}"
+            ),
+            "POST login (por IP)": lambda: factory.post("/api/v1/auth/login/", REMOTE_ADDR="10.0.0.1"),
+        }
+
+        self.stdout.write('')
+        self.stdout.write(f'{"Escenario":<38} {"limitador":<10} {"mediana µs":>10} {"p99 µs":>8}')
+        for nombre, crear in escenarios.items():
+            requests = [crear() for _ in range(total)]
+            self._fila(nombre, "ninguno", _respuesta, requests)
+            for etiqueta, limitador in limitadores.items():
+                # Presupuesto que no se agota: se mide el camino de la solicitud admitida
+                with override_settings(RATE_LIMIT_ENABLED=True, RATE_LIMITS={
+                    clase: (10 ** 9, 60) for clase in ("login", "presigned", "escritura", "lectura")
+                }):
+                    middleware = RateLimitMiddleware(_respuesta)
+                anterior, limite_tasa._limitador = limite_tasa._limitador, limitador
+                try:
+                    self._fila(nombre, etiqueta, middleware, requests)
+                finally:
+                    limite_tasa._limitador = anterior
+
+        self.stdout.write(self.style.SUCCESS('✅ Benchmark terminado.'))
+
+    def _fila(self, nombre, etiqueta, get_response, requests):
+        tiempos = []
+        for request in requests:
+            inicio = time.perf_counter()
+            get_response(request)
+            tiempos.append((time.perf_counter() - inicio) * 1_000_000)
+        tiempos.sort()
+        p99 = tiempos[int(len(tiempos) * 0.99)]
+        self.stdout.write(f'{nombre:<38} {etiqueta:<10} {statistics.median(tiempos):>10.1f} {p99:>8.1f}')
@@ -28,6 +28,7 @@ import random
 import uuid
 
 from apps.users.models import Profile
+from apps.users.signals import perfiles_en_bloque
 from apps.vehicles.models import Vehiculo, IngresoVehiculo, EvidenciaIngreso
 from apps.drivers.models import Chofer, HistorialAsignacionVehiculo
 from apps.workorders.models import (
@@ -225,52 +226,64 @@ class Command(BaseCommand):
             sites = ['Site Santiago', 'Site Valparaíso', 'Site Concepción', 'Site Antofagasta']
             sucursales = ['Sucursal 1', 'Sucursal 2', 'Sucursal 3', 'Sucursal 4']
             
-            for i in range(num_users):
-                rol = random.choice(roles)
-                
-                # Generar username único
-                username = f"{rol.lower()}{i+1}"
-                counter = 1
-                while User.objects.filter(username=username).exists():
-                    username = f"{rol.lower()}{i+1}_{counter}"
-                    counter += 1
-                
-                # Generar email único
-                email = f"{username}@pepsico.cl"
-                counter_email = 1
-                while User.objects.filter(email=email).exists():
-                    email = f"{username}{counter_email}@pepsico.cl"
-                    counter_email += 1
-                
-                # Generar RUT único
-                rut = generar_rut()
-                while User.objects.filter(rut=rut).exists():
+            # Los Profile se crean en bloque al salir (sin una señal por usuario)
+            preferencias = {}
+            with perfiles_en_bloque():
+                for i in range(num_users):
+                    rol = random.choice(roles)
+                    
+                    # Generar username único
+                    username = f"{rol.lower()}{i+1}"
+                    counter = 1
+                    while User.objects.filter(username=username).exists():
+                        username = f"{rol.lower()}{i+1}_{counter}"
+                        counter += 1
+                    
+                    # Generar email único
+                    email = f"{username}@pepsico.cl"
+                    counter_email = 1
+                    while User.objects.filter(email=email).exists():
+                        email = f"{username}{counter_email}@pepsico.cl"
+                        counter_email += 1
+                    
+                    # Generar RUT único
                     rut = generar_rut()
-                
-                user = User.objects.create_user(
-                    username=username,
-                    email=email,
-                    password='password123',  # Contraseña por defecto
-                    first_name=fake.first_name(),
-                    last_name=fake.last_name(),
-                    rol=rol,
-                    rut=rut,
-                    is_active=True,
-                    is_staff=(rol == 'ADMIN'),
-                    is_superuser=(rol == 'ADMIN'),
-                )
-                
-                # Crear perfil completo
-                profile = user.profile
-                profile.phone_number = fake.phone_number()[:20]
-                profile.notificaciones_email = random.choice([True, False])
-                profile.notificaciones_push = random.choice([True, False])
-                profile.notificaciones_sonido = random.choice([True, False])
-                profile.save()
-                
-                usuarios_por_rol[rol].append(user)
-                if (i + 1) % 10 == 0:
-                    self.stdout.write(f'  ✓ {i + 1}/{num_users} usuarios creados')
+                    while User.objects.filter(rut=rut).exists():
+                        rut = generar_rut()
+                    
+                    user = User.objects.create_user(
+                        username=username,
+                        email=email,
+                        password='password123',  # Contraseña por defecto
+                        first_name=fake.first_name(),
+                        last_name=fake.last_name(),
+                        rol=rol,
+                        rut=rut,
+                        is_active=True,
+                        is_staff=(rol == 'ADMIN'),
+                        is_superuser=(rol == 'ADMIN'),
+                    )
+                    preferencias[user.id] = {
+                        "phone_number": fake.phone_number()[:20],
+                        "notificaciones_email": random.choice([True, False]),
+                        "notificaciones_push": random.choice([True, False]),
+                        "notificaciones_sonido": random.choice([True, False]),
+                    }
+                    
+                    usuarios_por_rol[rol].append(user)
+                    if (i + 1) % 10 == 0:
+                        self.stdout.write(f'  ✓ {i + 1}/{num_users} usuarios creados')
+            
+            # Completar los perfiles creados al salir de perfiles_en_bloque()
+            perfiles = list(Profile.objects.filter(user_id__in=list(preferencias)))
+            for profile in perfiles:
+                for campo, valor in preferencias[profile.user_id].items():
+                    setattr(profile, campo, valor)
+            Profile.objects.bulk_update(
+                perfiles,
+                ["phone_number", "notificaciones_email", "notificaciones_push", "notificaciones_sonido"],
+                batch_size=500,
+            )
             
             self.stdout.write(self.style.SUCCESS(f'  ✅ {num_users} usuarios creados\n'))
 
@@ -351,9 +364,11 @@ class Command(BaseCommand):
                 )
                 choferes.append(chofer)
             
-            # Crear historial de asignaciones
+            # Crear historial de asignaciones (un chofer vigente por vehículo)
+            vehiculos_con_historial = set()
             for chofer in choferes[:num_drivers//2]:  # Solo para la mitad
-                if chofer.vehiculo_asignado:
+                if chofer.vehiculo_asignado_id and chofer.vehiculo_asignado_id not in vehiculos_con_historial:
+                    vehiculos_con_historial.add(chofer.vehiculo_asignado_id)
                     HistorialAsignacionVehiculo.objects.create(
                         chofer=chofer,
                         vehiculo=chofer.vehiculo_asignado,
@@ -656,16 +671,16 @@ class Command(BaseCommand):
             estados_agenda = ['PROGRAMADA', 'CONFIRMADA', 'EN_PROCESO', 'COMPLETADA', 'CANCELADA', 'REPROGRAMADA']
             
             # Crear cupos diarios para los próximos 30 días
-            # Nota: El modelo tiene fecha como unique, así que solo creamos uno por fecha
+            # Nota: Hay un cupo por (fecha, zona); se crea el cupo general (zona vacía)
             for i in range(30):
                 fecha = timezone.now().date() + timedelta(days=i)
                 # Verificar si ya existe un cupo para esta fecha
                 cupo, created = CupoDiario.objects.get_or_create(
                     fecha=fecha,
+                    zona='',
                     defaults={
                         'cupos_totales': random.randint(5, 15),
                         'cupos_ocupados': random.randint(0, 10),
-                        'zona': random.choice(zonas) if zonas else '',
                     }
                 )
                 if not created:
@@ -11,6 +11,7 @@ from apps.workorders.models import (
 from apps.drivers.models import Chofer, HistorialAsignacionVehiculo
 from apps.scheduling.models import Agenda
 from apps.emergencies.models import EmergenciaRuta
+from apps.core.fechas import filtro_dia_local
 from decimal import Decimal
 import random
 
@@ -134,8 +135,8 @@ class Command(BaseCommand):
             for vehiculo in vehiculos[:5]:  # Máximo 5 ingresos
                 # Verificar si ya existe un ingreso para hoy
                 ingreso_existente = IngresoVehiculo.objects.filter(
+                    filtro_dia_local("fecha_ingreso", timezone.localdate()),
                     vehiculo=vehiculo,
-                    fecha_ingreso__date=timezone.now().date()
                 ).first()
                 
                 if ingreso_existente and not options['force']:
@@ -249,8 +250,8 @@ class Command(BaseCommand):
                 
                 # Verificar si ya existe una agenda para este vehículo en esta fecha
                 agenda_existente = Agenda.objects.filter(
+                    filtro_dia_local("fecha_programada", timezone.localdate(fecha_agenda)),
                     vehiculo=vehiculo,
-                    fecha_programada__date=fecha_agenda.date()
                 ).first()
                 
                 if agenda_existente and not options['force']:
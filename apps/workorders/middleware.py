@@ -1,51 +1,164 @@
 # apps/workorders/middleware.py
-from django.core.cache import cache
+"""
+Middleware de limitación de tasa de la API y validación de archivos subidos.
+
+RateLimitMiddleware aplica presupuestos por clase de endpoint con el
+limitador atómico de apps/core/limite_tasa.py (script Lua en Redis):
+
+- login: /auth/login/ y recuperación de contraseña, por IP (estricto)
+- presigned: URLs presigned de S3, por usuario
+- escritura: POST/PUT/PATCH/DELETE, por usuario
+- lectura: GET/HEAD/OPTIONS, por usuario (generoso)
+
+El usuario se toma del JWT (header Authorization o cookie pgf_access) sin
+consultar la base de datos: la verificación de la firma se memoriza por
+token. Sin token válido se usa la IP. Al exceder el presupuesto responde
+429 con Retry-After.
+
+La IP es REMOTE_ADDR. X-Forwarded-For solo se considera si REMOTE_ADDR es
+un proxy de RATE_LIMIT_PROXIES_CONFIABLES, y de él se toma el salto más a
+la derecha que no sea un proxy confiable: el resto del header lo escribe
+el cliente y no puede elegir su propio presupuesto.
+
+Configuración en settings: RATE_LIMITS (presupuestos por clase),
+RATE_LIMIT_PROXIES_CONFIABLES y RATE_LIMIT_ENABLED. Si Redis falla, deja
+pasar la solicitud (falla abierto) y lo registra en el log.
+
+Relaciones:
+- Usa: apps/core/limite_tasa.py
+- Configurado en: pgf_core/settings/base.py (MIDDLEWARE)
+- Medido por: apps/workorders/management/commands/benchmark_rate_limit.py
+"""
+
+import ipaddress
+import logging
+import math
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
 from django.http import JsonResponse
-from django.utils import timezone
-import hashlib
+
+from apps.core.limite_tasa import consumir
+
+logger = logging.getLogger(__name__)
+
+# Endpoints sin usuario autenticado, limitados por IP
+RUTAS_LOGIN = ("/api/v1/auth/login/", "/api/v1/auth/password-reset/")
+
+METODOS_LECTURA = {"GET", "HEAD", "OPTIONS"}
+
+
+@lru_cache(maxsize=4096)
+def _verificar_token(token):
+    """(user_id, exp) de un access token válido; (None, 0) si no lo es."""
+    from rest_framework_simplejwt.exceptions import TokenError
+    from rest_framework_simplejwt.settings import api_settings
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    try:
+        access = AccessToken(token)
+    except TokenError:
+        return None, 0
+    return access.get(api_settings.USER_ID_CLAIM), access.get("exp", 0)
+
+
+def usuario_de_token(token):
+    """Id del usuario de un access token vigente, o None."""
+    user_id, exp = _verificar_token(token)
+    if user_id is None or exp <= time.time():
+        return None
+    return user_id
+
 
 class RateLimitMiddleware:
     """
-    Middleware para rate limiting simple basado en IP
+    Limita la tasa de solicitudes a /api/ por usuario y clase de endpoint.
     """
+
     def __init__(self, get_response):
+        if not getattr(settings, "RATE_LIMIT_ENABLED", True):
+            raise MiddlewareNotUsed
         self.get_response = get_response
-        # Configuración: requests por minuto
-        self.requests_per_minute = 60
-        self.window_seconds = 60
+        self.limites = settings.RATE_LIMITS
+        self.proxies = [
+            ipaddress.ip_network(proxy, strict=False)
+            for proxy in settings.RATE_LIMIT_PROXIES_CONFIABLES
+        ]
 
     def __call__(self, request):
         # Solo aplicar rate limiting a endpoints de API
         if not request.path.startswith('/api/'):
             return self.get_response(request)
-        
-        # Obtener IP del cliente
-        ip = self.get_client_ip(request)
-        cache_key = f"ratelimit:{ip}"
-        
-        # Obtener contador actual
-        current_count = cache.get(cache_key, 0)
-        
-        if current_count >= self.requests_per_minute:
-            return JsonResponse(
-                {"detail": "Rate limit exceeded. Please try again later."},
+
+        clase = self.clasificar(request)
+        identidad = f"ip{self.get_client_ip(request)}" if clase == "login" else self.identificar(request)
+        limite, periodo = self.limites[clase]
+
+        try:
+            espera_ms = consumir(f"{clase}:{identidad}", limite, periodo)
+        except Exception:
+            # Falla abierto: sin Redis la API sigue respondiendo
+            logger.warning("Rate limiting no disponible", exc_info=True)
+            espera_ms = 0
+
+        if espera_ms:
+            segundos = max(1, math.ceil(espera_ms / 1000))
+            response = JsonResponse(
+                {"detail": f"Demasiadas solicitudes. Intente nuevamente en {segundos} segundos."},
                 status=429
             )
-        
-        # Incrementar contador
-        cache.set(cache_key, current_count + 1, self.window_seconds)
-        
-        response = self.get_response(request)
-        return response
+            response["Retry-After"] = str(segundos)
+            return response
+
+        return self.get_response(request)
+
+    def clasificar(self, request):
+        """Clase de presupuesto de la solicitud (ver RATE_LIMITS)."""
+        if request.path.startswith(RUTAS_LOGIN):
+            return "login"
+        if "/presigned" in request.path:
+            return "presigned"
+        if request.method in METODOS_LECTURA:
+            return "lectura"
+        return "escritura"
+
+    def identificar(self, request):
+        """"u<id>" si trae un JWT vigente; si no, "ip<ip>"."""
+        autorizacion = request.META.get("HTTP_AUTHORIZATION", "")
+        if autorizacion.startswith("Bearer "):
+            token = autorizacion[7:]
+        else:
+            token = request.COOKIES.get("pgf_access")
+        if token:
+            user_id = usuario_de_token(token)
+            if user_id is not None:
+                return f"u{user_id}"
+        return f"ip{self.get_client_ip(request)}"
     
+    def es_proxy_confiable(self, ip):
+        if not self.proxies:
+            return False
+        try:
+            direccion = ipaddress.ip_address(ip)
+        except ValueError:
+            return False
+        return any(direccion in red for red in self.proxies)
+
     def get_client_ip(self, request):
-        """Obtiene la IP del cliente"""
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0]
-        else:
-            ip = request.META.get('REMOTE_ADDR')
-        return ip
+        """
+        IP del cliente: REMOTE_ADDR o, detrás de un proxy confiable, el salto
+        de X-Forwarded-For más a la derecha que no sea un proxy confiable.
+        """
+        ip = request.META.get("REMOTE_ADDR", "")
+        if not self.es_proxy_confiable(ip):
+            return ip
+        saltos = [s.strip() for s in request.META.get("HTTP_X_FORWARDED_FOR", "").split(",") if s.strip()]
+        for salto in reversed(saltos):
+            if not self.es_proxy_confiable(salto):
+                return salto
+        return saltos[0] if saltos else ip
 
 
 def validate_file_upload(file, max_size_mb=3072, allowed_types=None):
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drivers', '0001_initial'),
+        ('vehicles', '0007_ingresovehiculo_clave_idempotencia'),
+        ('workorders', '0013_add_subido_por_to_evidencia'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ordentrabajo',
+            index=models.Index(fields=['vehiculo', 'apertura'], name='workorders__vehicul_30d4ca_idx'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vehicles', '0008_linea_tiempo_vehiculo_idx'),
+        ('workorders', '0014_ordentrabajo_vehiculo_apertura_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bloqueovehiculo',
+            index=models.Index(fields=['vehiculo', 'creado_en'], name='workorders__vehicul_2d3e7a_idx'),
+        ),
+    ]
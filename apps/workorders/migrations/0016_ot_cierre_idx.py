@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:28
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drivers', '0002_linea_tiempo_vehiculo_idx'),
+        ('vehicles', '0009_snapshotflota'),
+        ('workorders', '0015_linea_tiempo_vehiculo_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ordentrabajo',
+            index=models.Index(fields=['cierre'], name='workorders__cierre_789004_idx'),
+        ),
+    ]
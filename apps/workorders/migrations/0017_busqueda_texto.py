@@ -0,0 +1,101 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:43
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations
+
+# Configuración de búsqueda en español (apps/workorders/busqueda.py, CONFIG_BUSQUEDA).
+# Es una copia de "spanish"; si el servidor ofrece unaccent se agrega antes del
+# stemmer para que "diagnóstico" y "diagnostico" sean el mismo término.
+CONFIG = "pgf_es"
+
+FUNCIONES_TRIGGER = {
+    "workorders_ordentrabajo": (
+        "ot_busqueda_actualizar",
+        "motivo, diagnostico, causa_ingreso",
+        f"""
+        NEW.busqueda :=
+            setweight(to_tsvector('{CONFIG}', coalesce(NEW.motivo, '')), 'A') ||
+            setweight(to_tsvector('{CONFIG}', coalesce(NEW.diagnostico, '')), 'B') ||
+            setweight(to_tsvector('{CONFIG}', coalesce(NEW.causa_ingreso, '')), 'C');
+        """,
+    ),
+    "workorders_comentarioot": (
+        "comentario_busqueda_actualizar",
+        "contenido",
+        f"NEW.busqueda := to_tsvector('{CONFIG}', coalesce(NEW.contenido, ''));",
+    ),
+}
+
+
+def crear_busqueda(apps, schema_editor):
+    """
+    Crea la configuración de texto, los triggers que mantienen las columnas
+    busqueda y completa las filas existentes.
+    """
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_ts_config WHERE cfgname = %s", [CONFIG])
+        if cursor.fetchone() is None:
+            cursor.execute(f"CREATE TEXT SEARCH CONFIGURATION {CONFIG} (COPY = pg_catalog.spanish)")
+            cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'unaccent'")
+            if cursor.fetchone() is not None:
+                cursor.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+                cursor.execute(
+                    f"ALTER TEXT SEARCH CONFIGURATION {CONFIG} "
+                    "ALTER MAPPING FOR hword, hword_part, word WITH unaccent, spanish_stem"
+                )
+
+        for tabla, (nombre, columnas, cuerpo) in FUNCIONES_TRIGGER.items():
+            cursor.execute(
+                f"CREATE OR REPLACE FUNCTION {nombre}() RETURNS trigger AS $$ "
+                f"BEGIN {cuerpo} RETURN NEW; END $$ LANGUAGE plpgsql"
+            )
+            # Solo recalcula si cambia alguna columna indexada (no en save(update_fields=["estado"]))
+            cursor.execute(
+                f"CREATE TRIGGER {nombre} BEFORE INSERT OR UPDATE OF {columnas} "
+                f"ON {tabla} FOR EACH ROW EXECUTE FUNCTION {nombre}()"
+            )
+            primera_columna = columnas.split(",")[0]
+            cursor.execute(f"UPDATE {tabla} SET {primera_columna} = {primera_columna}")
+
+
+def eliminar_busqueda(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        for tabla, (nombre, _, _) in FUNCIONES_TRIGGER.items():
+            cursor.execute(f"DROP TRIGGER IF EXISTS {nombre} ON {tabla}")
+            cursor.execute(f"DROP FUNCTION IF EXISTS {nombre}()")
+        cursor.execute(f"DROP TEXT SEARCH CONFIGURATION IF EXISTS {CONFIG}")
+
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drivers', '0002_linea_tiempo_vehiculo_idx'),
+        ('vehicles', '0010_busqueda_patente'),
+        ('workorders', '0016_ot_cierre_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comentarioot',
+            name='busqueda',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='ordentrabajo',
+            name='busqueda',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='comentarioot',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['busqueda'], name='comentario_busqueda_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='ordentrabajo',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['busqueda'], name='ot_busqueda_gin'),
+        ),
+        migrations.RunPython(crear_busqueda, eliminar_busqueda),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drivers', '0003_periodo_asignacion'),
+        ('vehicles', '0012_indices_alcance_por_rol'),
+        ('workorders', '0017_busqueda_texto'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='evidencia',
+            index=models.Index(fields=['subido_por', 'subido_en'], name='workorders__subido__afc574_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ordentrabajo',
+            index=models.Index(fields=['mecanico', 'estado'], name='workorders__mecanic_09ed53_idx'),
+        ),
+    ]
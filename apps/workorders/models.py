@@ -31,6 +31,9 @@ ABIERTA -> EN_DIAGNOSTICO -> EN_EJECUCION -> EN_PAUSA -> EN_EJECUCION -> EN_QA -
 
 from django.db import models
 from django.conf import settings  # Para acceder a AUTH_USER_MODEL
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from apps.core.alcance import SITES, TODOS, Condicion
 from apps.vehicles.models import Vehiculo  # Modelo de vehículo
 import uuid  # Para generar IDs únicos
 
@@ -301,6 +304,12 @@ class OrdenTrabajo(models.Model):
     # Cierre: fecha/hora de finalización (se establece al cerrar)
     cierre = models.DateTimeField(null=True, blank=True)
     
+    # ==================== BÚSQUEDA DE TEXTO ====================
+    
+    # tsvector de motivo (A), diagnostico (B) y causa_ingreso (C).
+    # Lo mantiene un trigger de la base de datos (migración 0017_busqueda_texto)
+    busqueda = SearchVectorField(null=True, editable=False)
+    
     class Meta:
         """
         Configuración del modelo.
@@ -309,7 +318,11 @@ class OrdenTrabajo(models.Model):
         """
         indexes = [
             models.Index(fields=["estado"]),  # Búsquedas por estado (muy frecuente)
-            models.Index(fields=["apertura"])  # Ordenamiento por fecha de apertura
+            models.Index(fields=["apertura"]),  # Ordenamiento por fecha de apertura
+            models.Index(fields=["vehiculo", "apertura"]),  # Historial paginado por vehículo
+            models.Index(fields=["cierre"]),  # OT cerradas por día/rango (dashboard, reportes)
+            models.Index(fields=["mecanico", "estado"]),  # OT del mecánico (evidencias por rol, ?estado=)
+            GinIndex(fields=["busqueda"], name="ot_busqueda_gin"),  # Búsqueda de texto
         ]
 
 
@@ -744,6 +757,22 @@ class Evidencia(models.Model):
     )
     invalidado_en = models.DateTimeField(null=True, blank=True)
     motivo_invalidacion = models.TextField(blank=True, help_text="Motivo de invalidación")
+    
+    # Visibilidad por rol (apps/core/alcance.py). Los roles no listados no ven evidencias
+    ALCANCE_POR_ROL = {
+        "ADMIN": TODOS,
+        # Sites de sus vehículos supervisados; sin site configurado ve todas
+        "JEFE_TALLER": Condicion("ot__vehiculo__site", SITES, si_vacio=TODOS),
+        "SUPERVISOR": Condicion("ot__vehiculo__site", SITES),
+        # Las que subió o las de las OT asignadas a él
+        "MECANICO": (Condicion("subido_por"), Condicion("ot__mecanico")),
+        "GUARDIA": Condicion("subido_por"),
+    }
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=["subido_por", "subido_en"]),  # Evidencias del usuario (mecánico, guardia)
+        ]
 
 
 class Auditoria(models.Model):
@@ -879,10 +908,14 @@ class ComentarioOT(models.Model):
     # Fecha de última edición
     editado_en = models.DateTimeField(null=True, blank=True)
     
+    # tsvector de contenido, mantenido por un trigger (migración 0017_busqueda_texto)
+    busqueda = SearchVectorField(null=True, editable=False)
+    
     class Meta:
         indexes = [
             models.Index(fields=["ot", "creado_en"]),
             models.Index(fields=["usuario", "creado_en"]),
+            GinIndex(fields=["busqueda"], name="comentario_busqueda_gin"),  # Búsqueda de texto
         ]
         ordering = ["creado_en"]
     
@@ -962,6 +995,7 @@ class BloqueoVehiculo(models.Model):
         indexes = [
             models.Index(fields=["vehiculo", "estado"]),
             models.Index(fields=["estado", "creado_en"]),
+            models.Index(fields=["vehiculo", "creado_en"]),  # Línea de tiempo del vehículo
         ]
         ordering = ["-creado_en"]
     
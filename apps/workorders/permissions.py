@@ -1,5 +1,8 @@
 from rest_framework.permissions import BasePermission, SAFE_METHODS
 
+from apps.core.alcance import puede_ver
+from apps.users.auth_context import obtener_contexto
+
 """
 Permisos para órdenes de trabajo según especificación de roles:
 
@@ -11,6 +14,10 @@ Permisos para órdenes de trabajo según especificación de roles:
 6. COORDINADOR_ZONA: Puede ver OT de su zona (NO cerrar)
 7. SPONSOR: Solo lectura completa (NO editar/cerrar)
 8. ADMIN: Gestión técnica (NO operativa - no crear/editar OT)
+
+La visibilidad de evidencias por rol se declara en Evidencia.ALCANCE_POR_ROL
+(apps/core/alcance.py) y se evalúa con el AuthContext del request
+(apps/users/auth_context.py).
 """
 
 # Roles que pueden leer OT
@@ -177,51 +184,11 @@ class WorkOrderPermission(BasePermission):
         rol = getattr(request.user, "rol", None)
         action = getattr(view, 'action', None) if view else None
         
-        # Validar permisos específicos para evidencias
+        # Evidencias: la misma regla por rol que filtra el listado
+        # (Evidencia.ALCANCE_POR_ROL), evaluada sobre el objeto
         from .models import Evidencia
         if isinstance(obj, Evidencia):
-            # Jefe de Taller: puede ver todas las evidencias de su Site
-            if rol == "JEFE_TALLER":
-                if obj.ot and obj.ot.vehiculo:
-                    # Verificar que el vehículo pertenezca al mismo Site del Jefe de Taller
-                    user_site = getattr(request.user, 'profile', None)
-                    if user_site and hasattr(user_site, 'site'):
-                        return obj.ot.vehiculo.site == user_site.site
-                    # Si no tiene site configurado, permitir acceso (fallback)
-                    return True
-                return True  # Permitir acceso a evidencias sin OT
-            
-            # Supervisor Zonal: solo evidencias de su Site
-            if rol == "SUPERVISOR":
-                if obj.ot and obj.ot.vehiculo:
-                    user_site = getattr(request.user, 'profile', None)
-                    if user_site and hasattr(user_site, 'site'):
-                        return obj.ot.vehiculo.site == user_site.site
-                    return False
-                return False
-            
-            # Administrador: acceso total (siempre permitir)
-            if rol == "ADMIN":
-                return True
-            
-            # Mecánico: solo evidencias que él subió o de la OT en la que trabaja
-            if rol == "MECANICO":
-                # Puede ver si él la subió
-                if obj.subido_por == request.user:
-                    return True
-                # Puede ver si es de una OT asignada a él
-                if obj.ot and obj.ot.mecanico == request.user:
-                    return True
-                return False
-            
-            # Guardia: solo evidencias iniciales que registró
-            if rol == "GUARDIA":
-                # Puede ver si él la subió
-                if obj.subido_por == request.user:
-                    return True
-                # Puede ver evidencias de ingreso/salida relacionadas con sus registros
-                # (esto se puede refinar más adelante)
-                return False
+            return puede_ver(obj, obtener_contexto(request))
         
         # CHOFER solo puede ver OT de su vehículo asignado
         if rol == "CHOFER":
@@ -0,0 +1,160 @@
+# apps/workorders/tests/test_busqueda.py
+"""
+Tests para la búsqueda de texto completo en OT y comentarios.
+"""
+
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from apps.workorders.busqueda import _resaltado_html, buscar_ots
+from apps.workorders.models import OrdenTrabajo, ComentarioOT
+
+URL = "/api/v1/work/ordenes/buscar/"
+
+
+@pytest.fixture
+def jefe_client(jefe_taller_user):
+    """Cliente autenticado como JEFE_TALLER."""
+    client = APIClient()
+    client.force_authenticate(user=jefe_taller_user)
+    return client
+
+
+@pytest.fixture
+def ots(vehiculo, supervisor_user):
+    """Tres OT con textos distintos."""
+    def crear(motivo, diagnostico="", site="SITE_TEST"):
+        return OrdenTrabajo.objects.create(
+            vehiculo=vehiculo, supervisor=supervisor_user, motivo=motivo, diagnostico=diagnostico, site=site
+        )
+    return {
+        "embrague": crear("Cambio de embrague", "Disco de embrague gastado"),
+        "frenos": crear("Ruido al frenar", "Pastillas de frenos traseros cristalizadas", site="SITE_NORTE"),
+        "luces": crear("Revisión de luces"),
+    }
+
+
+@pytest.mark.django_db
+@pytest.mark.service
+class TestBuscarOts:
+    """Tests para apps/workorders/busqueda.py"""
+
+    def test_trigger_mantiene_vector(self, ots):
+        """Test que el tsvector se calcula al crear y al editar el texto"""
+        ot = OrdenTrabajo.objects.get(pk=ots["luces"].pk)
+        assert ot.busqueda is not None
+
+        ot.diagnostico = "Alternador sin carga"
+        ot.save()
+        resultados, _ = buscar_ots("alternador")
+        assert [r["ot"].id for r in resultados] == [ot.id]
+
+    def test_stemming_y_relevancia(self, ots):
+        """Test que 'frenos' encuentra 'frenar' y ordena por relevancia (motivo pesa más)"""
+        resultados, hay_mas = buscar_ots("frenos")
+        assert [r["ot"].id for r in resultados] == [ots["frenos"].id]
+        assert hay_mas is False
+
+        resultados, _ = buscar_ots("embrague")
+        assert resultados[0]["ot"].id == ots["embrague"].id
+        assert "<mark>embrague</mark>" in resultados[0]["resaltado"]["motivo"]
+
+    def test_frase_exacta(self, ots):
+        """Test que las comillas buscan la frase"""
+        assert len(buscar_ots('"frenos traseros"')[0]) == 1
+        assert len(buscar_ots('"traseros frenos"')[0]) == 0
+
+    def test_busca_en_comentarios(self, ots, jefe_taller_user):
+        """Test que una OT aparece por sus comentarios, con el fragmento resaltado"""
+        ComentarioOT.objects.create(ot=ots["luces"], usuario=jefe_taller_user, contenido="Se detectó fuga de refrigerante")
+        resultados, _ = buscar_ots("refrigerante")
+
+        assert [r["ot"].id for r in resultados] == [ots["luces"].id]
+        assert "<mark>refrigerante</mark>" in resultados[0]["resaltado"]["comentario"]
+
+    def test_resaltado_escapa_html(self, ots, jefe_taller_user):
+        """Test que el texto de usuarios se escapa y solo <mark> queda como HTML"""
+        ComentarioOT.objects.create(
+            ot=ots["luces"], usuario=jefe_taller_user,
+            contenido='Fuga de refrigerante <img src=x onerror="alert(1)"> & <mark>falsa</mark>',
+        )
+        resultados, _ = buscar_ots("refrigerante")
+
+        comentario = resultados[0]["resaltado"]["comentario"]
+        assert "<mark>refrigerante</mark>" in comentario
+        sin_marcas = comentario.replace("<mark>refrigerante</mark>", "")
+        assert "<" not in sin_marcas and ">" not in sin_marcas
+        assert "&amp;" in comentario
+
+    @pytest.mark.unit
+    def test_resaltado_html(self):
+        """Test que el fragmento se escapa antes de convertir los centinelas en <mark>"""
+        assert _resaltado_html('\x02a\x03 <script>"x"</script>') == (
+            "<mark>a</mark> &lt;script&gt;&quot;x&quot;&lt;/script&gt;"
+        )
+        assert _resaltado_html(None) is None
+
+    def test_filtros_site_y_fecha(self, ots):
+        """Test que site y rango de apertura acotan los resultados"""
+        assert buscar_ots("frenos", site="SITE_TEST")[0] == []
+        ayer = timezone.localdate() - timedelta(days=1)
+        assert buscar_ots("embrague", hasta=ayer)[0] == []
+        assert len(buscar_ots("embrague", desde=ayer)[0]) == 1
+
+    def test_paginacion(self, vehiculo):
+        """Test que hay_mas indica si quedan resultados"""
+        for i in range(3):
+            OrdenTrabajo.objects.create(vehiculo=vehiculo, motivo=f"Cambio de aceite {i}")
+        resultados, hay_mas = buscar_ots("aceite", limite=2)
+        assert len(resultados) == 2 and hay_mas
+        resultados, hay_mas = buscar_ots("aceite", limite=2, pagina=2)
+        assert len(resultados) == 1 and not hay_mas
+
+    def test_usa_indice_gin(self, ots):
+        """Test que la coincidencia sobre OT usa el índice GIN (sin seq scan)"""
+        from django.contrib.postgres.search import SearchQuery
+
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+        consulta = SearchQuery("embrague", config="pgf_es", search_type="websearch")
+        plan = OrdenTrabajo.objects.filter(busqueda=consulta).explain()
+        assert "ot_busqueda_gin" in plan
+
+
+@pytest.mark.django_db
+@pytest.mark.view
+@pytest.mark.api
+class TestBuscarView:
+    """Tests para GET /work/ordenes/buscar/"""
+
+    def test_buscar(self, jefe_client, ots):
+        """Test que retorna resultados con patente, relevancia y resaltado"""
+        response = jefe_client.get(URL, {"q": "embrague"})
+
+        assert response.status_code == status.HTTP_200_OK
+        resultado = response.data["resultados"][0]
+        assert resultado["id"] == str(ots["embrague"].id)
+        assert resultado["patente"] == "TEST01"
+        assert resultado["relevancia"] > 0
+        assert "<mark>" in resultado["resaltado"]["diagnostico"]
+
+    def test_requiere_q(self, jefe_client):
+        """Test que sin q retorna 400"""
+        response = jefe_client.get(URL)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_fecha_invalida(self, jefe_client):
+        """Test que una fecha mal formada retorna 400"""
+        response = jefe_client.get(URL, {"q": "frenos", "desde": "15-01-2025"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_rol_sin_acceso(self, mecanico_user):
+        """Test que roles sin acceso reciben 403"""
+        client = APIClient()
+        client.force_authenticate(user=mecanico_user)
+        response = client.get(URL, {"q": "frenos"})
+        assert response.status_code == status.HTTP_403_FORBIDDEN
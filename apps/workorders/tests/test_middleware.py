@@ -0,0 +1,209 @@
+# apps/workorders/tests/test_middleware.py
+"""
+Tests para RateLimitMiddleware y el limitador GCRA (apps/core/limite_tasa.py).
+"""
+
+import json
+import threading
+from datetime import timedelta
+
+import pytest
+from django.conf import settings as django_settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import RequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+from apps.core import limite_tasa
+from apps.core.limite_tasa import LimitadorLocal, consumir
+from apps.workorders.middleware import RateLimitMiddleware
+
+
+@pytest.fixture
+def limitador(monkeypatch):
+    """Limitador en memoria nuevo para cada test."""
+    nuevo = LimitadorLocal()
+    monkeypatch.setattr(limite_tasa, "_limitador", nuevo)
+    return nuevo
+
+
+@pytest.fixture
+def middleware(settings, limitador):
+    settings.RATE_LIMIT_ENABLED = True
+    settings.RATE_LIMITS = {"login": (3, 60), "presigned": (2, 60), "escritura": (5, 60), "lectura": (5, 60)}
+    return RateLimitMiddleware(lambda request: HttpResponse("ok"))
+
+
+def _token(user_id, **vigencia):
+    token = AccessToken()
+    token["user_id"] = user_id
+    if vigencia:
+        token.set_exp(lifetime=timedelta(**vigencia))
+    return str(token)
+
+
+def _get(path="/api/v1/vehicles/", ip="10.0.0.1", token=None, metodo="get", xff=None):
+    extra = {"REMOTE_ADDR": ip}
+    if xff:
+        extra["HTTP_X_FORWARDED_FOR"] = xff
+    if token:
+        extra["HTTP_AUTHORIZATION"] = f"Bearer {token}"
+    return getattr(RequestFactory(), metodo)(path, **extra)
+
+
+def _estados(middleware, n, **kwargs):
+    return [middleware(_get(**kwargs)).status_code for _ in range(n)]
+
+
+@pytest.mark.unit
+class TestLimitadorGCRA:
+    """Tests del algoritmo GCRA en memoria"""
+
+    def test_rafaga_y_reposicion(self, monkeypatch, limitador):
+        """Test que admite `limite` de una vez y luego una cada intervalo"""
+        reloj = [1000.0]
+        monkeypatch.setattr(limite_tasa.time, "monotonic", lambda: reloj[0])
+
+        assert [consumir("k", 4, 60) for _ in range(4)] == [0, 0, 0, 0]
+        espera = consumir("k", 4, 60)
+        assert 14_000 < espera <= 15_001  # intervalo = 60s / 4
+
+        reloj[0] += 15
+        assert consumir("k", 4, 60) == 0
+        assert consumir("k", 4, 60) > 0
+
+    def test_rechazo_no_consume(self, monkeypatch, limitador):
+        """Test que las solicitudes rechazadas no alargan la espera"""
+        monkeypatch.setattr(limite_tasa.time, "monotonic", lambda: 50.0)
+        for _ in range(2):
+            consumir("k", 2, 10)
+        assert consumir("k", 2, 10) == consumir("k", 2, 10)
+
+    def test_concurrente_admite_exactamente_el_limite(self, limitador):
+        """Test que con muchos hilos se admiten exactamente `limite` solicitudes"""
+        admitidas = []
+        barrera = threading.Barrier(20)
+
+        def pedir():
+            barrera.wait()
+            for _ in range(10):
+                if consumir("compartida", 50, 3600) == 0:
+                    admitidas.append(1)
+
+        hilos = [threading.Thread(target=pedir) for _ in range(20)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        assert len(admitidas) == 50
+
+
+@pytest.mark.unit
+class TestRateLimitMiddleware:
+    """Tests de clases de endpoint, identidad y respuesta 429"""
+
+    def test_login_estricto_por_ip(self, middleware):
+        """Test que el login se limita por IP y responde Retry-After"""
+        estados = _estados(middleware, 4, path="/api/v1/auth/login/", metodo="post")
+        assert estados == [200, 200, 200, 429]
+
+        response = middleware(_get("/api/v1/auth/login/", metodo="post"))
+        assert int(response["Retry-After"]) >= 1
+        assert "Demasiadas solicitudes" in json.loads(response.content)["detail"]
+        assert middleware(_get("/api/v1/auth/login/", ip="10.0.0.2", metodo="post")).status_code == 200
+
+    def test_x_forwarded_for_sin_proxy_confiable(self, middleware):
+        """Test que un X-Forwarded-For distinto en cada solicitud no evade el límite de login"""
+        estados = [
+            middleware(_get("/api/v1/auth/login/", metodo="post", xff=f"203.0.113.{i}")).status_code
+            for i in range(4)
+        ]
+        assert estados == [200, 200, 200, 429]
+
+    def test_x_forwarded_for_de_proxy_confiable(self, settings, limitador):
+        """Test que detrás de un proxy confiable se usa el salto más a la derecha no confiable"""
+        settings.RATE_LIMIT_ENABLED = True
+        settings.RATE_LIMITS = {"login": (1, 60), "presigned": (2, 60), "escritura": (5, 60), "lectura": (5, 60)}
+        settings.RATE_LIMIT_PROXIES_CONFIABLES = ["10.0.0.0/8"]
+        middleware = RateLimitMiddleware(lambda request: HttpResponse("ok"))
+
+        def login(xff):
+            return middleware(_get("/api/v1/auth/login/", metodo="post", xff=xff)).status_code
+
+        # El cliente antepone IPs falsas: cuenta la que agregó el proxy
+        assert login("1.1.1.1, 198.51.100.7, 10.0.0.5") == 200
+        assert login("2.2.2.2, 198.51.100.7") == 429
+        assert login("198.51.100.8") == 200
+        assert middleware.get_client_ip(_get(ip="192.0.2.1", xff="198.51.100.9")) == "192.0.2.1"
+
+    def test_por_usuario(self, middleware):
+        """Test que el presupuesto es por usuario (no por IP) con JWT vigente"""
+        token = _token(1)
+        assert _estados(middleware, 5, token=token) == [200] * 5
+        # Mismo usuario desde otra IP: mismo presupuesto
+        assert middleware(_get(ip="10.9.9.9", token=token)).status_code == 429
+        # Otro usuario desde la misma IP: presupuesto propio
+        assert middleware(_get(token=_token(2))).status_code == 200
+
+    def test_token_vencido_o_invalido_usa_ip(self, middleware):
+        """Test que sin token vigente se limita por IP"""
+        vencido = _token(1, seconds=-1)
+        estados = _estados(middleware, 3, token=vencido) + _estados(middleware, 3, token="no-es-jwt")
+        assert estados == [200] * 5 + [429]
+
+    def test_cookie_pgf_access(self, middleware):
+        """Test que el token de la cookie identifica al usuario"""
+        factory = RequestFactory()
+        factory.cookies["pgf_access"] = _token(3)
+        for _ in range(5):
+            middleware(factory.get("/api/v1/vehicles/", REMOTE_ADDR="10.0.0.1"))
+        assert middleware(_get()).status_code == 200  # La IP no consumió presupuesto
+
+    def test_clases_independientes(self, middleware):
+        """Test que presigned, escritura y lectura tienen presupuestos separados"""
+        token = _token(1)
+        assert _estados(middleware, 3, path="/api/v1/work/evidencias/presigned/", token=token, metodo="post") == [
+            200, 200, 429
+        ]
+        assert middleware(_get(token=token, metodo="post")).status_code == 200
+        assert middleware(_get(token=token)).status_code == 200
+
+    def test_fuera_de_api(self, middleware):
+        """Test que las rutas fuera de /api/ no se limitan"""
+        assert _estados(middleware, 10, path="/admin/") == [200] * 10
+
+    def test_falla_abierto(self, middleware, limitador, monkeypatch):
+        """Test que un error del backend deja pasar la solicitud"""
+        def caido(*args):
+            raise ConnectionError("redis caído")
+        monkeypatch.setattr(limitador, "consumir", caido)
+        assert _estados(middleware, 10) == [200] * 10
+
+    def test_desactivado(self, settings):
+        """Test que RATE_LIMIT_ENABLED=False quita el middleware"""
+        settings.RATE_LIMIT_ENABLED = False
+        with pytest.raises(MiddlewareNotUsed):
+            RateLimitMiddleware(lambda request: HttpResponse("ok"))
+
+
+@pytest.mark.integration
+@pytest.mark.skipif(
+    not django_settings.CACHES["default"]["BACKEND"].startswith("django_redis"),
+    reason="Requiere la caché django-redis",
+)
+class TestLimitadorRedis:
+    """Tests del script Lua contra Redis"""
+
+    def test_rafaga_y_espera(self):
+        """Test que el script Lua aplica el mismo GCRA"""
+        from django_redis import get_redis_connection
+        from redis.exceptions import ConnectionError as RedisConnectionError
+
+        try:
+            redis = limite_tasa.LimitadorRedis()
+            get_redis_connection("default").delete(f"{limite_tasa.PREFIJO_CLAVE}:test:lua")
+        except RedisConnectionError:
+            pytest.skip("Redis no disponible")
+
+        resultados = [consumir("test:lua", 3, 60, limitador=redis) for _ in range(4)]
+        assert resultados[:3] == [0, 0, 0]
+        assert 19_000 < resultados[3] <= 20_000
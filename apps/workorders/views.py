@@ -16,6 +16,7 @@ Relaciones:
 - Usa: apps/workorders/services.py (transiciones de estado)
 - Usa: apps/workorders/permissions.py (WorkOrderPermission)
 - Usa: apps/workorders/filters.py (OrdenTrabajoFilter)
+- Usa: apps/core/alcance.py (visibilidad por rol de EvidenciaViewSet)
 - Conectado a: apps/workorders/urls.py
 
 Endpoints principales:
@@ -52,6 +53,7 @@ from rest_framework.filters import OrderingFilter, SearchFilter
 
 from drf_spectacular.utils import extend_schema  # Para documentación OpenAPI
 
+from apps.core.alcance import AlcancePorRolMixin
 from apps.core.serializers import EmptySerializer
 from .filters import OrdenTrabajoFilter
 from .permissions import WorkOrderPermission
@@ -152,6 +154,108 @@ class OrdenTrabajoViewSet(viewsets.ModelViewSet):
     ordering_fields = ["id", "apertura", "cierre", "estado"]  # Campos ordenables
     search_fields = ["vehiculo__patente"]  # Búsqueda por patente
 
+    @extend_schema(
+        responses={200: None},
+        description="Búsqueda de texto completo en OT y sus comentarios"
+    )
+    @action(detail=False, methods=['get'], url_path='buscar')
+    def buscar(self, request):
+        """
+        Busca trabajos anteriores por texto (motivo, diagnóstico, causa de
+        ingreso y comentarios), ordenados por relevancia.
+
+        Endpoint: GET /api/v1/work/ordenes/buscar/?q=embrague
+
+        Permisos:
+        - JEFE_TALLER, SUPERVISOR, COORDINADOR_ZONA y ADMIN
+
+        Query params:
+        - q: Texto a buscar. Admite "frase exacta", OR y -excluir
+        - site: Filtra por site de la OT (opcional)
+        - desde, hasta: Rango de apertura YYYY-MM-DD, ambos incluidos (opcional)
+        - limite: Resultados por página (default 20, máximo 50)
+        - pagina: Número de página (default 1)
+
+        Retorna:
+        - 200: {
+            "resultados": [{
+                "id": "...", "patente": "ABC123", "estado": "CERRADA", "tipo": "...",
+                "site": "...", "apertura": "...", "cierre": "...", "relevancia": 0.42,
+                "resaltado": {"motivo": "...<mark>embrague</mark>...", "diagnostico": "...",
+                              "causa_ingreso": "...", "comentario": "..." | null}
+                # HTML: texto escapado, coincidencias en <mark>
+            }, ...],
+            "pagina": 1,
+            "hay_mas": true
+          }
+        - 400: Si falta q o las fechas no son válidas
+        - 403: Si el rol no tiene acceso
+
+        Características especiales:
+        - Usa columnas tsvector con índice GIN (ver apps/workorders/busqueda.py)
+        - Ignora tildes si la base tiene la extensión unaccent
+        """
+        from datetime import date
+        from .busqueda import buscar_ots
+
+        if request.user.rol not in ("JEFE_TALLER", "SUPERVISOR", "COORDINADOR_ZONA", "ADMIN"):
+            return Response(
+                {"detail": "No tiene permisos para buscar órdenes de trabajo."},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        texto = request.query_params.get("q", "").strip()
+        if not texto:
+            return Response(
+                {"detail": "Se requiere el parámetro 'q'."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            desde = request.query_params.get("desde")
+            hasta = request.query_params.get("hasta")
+            desde = date.fromisoformat(desde) if desde else None
+            hasta = date.fromisoformat(hasta) if hasta else None
+        except ValueError:
+            return Response(
+                {"detail": "Formato de fecha inválido. Use YYYY-MM-DD"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            limite = min(max(int(request.query_params.get("limite", 20)), 1), 50)
+            pagina = max(int(request.query_params.get("pagina", 1)), 1)
+        except ValueError:
+            limite, pagina = 20, 1
+
+        resultados, hay_mas = buscar_ots(
+            texto,
+            site=request.query_params.get("site") or None,
+            desde=desde,
+            hasta=hasta,
+            limite=limite,
+            pagina=pagina,
+        )
+
+        return Response({
+            "resultados": [
+                {
+                    "id": str(r["ot"].id),
+                    "patente": r["ot"].vehiculo.patente if r["ot"].vehiculo else None,
+                    "estado": r["ot"].estado,
+                    "tipo": r["ot"].tipo,
+                    "site": r["ot"].site,
+                    "apertura": r["ot"].apertura.isoformat(),
+                    "cierre": r["ot"].cierre.isoformat() if r["ot"].cierre else None,
+                    "relevancia": round(r["relevancia"], 4),
+                    "resaltado": r["resaltado"],
+                }
+                for r in resultados
+            ],
+            "pagina": pagina,
+            "hay_mas": hay_mas,
+        })
+
     def create(self, request, *args, **kwargs):
         """
         Crea una nueva OT y envía notificaciones a usuarios relevantes.
@@ -1394,7 +1498,7 @@ class ChecklistViewSet(viewsets.ModelViewSet):
 
 
 # ============== EVIDENCIAS (incluye presigned S3) =================
-class EvidenciaViewSet(viewsets.ModelViewSet):
+class EvidenciaViewSet(AlcancePorRolMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestión de Evidencias (fotos/documentos).
     
@@ -1417,6 +1521,13 @@ class EvidenciaViewSet(viewsets.ModelViewSet):
     - Por OT
     - Ordenamiento por fecha de subida
     
+    Visibilidad (Evidencia.ALCANCE_POR_ROL, un solo filtro por rol):
+    - JEFE_TALLER: todas las evidencias de su Site
+    - SUPERVISOR: solo evidencias de su Site
+    - ADMIN: todas las evidencias
+    - MECANICO: evidencias que él subió o de la OT en la que trabaja
+    - GUARDIA: evidencias que él subió
+    
     Flujo de subida:
     1. Frontend llama a /presigned/ para obtener URL
     2. Frontend sube archivo directamente a S3 usando URL presigned
@@ -1430,59 +1541,6 @@ class EvidenciaViewSet(viewsets.ModelViewSet):
     filterset_fields = ["tipo", "ot"]
     ordering_fields = ["subido_en"]
     
-    def get_queryset(self):
-        """
-        Filtra el queryset según el rol del usuario.
-        
-        - JEFE_TALLER: todas las evidencias de su Site
-        - SUPERVISOR: solo evidencias de su Site
-        - ADMIN: todas las evidencias
-        - MECANICO: evidencias que él subió o de la OT en la que trabaja
-        - GUARDIA: evidencias que él subió
-        """
-        queryset = super().get_queryset()
-        user = self.request.user
-        
-        if not user or not user.is_authenticated:
-            return queryset.none()
-        
-        rol = getattr(user, "rol", None)
-        
-        # Jefe de Taller: todas las evidencias de su Site
-        if rol == "JEFE_TALLER":
-            user_site = getattr(user, 'profile', None)
-            if user_site and hasattr(user_site, 'site') and user_site.site:
-                return queryset.filter(ot__vehiculo__site=user_site.site)
-            # Si no tiene site configurado, mostrar todas (fallback)
-            return queryset
-        
-        # Supervisor Zonal: solo evidencias de su Site
-        if rol == "SUPERVISOR":
-            user_site = getattr(user, 'profile', None)
-            if user_site and hasattr(user_site, 'site') and user_site.site:
-                return queryset.filter(ot__vehiculo__site=user_site.site)
-            return queryset.none()
-        
-        # Administrador: todas las evidencias
-        if rol == "ADMIN":
-            return queryset
-        
-        # Mecánico: evidencias que él subió o de la OT en la que trabaja
-        if rol == "MECANICO":
-            # Evidencias que él subió
-            queryset_user = queryset.filter(subido_por=user)
-            # Evidencias de OTs asignadas a él
-            queryset_ot = queryset.filter(ot__mecanico=user)
-            # Combinar ambos querysets
-            return queryset_user.union(queryset_ot)
-        
-        # Guardia: solo evidencias que él subió
-        if rol == "GUARDIA":
-            return queryset.filter(subido_por=user)
-        
-        # Otros roles: sin acceso
-        return queryset.none()
-    
     def create(self, request, *args, **kwargs):
         """
         Crea una nueva evidencia y envía notificaciones a usuarios relevantes.
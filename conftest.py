@@ -16,6 +16,16 @@ import uuid
 User = get_user_model()
 
 
+@pytest.fixture(autouse=True)
+def sin_rate_limit(settings):
+    """
+    Desactiva RateLimitMiddleware: los tests hacen muchas solicitudes desde
+    la misma IP. Sus propios tests lo instancian directamente
+    (apps/workorders/tests/test_middleware.py).
+    """
+    settings.RATE_LIMIT_ENABLED = False
+
+
 @pytest.fixture
 def admin_user(db):
     """Crea un usuario administrador para pruebas."""
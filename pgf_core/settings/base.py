@@ -18,6 +18,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",  # Índices con OpClass, búsqueda de texto
     "channels",  # Django Channels para WebSockets
     "rest_framework",
     "rest_framework_simplejwt",
@@ -38,7 +39,7 @@ INSTALLED_APPS = [
 AUTH_USER_MODEL = "users.User"
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
-    # "apps.workorders.middleware.RateLimitMiddleware",  # Descomentar cuando se necesite rate limiting
+    "apps.workorders.middleware.RateLimitMiddleware",                # Limitador atómico (Redis), ver RATE_LIMITS
     "django.contrib.sessions.middleware.SessionMiddleware",         # ✔ requerido
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",                    # opcional pero recomendado
@@ -126,6 +127,21 @@ SIMPLE_JWT = {
     "AUTH_HEADER_TYPES": ("Bearer",),
 }
 
+# -------- Rate limiting (apps/workorders/middleware.py) --------
+# Presupuestos por clase de endpoint: (solicitudes, segundos)
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMITS = {
+    "login": (10, 60),        # /auth/login/ y recuperación de contraseña, por IP
+    "presigned": (60, 60),    # URLs presigned de S3, por usuario
+    "escritura": (300, 60),   # POST/PUT/PATCH/DELETE, por usuario
+    "lectura": (1200, 60),    # GET/HEAD/OPTIONS, por usuario
+}
+# Proxies (IP o red CIDR) cuyo X-Forwarded-For se acepta para obtener la IP
+# del cliente; sin proxies configurados se usa REMOTE_ADDR
+RATE_LIMIT_PROXIES_CONFIABLES = [
+    p.strip() for p in os.getenv("RATE_LIMIT_PROXIES_CONFIABLES", "").split(",") if p.strip()
+]
+
 # -------- Logging --------
 LOGGING = {
     "version": 1,
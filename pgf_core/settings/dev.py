@@ -22,6 +22,31 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'apps.workorders.tasks_colacion.finalizar_colacion_automatica',
         'schedule': crontab(hour=13, minute=15),  # Todos los días a las 13:15
     },
+    # Snapshot diario de la composición de la flota (tendencias de disponibilidad)
+    'generar-snapshot-flota': {
+        'task': 'apps.vehicles.tasks.generar_snapshot_flota',
+        'schedule': crontab(hour=23, minute=50),  # Todos los días a las 23:50
+    },
+    # Lookup de portería: patentes agendadas del día antes del primer turno
+    'precalentar-lookup-porteria': {
+        'task': 'apps.vehicles.tasks.precalentar_lookup_porteria',
+        'schedule': crontab(hour=5, minute=30),  # Todos los días a las 05:30
+    },
+    # Stock de bodega al cierre del día anterior (stock histórico y valorización)
+    'capturar-snapshot-stock': {
+        'task': 'apps.inventory.tasks.capturar_snapshot_stock',
+        'schedule': crontab(hour=0, minute=15),  # Todos los días a las 00:15
+    },
+    # Puntos de reorden dinámicos desde el consumo de repuestos
+    'calcular-sugerencias-reorden': {
+        'task': 'apps.inventory.tasks.calcular_sugerencias_reorden',
+        'schedule': crontab(hour=1, minute=0),  # Todos los días a las 01:00
+    },
+    # Próxima mantención preventiva proyectada de cada vehículo
+    'recalcular-pronosticos-mantencion': {
+        'task': 'apps.scheduling.tasks.recalcular_pronosticos_mantencion',
+        'schedule': crontab(hour=0, minute=30),  # Todos los días a las 00:30
+    },
 }
 
 CELERY_TIMEZONE = 'America/Santiago'